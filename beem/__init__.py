@@ -5,13 +5,16 @@ __all__ = [
     "steem",
     "aes",
     "account",
+    "accounthistory",
     "amount",
     "asset",
     "block",
     "blockchain",
+    "blockstore",
     "market",
     "storage",
     "price",
+    "refblock",
     "utils",
     "wallet",
     "vote",
@@ -13,9 +13,9 @@ import logging
 from prettytable import PrettyTable
 from beem.instance import shared_steem_instance
 from .exceptions import AccountDoesNotExistsException, OfflineHasNoRPCException
-from beemapi.exceptions import ApiNotSupported
 from .blockchainobject import BlockchainObject
 from .blockchain import Blockchain
+from .accounthistory import AccountHistoryBatch, AccountHistoryDownloader, get_account_history
 from .utils import formatTimeString, formatTimedelta, remove_from_dict, reputation_to_score, addTzInfo
 from beem.amount import Amount
 from beembase import operations
@@ -879,14 +879,7 @@ class Account(BlockchainObject):
             return None
         self.steem.rpc.set_next_node_on_empty_reply(False)
         # self.steem.rpc.set_next_node_on_empty_reply(True)
-        if self.steem.rpc.get_use_appbase():
-            try:
-                ret = self.steem.rpc.get_account_history({'account': account["name"], 'start': start, 'limit': limit}, api="account_history")['history']
-            except ApiNotSupported:
-                ret = self.steem.rpc.get_account_history(account["name"], start, limit)
-        else:
-            ret = self.steem.rpc.get_account_history(account["name"], start, limit, api="database")
-        return ret
+        return get_account_history(self.steem.rpc, account["name"], start=start, limit=limit)
 
     def estimate_virtual_op_num(self, blocktime, stop_diff=1, max_count=100):
         """ Returns an estimation of an virtual operation index for a given time or blockindex
@@ -1135,6 +1128,38 @@ class Account(BlockchainObject):
             if not only_ops or op_type in only_ops:
                 yield construct_op(self["name"])
 
+    def _get_history_start_index(self, start, use_block_num, batch_size, max_index):
+        """ Returns the account history index at which a chronological history
+            starting at ``start`` has to begin
+        """
+        if start is not None and not use_block_num and not isinstance(start, (datetime, date, time)):
+            start_index = start
+        elif start is not None and max_index > batch_size:
+            op_est = self.estimate_virtual_op_num(start, stop_diff=1)
+            est_diff = 0
+            if isinstance(start, (datetime, date, time)):
+                for h in self.get_account_history(op_est, 0):
+                    block_date = formatTimeString(h["timestamp"])
+                while(op_est > est_diff + batch_size and block_date > start):
+                    est_diff += batch_size
+                    if op_est - est_diff < 0:
+                        est_diff = op_est
+                    for h in self.get_account_history(op_est - est_diff, 0):
+                        block_date = formatTimeString(h["timestamp"])
+            elif not isinstance(start, (datetime, date, time)):
+                for h in self.get_account_history(op_est, 0):
+                    block_num = h["block"]
+                while(op_est > est_diff + batch_size and block_num > start):
+                    est_diff += batch_size
+                    if op_est - est_diff < 0:
+                        est_diff = op_est
+                    for h in self.get_account_history(op_est - est_diff, 0):
+                        block_num = h["block"]
+            start_index = op_est - est_diff
+        else:
+            start_index = 0
+        return start_index
+
     def history(
         self, start=None, stop=None, use_block_num=True,
         only_ops=[], exclude_ops=[], batch_size=1000, raw_output=False
@@ -1218,32 +1243,7 @@ class Account(BlockchainObject):
             return
         start = addTzInfo(start)
         stop = addTzInfo(stop)
-        if start is not None and not use_block_num and not isinstance(start, (datetime, date, time)):
-            start_index = start
-        elif start is not None and max_index > batch_size:
-            op_est = self.estimate_virtual_op_num(start, stop_diff=1)
-            est_diff = 0
-            if isinstance(start, (datetime, date, time)):
-                for h in self.get_account_history(op_est, 0):
-                    block_date = formatTimeString(h["timestamp"])
-                while(op_est > est_diff + batch_size and block_date > start):
-                    est_diff += batch_size
-                    if op_est - est_diff < 0:
-                        est_diff = op_est
-                    for h in self.get_account_history(op_est - est_diff, 0):
-                        block_date = formatTimeString(h["timestamp"])
-            elif not isinstance(start, (datetime, date, time)):
-                for h in self.get_account_history(op_est, 0):
-                    block_num = h["block"]
-                while(op_est > est_diff + batch_size and block_num > start):
-                    est_diff += batch_size
-                    if op_est - est_diff < 0:
-                        est_diff = op_est
-                    for h in self.get_account_history(op_est - est_diff, 0):
-                        block_num = h["block"]
-            start_index = op_est - est_diff
-        else:
-            start_index = 0
+        start_index = self._get_history_start_index(start, use_block_num, batch_size, max_index)
 
         first = start_index + _limit
         if first > max_index:
@@ -1295,6 +1295,92 @@ class Account(BlockchainObject):
                 elif first > max_index or last_round:
                     break
 
+    def get_account_history_batch(self, index, limit):
+        """ Returns the account history from ``index - limit`` up to ``index`` as
+            :class:`beem.accounthistory.AccountHistoryBatch`
+
+            :param int index: highest account history index of the batch
+            :param int limit: number of operations before index
+        """
+        return AccountHistoryBatch(self["name"], self._get_account_history(start=index, limit=limit) or [])
+
+    def history_batches(
+        self, start=None, stop=None, use_block_num=True,
+        only_ops=[], exclude_ops=[], batch_size=1000, threading=False, thread_num=None
+    ):
+        """ Returns a generator of columnar batches of the account history. The
+            earliest operation will be first.
+
+            :param int/datetime start: start number/date of transactions to
+                return (*optional*)
+            :param int/datetime stop: stop number/date of transactions to
+                return (*optional*)
+            :param bool use_block_num: if true, start and stop are block numbers,
+                otherwise virtual OP count numbers.
+            :param array only_ops: Limit generator by these
+                operations (*optional*)
+            :param array exclude_ops: Exclude thse operations from
+                generator (*optional*)
+            :param int batch_size: internal api call batch size (*optional*)
+            :param bool threading: when True, the batches are downloaded in parallel from
+                all nodes by a :class:`beem.accounthistory.AccountHistoryDownloader`
+            :param int thread_num: number of parallel requests, when `threading` is set
+
+            Every received batch is stored as :class:`beem.accounthistory.AccountHistoryBatch`
+            and filtered as a whole, no dict is created and no operation hash is
+            calculated per operation. Empty batches are skipped.
+
+            .. code-block:: python
+
+                from beem.account import Account
+                acc = Account("gtg")
+                blocks = 0
+                for batch in acc.history_batches(only_ops=["producer_reward"]):
+                    blocks += len(batch)
+
+        """
+        max_index = self.virtual_op_count()
+        if not max_index or not batch_size:
+            return
+        start = addTzInfo(start)
+        stop = addTzInfo(stop)
+        index = self._get_history_start_index(start, use_block_num, batch_size, max_index)
+        if threading:
+            stop_index = max_index
+            if stop is not None and not use_block_num and not isinstance(stop, (datetime, date, time)):
+                stop_index = min(stop, max_index)
+            downloader = AccountHistoryDownloader(self["name"], thread_num=thread_num, batch_size=batch_size,
+                                                  steem_instance=self.steem)
+            batches = downloader.download(start=index, stop=stop_index)
+        else:
+            batches = self._get_history_batches(index, max_index, batch_size)
+        try:
+            for batch in batches:
+                stop_reached = stop is not None and batch.is_past(stop, use_block_num=use_block_num)
+                batch = batch.filter(start=start, stop=stop, use_block_num=use_block_num,
+                                     only_ops=only_ops, exclude_ops=exclude_ops)
+                if len(batch):
+                    yield batch
+                if stop_reached:
+                    return
+        finally:
+            batches.close()
+
+    def _get_history_batches(self, index, max_index, batch_size):
+        """ Yields the account history from index to max_index in batches of batch_size"""
+        while index <= max_index:
+            limit = batch_size
+            first = index + limit
+            if first > max_index:
+                first = max_index
+                limit = max_index - index
+            batch = self.get_account_history_batch(first, limit)
+            if not len(batch):
+                return
+            # the first rows can overlap with the previous batch
+            yield batch.select([i >= index for i in batch.index])
+            index = first + 1
+
     def history_reverse(
         self, start=None, stop=None, use_block_num=True,
         only_ops=[], exclude_ops=[], batch_size=1000, raw_output=False
@@ -2230,15 +2316,18 @@ class Accounts(AccountsObject):
         if not self.steem.is_connected():
             return
         accounts = []
-        name_cnt = 0
-
-        while name_cnt < len(name_list):
-            self.steem.rpc.set_next_node_on_empty_reply(False)
-            if self.steem.rpc.get_use_appbase():
-                accounts += self.steem.rpc.find_accounts({'accounts': name_list[name_cnt:batch_limit + name_cnt]}, api="database")["accounts"]
-            else:
+        self.steem.rpc.set_next_node_on_empty_reply(False)
+        if self.steem.rpc.get_use_appbase():
+            # all chunks are send in a single batch call
+            batch = self.steem.rpc.batch()
+            for name_cnt in range(0, len(name_list), batch_limit):
+                batch.find_accounts({'accounts': name_list[name_cnt:batch_limit + name_cnt]}, api="database")
+            if len(batch) > 0:
+                for ret in batch.execute():
+                    accounts += ret["accounts"]
+        else:
+            for name_cnt in range(0, len(name_list), batch_limit):
                 accounts += self.steem.rpc.get_accounts(name_list[name_cnt:batch_limit + name_cnt])
-            name_cnt += batch_limit
 
         super(Accounts, self).__init__(
             [
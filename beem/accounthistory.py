@@ -0,0 +1,401 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import int, str
+import calendar
+import threading
+import time
+from array import array
+from datetime import datetime, date
+from itertools import compress
+from beembase.operationids import ops as _known_ops
+from beemapi.exceptions import ApiNotSupported
+from beemapi.steemnoderpc import SteemNodeRPC
+from beemapi.nodepool import NodePool
+from beemapi.batchcontroller import BatchController
+from .blockchain import Blockchain, BlockFetcher, FUTURES_MODULE
+
+#: Operation type names, the position is the type id used in :attr:`AccountHistoryBatch.op_type`.
+#: Operation names which are unknown to :mod:`beembase.operationids` are appended when they are seen.
+op_type_names = list(_known_ops)
+_op_type_ids = {name: i for i, name in enumerate(op_type_names)}
+_op_type_lock = threading.Lock()
+
+_day_cache = {}
+
+try:
+    array("q")
+    _int64 = "q"
+except ValueError:
+    # python 2 has no long long arrays
+    _int64 = "l"
+
+
+def get_op_type_id(op_type):
+    """ Returns the type id of an operation name, unknown names get a new id
+
+        :param str op_type: operation name, e.g. ``vote``
+    """
+    type_id = _op_type_ids.get(op_type)
+    if type_id is None:
+        with _op_type_lock:
+            type_id = _op_type_ids.get(op_type)
+            if type_id is None:
+                type_id = len(op_type_names)
+                op_type_names.append(op_type)
+                _op_type_ids[op_type] = type_id
+    return type_id
+
+
+def timestamp_to_epoch(timestamp):
+    """ Converts a timestamp string of the form ``2018-01-01T00:00:00`` into seconds since epoch
+
+        The date part is parsed once per day, so that converting the timestamps of an
+        account history costs only a few string slices per operation.
+    """
+    day = timestamp[:10]
+    seconds = _day_cache.get(day)
+    if seconds is None:
+        if len(_day_cache) > 100000:
+            _day_cache.clear()
+        seconds = calendar.timegm(time.strptime(day, "%Y-%m-%d"))
+        _day_cache[day] = seconds
+    return seconds + int(timestamp[11:13]) * 3600 + int(timestamp[14:16]) * 60 + int(timestamp[17:19])
+
+
+def get_account_history(rpc, account, start=-1, limit=0):
+    """ Returns the raw account history from ``start - limit`` up to ``start``
+
+        :param beemapi.steemnoderpc.SteemNodeRPC rpc: rpc instance
+        :param str account: account name
+        :param int start: highest history index, -1 is the latest
+        :param int limit: number of operations before start
+    """
+    if rpc.get_use_appbase():
+        try:
+            return rpc.get_account_history({'account': account, 'start': start, 'limit': limit}, api="account_history")['history']
+        except ApiNotSupported:
+            return rpc.get_account_history(account, start, limit)
+    return rpc.get_account_history(account, start, limit, api="database")
+
+
+def to_epoch(value):
+    """ Converts a datetime/date into seconds since epoch, other values are returned unchanged"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            return calendar.timegm(value.utctimetuple())
+        return calendar.timegm(value.timetuple())
+    elif isinstance(value, date):
+        return calendar.timegm(value.timetuple())
+    return value
+
+
+class AccountHistoryBatch(object):
+    """ Columnar batch of account history operations
+
+        :param str account: name of the account
+        :param list history: history items as returned by ``get_account_history``,
+            i.e. a list of ``[index, event]`` pairs
+
+        The batch has one column per field, all columns have the same length:
+
+        * ``index`` - ``array('q')`` of the account history indices
+        * ``block`` - ``array('q')`` of the block numbers
+        * ``timestamp`` - ``array('q')`` of the block times in seconds since epoch
+        * ``op_type`` - ``array('l')`` of operation type ids, see :attr:`op_type_names`
+        * ``trx_id`` - list of transaction ids
+        * ``op`` - list of the raw operation payloads
+
+        The raw events are kept without copies, dicts as returned by
+        :func:`beem.account.Account.get_account_history` are only built by
+        :func:`to_dicts` and the operation hash is only calculated by
+        :func:`hashes`.
+
+        .. code-block:: python
+
+            from beem.account import Account
+            acc = Account("gtg")
+            for batch in acc.history_batches(only_ops=["producer_reward"]):
+                print(len(batch), batch.block[-1])
+
+    """
+    __slots__ = ["account", "index", "block", "timestamp", "op_type", "trx_id", "op", "_events", "_hashes"]
+
+    def __init__(self, account, history=None):
+        self.account = account
+        self.index = array(_int64)
+        self.block = array(_int64)
+        self.timestamp = array(_int64)
+        self.op_type = array("l")
+        self.trx_id = []
+        self.op = []
+        self._events = []
+        self._hashes = None
+        if history:
+            self.extend(history)
+
+    def extend(self, history):
+        """ Appends history items, as returned by ``get_account_history``"""
+        events = [item[1] for item in history]
+        self.index.extend([item[0] for item in history])
+        self.block.extend([event["block"] for event in events])
+        self.timestamp.extend([timestamp_to_epoch(event["timestamp"]) for event in events])
+        ops = [event["op"] for event in events]
+        self.op_type.extend([get_op_type_id(self._op_name(op)) for op in ops])
+        self.trx_id.extend([event.get("trx_id") for event in events])
+        self.op.extend(ops)
+        self._events.extend(events)
+        self._hashes = None
+
+    @staticmethod
+    def _op_name(op):
+        if isinstance(op, dict):
+            op_type = op["type"]
+            if op_type.endswith("_operation"):
+                op_type = op_type[:-10]
+            return op_type
+        return op[0]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __repr__(self):
+        if not len(self):
+            return "<AccountHistoryBatch %s empty>" % self.account
+        return "<AccountHistoryBatch %s index=%d..%d n=%d>" % (self.account, self.index[0], self.index[-1], len(self))
+
+    @property
+    def op_type_names(self):
+        """ Returns the operation name of every operation"""
+        return [op_type_names[i] for i in self.op_type]
+
+    def select(self, mask):
+        """ Returns a new batch which contains only the rows where mask is true
+
+            :param list mask: one boolean per row
+        """
+        if all(mask):
+            return self
+        batch = AccountHistoryBatch(self.account)
+        batch.index = array(_int64, compress(self.index, mask))
+        batch.block = array(_int64, compress(self.block, mask))
+        batch.timestamp = array(_int64, compress(self.timestamp, mask))
+        batch.op_type = array("l", compress(self.op_type, mask))
+        batch.trx_id = list(compress(self.trx_id, mask))
+        batch.op = list(compress(self.op, mask))
+        batch._events = list(compress(self._events, mask))
+        if self._hashes is not None:
+            batch._hashes = list(compress(self._hashes, mask))
+        return batch
+
+    def mask(self, start=None, stop=None, use_block_num=True, only_ops=[], exclude_ops=[]):
+        """ Returns a list with one boolean per row, which is true for rows passing the filter
+
+            :param int/datetime start: lowest block number, index or time (*optional*)
+            :param int/datetime stop: highest block number, index or time (*optional*)
+            :param bool use_block_num: if true, start and stop are block numbers,
+                otherwise virtual OP count numbers.
+            :param array only_ops: Limit to these operations (*optional*)
+            :param array exclude_ops: Exclude these operations (*optional*)
+        """
+        mask = [True] * len(self)
+        if only_ops:
+            type_ids = set(get_op_type_id(o) for o in only_ops)
+            mask = [m and t in type_ids for m, t in zip(mask, self.op_type)]
+        if exclude_ops:
+            type_ids = set(get_op_type_id(o) for o in exclude_ops)
+            mask = [m and t not in type_ids for m, t in zip(mask, self.op_type)]
+        for value, lower in ((start, True), (stop, False)):
+            if value is None:
+                continue
+            column = self._column(value, use_block_num)
+            value = to_epoch(value)
+            if lower:
+                mask = [m and c >= value for m, c in zip(mask, column)]
+            else:
+                mask = [m and c <= value for m, c in zip(mask, column)]
+        return mask
+
+    def filter(self, start=None, stop=None, use_block_num=True, only_ops=[], exclude_ops=[]):
+        """ Returns a new batch with the rows passing the filter, the parameters are the same as in :func:`mask`"""
+        return self.select(self.mask(start=start, stop=stop, use_block_num=use_block_num,
+                                     only_ops=only_ops, exclude_ops=exclude_ops))
+
+    def is_past(self, stop, use_block_num=True):
+        """ Returns True when the last row is behind ``stop``
+
+            :param int/datetime stop: highest block number, index or time
+            :param bool use_block_num: if true, stop is a block number,
+                otherwise a virtual OP count number.
+        """
+        if not len(self):
+            return False
+        return self._column(stop, use_block_num)[-1] > to_epoch(stop)
+
+    def _column(self, value, use_block_num):
+        if isinstance(value, (datetime, date)):
+            return self.timestamp
+        elif use_block_num:
+            return self.block
+        return self.index
+
+    def hashes(self):
+        """ Returns the operation hash of every row, which is the ``_id`` in
+            :func:`beem.account.Account.get_account_history`. The hashes are calculated
+            on the first call.
+        """
+        if self._hashes is None:
+            self._hashes = [Blockchain.hash_op(self._immutable(event)) for event in self._events]
+        return self._hashes
+
+    def _immutable(self, event):
+        op = event["op"]
+        op_type = self._op_name(op)
+        op = op["value"] if isinstance(op, dict) else op[1]
+        immutable = op.copy()
+        immutable.update({k: v for k, v in event.items() if k != "op"})
+        immutable.update({
+            'account': self.account,
+            'type': op_type,
+        })
+        return immutable
+
+    def to_dicts(self, with_hash=True):
+        """ Returns a list of dicts, which are the same as the output of
+            :func:`beem.account.Account.get_account_history`
+
+            :param bool with_hash: when False, ``_id`` is not added
+        """
+        hashes = self.hashes() if with_hash else None
+        result = []
+        for i, event in enumerate(self._events):
+            immutable = self._immutable(event)
+            if hashes is not None:
+                immutable["_id"] = hashes[i]
+            immutable["index"] = self.index[i]
+            result.append(immutable)
+        return result
+
+    def raw(self):
+        """ Returns the rows as ``[index, event]`` pairs, as returned by the node"""
+        return [[i, event] for i, event in zip(self.index, self._events)]
+
+
+class AccountHistoryDownloader(object):
+    """ Downloads an account history in parallel from all nodes
+
+        :param str account: name of the account
+        :param list nodes: node urls (default are the nodes of the steem instance)
+        :param int thread_num: number of parallel requests (default is
+            ``max_concurrency`` times the number of nodes)
+        :param int batch_size: number of operations per request. When None, the
+            batch size and the parallel requests of every node are adapted by
+            ``controller`` (default is None)
+        :param int max_concurrency: maximum number of parallel requests per node (default is 4)
+        :param dict weights: capacity of a node relative to the other nodes,
+            given as ``{url: weight}`` (default is 1 for every node)
+        :param int num_retries: number of retries of a single range, before its
+            error is raised (default is 3)
+        :param float retry_delay: waiting time in seconds between two retries (default is 1)
+        :param beem.steem.Steem steem_instance: Steem instance, whose nodes and rpc
+            settings are used, when ``nodes`` is not set
+        :param BatchController controller: controller which is used, when
+            ``batch_size`` is None (default is a new
+            :class:`beemapi.batchcontroller.BatchController`)
+
+        The index range is split into ranges of ``batch_size`` operations, or of the
+        current batch size of the controller, which
+        are requested by a :class:`beem.blockchain.BlockFetcher`. The requests are
+        spread over all nodes by a :class:`beemapi.nodepool.NodePool`, a range which
+        failed on one node is requested from another node.
+        The batches are yielded in order, :attr:`checkpoint` is the index from
+        which a stopped download can be resumed.
+
+        .. code-block:: python
+
+            from beem.accounthistory import AccountHistoryDownloader
+            downloader = AccountHistoryDownloader("gtg")
+            for batch in downloader.download(start=0):
+                store(batch)
+                save_checkpoint(downloader.checkpoint)
+
+    """
+    def __init__(self, account, nodes=None, thread_num=None, batch_size=None, max_concurrency=4,
+                 weights=None, num_retries=3, retry_delay=1, steem_instance=None, controller=None):
+        self.account = account
+        rpc_kwargs = {}
+        if nodes is None:
+            from beem.instance import shared_steem_instance
+            rpc = (steem_instance or shared_steem_instance()).rpc
+            nodes = [rpc.nodes[i].url for i in range(len(rpc.nodes))]
+            rpc_kwargs = {"user": rpc.user, "password": rpc.password, "timeout": rpc.timeout,
+                          "use_condenser": rpc.use_condenser}
+        elif not isinstance(nodes, (list, tuple)):
+            nodes = [nodes]
+        if not nodes:
+            raise ValueError("At least one node is needed")
+        self.nodes = list(nodes)
+        if batch_size is None and controller is None:
+            # the api returns at most 1000 operations
+            controller = BatchController(batch_size=100, max_batch_size=1000,
+                                         concurrency=max(1, max_concurrency // 2), max_concurrency=max_concurrency)
+        self.controller = controller if batch_size is None else None
+        self.pool = NodePool(self.nodes, rpc_class=SteemNodeRPC, max_concurrency=max_concurrency,
+                             weights=weights, controller=self.controller, **rpc_kwargs)
+        if thread_num is None:
+            thread_num = self.pool.max_workers
+        self.thread_num = thread_num
+        self.batch_size = batch_size
+        self.num_retries = num_retries
+        self.retry_delay = retry_delay
+        self.checkpoint = None
+
+    def fetch(self, start, stop):
+        """ Returns the operations from ``start`` to ``stop`` (including) as
+            :class:`AccountHistoryBatch`. A ValueError is raised, when the node
+            did not return all of them.
+        """
+        def fetch_range(rpc):
+            history = get_account_history(rpc, self.account, stop, stop - start)
+            history = [item for item in history if start <= item[0] <= stop]
+            if len(history) != stop - start + 1:
+                raise ValueError("Node %s returned %d of %d operations between %d and %d" % (
+                    rpc.url, len(history), stop - start + 1, start, stop))
+            return history
+        return AccountHistoryBatch(self.account, self.pool.run(fetch_range, batch_size=stop - start + 1))
+
+    def download(self, start=0, stop=None):
+        """ Yields the account history from ``start`` to ``stop`` as
+            :class:`AccountHistoryBatch` in order
+
+            :param int start: first history index, e.g. a stored :attr:`checkpoint` (default is 0)
+            :param int stop: last history index (default is the current ``virtual_op_count``)
+        """
+        if not FUTURES_MODULE:
+            raise Exception("concurrent.futures is required for the AccountHistoryDownloader")
+        if stop is None:
+            latest = self.pool.run(lambda rpc: get_account_history(rpc, self.account, -1, 0))
+            if not latest:
+                return
+            stop = latest[0][0]
+        self.checkpoint = start
+        if stop < start:
+            return
+        fetcher = BlockFetcher(lambda index_range: self.fetch(*index_range), thread_num=self.thread_num,
+                               num_retries=self.num_retries, retry_delay=self.retry_delay)
+        try:
+            for batch in fetcher.fetch_items(self._get_ranges(start, stop)):
+                self.checkpoint = batch.index[-1] + 1
+                yield batch
+        finally:
+            fetcher.close()
+
+    def _get_ranges(self, start, stop):
+        """Yields the index ranges, the batch size is read when a range is requested"""
+        first = start
+        while first <= stop:
+            batch_size = self.batch_size or self.controller.batch_size()
+            yield first, min(first + batch_size - 1, stop)
+            first += batch_size
@@ -0,0 +1,160 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import logging
+from beemapi.asyncsteemnoderpc import AsyncSteemNodeRPC
+from .steem import Steem
+from .storage import configStorage as config
+from .exceptions import BlockDoesNotExistsException, AccountDoesNotExistsException
+
+log = logging.getLogger(__name__)
+
+
+class AsyncSteem(object):
+    """ Read-only connection to the Steem network for asyncio applications.
+
+        :param str node: Node to connect to *(optional)*
+        :param str rpcuser: RPC user *(optional)*
+        :param str rpcpassword: RPC password *(optional)*
+        :param int num_retries: Set the maximum number of reconnects to the nodes before
+            NumRetriesReached is raised. Disabled for -1. (default is -1)
+        :param int num_retries_call: Repeat num_retries_call times a rpc call on node error (default is 5)
+        :param int timeout: Timeout setting for https nodes (default is 60)
+        :param int max_connections: Size of the https connection pool (default is 32)
+
+        All calls are coroutines, so that many of them can be awaited
+        concurrently on a single connection pool:
+
+        .. code-block:: python
+
+            import asyncio
+            from beem.asyncsteem import AsyncSteem
+
+            async def main():
+                async with AsyncSteem() as stm:
+                    blocks = await stm.get_blocks(range(1, 1001))
+                    accounts = await stm.get_accounts(["holger80", "beembot"])
+
+            asyncio.get_event_loop().run_until_complete(main())
+
+        The returned blocks and accounts are the plain dicts which are
+        returned by the node.
+    """
+
+    def __init__(self,
+                 node="",
+                 rpcuser=None,
+                 rpcpassword=None,
+                 **kwargs):
+        """Init AsyncSteem"""
+        if not node:
+            node = self.get_default_nodes()
+            if not bool(node):
+                raise ValueError("A Steem node needs to be provided!")
+
+        if not rpcuser and "rpcuser" in config:
+            rpcuser = config["rpcuser"]
+
+        if not rpcpassword and "rpcpassword" in config:
+            rpcpassword = config["rpcpassword"]
+        self.rpc = AsyncSteemNodeRPC(node, rpcuser, rpcpassword, **kwargs)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __repr__(self):
+        if self.rpc.url:
+            return "<%s node=%s>" % (self.__class__.__name__, str(self.rpc.url))
+        return "<%s>" % (self.__class__.__name__)
+
+    async def connect(self):
+        """Connects to the first working node"""
+        if self.rpc.url is None:
+            await self.rpc.rpcconnect()
+
+    async def close(self):
+        """Closes all open connections"""
+        await self.rpc.rpcclose()
+
+    get_default_nodes = Steem.get_default_nodes
+
+    async def get_dynamic_global_properties(self):
+        """ This call returns the *dynamic global properties*"""
+        await self.connect()
+        return await self.rpc.get_dynamic_global_properties(api="database")
+
+    async def get_config(self):
+        """ Returns internal chain configuration."""
+        await self.connect()
+        return await self.rpc.get_config(api="database")
+
+    async def get_block(self, block_num, only_ops=False, only_virtual_ops=False):
+        """ Returns a single block
+
+            :param int block_num: block number
+            :param bool only_ops: Returns only the operations of the block (default: False)
+            :param bool only_virtual_ops: Returns only the virtual operations (default: False)
+        """
+        await self.connect()
+        block_num = int(block_num)
+        if only_ops or only_virtual_ops:
+            if self.rpc.get_use_appbase():
+                ops = (await self.rpc.get_ops_in_block({"block_num": block_num, 'only_virtual': only_virtual_ops}, api="account_history"))["ops"]
+            else:
+                ops = await self.rpc.get_ops_in_block(block_num, only_virtual_ops)
+            if not ops:
+                raise BlockDoesNotExistsException(str(block_num))
+            block = {'block': ops[0]["block"],
+                     'timestamp': ops[0]["timestamp"],
+                     'operations': ops}
+        else:
+            if self.rpc.get_use_appbase():
+                block = await self.rpc.get_block({"block_num": block_num}, api="block")
+                if block and "block" in block:
+                    block = block["block"]
+            else:
+                block = await self.rpc.get_block(block_num)
+        if not block:
+            raise BlockDoesNotExistsException(str(block_num))
+        block["id"] = block_num
+        return block
+
+    async def get_blocks(self, block_nums, only_ops=False, only_virtual_ops=False):
+        """ Returns a list of blocks, which are all requested concurrently
+
+            :param list block_nums: list of block numbers
+            :param bool only_ops: Returns only the operations of the block (default: False)
+            :param bool only_virtual_ops: Returns only the virtual operations (default: False)
+        """
+        await self.connect()
+        return await asyncio.gather(*[self.get_block(block_num, only_ops=only_ops, only_virtual_ops=only_virtual_ops)
+                                      for block_num in block_nums])
+
+    async def get_accounts(self, names):
+        """ Returns a list of accounts
+
+            :param list names: list of account names
+        """
+        await self.connect()
+        if self.rpc.get_use_appbase():
+            accounts = (await self.rpc.find_accounts({'accounts': list(names)}, api="database"))["accounts"]
+        else:
+            accounts = await self.rpc.get_accounts(list(names))
+        return accounts
+
+    async def get_account(self, name):
+        """ Returns a single account
+
+            :param str name: account name
+        """
+        accounts = await self.get_accounts([name])
+        if not accounts:
+            raise AccountDoesNotExistsException(name)
+        return accounts[0]
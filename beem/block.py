@@ -74,6 +74,14 @@ class Block(BlockchainObject):
         """
         if not isinstance(self.identifier, int):
             self.identifier = int(self.identifier)
+        block_store = None
+        if not self.only_ops and not self.only_virtual_ops:
+            block_store = self.steem.block_store
+        if block_store is not None:
+            block = block_store.get(self.identifier)
+            if block is not None:
+                super(Block, self).__init__(block, steem_instance=self.steem)
+                return
         if not self.steem.is_connected():
             return None
         self.steem.rpc.set_next_node_on_empty_reply(False)
@@ -97,6 +105,10 @@ class Block(BlockchainObject):
                 block = self.steem.rpc.get_block(self.identifier)
         if not block:
             raise BlockDoesNotExistsException(str(self.identifier))
+        if block_store is not None:
+            if self.identifier > block_store.last_irreversible_block_num:
+                block_store = self.steem.update_block_store()
+            block_store.put(self.identifier, block)
         super(Block, self).__init__(block, steem_instance=self.steem)
 
     @property
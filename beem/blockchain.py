@@ -11,21 +11,121 @@ import time
 import hashlib
 import json
 import math
+import logging
+from collections import deque
 from datetime import datetime, timedelta
 from .utils import formatTimeString
 from .block import Block
 from .exceptions import BatchedCallsNotSupported, BlockDoesNotExistsException, BlockWaitTimeExceeded
 from beemgraphenebase.py23 import py23_bytes
+from beemapi.exceptions import ApiNotSupported
+from beemapi.batchcontroller import BatchController
 from beem.instance import shared_steem_instance
 from .amount import Amount
 FUTURES_MODULE = None
 if not FUTURES_MODULE:
     try:
-        from concurrent.futures import ThreadPoolExecutor, wait, as_completed
+        from concurrent.futures import ThreadPoolExecutor, wait
         FUTURES_MODULE = "futures"
     except ImportError:
         FUTURES_MODULE = None
 
+log = logging.getLogger(__name__)
+
+
+class BlockFetcher(object):
+    """ Fetches blocks in parallel and yields them strictly in order
+
+        :param callable fetch: Function which returns the block for a given block number
+        :param int thread_num: Number of blocks which are fetched at the same time (default is 8)
+        :param int read_ahead: Maximum number of blocks which are requested or fetched,
+            but not yet consumed (default is ``2 * thread_num``)
+        :param int num_retries: Number of retries for a single block, before its
+            error is raised (default is 3)
+        :param float retry_delay: Waiting time in seconds between two retries (default is 1)
+
+        A sliding window of ``read_ahead`` requests is kept in flight. A new
+        request is only submitted when the oldest block was consumed, so a
+        slow consumer does not let the prefetched blocks pile up and a slow
+        block only delays the blocks behind it, not a whole chunk.
+
+        .. code-block:: python
+
+            from beem.blockchain import BlockFetcher
+            from beem.block import Block
+            with BlockFetcher(Block, thread_num=8) as fetcher:
+                for block in fetcher.fetch_range(1, 100):
+                    print(block)
+
+    """
+    def __init__(self, fetch, thread_num=8, read_ahead=None, num_retries=3, retry_delay=1):
+        if not FUTURES_MODULE:
+            raise Exception("concurrent.futures is required for the BlockFetcher")
+        self.fetch = fetch
+        self.thread_num = thread_num
+        if read_ahead is None:
+            read_ahead = 2 * thread_num
+        self.read_ahead = max(read_ahead, thread_num)
+        self.num_retries = num_retries
+        self.retry_delay = retry_delay
+        self.pool = ThreadPoolExecutor(max_workers=thread_num)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """ Stops all worker threads. Not yet started requests are dropped."""
+        self.pool.shutdown(wait=False)
+
+    def _fetch_with_retry(self, block_num):
+        retry = 0
+        while True:
+            try:
+                return self.fetch(block_num)
+            except Exception as e:
+                if retry >= self.num_retries:
+                    raise
+                retry += 1
+                log.warning("Retry fetching block %s (%d/%d): %s" % (str(block_num), retry, self.num_retries, str(e)))
+                time.sleep(self.retry_delay)
+
+    def fetch_range(self, start, stop):
+        """ Yields the blocks from ``start`` to ``stop`` (including) in order
+
+            :param int start: First block number
+            :param int stop: Last block number
+        """
+        return self.fetch_items(range(start, stop + 1))
+
+    def fetch_items(self, items):
+        """ Yields the results of ``fetch`` for all items in order
+
+            :param iterable items: arguments of ``fetch``. A lazy iterable is only
+                advanced when a request is submitted, so that later items can
+                depend on the results received so far.
+        """
+        window = deque()
+        items = iter(items)
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(window) < self.read_ahead:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    window.append(self.pool.submit(self._fetch_with_retry, item))
+                if not window:
+                    break
+                yield window.popleft().result()
+        finally:
+            for future in window:
+                future.cancel()
+
 
 @python_2_unicode_compatible
 class Blockchain(object):
@@ -37,6 +137,9 @@ class Blockchain(object):
             actual head block (``head``)
         :param int max_block_wait_repetition: maximum wait repetition for next block
             where each repetition is block_interval long (default is 3)
+        :param BatchController batch_controller: adapts the batch size of
+            ``blocks(max_batch_size="auto")`` to the node, see
+            :class:`beemapi.batchcontroller.BatchController` (default is created on first use)
 
         This class let's you deal with blockchain related data and methods.
         Read blockchain related data:
@@ -83,8 +186,10 @@ class Blockchain(object):
         mode="irreversible",
         max_block_wait_repetition=None,
         data_refresh_time_seconds=900,
+        batch_controller=None,
     ):
         self.steem = steem_instance or shared_steem_instance()
+        self.batch_controller = batch_controller
 
         if mode == "irreversible":
             self.mode = 'last_irreversible_block_num'
@@ -203,15 +308,18 @@ class Blockchain(object):
         ).time()
         return int(time.mktime(block_time.timetuple()))
 
-    def blocks(self, start=None, stop=None, max_batch_size=None, threading=False, thread_num=8, only_ops=False, only_virtual_ops=False):
+    def blocks(self, start=None, stop=None, max_batch_size=None, threading=False, thread_num=8, only_ops=False, only_virtual_ops=False, read_ahead=None):
         """ Yields blocks starting from ``start``.
 
             :param int start: Starting block
             :param int stop: Stop at this block
             :param int max_batch_size: only for appbase nodes. When not None, batch calls of are used.
+                With ``"auto"``, the batch size is adapted to the node by :attr:`batch_controller`.
                 Cannot combine with threading
             :param bool threading: Enables threading. Cannot be combined with batch calls
             :param int thread_num: Defines the number of threads, when `threading` is set.
+            :param int read_ahead: Maximum number of prefetched blocks, when `threading` is set
+                (default is ``2 * thread_num``)
             :param bool only_ops: Only yielding operations, when set to True (default: False)
             :param bool only_virtual_ops: Only yield virtual operations (default: False)
 
@@ -226,111 +334,171 @@ class Blockchain(object):
         current_block_num = current_block.block_num
         if not start:
             start = current_block_num
+        if self.is_irreversible_mode():
+            self.steem.update_block_store(current_block_num)
         head_block_reached = False
-        # We are going to loop indefinitely
-        while True:
-
-            # Get chain properies to identify the
-            if stop:
-                head_block = stop
-            else:
-                current_block_num = self.get_current_block_num()
-                head_block = current_block_num
-            if threading and FUTURES_MODULE and not head_block_reached:
-                pool = ThreadPoolExecutor(max_workers=thread_num + 1)
-                # disable autoclean
-                auto_clean = current_block.get_cache_auto_clean()
-                current_block.set_cache_auto_clean(False)
-                latest_block = 0
-                for blocknum in range(start, head_block + 1, thread_num):
-                    futures = []
-                    i = blocknum
-                    while i < blocknum + thread_num and i <= head_block:
-                        futures.append(pool.submit(Block, i, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem))
-                        i += 1
-                    results = [r.result() for r in as_completed(futures)]
-                    block_nums = []
-                    for b in results:
-                        block_nums.append(int(b.identifier))
-                        if latest_block < int(b.identifier):
-                            latest_block = int(b.identifier)
-                    from operator import itemgetter
-                    blocks = sorted(results, key=itemgetter('id'))
-                    for b in blocks:
-                        yield b
-                    current_block.clear_cache_from_expired_items()
-                if latest_block < head_block:
-                    for blocknum in range(latest_block, head_block + 1):
-                        block = Block(blocknum, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem)
+        fetcher = None
+        if threading and FUTURES_MODULE:
+            # disable autoclean
+            auto_clean = current_block.get_cache_auto_clean()
+            current_block.set_cache_auto_clean(False)
+            # the worker threads are only used until the head block is reached
+            fetcher = BlockFetcher(
+                lambda blocknum: Block(blocknum, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem),
+                thread_num=thread_num,
+                read_ahead=read_ahead,
+                num_retries=self.max_block_wait_repetition,
+                retry_delay=self.block_interval)
+        try:
+            # We are going to loop indefinitely
+            while True:
+
+                # Get chain properies to identify the
+                if stop:
+                    head_block = stop
+                else:
+                    current_block_num = self.get_current_block_num()
+                    head_block = current_block_num
+                    if self.is_irreversible_mode():
+                        self.steem.update_block_store(current_block_num)
+                if fetcher is not None and not head_block_reached:
+                    for block in fetcher.fetch_range(start, head_block):
+                        yield block
+                        if int(block.identifier) % fetcher.read_ahead == 0:
+                            current_block.clear_cache_from_expired_items()
+                    # the following blocks are read one by one
+                    fetcher.close()
+                    fetcher = None
+                    current_block.set_cache_auto_clean(auto_clean)
+                elif max_batch_size == "auto" and not head_block_reached:
+                    if not self.steem.is_connected():
+                        return None
+                    self.steem.rpc.set_next_node_on_empty_reply(False)
+                    for block in self._get_blocks_adaptive(start, head_block, only_ops=only_ops, only_virtual_ops=only_virtual_ops):
                         yield block
+                elif max_batch_size is not None and max_batch_size != "auto" and (head_block - start) >= max_batch_size and not head_block_reached:
+                    if not self.steem.is_connected():
+                        return None
+                    self.steem.rpc.set_next_node_on_empty_reply(False)
+                    for blocknumblock in range(start, head_block + 1, max_batch_size):
+                        block_nums = range(blocknumblock, min(blocknumblock + max_batch_size, head_block + 1))
+                        for block in self._get_block_batch(block_nums, only_ops=only_ops, only_virtual_ops=only_virtual_ops):
+                            yield block
+                else:
+                    # Blocks from start until head block
+                    for blocknum in range(start, head_block + 1):
+                        # Get full block
+                        block = self.wait_for_and_get_block(blocknum, only_ops=only_ops, only_virtual_ops=only_virtual_ops)
+                        yield block
+                # Set new start
+                start = head_block + 1
+                head_block_reached = True
+
+                if stop and start > stop:
+                    # raise StopIteration
+                    return
+
+                # Sleep for one block
+                time.sleep(self.block_interval)
+        finally:
+            if fetcher is not None:
+                fetcher.close()
                 current_block.set_cache_auto_clean(auto_clean)
-            elif max_batch_size is not None and (head_block - start) >= max_batch_size and not head_block_reached:
-                if not self.steem.is_connected():
-                    return None
-                self.steem.rpc.set_next_node_on_empty_reply(False)
-                latest_block = start - 1
-                batches = max_batch_size
-                for blocknumblock in range(start, head_block + 1, batches):
-                    # Get full block
-                    if (head_block - blocknumblock) < batches:
-                        batches = head_block - blocknumblock + 1
-                    for blocknum in range(blocknumblock, blocknumblock + batches - 1):
-                        if only_virtual_ops:
-                            if self.steem.rpc.get_use_appbase():
-                                # self.steem.rpc.get_ops_in_block({"block_num": blocknum, 'only_virtual': only_virtual_ops}, api="account_history", add_to_queue=True)
-                                self.steem.rpc.get_ops_in_block(blocknum, only_virtual_ops, add_to_queue=True)
-                            else:
-                                self.steem.rpc.get_ops_in_block(blocknum, only_virtual_ops, add_to_queue=True)
-                        else:
-                            if self.steem.rpc.get_use_appbase():
-                                self.steem.rpc.get_block({"block_num": blocknum}, api="block", add_to_queue=True)
-                            else:
-                                self.steem.rpc.get_block(blocknum, add_to_queue=True)
-                        latest_block = blocknum
-                    if batches >= 1:
-                        latest_block += 1
-                    if latest_block <= head_block:
-                        if only_virtual_ops:
-                            if self.steem.rpc.get_use_appbase():
-                                # self.steem.rpc.get_ops_in_block({"block_num": blocknum, 'only_virtual': only_virtual_ops}, api="account_history", add_to_queue=False)
-                                block_batch = self.steem.rpc.get_ops_in_block(blocknum, only_virtual_ops, add_to_queue=False)
-                            else:
-                                block_batch = self.steem.rpc.get_ops_in_block(blocknum, only_virtual_ops, add_to_queue=False)
-                        else:
-                            if self.steem.rpc.get_use_appbase():
-                                block_batch = self.steem.rpc.get_block({"block_num": latest_block}, api="block", add_to_queue=False)
-                            else:
-                                block_batch = self.steem.rpc.get_block(latest_block, add_to_queue=False)
-                        if not bool(block_batch):
-                            raise BatchedCallsNotSupported()
-                        blocknum = latest_block - len(block_batch) + 1
-                        if not isinstance(block_batch, list):
-                            block_batch = [block_batch]
-                        for block in block_batch:
-                            if self.steem.rpc.get_use_appbase():
-                                if only_virtual_ops:
-                                    block = block["ops"]
-                                else:
-                                    block = block["block"]
-                            block["id"] = blocknum
-                            yield Block(block, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem)
-                            blocknum += 1
-            else:
-                # Blocks from start until head block
-                for blocknum in range(start, head_block + 1):
-                    # Get full block
-                    block = self.wait_for_and_get_block(blocknum, only_ops=only_ops, only_virtual_ops=only_virtual_ops)
-                    yield block
-            # Set new start
-            start = head_block + 1
-            head_block_reached = True
-
-            if stop and start > stop:
-                # raise StopIteration
-                return
-
-            # Sleep for one block
-            time.sleep(self.block_interval)
+
+    def _get_blocks_adaptive(self, start, stop, only_ops=False, only_virtual_ops=False):
+        """ Yields the blocks from ``start`` to ``stop`` from batch calls, whose size
+            is adapted to the latency and the errors of the node by :attr:`batch_controller`
+        """
+        if self.batch_controller is None:
+            self.batch_controller = BatchController(max_batch_size=500, target_latency=1.)
+        controller = self.batch_controller
+        blocknum = start
+        while blocknum <= stop:
+            url = self.steem.rpc.url
+            block_nums = range(blocknum, min(blocknum + controller.batch_size(url), stop + 1))
+            request_start = time.time()
+            try:
+                blocks = self._get_block_batch(block_nums, only_ops=only_ops, only_virtual_ops=only_virtual_ops)
+            except (BatchedCallsNotSupported, BlockDoesNotExistsException):
+                raise
+            except Exception as e:
+                controller.record(url, len(block_nums), time.time() - request_start, error=True)
+                if len(block_nums) <= controller.min_batch_size:
+                    raise
+                log.warning("Batch of %d blocks failed on %s: %s" % (len(block_nums), url, str(e)))
+                continue
+            controller.record(url, len(block_nums), time.time() - request_start)
+            for block in blocks:
+                yield block
+            blocknum += len(block_nums)
+
+    def _get_block_batch(self, block_nums, only_ops=False, only_virtual_ops=False):
+        """ Returns the blocks for all given block numbers, which are received
+            in a single batch call
+
+            :param list block_nums: block numbers
+            :param bool only_ops: Returns blocks with operations only, when set to True (default: False)
+            :param bool only_virtual_ops: Includes only virtual operations (default: False)
+        """
+        rpc = self.steem.rpc
+        ops_only = only_ops or only_virtual_ops
+        use_account_history_api = ops_only and rpc.get_use_appbase()
+        block_store = None
+        stored_blocks = {}
+        if not ops_only:
+            block_store = self.steem.block_store
+        if block_store is not None:
+            for blocknum in block_nums:
+                block = block_store.get(blocknum)
+                if block is not None:
+                    stored_blocks[blocknum] = block
+        missing_block_nums = [blocknum for blocknum in block_nums if blocknum not in stored_blocks]
+        block_batch = []
+        if block_store is not None and len(missing_block_nums) > 0 and missing_block_nums[-1] > block_store.last_irreversible_block_num:
+            self.steem.update_block_store()
+        if len(missing_block_nums) > 0:
+            batch = rpc.batch(max_batch_size=len(missing_block_nums))
+            for blocknum in missing_block_nums:
+                if use_account_history_api:
+                    batch.get_ops_in_block({"block_num": blocknum, 'only_virtual': only_virtual_ops}, api="account_history")
+                elif ops_only:
+                    batch.get_ops_in_block(blocknum, only_virtual_ops)
+                elif rpc.get_use_appbase():
+                    batch.get_block({"block_num": blocknum}, api="block")
+                else:
+                    batch.get_block(blocknum)
+            try:
+                block_batch = batch.execute()
+            except ApiNotSupported:
+                if not use_account_history_api:
+                    raise
+                batch = rpc.batch(max_batch_size=len(missing_block_nums))
+                for blocknum in missing_block_nums:
+                    batch.get_ops_in_block(blocknum, only_virtual_ops, api="condenser")
+                block_batch = batch.execute()
+            if not any(block_batch):
+                raise BatchedCallsNotSupported()
+        for blocknum, block in zip(missing_block_nums, block_batch):
+            if ops_only:
+                if isinstance(block, dict) and "ops" in block:
+                    block = block["ops"]
+                timestamp = block[0]["timestamp"] if block else None
+                block = {'block': blocknum,
+                         'timestamp': timestamp,
+                         'operations': block}
+            elif block and "block" in block:
+                block = block["block"]
+            if not block:
+                raise BlockDoesNotExistsException(str(blocknum))
+            if block_store is not None:
+                block_store.put(blocknum, block)
+            stored_blocks[blocknum] = block
+        blocks = []
+        for blocknum in block_nums:
+            block = stored_blocks[blocknum]
+            block["id"] = blocknum
+            blocks.append(Block(block, only_ops=only_ops, only_virtual_ops=only_virtual_ops, steem_instance=self.steem))
+        return blocks
 
     def wait_for_and_get_block(self, block_number, blocks_waiting_for=None, only_ops=False, only_virtual_ops=False):
         """ Get the desired block from the chain, if the current head block is smaller (for both head and irreversible)
@@ -413,9 +581,11 @@ class Blockchain(object):
             :param int start: Start at this block
             :param int stop: Stop at this block
             :param int max_batch_size: only for appbase nodes. When not None, batch calls of are used.
+                With ``"auto"``, the batch size is adapted to the node by :attr:`batch_controller`.
                 Cannot combine with threading
             :param bool threading: Enables threading. Cannot be combined with batch calls
             :param int thread_num: Defines the number of threads, when `threading` is set.
+            :param int read_ahead: Maximum number of prefetched blocks, when `threading` is set
             :param bool only_ops: Only yielding operations, when set to True (default: False)
             :param bool only_virtual_ops: Only yield virtual operations (default: False)
 
@@ -7,64 +7,168 @@ from builtins import str
 from future.utils import python_2_unicode_compatible
 from beemgraphenebase.py23 import bytes_types, integer_types, string_types, text_type
 from beem.instance import shared_steem_instance
-from datetime import datetime, timedelta
+from collections import OrderedDict
+import heapq
 import json
+import sys
+import threading
 
 
-@python_2_unicode_compatible
-class ObjectCache(dict):
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
 
-    def __init__(self, initial_data={}, default_expiration=10, auto_clean=True):
-        super(ObjectCache, self).__init__(initial_data)
+@python_2_unicode_compatible
+class ObjectCache(object):
+    """ Bounded least recently used cache with expiring items
+
+        :param dict initial_data: Items which are stored at creation
+        :param int default_expiration: Lifetime of an item in seconds (default is 10)
+        :param bool auto_clean: When True, expired items are removed on every
+            insert (default is True)
+        :param int max_entries: Maximum number of stored items, the least
+            recently used item is removed when it is exceeded. Unbounded for
+            None (default is None)
+        :param int max_bytes: Maximum summed size of the stored items, measured
+            as length of their json representation. Unbounded for None
+            (default is None)
+
+        Inserts, lookups and evictions are O(1); expired items are found
+        with a heap ordered by expiration time, so a clean only touches
+        items which are really expired. All methods are thread-safe.
+    """
+
+    def __init__(self, initial_data={}, default_expiration=10, auto_clean=True,
+                 max_entries=None, max_bytes=None):
         self.default_expiration = default_expiration
         self.auto_clean = auto_clean
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._expiration_heap = []
+        self._counter = 0
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        for key in initial_data:
+            self[key] = initial_data[key]
 
     def __setitem__(self, key, value):
-        if key in self:
-            del self[key]
-        data = {
-            "expires": datetime.utcnow() + timedelta(
-                seconds=self.default_expiration),
-            "data": value
-        }
-        dict.__setitem__(self, key, data)
-        if self.auto_clean:
-            self.clear_expired_items()
+        size = self._get_size(value) if self.max_bytes is not None else 0
+        with self._lock:
+            now = monotonic()
+            if key in self._data:
+                self._remove(key)
+            expires = now + self.default_expiration
+            self._data[key] = [expires, value, size]
+            self._bytes += size
+            self._counter += 1
+            heapq.heappush(self._expiration_heap, (expires, self._counter, key))
+            if self.auto_clean:
+                self._clear_expired_items(now)
+            self._evict()
+            if len(self._expiration_heap) > 2 * len(self._data) + 64:
+                self._rebuild_heap()
 
     def __getitem__(self, key):
-        if key in self:
-            value = dict.__getitem__(self, key)
-            return value["data"]
+        return self.get(key, None)
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or monotonic() >= item[0]:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._touch(key)
+            return item[1]
 
-    def get(self, key, default):
-        if key in self:
-            return self[key]
-        else:
-            return default
+    def __contains__(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and monotonic() < item[0]
 
-    def clear_expired_items(self):
-        keys = []
-        for key in self.keys():
-            keys.append(key)
-        for key in keys:
-            value = dict.__getitem__(self, key)
-            if datetime.utcnow() >= value["expires"]:
-                del self[key]
+    def __len__(self):
+        return len(self._data)
 
-    def __contains__(self, key):
-        if dict.__contains__(self, key):
-            value = dict.__getitem__(self, key)
-            if datetime.utcnow() < value["expires"]:
-                return True
-            else:
-                value["data"] = None
-        return False
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        with self._lock:
+            return list(self._data.keys())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expiration_heap = []
+            self._bytes = 0
+
+    def clear_expired_items(self):
+        with self._lock:
+            self._clear_expired_items(monotonic())
+
+    def stats(self):
+        """ Returns the number of items, their size and the hit, miss,
+            eviction and expiration counters
+        """
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes,
+                    "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "expirations": self.expirations}
+
+    def _get_size(self, value):
+        try:
+            return len(json.dumps(value, separators=(',', ':'), default=str))
+        except (TypeError, ValueError):
+            return sys.getsizeof(value)
+
+    def _touch(self, key):
+        try:
+            self._data.move_to_end(key)
+        except AttributeError:
+            self._data[key] = self._data.pop(key)
+
+    def _remove(self, key):
+        item = self._data.pop(key)
+        self._bytes -= item[2]
+
+    def _clear_expired_items(self, now):
+        heap = self._expiration_heap
+        while heap and heap[0][0] <= now:
+            expires, _, key = heapq.heappop(heap)
+            item = self._data.get(key)
+            # The heap can contain outdated entries of overwritten items
+            if item is not None and item[0] == expires:
+                self._remove(key)
+                self.expirations += 1
+
+    def _evict(self):
+        while self._data and ((self.max_entries is not None and len(self._data) > self.max_entries) or
+                              (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+    def _rebuild_heap(self):
+        self._expiration_heap = [(item[0], i, key) for i, (key, item) in enumerate(self._data.items())]
+        heapq.heapify(self._expiration_heap)
+        self._counter = len(self._expiration_heap)
 
     def __str__(self):
         if self.auto_clean:
             self.clear_expired_items()
         return "ObjectCache(n={}, default_expiration={})".format(
-            len(list(self.keys())), self.default_expiration)
+            len(self), self.default_expiration)
 
 
 class BlockchainObject(dict):
@@ -73,7 +177,13 @@ class BlockchainObject(dict):
     type_id = None
     type_ids = []
 
-    _cache = ObjectCache()
+    #: Lifetime of cached objects in seconds
+    cache_expiration = 10
+    #: Maximum number of cached objects of a class
+    cache_max_entries = 10000
+
+    _caches = {}
+    _caches_lock = threading.Lock()
 
     def __init__(
         self,
@@ -136,9 +246,31 @@ class BlockchainObject(dict):
             self.cache()
             self.cached = True
 
+    @classmethod
+    def get_object_cache(cls):
+        """ Returns the cache of this class. Every class has its own cache,
+            so that e.g. blocks do not push accounts out of the cache.
+        """
+        cache = BlockchainObject._caches.get(cls)
+        if cache is None:
+            with BlockchainObject._caches_lock:
+                cache = BlockchainObject._caches.get(cls)
+                if cache is None:
+                    cache = ObjectCache(default_expiration=cls.cache_expiration,
+                                        max_entries=cls.cache_max_entries)
+                    BlockchainObject._caches[cls] = cache
+        return cache
+
     @staticmethod
     def clear_cache():
-        BlockchainObject._cache = ObjectCache()
+        """ Clears the caches of all classes"""
+        with BlockchainObject._caches_lock:
+            BlockchainObject._caches = {}
+
+    @staticmethod
+    def get_cache_stats():
+        """ Returns the cache statistics of every class"""
+        return dict((cls.__name__, cache.stats()) for cls, cache in list(BlockchainObject._caches.items()))
 
     def test_valid_objectid(self, i):
         if isinstance(i, string_types):
@@ -158,28 +290,28 @@ class BlockchainObject(dict):
     def cache(self):
         # store in cache
         if dict.__contains__(self, self.id_item):
-            BlockchainObject._cache[self.get(self.id_item)] = self
+            self.get_object_cache()[self.get(self.id_item)] = self
 
     def clear_cache_from_expired_items(self):
-        BlockchainObject._cache.clear_expired_items()
+        self.get_object_cache().clear_expired_items()
 
     def set_cache_expiration(self, expiration):
-        BlockchainObject._cache.default_expiration = expiration
+        self.get_object_cache().default_expiration = expiration
 
     def set_cache_auto_clean(self, auto_clean):
-        BlockchainObject._cache.auto_clean = auto_clean
+        self.get_object_cache().auto_clean = auto_clean
 
     def get_cache_expiration(self):
-        return BlockchainObject._cache.default_expiration
+        return self.get_object_cache().default_expiration
 
     def get_cache_auto_clean(self):
-        return BlockchainObject._cache.auto_clean
+        return self.get_object_cache().auto_clean
 
     def iscached(self, id):
-        return id in BlockchainObject._cache
+        return id in self.get_object_cache()
 
     def getcache(self, id):
-        return BlockchainObject._cache.get(id, None)
+        return self.get_object_cache().get(id, None)
 
     def __getitem__(self, key):
         if not self.cached:
@@ -0,0 +1,149 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from .storage import DataDir
+
+log = logging.getLogger(__name__)
+
+
+class BlockStore(DataDir):
+    """ Local store for irreversible blocks
+
+        :param str chain_id: Chain id, blocks of different chains are stored
+            in different directories (default is the steem chain id)
+        :param str directory: Directory of the store (default is ``blocks/``
+            inside the beem data directory)
+        :param int segment_size: Number of block numbers per segment (default is 100000)
+
+        Blocks are stored as zlib compressed json in append-only segment
+        files. Each segment covers ``segment_size`` block numbers and has a
+        fixed-width index file, which stores offset and length of every block,
+        so that a block is found with a single seek. A block is only added
+        when its number is not above :attr:`last_irreversible_block_num`,
+        which has to be set by the caller.
+
+        .. code-block:: python
+
+            from beem import Steem
+            from beem.blockchain import Blockchain
+            stm = Steem(block_store=True)
+            # the second replay is read from disk
+            for block in Blockchain(steem_instance=stm).blocks(start=1, stop=1000):
+                pass
+
+    """
+    index_format = "<QI"
+    index_size = struct.calcsize(index_format)
+
+    def __init__(self, chain_id=None, directory=None, segment_size=100000):
+        super(BlockStore, self).__init__()
+        if chain_id is None:
+            chain_id = "0" * 64
+        if directory is None:
+            directory = os.path.join(self.data_dir, "blocks")
+        self.directory = os.path.join(directory, chain_id[:16])
+        self.segment_size = segment_size
+        self.last_irreversible_block_num = 0
+        self._segments = {}
+        self._lock = threading.Lock()
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def __contains__(self, block_num):
+        return self._get_index(int(block_num)) is not None
+
+    def set_last_irreversible_block_num(self, block_num):
+        """ Sets the highest block number which may be stored. The value can only grow."""
+        block_num = int(block_num)
+        if block_num > self.last_irreversible_block_num:
+            self.last_irreversible_block_num = block_num
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, "%010d" % (segment * self.segment_size))
+
+    def _get_segment(self, segment, create=False):
+        """Returns the opened data and index file of a segment"""
+        files = self._segments.get(segment)
+        if files is not None:
+            return files
+        path = self._segment_path(segment)
+        if not os.path.isfile(path + ".idx"):
+            if not create:
+                return None
+            open(path + ".dat", "ab").close()
+            open(path + ".idx", "ab").close()
+        files = (open(path + ".dat", "r+b"), open(path + ".idx", "r+b"))
+        self._segments[segment] = files
+        return files
+
+    def _get_index(self, block_num):
+        """Returns offset and length of a stored block or None"""
+        segment, position = divmod(block_num, self.segment_size)
+        with self._lock:
+            files = self._get_segment(segment)
+            if files is None:
+                return None
+            files[1].seek(position * self.index_size)
+            record = files[1].read(self.index_size)
+        if len(record) < self.index_size:
+            return None
+        offset, length = struct.unpack(self.index_format, record)
+        if length == 0:
+            return None
+        return offset, length
+
+    def get(self, block_num):
+        """ Returns the stored block as dict or None
+
+            :param int block_num: Block number
+        """
+        block_num = int(block_num)
+        index = self._get_index(block_num)
+        if index is None:
+            return None
+        offset, length = index
+        with self._lock:
+            data_file = self._get_segment(block_num // self.segment_size)[0]
+            data_file.seek(offset)
+            data = data_file.read(length)
+        return json.loads(zlib.decompress(data).decode("utf-8"))
+
+    def put(self, block_num, block):
+        """ Stores a block, when it is irreversible and not already stored
+
+            :param int block_num: Block number
+            :param dict block: Block, as returned by ``get_block``
+            :returns: True, when the block was stored
+        """
+        block_num = int(block_num)
+        if block_num > self.last_irreversible_block_num or block_num in self:
+            return False
+        data = zlib.compress(json.dumps(block, separators=(',', ':'), default=str).encode("utf-8"))
+        segment, position = divmod(block_num, self.segment_size)
+        with self._lock:
+            data_file, index_file = self._get_segment(segment, create=True)
+            data_file.seek(0, os.SEEK_END)
+            offset = data_file.tell()
+            data_file.write(data)
+            data_file.flush()
+            # The index is written last, an interrupted write leaves only unused data
+            index_file.seek(position * self.index_size)
+            index_file.write(struct.pack(self.index_format, offset, len(data)))
+            index_file.flush()
+        return True
+
+    def close(self):
+        """ Closes all open segment files"""
+        with self._lock:
+            for data_file, index_file in self._segments.values():
+                data_file.close()
+                index_file.close()
+            self._segments = {}
@@ -0,0 +1,234 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from datetime import datetime, date
+import logging
+import threading
+import time
+from beembase.transactions import getRefBlockParams
+from .block import BlockHeader
+from .instance import shared_steem_instance
+from .utils import parse_time, addTzInfo
+
+log = logging.getLogger(__name__)
+
+#: Number of blocks, which can be referenced by ``ref_block_num``
+TAPOS_BLOCKS = 0x10000
+
+
+def _to_timestamp(block_time):
+    if block_time is None:
+        return time.time()
+    if not isinstance(block_time, (datetime, date)):
+        block_time = parse_time(block_time)
+    block_time = addTzInfo(block_time)
+    return (block_time - parse_time("1970-01-01T00:00:00")).total_seconds()
+
+
+class RefBlockProvider(object):
+    """ Shared provider of the reference block of new transactions
+
+        :param Steem steem_instance: Steem instance
+        :param float max_age: Maximum age of the reference block in seconds. An
+            older reference block is refreshed before it is returned (default is 600)
+        :param float refresh_interval: Refresh interval of the background thread,
+            which is started by :func:`start` (default is ``max_age / 4``)
+
+        ``ref_block_num`` and ``ref_block_prefix`` of a transaction may refer to
+        any of the last 65536 blocks (about 54 hours). Instead of reading the
+        dynamic global properties for every transaction, the provider keeps an
+        irreversible block and returns its parameters, as long as the block
+        is not older than ``max_age``. The age is calculated from the block
+        timestamp, so that old blocks of a replayed stream are never used.
+        As the block is irreversible, it cannot be forked out, which would
+        invalidate all transactions referring to it.
+
+        The reference block is updated
+
+        * by :func:`refresh`, which reads the last irreversible block,
+        * by a background thread (see :func:`start`),
+        * by :func:`update_from_block` from a block stream, which is
+          already read, for blocks up to the last irreversible block number.
+
+        The last irreversible block number is updated by
+        :func:`update_from_properties`, which is called automatically, when the
+        dynamic global properties are read by :func:`beem.steem.Steem.refresh_data`.
+
+        When the provider is set as ``ref_block_provider`` of a
+        :class:`beem.steem.Steem` instance, it is used by
+        :func:`beem.transactionbuilder.TransactionBuilder.constructTx`.
+
+        .. code-block:: python
+
+            from beem import Steem
+            stm = Steem(ref_block_provider=True)
+            with stm.ref_block_provider:
+                # transactions are built without reading the properties
+                for i in range(100):
+                    stm.custom_json("test", {"i": i}, required_posting_auths=["test"])
+
+        The background thread uses the rpc connection of ``steem_instance``.
+        As websocket connections are not shared between threads, a separate
+        Steem instance should be used when the main thread communicates with a
+        websocket node.
+    """
+    def __init__(self, steem_instance=None, max_age=600, refresh_interval=None):
+        self.steem = steem_instance or shared_steem_instance()
+        if max_age <= 0 or max_age >= TAPOS_BLOCKS * 3:
+            raise ValueError("max_age must be between 0 and %d seconds" % (TAPOS_BLOCKS * 3))
+        self.max_age = max_age
+        if refresh_interval is None:
+            refresh_interval = max_age / 4.
+        self.refresh_interval = refresh_interval
+        self.block_num = None
+        self.block_id = None
+        self.block_timestamp = None
+        self.last_irreversible_block_num = None
+        self.refreshes = 0
+        self.hits = 0
+        self._params = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def update(self, block_id, block_num=None, timestamp=None):
+        """ Sets a new reference block. Blocks, which are older than the
+            current reference block, are ignored. The block should be
+            irreversible, as transactions referring to a block, which is
+            forked out, are rejected.
+
+            :param str block_id: Block id
+            :param int block_num: Block number (default is the number stored
+                in the block id)
+            :param timestamp: Block time as string or datetime (default is now)
+            :returns: True, when the reference block was changed
+        """
+        if block_num is None:
+            block_num = int(block_id[:8], 16)
+        params = getRefBlockParams(block_id, block_num)
+        block_timestamp = _to_timestamp(timestamp)
+        with self._lock:
+            if self.block_num is not None and block_num < self.block_num:
+                return False
+            self.block_num = block_num
+            self.block_id = block_id
+            self.block_timestamp = block_timestamp
+            self._params = params
+        return True
+
+    def update_from_properties(self, props):
+        """ Stores the last irreversible block number of the dynamic global
+            properties. The reference block itself is not changed, as the
+            properties do not contain the id of the irreversible block.
+
+            :param dict props: dynamic global properties
+            :returns: True, when the last irreversible block number was increased
+        """
+        if not props or "last_irreversible_block_num" not in props:
+            return False
+        block_num = int(props["last_irreversible_block_num"])
+        with self._lock:
+            if self.last_irreversible_block_num is not None and block_num <= self.last_irreversible_block_num:
+                return False
+            self.last_irreversible_block_num = block_num
+        return True
+
+    def update_from_block(self, block):
+        """ Sets an irreversible block of a block stream as reference block.
+            Blocks above the last irreversible block number are ignored.
+
+            :param block: :class:`beem.block.Block` or block dict, which contains
+                ``block_id`` and ``timestamp``
+        """
+        if not block or "block_id" not in block:
+            return False
+        block_num = int(block["block_id"][:8], 16)
+        if self.last_irreversible_block_num is None or block_num > self.last_irreversible_block_num:
+            return False
+        return self.update(block["block_id"], block_num, timestamp=block.get("timestamp"))
+
+    def refresh(self):
+        """ Reads the last irreversible block number from the dynamic global
+            properties and sets the parent of this block as reference block.
+            Its id is the ``previous`` field of the last irreversible block.
+        """
+        props = self.steem.get_dynamic_global_properties(use_stored_data=False)
+        self.refreshes += 1
+        self.update_from_properties(props)
+        if not props or "last_irreversible_block_num" not in props:
+            return
+        block_num = int(props["last_irreversible_block_num"])
+        header = BlockHeader(block_num, steem_instance=self.steem)
+        self.update(header["previous"], block_num - 1, header["timestamp"])
+
+    @property
+    def age(self):
+        """ Age of the reference block in seconds, None when no block is known"""
+        with self._lock:
+            if self.block_timestamp is None:
+                return None
+            return time.time() - self.block_timestamp
+
+    def get_block_params(self):
+        """ Returns ``ref_block_num`` and ``ref_block_prefix`` for a new transaction
+
+            The properties are only read, when the reference block is unknown
+            or older than ``max_age``.
+        """
+        age = self.age
+        if age is not None and age < self.max_age:
+            with self._lock:
+                self.hits += 1
+                return self._params
+        with self._refresh_lock:
+            # another thread may have refreshed in the meantime
+            age = self.age
+            if age is None or age >= self.max_age:
+                self.refresh()
+        with self._lock:
+            if self._params is None:
+                raise ValueError("No reference block is available")
+            return self._params
+
+    def start(self):
+        """ Starts the background thread, which refreshes the reference
+            block every ``refresh_interval`` seconds
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="RefBlockProvider")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stops the background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with self._refresh_lock:
+                    self.refresh()
+            except Exception as e:
+                log.warning("Refreshing the reference block failed: %s" % str(e))
+            self._stop.wait(self.refresh_interval)
+
+    def stats(self):
+        """ Returns the reference block, its age and the hit and refresh counters"""
+        return {"block_num": self.block_num, "age": self.age,
+                "last_irreversible_block_num": self.last_irreversible_block_num,
+                "hits": self.hits, "refreshes": self.refreshes}
@@ -13,7 +13,7 @@ import ast
 from beemgraphenebase.py23 import bytes_types, integer_types, string_types, text_type
 from datetime import datetime, timedelta
 from beemapi.steemnoderpc import SteemNodeRPC
-from beemapi.exceptions import NoAccessApi, NoApiWithName
+from beemapi.exceptions import NoAccessApi, NoApiWithName, RPCError, CallRetriesReached
 from beemgraphenebase.account import PrivateKey, PublicKey
 from beembase import transactions, operations
 from .account import Account
@@ -63,9 +63,24 @@ class Steem(object):
             NumRetriesReached is raised. Disabled for -1. (default is -1)
         :param int num_retries_call: Repeat num_retries_call times a rpc call on node error (default is 5)
         :param int timeout: Timeout setting for https nodes (default is 60)
+        :param bool node_scoring: When True, the node with the lowest latency, highest
+            success rate and smallest head block lag is chosen (default is False)
+        :param bool circuit_breaker: When True, a node is skipped for a growing time after
+            several failed calls in a row, and a failed call is repeated on another node
+            right away (default is False)
+        :param bool ws_multiplexing: When True, the replies of a websocket node are read
+            by a background thread, so that calls from several threads share one
+            connection (default is False)
         :param bool use_sc2: When True, a steemconnect object is created. Can be used for
             broadcast posting op or creating hot_links (default is False)
         :param SteemConnect steemconnect: A SteemConnect object can be set manually, set use_sc2 to True
+        :param bool block_store: When True, irreversible blocks are stored locally in a
+            :class:`beem.blockstore.BlockStore` and are read from there on the next request.
+            A BlockStore object can also be set (default is False)
+        :param bool ref_block_provider: When True, the reference block of new transactions
+            is provided by a shared :class:`beem.refblock.RefBlockProvider`, instead of
+            reading the dynamic global properties for every transaction.
+            A RefBlockProvider object can also be set (default is False)
 
         Three wallet operation modes are possible:
 
@@ -144,6 +159,12 @@ class Steem(object):
             :param bool use_sc2: When True, a steemconnect object is created. Can be used for broadcast
                 posting op or creating hot_links  (default is False)
             :param SteemConnect steemconnect: A SteemConnect object can be set manually, set use_sc2 to True
+            :param bool block_store: When True, irreversible blocks are stored locally (default is False)
+            :param bool ref_block_provider: When True, the reference block of new transactions
+                is reused (default is False)
+            :param dict data_refresh_times: Minimal refresh time in seconds of single fields of
+                the stored blockchain parameters, e.g. ``{"config": 86400}``. Fields which are
+                not set use ``data_refresh_time_seconds``.
 
         """
 
@@ -158,6 +179,8 @@ class Steem(object):
         self.steemconnect = kwargs.get("steemconnect", None)
         self.use_sc2 = bool(kwargs.get("use_sc2", False))
         self.blocking = kwargs.get("blocking", False)
+        self._block_store = kwargs.get("block_store", None)
+        self._ref_block_provider = kwargs.get("ref_block_provider", None)
 
         # Store config for access through other Classes
         self.config = config
@@ -169,10 +192,12 @@ class Steem(object):
                          **kwargs)
 
         self.data = {'last_refresh': None, 'dynamic_global_properties': None, 'feed_history': None,
-                     'get_feed_history': None, 'hardfork_properties': None,
+                     'hardfork_properties': None,
                      'network': None, 'witness_schedule': None, 'reserve_ratio': None,
                      'config': None, 'reward_funds': None}
         self.data_refresh_time_seconds = data_refresh_time_seconds
+        self.data_refresh_times = dict(kwargs.get("data_refresh_times", {}))
+        self._data_last_refresh = {}
         # self.refresh_data()
 
         # txbuffers/propbuffer are initialized and cleared
@@ -203,11 +228,10 @@ class Steem(object):
             if not bool(node):
                 raise ValueError("A Steem node needs to be provided!")
 
-        if not rpcuser and "rpcuser" in config:
-            rpcuser = config["rpcuser"]
-
-        if not rpcpassword and "rpcpassword" in config:
-            rpcpassword = config["rpcpassword"]
+        if not rpcuser or not rpcpassword:
+            stored = config.get_many(["rpcuser", "rpcpassword"])
+            rpcuser = rpcuser or stored["rpcuser"]
+            rpcpassword = rpcpassword or stored["rpcpassword"]
 
         self.rpc = SteemNodeRPC(node, rpcuser, rpcpassword, **kwargs)
 
@@ -226,31 +250,103 @@ class Steem(object):
             return "<%s, nobroadcast=%s>" % (
                 self.__class__.__name__, str(self.nobroadcast))
 
-    def refresh_data(self, force_refresh=False, data_refresh_time_seconds=None):
+    #: Blockchain parameters, which are stored in :attr:`data` by :func:`refresh_data`
+    data_fields = ['dynamic_global_properties', 'feed_history', 'hardfork_properties', 'network',
+                   'witness_schedule', 'config', 'reward_funds', 'reserve_ratio']
+
+    def refresh_data(self, force_refresh=False, data_refresh_time_seconds=None, fields=None):
         """ Read and stores steem blockchain parameters
             If the last data refresh is older than data_refresh_time_seconds, data will be refreshed
 
             :param bool force_refresh: if True, data are forced to refreshed
             :param float data_refresh_time_seconds: set a new minimal refresh time in seconds
+            :param list fields: refresh only when one of these fields of :attr:`data_fields`
+                is outdated (default is all)
 
+            Every field has its own refresh time (see ``data_refresh_times``). When
+            a field has to be refreshed, all outdated fields are read together with a
+            single batch call.
         """
         if self.offline:
             return
         if data_refresh_time_seconds is not None:
             self.data_refresh_time_seconds = data_refresh_time_seconds
-        if self.data['last_refresh'] is not None and not force_refresh:
-            if (datetime.utcnow() - self.data['last_refresh']).total_seconds() < self.data_refresh_time_seconds:
-                return
-        self.data['last_refresh'] = datetime.utcnow()
-        self.data["dynamic_global_properties"] = self.get_dynamic_global_properties(False)
-        self.data['feed_history'] = self.get_feed_history(False)
-        self.data['get_feed_history'] = self.get_feed_history(False)
-        self.data['hardfork_properties'] = self.get_hardfork_properties(False)
-        self.data['network'] = self.get_network(False)
-        self.data['witness_schedule'] = self.get_witness_schedule(False)
-        self.data['config'] = self.get_config(False)
-        self.data['reward_funds'] = self.get_reward_funds(False)
-        self.data['reserve_ratio'] = self.get_reserve_ratio(False)
+        if fields is None:
+            fields = self.data_fields
+        now = datetime.utcnow()
+        if force_refresh:
+            outdated = list(fields)
+        elif any(self._is_data_outdated(field, now) for field in fields):
+            outdated = [field for field in self.data_fields if self._is_data_outdated(field, now)]
+        else:
+            return
+        self.data.update(self._read_data(outdated))
+        if "dynamic_global_properties" in outdated and self._ref_block_provider:
+            self.ref_block_provider.update_from_properties(self.data["dynamic_global_properties"])
+        for field in outdated:
+            self._data_last_refresh[field] = now
+        self.data['last_refresh'] = now
+
+    def _is_data_outdated(self, field, now):
+        last_refresh = self._data_last_refresh.get(field)
+        if last_refresh is None:
+            return True
+        refresh_time = self.data_refresh_times.get(field, self.data_refresh_time_seconds)
+        return (now - last_refresh).total_seconds() >= refresh_time
+
+    def _read_data(self, fields):
+        """ Reads the given fields of :attr:`data_fields` with one batch call.
+            Falls back to single calls, when the node does not accept batch calls.
+        """
+        if self.rpc is None:
+            return dict((field, None) for field in fields)
+        appbase = self.rpc.get_use_appbase()
+        calls = {}
+        try:
+            batch = self.rpc.batch()
+            if "dynamic_global_properties" in fields or ("reserve_ratio" in fields and not appbase):
+                calls["dynamic_global_properties"] = batch.get_dynamic_global_properties(api="database")
+            if "feed_history" in fields:
+                calls["feed_history"] = batch.get_feed_history(api="database")
+            if "hardfork_properties" in fields:
+                if appbase:
+                    calls["hardfork_properties"] = batch.get_hardfork_properties(api="database")
+                else:
+                    calls["hardfork_properties"] = batch.get_next_scheduled_hardfork(api="database")
+            if "config" in fields or "network" in fields:
+                calls["config"] = batch.get_config(api="database")
+            if "witness_schedule" in fields:
+                calls["witness_schedule"] = batch.get_witness_schedule(api="database")
+            if "reward_funds" in fields:
+                if appbase:
+                    calls["reward_funds"] = batch.get_reward_funds(api="database")
+                else:
+                    calls["reward_funds"] = batch.get_reward_fund("post", api="database")
+            if "reserve_ratio" in fields and appbase:
+                calls["reserve_ratio"] = batch.get_reserve_ratio(api="witness")
+            results = batch.execute()
+        except (RPCError, CallRetriesReached) as e:
+            log.debug("Batch call failed, reading data with single calls: %s" % str(e))
+            return dict((field, getattr(self, "get_" + field)(False)) for field in fields)
+
+        data = dict((field, results[index]) for field, index in calls.items())
+        if "reward_funds" in data and appbase:
+            funds = data["reward_funds"]['funds']
+            if len(funds) > 0:
+                funds = funds[0]
+            data["reward_funds"] = funds
+        if "network" in fields:
+            try:
+                data["network"] = self.rpc.get_network(props=data["config"])
+            except:
+                from beemgraphenebase.chains import known_chains
+                data["network"] = known_chains["STEEM"]
+        if "reserve_ratio" in fields and not appbase:
+            props = data["dynamic_global_properties"]
+            data["reserve_ratio"] = {'id': 0, 'average_block_size': props['average_block_size'],
+                                     'current_reserve_ratio': props['current_reserve_ratio'],
+                                     'max_virtual_bandwidth': props['max_virtual_bandwidth']}
+        return dict((field, data[field]) for field in fields)
 
     def get_dynamic_global_properties(self, use_stored_data=True):
         """ This call returns the *dynamic global properties*
@@ -260,7 +356,7 @@ class Steem(object):
 
         """
         if use_stored_data:
-            self.refresh_data()
+            self.refresh_data(fields=['dynamic_global_properties'])
             return self.data['dynamic_global_properties']
         if self.rpc is None:
             return None
@@ -275,7 +371,7 @@ class Steem(object):
 
         """
         if use_stored_data:
-            self.refresh_data()
+            self.refresh_data(fields=['reserve_ratio'])
             return self.data['reserve_ratio']
 
         if self.rpc is None:
@@ -299,7 +395,7 @@ class Steem(object):
 
         """
         if use_stored_data:
-            self.refresh_data()
+            self.refresh_data(fields=['feed_history'])
             return self.data['feed_history']
         if self.rpc is None:
             return None
@@ -314,7 +410,7 @@ class Steem(object):
 
         """
         if use_stored_data:
-            self.refresh_data()
+            self.refresh_data(fields=['reward_funds'])
             return self.data['reward_funds']
 
         if self.rpc is None:
@@ -336,9 +432,9 @@ class Steem(object):
             empty or old, refresh_data() is used.
         """
         if use_stored_data:
-            self.refresh_data()
-            if self.data['get_feed_history']:
-                return self.data['get_feed_history']['current_median_history']
+            self.refresh_data(fields=['feed_history'])
+            if self.data['feed_history']:
+                return self.data['feed_history']['current_median_history']
             else:
                 return None
         if self.rpc is None:
@@ -357,7 +453,7 @@ class Steem(object):
             empty or old, refresh_data() is used.
         """
         if use_stored_data:
-            self.refresh_data()
+            self.refresh_data(fields=['hardfork_properties'])
             return self.data['hardfork_properties']
         if self.rpc is None:
             return None
@@ -379,7 +475,7 @@ class Steem(object):
             :rtype: dict
         """
         if use_stored_data:
-            self.refresh_data()
+            self.refresh_data(fields=['network'])
             return self.data['network']
 
         if self.rpc is None:
@@ -586,7 +682,7 @@ class Steem(object):
 
         """
         if use_stored_data:
-            self.refresh_data()
+            self.refresh_data(fields=['witness_schedule'])
             return self.data['witness_schedule']['median_props']
         else:
             return self.get_witness_schedule(use_stored_data)['median_props']
@@ -596,7 +692,7 @@ class Steem(object):
 
         """
         if use_stored_data:
-            self.refresh_data()
+            self.refresh_data(fields=['witness_schedule'])
             return self.data['witness_schedule']
 
         if self.rpc is None:
@@ -612,7 +708,7 @@ class Steem(object):
                 STEEMIT keys by STEEM (only useful on non appbase nodes)
         """
         if use_stored_data:
-            self.refresh_data()
+            self.refresh_data(fields=['config'])
             config = self.data['config']
         else:
             if self.rpc is None:
@@ -635,6 +731,39 @@ class Steem(object):
         else:
             return self.get_network()
 
+    @property
+    def block_store(self):
+        """ Returns the local :class:`beem.blockstore.BlockStore` or None, when not enabled"""
+        if self._block_store is True:
+            from .blockstore import BlockStore
+            self._block_store = BlockStore(chain_id=self.chain_params["chain_id"])
+        return self._block_store or None
+
+    @property
+    def ref_block_provider(self):
+        """ Returns the :class:`beem.refblock.RefBlockProvider` or None, when not enabled"""
+        if self._ref_block_provider is True:
+            from .refblock import RefBlockProvider
+            self._ref_block_provider = RefBlockProvider(steem_instance=self)
+        return self._ref_block_provider or None
+
+    def update_block_store(self, last_irreversible_block_num=None):
+        """ Updates the last irreversible block number of the block store and returns the store
+
+            :param int last_irreversible_block_num: When not set, the stored dynamic
+                global properties are used
+        """
+        block_store = self.block_store
+        if block_store is None:
+            return None
+        if last_irreversible_block_num is None:
+            props = self.get_dynamic_global_properties()
+            if props is None:
+                return block_store
+            last_irreversible_block_num = props["last_irreversible_block_num"]
+        block_store.set_last_irreversible_block_num(last_irreversible_block_num)
+        return block_store
+
     @property
     def prefix(self):
         return self.chain_params["prefix"]
@@ -10,6 +10,7 @@ import shutil
 import time
 import os
 import sqlite3
+import threading
 from .aes import AESCipher
 from appdirs import user_data_dir
 from datetime import datetime
@@ -53,10 +54,76 @@ class DataDir(object):
     data_dir = user_data_dir(appname, appauthor)
     sqlDataBaseFile = os.path.join(data_dir, storageDatabase)
 
+    _local = threading.local()
+    _connections = []
+    _connections_lock = threading.Lock()
+    _connections_generation = 0
+
     def __init__(self):
         #: Storage
         self.mkdir_p()
 
+    def get_connection(self):
+        """ Returns the database connection of the current thread
+
+            Every thread keeps one connection open, so that the database
+            is not opened again on every query and sqlite can reuse its
+            prepared statements. File databases are switched to WAL mode,
+            so that readers do not block the writer. All threads share a
+            single connection to an in-memory database, as every new
+            connection would open a new, empty database. The connections
+            of finished threads are closed, when a new connection is opened.
+        """
+        local = DataDir._local
+        if getattr(local, "generation", None) != DataDir._connections_generation:
+            local.connections = {}
+            local.generation = DataDir._connections_generation
+        connection = local.connections.get(self.sqlDataBaseFile)
+        if connection is not None:
+            return connection
+        with DataDir._connections_lock:
+            DataDir._close_finished_connections()
+            if self.sqlDataBaseFile == ":memory:":
+                for path, shared, thread in DataDir._connections:
+                    if path == ":memory:":
+                        connection = shared
+                        break
+            if connection is None:
+                connection = sqlite3.connect(self.sqlDataBaseFile, check_same_thread=False, cached_statements=64)
+                if self.sqlDataBaseFile != ":memory:":
+                    try:
+                        connection.execute("PRAGMA journal_mode=WAL")
+                    except sqlite3.OperationalError:
+                        log.warning("Could not enable WAL mode (database: %s)" % (self.sqlDataBaseFile))
+                DataDir._connections.append((self.sqlDataBaseFile, connection, threading.current_thread()))
+        local.connections[self.sqlDataBaseFile] = connection
+        return connection
+
+    @staticmethod
+    def _close_finished_connections():
+        """ Closes the connections of threads, which are no longer alive.
+            The shared in-memory connection is kept, as closing it would
+            drop the database. Must be called with ``_connections_lock``.
+        """
+        connections = []
+        for path, connection, thread in DataDir._connections:
+            if path != ":memory:" and not thread.is_alive():
+                connection.close()
+            else:
+                connections.append((path, connection, thread))
+        DataDir._connections = connections
+
+    @staticmethod
+    def close_connections():
+        """ Closes the database connections of all threads. New connections
+            are opened when they are needed again.
+        """
+        with DataDir._connections_lock:
+            for path, connection, thread in DataDir._connections:
+                connection.close()
+            DataDir._connections = []
+            DataDir._connections_generation += 1
+
     def mkdir_p(self):
         """ Ensure that the directory in which the data is stored
             exists
@@ -93,8 +160,10 @@ class DataDir(object):
             return
         if not os.path.isfile(src):
             return
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
+        # Move the write-ahead log into the database file
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
         # Lock database before making a backup
         cursor.execute('begin immediate')
         # Make new backup file
@@ -121,6 +190,9 @@ class DataDir(object):
                     newest_backup_file = backup_file
         if newest_backup_file is not None:
             self.sqlite3_copy(newest_backup_file, self.sqlDataBaseFile)
+            # Open connections may still have the replaced database cached
+            self.close_connections()
+            configStorage.clear_cache()
 
     def clean_data(self):
         """ Delete files older than 70 days
@@ -159,7 +231,7 @@ class Key(DataDir):
         query = ("SELECT name FROM sqlite_master "
                  "WHERE type='table' AND name=?", (self.__tablename__, ))
         try:
-            connection = sqlite3.connect(self.sqlDataBaseFile)
+            connection = self.get_connection()
             cursor = connection.cursor()
             cursor.execute(*query)
             return True if cursor.fetchone() else False
@@ -175,7 +247,7 @@ class Key(DataDir):
                  "id INTEGER PRIMARY KEY AUTOINCREMENT,"
                  "pub STRING(256),"
                  "wif STRING(256))".format(self.__tablename__))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(query)
         connection.commit()
@@ -184,7 +256,7 @@ class Key(DataDir):
         """ Returns the public keys stored in the database
         """
         query = ("SELECT pub from {0} ".format(self.__tablename__))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         try:
             cursor.execute(query)
@@ -202,7 +274,7 @@ class Key(DataDir):
            The encryption scheme is BIP38
         """
         query = ("SELECT wif from {0} WHERE pub=?".format(self.__tablename__), (pub,))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(*query)
         key = cursor.fetchone()
@@ -218,7 +290,7 @@ class Key(DataDir):
            :param str wif: Private key
         """
         query = ("UPDATE {0} SET wif=? WHERE pub=?".format(self.__tablename__), (wif, pub))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(*query)
         connection.commit()
@@ -233,7 +305,7 @@ class Key(DataDir):
         if self.getPrivateKeyForPublicKey(pub):
             raise ValueError("Key already in storage")
         query = ("INSERT INTO {0} (pub, wif) VALUES (?, ?)".format(self.__tablename__), (pub, wif))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(*query)
         connection.commit()
@@ -244,7 +316,7 @@ class Key(DataDir):
            :param str pub: Public key
         """
         query = ("DELETE FROM {0} WHERE pub=?".format(self.__tablename__), (pub,))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(*query)
         connection.commit()
@@ -260,7 +332,7 @@ class Key(DataDir):
             return
         else:
             query = ("DELETE FROM {0} ".format(self.__tablename__))
-            connection = sqlite3.connect(self.sqlDataBaseFile)
+            connection = self.get_connection()
             cursor = connection.cursor()
             cursor.execute(query)
             connection.commit()
@@ -282,7 +354,7 @@ class Token(DataDir):
         query = ("SELECT name FROM sqlite_master "
                  "WHERE type='table' AND name=?", (self.__tablename__, ))
         try:
-            connection = sqlite3.connect(self.sqlDataBaseFile)
+            connection = self.get_connection()
             cursor = connection.cursor()
             cursor.execute(*query)
             return True if cursor.fetchone() else False
@@ -298,7 +370,7 @@ class Token(DataDir):
                  "id INTEGER PRIMARY KEY AUTOINCREMENT,"
                  "name STRING(256),"
                  "token STRING(256))".format(self.__tablename__))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(query)
         connection.commit()
@@ -307,7 +379,7 @@ class Token(DataDir):
         """ Returns the public names stored in the database
         """
         query = ("SELECT name from {0} ".format(self.__tablename__))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         try:
             cursor.execute(query)
@@ -325,7 +397,7 @@ class Token(DataDir):
            The encryption scheme is BIP38
         """
         query = ("SELECT token from {0} WHERE name=?".format(self.__tablename__), (name,))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(*query)
         token = cursor.fetchone()
@@ -341,7 +413,7 @@ class Token(DataDir):
            :param str token: Private token
         """
         query = ("UPDATE {0} SET token=? WHERE name=?".format(self.__tablename__), (token, name))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(*query)
         connection.commit()
@@ -356,7 +428,7 @@ class Token(DataDir):
         if self.getTokenForPublicName(name):
             raise ValueError("Key already in storage")
         query = ("INSERT INTO {0} (name, token) VALUES (?, ?)".format(self.__tablename__), (name, token))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(*query)
         connection.commit()
@@ -367,7 +439,7 @@ class Token(DataDir):
            :param str name: Public name
         """
         query = ("DELETE FROM {0} WHERE name=?".format(self.__tablename__), (name,))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(*query)
         connection.commit()
@@ -383,7 +455,7 @@ class Token(DataDir):
             return
         else:
             query = ("DELETE FROM {0} ".format(self.__tablename__))
-            connection = sqlite3.connect(self.sqlDataBaseFile)
+            connection = self.get_connection()
             cursor = connection.cursor()
             cursor.execute(query)
             connection.commit()
@@ -409,8 +481,26 @@ class Configuration(DataDir):
         "sc2_api_url": "https://v2.steemconnect.com/api/",
         "oauth_base_url": "https://v2.steemconnect.com/oauth2/"}
 
+    #: Marks keys, which are not stored
+    missing = object()
+
     def __init__(self):
         super(Configuration, self).__init__()
+        #: Read-through cache of the stored values
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    def clear_cache(self):
+        """ Clears the read cache, e.g. after the database was changed by
+            another process
+        """
+        with self._cache_lock:
+            self._cache = {}
+
+    def _invalidate(self, keys):
+        with self._cache_lock:
+            for key in keys:
+                self._cache.pop(key, None)
 
     def exists_table(self):
         """ Check if the database table exists
@@ -418,7 +508,7 @@ class Configuration(DataDir):
         query = ("SELECT name FROM sqlite_master "
                  "WHERE type='table' AND name=?", (self.__tablename__,))
         try:
-            connection = sqlite3.connect(self.sqlDataBaseFile)
+            connection = self.get_connection()
             cursor = connection.cursor()
             cursor.execute(*query)
             return True if cursor.fetchone() else False
@@ -434,7 +524,7 @@ class Configuration(DataDir):
                  "id INTEGER PRIMARY KEY AUTOINCREMENT,"
                  "key STRING(256),"
                  "value STRING(256))".format(self.__tablename__))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         try:
             cursor.execute(query)
@@ -442,6 +532,7 @@ class Configuration(DataDir):
         except sqlite3.OperationalError:
             log.error("Could not write to database: %s" % (self.__tablename__))
             raise NoWriteAccess("Could not write to database: %s" % (self.__tablename__))
+        self.clear_cache()
 
     def checkBackup(self):
         """ Backup the SQL database every 7 days
@@ -461,15 +552,36 @@ class Configuration(DataDir):
         except:
             self.refreshBackup()
 
+    def _read_values(self, keys):
+        """ Returns the stored values of the keys as dict. Missing keys
+            have the value ``Configuration.missing``. Raises
+            sqlite3.OperationalError when the table cannot be read.
+        """
+        with self._cache_lock:
+            values = dict((key, self._cache[key]) for key in keys if key in self._cache)
+        missing = [key for key in keys if key not in values]
+        if not missing:
+            return values
+        connection = self.get_connection()
+        cursor = connection.cursor()
+        # sqlite allows at most 999 parameters per statement
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            query = ("SELECT key, value FROM {0} WHERE key IN ({1})".format(
+                self.__tablename__, ",".join("?" * len(chunk))), chunk)
+            cursor.execute(*query)
+            found = dict(cursor.fetchall())
+            with self._cache_lock:
+                for key in chunk:
+                    values[key] = found.get(key, self.missing)
+                    self._cache[key] = values[key]
+        return values
+
     def _haveKey(self, key):
         """ Is the key `key` available int he configuration?
         """
-        query = ("SELECT value FROM {0} WHERE key=?".format(self.__tablename__), (key,))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
-        cursor = connection.cursor()
         try:
-            cursor.execute(*query)
-            return True if cursor.fetchone() else False
+            return self._read_values([key])[key] is not self.missing
         except sqlite3.OperationalError:
             log.warning("Could not read %s (database: %s)" % (str(key), self.__tablename__))
             return False
@@ -478,25 +590,7 @@ class Configuration(DataDir):
         """ This method behaves differently from regular `dict` in that
             it returns `None` if a key is not found!
         """
-        query = ("SELECT value FROM {0} WHERE key=?".format(self.__tablename__), (key,))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
-        cursor = connection.cursor()
-        try:
-            cursor.execute(*query)
-            result = cursor.fetchone()
-            if result:
-                return result[0]
-            else:
-                if key in self.config_defaults:
-                    return self.config_defaults[key]
-                else:
-                    return None
-        except sqlite3.OperationalError:
-            log.warning("Could not read %s (database: %s)" % (str(key), self.__tablename__))
-            if key in self.config_defaults:
-                return self.config_defaults[key]
-            else:
-                return None
+        return self.get_many([key])[key]
 
     def get(self, key, default=None):
         """ Return the key if exists or a default value
@@ -506,6 +600,27 @@ class Configuration(DataDir):
         else:
             return default
 
+    def get_many(self, keys):
+        """ Returns the values of several keys as dict, which are read with
+            a single query. Keys which are not stored have their default
+            value or None.
+
+            :param list keys: list of keys
+        """
+        keys = list(keys)
+        try:
+            values = self._read_values(keys)
+        except sqlite3.OperationalError:
+            log.warning("Could not read %s (database: %s)" % (str(keys), self.__tablename__))
+            values = {}
+        result = {}
+        for key in keys:
+            value = values.get(key, self.missing)
+            if value is self.missing:
+                value = self.config_defaults.get(key, None)
+            result[key] = value
+        return result
+
     def __contains__(self, key):
         if self._haveKey(key) or key in self.config_defaults:
             return True
@@ -513,24 +628,37 @@ class Configuration(DataDir):
             return False
 
     def __setitem__(self, key, value):
-        if self._haveKey(key):
-            query = ("UPDATE {0} SET value=? WHERE key=?".format(self.__tablename__), (value, key))
-        else:
-            query = ("INSERT INTO {0} (key, value) VALUES (?, ?)".format(self.__tablename__), (key, value))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        self.set_many({key: value})
+
+    def set_many(self, values):
+        """ Stores several key/value pairs in a single transaction
+
+            :param dict values: key/value pairs
+        """
+        keys = list(values.keys())
+        connection = self.get_connection()
         cursor = connection.cursor()
         try:
-            cursor.execute(*query)
+            stored = self._read_values(keys)
+            for key in keys:
+                if stored[key] is not self.missing:
+                    query = ("UPDATE {0} SET value=? WHERE key=?".format(self.__tablename__), (values[key], key))
+                else:
+                    query = ("INSERT INTO {0} (key, value) VALUES (?, ?)".format(self.__tablename__), (key, values[key]))
+                cursor.execute(*query)
             connection.commit()
         except sqlite3.OperationalError:
-            log.error("Could not write to %s (database: %s)" % (str(key), self.__tablename__))
-            raise NoWriteAccess("Could not write to %s (database: %s)" % (str(key), self.__tablename__))
+            connection.rollback()
+            log.error("Could not write to %s (database: %s)" % (str(keys), self.__tablename__))
+            raise NoWriteAccess("Could not write to %s (database: %s)" % (str(keys), self.__tablename__))
+        finally:
+            self._invalidate(keys)
 
     def delete(self, key):
         """ Delete a key from the configuration store
         """
         query = ("DELETE FROM {0} WHERE key=?".format(self.__tablename__), (key,))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         try:
             cursor.execute(*query)
@@ -538,13 +666,15 @@ class Configuration(DataDir):
         except sqlite3.OperationalError:
             log.error("Could not write to %s (database: %s)" % (str(key), self.__tablename__))
             raise NoWriteAccess("Could not write to %s (database: %s)" % (str(key), self.__tablename__))
+        finally:
+            self._invalidate([key])
 
     def __iter__(self):
         return iter(list(self.items()))
 
     def items(self):
         query = ("SELECT key, value from {0} ".format(self.__tablename__))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(query)
         r = {}
@@ -554,7 +684,7 @@ class Configuration(DataDir):
 
     def __len__(self):
         query = ("SELECT id from {0} ".format(self.__tablename__))
-        connection = sqlite3.connect(self.sqlDataBaseFile)
+        connection = self.get_connection()
         cursor = connection.cursor()
         cursor.execute(query)
         return len(cursor.fetchall())
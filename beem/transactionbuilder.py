@@ -11,6 +11,7 @@ from .utils import formatTimeFromNow
 from .steemconnect import SteemConnect
 from beembase.objects import Operation
 from beemgraphenebase.account import PrivateKey, PublicKey
+from beemgraphenebase.ecdsasig import Signer
 from beembase.signedtransactions import Signed_Transaction
 from beembase import transactions, operations
 from .exceptions import (
@@ -57,6 +58,7 @@ class TransactionBuilder(dict):
         **kwargs
     ):
         self.steem = steem_instance or shared_steem_instance()
+        self._signers = {}
         self.clear()
         if tx and isinstance(tx, dict):
             super(TransactionBuilder, self).__init__(tx)
@@ -207,10 +209,13 @@ class TransactionBuilder(dict):
     def appendWif(self, wif):
         """ Add a wif that should be used for signing of the transaction.
 
-            :param string wif: One wif key to use for signing
+            :param string wif: One wif key or a
+                :class:`beemgraphenebase.ecdsasig.Signer` to use for signing
                 a transaction.
         """
-        if wif:
+        if isinstance(wif, Signer):
+            self.wifs.add(wif)
+        elif wif:
             try:
                 PrivateKey(wif, prefix=self.steem.prefix)
                 self.wifs.add(wif)
@@ -236,8 +241,12 @@ class TransactionBuilder(dict):
         expiration = formatTimeFromNow(
             self.expiration or self.steem.expiration
         )
-        ref_block_num, ref_block_prefix = transactions.getBlockParams(
-            self.steem.rpc)
+        ref_block_provider = self.steem.ref_block_provider
+        if ref_block_provider is not None:
+            ref_block_num, ref_block_prefix = ref_block_provider.get_block_params()
+        else:
+            ref_block_num, ref_block_prefix = transactions.getBlockParams(
+                self.steem.rpc)
         self.tx = Signed_Transaction(
             ref_block_prefix=ref_block_prefix,
             expiration=expiration,
@@ -283,10 +292,21 @@ class TransactionBuilder(dict):
         if not any(self.wifs):
             raise MissingKeyError
 
-        signedtx.sign(self.wifs, chain=self.steem.chain_params)
+        signedtx.sign([self._get_signer(wif) for wif in self.wifs], chain=self.steem.chain_params)
         self["signatures"].extend(signedtx.json().get("signatures"))
         return signedtx
 
+    def _get_signer(self, wif):
+        """ Returns a signer for a wif key, which is kept when the
+            transaction builder is cleared, so that the key is loaded only
+            once for all transactions of this builder
+        """
+        if isinstance(wif, Signer):
+            return wif
+        if wif not in self._signers:
+            self._signers[wif] = Signer(wif)
+        return self._signers[wif]
+
     def verify_authority(self):
         """ Verify the authority of the signed transaction
         """
@@ -7,4 +7,10 @@ __all__ = [
     "rpcutils",
     "graphenerpc",
     "node",
+    "nodepool",
+    "jsoncodec",
+    "responsecache",
+    "rpcstats",
+    "batchcontroller",
+    "fakenode",
 ]
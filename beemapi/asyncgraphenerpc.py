@@ -0,0 +1,359 @@
+"""asyncio based graphenerpc."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import logging
+import re
+import ssl
+import time
+from .exceptions import (
+    UnauthorizedError, RPCError, RPCErrorDoRetry, NumRetriesReached, CallRetriesReached, WorkingNodeMissing
+)
+from .rpcutils import is_network_appbase_ready
+from .graphenerpc import GrapheneRPC
+from . import jsoncodec
+from beemgraphenebase.version import version as beem_version
+
+AIOHTTP_MODULE = None
+if not AIOHTTP_MODULE:
+    try:
+        import aiohttp
+        AIOHTTP_MODULE = "aiohttp"
+    except ImportError:
+        AIOHTTP_MODULE = None
+
+
+log = logging.getLogger(__name__)
+
+
+class AsyncGrapheneRPC(GrapheneRPC):
+    """
+    This class allows to call API methods from asyncio coroutines.
+
+    All API methods are mapped in the same way as in
+    :class:`beemapi.graphenerpc.GrapheneRPC`, but they return
+    awaitables. Many calls can be in flight at the same time: https
+    calls share one pooled ``aiohttp`` session and websocket calls share
+    a single connection whose replies are routed by their request id.
+
+    :param str urls: Either a single Websocket/Http URL, or a list of URLs
+    :param str user: Username for Authentication
+    :param str password: Password for Authentication
+    :param int num_retries: Try x times to num_retries to a node on disconnect, -1 for indefinitely
+    :param int num_retries_call: Repeat num_retries_call times a rpc call on node error (default is 5)
+    :param int timeout: Timeout setting for https nodes (default is 60)
+    :param int max_connections: Size of the https connection pool (default is 32)
+    :param bool use_condenser: Use the old condenser_api rpc protocol on nodes with version
+        0.19.4 or higher. The settings has no effect on nodes with version of 0.19.3 or lower.
+
+    Usage:
+
+        .. code-block:: python
+
+            import asyncio
+            from beemapi.asyncgraphenerpc import AsyncGrapheneRPC
+
+            async def main():
+                async with AsyncGrapheneRPC("https://api.steemit.com") as rpc:
+                    blocks = await asyncio.gather(
+                        *[rpc.get_block(i) for i in range(1, 101)])
+
+            asyncio.get_event_loop().run_until_complete(main())
+
+    .. note:: ``aiohttp`` has to be installed.
+
+    """
+
+    def __init__(self, urls, user=None, password=None, **kwargs):
+        """Init."""
+        kwargs["autoconnect"] = False
+        super(AsyncGrapheneRPC, self).__init__(urls, user=user, password=password, **kwargs)
+        self.max_connections = kwargs.get("max_connections", 32)
+        self._connect_lock = None
+        self._ws_reader = None
+        self._ws_futures = {}
+
+    async def __aenter__(self):
+        await self.rpcconnect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.rpcclose()
+
+    def _get_session(self):
+        """Returns the pooled aiohttp session, which is created on first use"""
+        if AIOHTTP_MODULE is None:
+            raise Exception("aiohttp is required for AsyncGrapheneRPC")
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self.session
+
+    async def next(self):
+        """Switches to the next node url"""
+        await self._ws_close()
+        await self.rpcconnect()
+
+    async def rpcconnect(self, next_url=True, failed_url=None):
+        """Connect to next url in a loop.
+
+        :param str failed_url: When set, the node is only switched when it is
+            still the current one. This prevents that concurrent failing calls
+            skip over several working nodes.
+        """
+        if self.nodes.working_nodes_count == 0:
+            return
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if failed_url is not None and failed_url != self.url:
+                return
+            while True:
+                if next_url:
+                    await self._ws_close()
+                    self.url = next(self.nodes)
+                    self.nodes.reset_error_cnt_call()
+                    wait = 0
+                    if self.nodes.circuit_breaker and self.nodes.working_nodes_count > 1:
+                        wait = self.nodes.node.open_remaining()
+                    if wait > 0:
+                        # the circuit breakers of all nodes are open
+                        log.warning("Waiting %.1f seconds for node %s" % (wait, self.url))
+                        await asyncio.sleep(wait)
+                    log.debug("Trying to connect to node %s" % self.url)
+                    if self.url[:2] == "ws":
+                        self.current_rpc = self.rpc_methods["ws"]
+                    else:
+                        self.current_rpc = self.rpc_methods["jsonrpc"]
+                        self.headers = {'User-Agent': 'beem v%s' % (beem_version),
+                                        'content-type': 'application/json'}
+                try:
+                    if self.current_rpc == 0:
+                        await self._ws_connect()
+                        await self.rpclogin(self.user, self.password)
+                    try:
+                        props = None
+                        if not self.use_condenser:
+                            props = await self._call_once("get_config", api="database")
+                        else:
+                            props = await self._call_once("get_config")
+                    except Exception as e:
+                        if re.search("Bad Cast:Invalid cast from type", str(e)):
+                            self.current_rpc += 2
+                            props = await self._call_once("get_config", api="database")
+                    if props is None:
+                        raise RPCError("Could not recieve answer for get_config")
+                    if is_network_appbase_ready(props):
+                        if self.ws:
+                            self.current_rpc = self.rpc_methods["wsappbase"]
+                        else:
+                            self.current_rpc = self.rpc_methods["appbase"]
+                    break
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    self.nodes.increase_error_cnt()
+                    do_sleep = not next_url or (next_url and self.nodes.working_nodes_count == 1)
+                    self.nodes.sleep_and_check_retries(str(e), sleep=False)
+                    if do_sleep:
+                        await asyncio.sleep(self.nodes.sleep_time())
+                    next_url = True
+
+    async def rpclogin(self, user, password):
+        """Login into Websocket"""
+        if self.ws and self.current_rpc == 0 and user and password:
+            await self._call_once("login", user, password, api="login_api")
+
+    async def rpcclose(self):
+        """Close the websocket and the https session"""
+        self.stop_node_probing()
+        await self._ws_close()
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def _ws_connect(self):
+        """Opens the websocket connection and starts the reply reader"""
+        session = self._get_session()
+        sslcontext = None
+        if self.url[:3] == "wss":
+            sslcontext = ssl.create_default_context()
+        self.ws = await session.ws_connect(self.url, ssl=sslcontext, max_msg_size=0)
+        self._ws_reader = asyncio.ensure_future(self._ws_read(self.ws))
+
+    async def _ws_close(self):
+        """Closes the websocket connection, pending calls are failed"""
+        ws = self.ws
+        self.ws = None
+        if ws is not None:
+            try:
+                await ws.close()
+            except Exception as e:
+                log.warning(str(e))
+        if self._ws_reader is not None:
+            await asyncio.gather(self._ws_reader, return_exceptions=True)
+            self._ws_reader = None
+
+    async def _ws_read(self, ws):
+        """Routes each websocket reply to the call waiting for its id"""
+        error = RPCErrorDoRetry("Websocket connection closed")
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                try:
+                    data = jsoncodec.loads(msg.data)
+                except ValueError:
+                    continue
+                if not isinstance(data, list):
+                    data = [data]
+                future = None
+                for r in data:
+                    if isinstance(r, dict) and r.get("id") in self._ws_futures:
+                        future = self._ws_futures.pop(r.get("id"))
+                        break
+                if future is not None and not future.done():
+                    future.set_result(msg.data)
+        except Exception as e:
+            error = e
+        finally:
+            futures = list(self._ws_futures.values())
+            self._ws_futures = {}
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+
+    async def request_send(self, payload):
+        session = self._get_session()
+        auth = None
+        if self.user is not None and self.password is not None:
+            auth = aiohttp.BasicAuth(self.user, self.password)
+        async with session.post(self.url, data=payload, headers=self.headers, auth=auth) as response:
+            if response.status == 401:
+                raise UnauthorizedError
+            return await response.read()
+
+    async def ws_send(self, payload, request_id):
+        if self.ws is None:
+            raise RPCErrorDoRetry("Websocket is not connected")
+        future = asyncio.get_event_loop().create_future()
+        self._ws_futures[request_id] = future
+        try:
+            await self.ws.send_str(payload.decode('utf8'))
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._ws_futures.pop(request_id, None)
+
+    async def _send(self, payload):
+        """Sends the payload once to the current node and returns the raw reply"""
+        if isinstance(payload, list):
+            request_id = payload[0]["id"]
+        else:
+            request_id = payload["id"]
+        data = jsoncodec.dumps(payload)
+        url = self.url
+        start = time.time()
+        try:
+            if self.current_rpc == 0 or self.current_rpc == 2:
+                reply = await self.ws_send(data, request_id)
+            else:
+                reply = await self.request_send(data)
+        except Exception:
+            if self.rpc_stats is not None:
+                self.rpc_stats.record_request(url, payload, time.time() - start, len(data), error=True)
+            raise
+        if self.rpc_stats is not None:
+            self.rpc_stats.record_request(url, payload, time.time() - start, len(data),
+                                          len(reply) if reply else 0, error=not bool(reply))
+        return reply
+
+    async def _call_once(self, name, *args, **kwargs):
+        """Calls an api method on the current node without retries or node switching.
+        Used while connecting, where a failing call must not trigger a reconnect.
+        """
+        query = self._build_query(name, *args, **kwargs)
+        return self._process_reply(await self._send(query))
+
+    async def get_network(self, props=None):
+        """ Identify the connected network. This call returns a
+            dictionary with keys chain_id, core_symbol and prefix
+        """
+        if props is None:
+            props = await self.get_config(api="database")
+        return super(AsyncGrapheneRPC, self).get_network(props=props)
+
+    async def rpcexec(self, payload):
+        """
+        Execute a call by sending the payload.
+
+        :param json payload: Payload data
+        :raises ValueError: if the server does not respond in proper JSON format
+        :raises RPCError: if the server returns an error
+        """
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(jsoncodec.dumps(payload))
+        if self.nodes.working_nodes_count == 0:
+            raise WorkingNodeMissing
+        if self.url is None:
+            await self.rpcconnect()
+        reply = {}
+        url = None
+        while True:
+            if url is not None and self.rpc_stats is not None:
+                self.rpc_stats.record_retry(url, failover=self.url != url)
+            url = self.url
+            self.nodes.increase_error_cnt_call()
+            try:
+                start = time.time()
+                reply = await self._send(payload)
+                if not bool(reply):
+                    try:
+                        if self.nodes.other_node_available():
+                            raise CallRetriesReached()
+                        self.nodes.sleep_and_check_retries("Empty Reply", sleep=False, call_retry=True)
+                        self.nodes.record_failure()
+                        await asyncio.sleep(self.nodes.sleep_time(call_retry=True))
+                    except CallRetriesReached:
+                        # records the failure of the node
+                        self.nodes.increase_error_cnt()
+                        self.nodes.sleep_and_check_retries("Empty Reply", sleep=False, call_retry=False)
+                        await self.rpcconnect(failed_url=url)
+                else:
+                    self.nodes.record_success(time.time() - start)
+                    break
+            except (KeyboardInterrupt, UnauthorizedError, NumRetriesReached):
+                raise
+            except Exception as e:
+                self.nodes.increase_error_cnt()
+                self.nodes.sleep_and_check_retries(str(e), sleep=False, call_retry=False)
+                await self.rpcconnect(failed_url=url)
+
+        if self.rpc_stats is None:
+            return self._process_reply(reply)
+        start = time.time()
+        try:
+            return self._process_reply(reply)
+        finally:
+            self.rpc_stats.record_decode(self.url, payload, time.time() - start)
+
+    def __getattr__(self, name):
+        """Map all methods to RPC calls and pass through the arguments."""
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            add_to_queue = kwargs.get("add_to_queue", False)
+            query = self._build_query(name, *args, **kwargs)
+            if add_to_queue:
+                self.rpc_queue.append(query)
+                return None
+            elif len(self.rpc_queue) > 0:
+                self.rpc_queue.append(query)
+                query = self.rpc_queue
+                self.rpc_queue = []
+            return await self.rpcexec(query)
+        return method
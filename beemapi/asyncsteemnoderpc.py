@@ -0,0 +1,105 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import re
+from .asyncgraphenerpc import AsyncGrapheneRPC
+from .steemnoderpc import SteemNodeRPC
+from . import exceptions
+import logging
+log = logging.getLogger(__name__)
+
+
+class AsyncSteemNodeRPC(AsyncGrapheneRPC, SteemNodeRPC):
+    """ This class allows to call API methods exposed by the witness node
+        from asyncio coroutines.
+
+        It handles the same Steem specific errors as
+        :class:`beemapi.steemnoderpc.SteemNodeRPC`, but retries are
+        awaited with ``asyncio.sleep`` so that other calls keep running.
+
+        :param str urls: Either a single Websocket/Http URL, or a list of URLs
+        :param str user: Username for Authentication
+        :param str password: Password for Authentication
+        :param int num_retries: Try x times to num_retries to a node on disconnect, -1 for indefinitely
+        :param int num_retries_call: Repeat num_retries_call times a rpc call on node error (default is 5)
+        :param int timeout: Timeout setting for https nodes (default is 60)
+        :param int max_connections: Size of the https connection pool (default is 32)
+        :param bool use_condenser: Use the old condenser_api rpc protocol on nodes with version
+            0.19.4 or higher. The settings has no effect on nodes with version of 0.19.3 or lower.
+
+    """
+
+    def __init__(self, *args, **kwargs):
+        """ Init AsyncSteemNodeRPC
+
+            :param str urls: Either a single Websocket/Http URL, or a list of URLs
+            :param str user: Username for Authentication
+            :param str password: Password for Authentication
+            :param int num_retries: Try x times to num_retries to a node on disconnect, -1 for indefinitely
+            :param int num_retries_call: Repeat num_retries_call times a rpc call on node error (default is 5)
+            :param int timeout: Timeout setting for https nodes (default is 60)
+
+        """
+        super(AsyncSteemNodeRPC, self).__init__(*args, **kwargs)
+
+    async def rpcexec(self, payload):
+        """ Execute a call by sending the payload.
+            In here, we mostly deal with Steem specific error handling
+
+            :param json payload: Payload data
+            :raises ValueError: if the server does not respond in proper JSON format
+            :raises RPCError: if the server returns an error
+        """
+        doRetry = True
+        maxRetryCountReached = False
+        while doRetry and not maxRetryCountReached:
+            doRetry = False
+            url = self.url
+            try:
+                return await super(AsyncSteemNodeRPC, self).rpcexec(payload)
+            except exceptions.RPCErrorDoRetry as e:
+                msg = exceptions.decodeRPCErrorMsg(e).strip()
+                try:
+                    self.nodes.sleep_and_check_retries(str(msg), sleep=False, call_retry=True)
+                    await asyncio.sleep(self.nodes.sleep_time(call_retry=True))
+                    doRetry = True
+                except exceptions.CallRetriesReached:
+                    if self.nodes.working_nodes_count > 1:
+                        await self._retry_on_next_node(msg, url)
+                        doRetry = True
+                    else:
+                        raise exceptions.CallRetriesReached
+            except exceptions.RPCError as e:
+                try:
+                    doRetry = await self._check_error_message(e, url)
+                except exceptions.CallRetriesReached:
+                    msg = exceptions.decodeRPCErrorMsg(e).strip()
+                    if self.nodes.working_nodes_count > 1:
+                        await self._retry_on_next_node(msg, url)
+                        doRetry = True
+                    else:
+                        raise exceptions.CallRetriesReached
+            maxRetryCountReached = self.nodes.num_retries_call_reached
+
+    async def _retry_on_next_node(self, error_msg, failed_url=None):
+        self.nodes.increase_error_cnt()
+        self.nodes.sleep_and_check_retries(error_msg, sleep=False, call_retry=False)
+        await self.rpcconnect(failed_url=failed_url)
+
+    async def _check_error_message(self, e, failed_url=None):
+        """Check error message and decide what to do. Errors which are
+        not retried are raised by :meth:`SteemNodeRPC._check_error_message`.
+        """
+        msg = exceptions.decodeRPCErrorMsg(e).strip()
+        if re.search("Unable to acquire database lock", msg) or re.search("Internal Error", msg) or re.search("Unknown exception", msg):
+            self.nodes.sleep_and_check_retries(str(msg), sleep=False, call_retry=True)
+            await asyncio.sleep(self.nodes.sleep_time(call_retry=True))
+            return True
+        elif re.search("!check_max_block_age", str(e)):
+            if self.nodes.working_nodes_count == 1:
+                raise exceptions.UnhandledRPCError(msg)
+            await self._retry_on_next_node(str(msg), failed_url)
+            return True
+        return SteemNodeRPC._check_error_message(self, e, self.error_cnt_call)
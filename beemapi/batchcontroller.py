@@ -0,0 +1,123 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import threading
+
+
+class BatchController(object):
+    """ Adapts the batch size and the number of parallel requests of every
+        node to its observed latency, reply size and errors
+
+        :param int batch_size: initial batch size of a node (default is 10)
+        :param int min_batch_size: smallest batch size (default is 1)
+        :param int max_batch_size: largest batch size (default is 1000)
+        :param int concurrency: initial number of parallel requests of a node (default is 1)
+        :param int max_concurrency: maximum number of parallel requests of a node (default is 8)
+        :param float target_latency: replies which take longer in seconds shrink
+            the batch size and the concurrency (default is 2)
+        :param int max_reply_bytes: replies which are larger shrink the batch size,
+            unbounded for None (default is None)
+
+        The batch size starts by doubling after every fast reply, until a reply
+        is slow, too large, or the number of items per second drops. From then on
+        it grows by an eighth and shrinks by a quarter on slow replies.
+        An error halves the batch size. The concurrency grows by one after
+        ``2 * concurrency`` fast replies in a row and shrinks on slow replies and
+        errors.
+
+        .. code-block:: python
+
+            from beemapi.batchcontroller import BatchController
+            controller = BatchController()
+            size = controller.batch_size(rpc.url)
+            start = time.time()
+            blocks = get_blocks(size)
+            controller.record(rpc.url, size, time.time() - start)
+
+    """
+    def __init__(self, batch_size=10, min_batch_size=1, max_batch_size=1000, concurrency=1,
+                 max_concurrency=8, target_latency=2., max_reply_bytes=None):
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.initial_batch_size = max(min_batch_size, min(batch_size, max_batch_size))
+        self.max_concurrency = max_concurrency
+        self.initial_concurrency = max(1, min(concurrency, max_concurrency))
+        self.target_latency = target_latency
+        self.max_reply_bytes = max_reply_bytes
+        self._nodes = {}
+        self._lock = threading.Lock()
+
+    def _get_node(self, url):
+        state = self._nodes.get(url)
+        if state is None:
+            state = {"batch_size": float(self.initial_batch_size), "threshold": float(self.max_batch_size),
+                     "concurrency": self.initial_concurrency, "successes": 0, "best_rate": 0.,
+                     "requests": 0, "errors": 0}
+            self._nodes[url] = state
+        return state
+
+    def batch_size(self, url=None):
+        """ Returns the current batch size of a node. Without url, the smallest
+            batch size of all nodes is returned.
+        """
+        with self._lock:
+            if url is None:
+                if not self._nodes:
+                    return self.initial_batch_size
+                return int(min(state["batch_size"] for state in self._nodes.values()))
+            return int(self._get_node(url)["batch_size"])
+
+    def concurrency(self, url):
+        """ Returns the current number of parallel requests of a node"""
+        with self._lock:
+            return self._get_node(url)["concurrency"]
+
+    def record(self, url, batch_size=None, latency=0., error=False, reply_bytes=None):
+        """ Adds the result of a request and adapts batch size and concurrency
+
+            :param str url: node url
+            :param int batch_size: number of items of the request, None for
+                requests which only count for the concurrency
+            :param float latency: duration of the request in seconds
+            :param bool error: True, when the request failed
+            :param int reply_bytes: size of the reply, when known
+        """
+        with self._lock:
+            state = self._get_node(url)
+            state["requests"] += 1
+            if error:
+                state["errors"] += 1
+                state["batch_size"] = max(self.min_batch_size, state["batch_size"] / 2)
+                state["threshold"] = state["batch_size"]
+                state["concurrency"] = max(1, state["concurrency"] // 2)
+                state["successes"] = 0
+                return
+            too_slow = latency > self.target_latency
+            too_large = self.max_reply_bytes is not None and reply_bytes is not None and reply_bytes > self.max_reply_bytes
+            if batch_size is not None and batch_size >= int(state["batch_size"]):
+                rate = batch_size / max(latency, 1e-6)
+                if too_slow or too_large or rate < 0.8 * state["best_rate"]:
+                    state["batch_size"] = max(self.min_batch_size, state["batch_size"] * 0.75)
+                    state["threshold"] = state["batch_size"]
+                elif state["batch_size"] < state["threshold"]:
+                    state["batch_size"] = min(state["batch_size"] * 2, state["threshold"], self.max_batch_size)
+                else:
+                    state["batch_size"] = min(state["batch_size"] * 1.125 + 1, self.max_batch_size)
+                state["best_rate"] = max(rate, state["best_rate"] * 0.95)
+            if too_slow:
+                state["concurrency"] = max(1, state["concurrency"] - 1)
+                state["successes"] = 0
+            else:
+                state["successes"] += 1
+                if state["successes"] >= 2 * state["concurrency"]:
+                    state["concurrency"] = min(self.max_concurrency, state["concurrency"] + 1)
+                    state["successes"] = 0
+
+    def get_stats(self):
+        """ Returns batch size, concurrency, requests and errors per node"""
+        with self._lock:
+            return {url: {"batch_size": int(state["batch_size"]), "concurrency": state["concurrency"],
+                          "requests": state["requests"], "errors": state["errors"]}
+                    for url, state in self._nodes.items()}
@@ -0,0 +1,437 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from . import jsoncodec
+from .rpcutils import split_query
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+log = logging.getLogger(__name__)
+
+#: Directory of the bundled fixtures
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+#: Names of the bundled fixtures, a node with version 0.20.2 and a node with version 0.19.2.
+#: Both contain the blocks :data:`FIXTURE_BLOCKS`, the chain properties, which
+#: are read by :func:`beem.steem.Steem.refresh_data`, and the account
+#: :data:`FIXTURE_ACCOUNT` with 100 history operations.
+BUNDLED_FIXTURES = ["appbase", "pre_appbase"]
+#: First and last block number of the bundled fixtures
+FIXTURE_BLOCKS = (25000001, 25000050)
+#: Account of the bundled fixtures
+FIXTURE_ACCOUNT = "beem-test"
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def get_request_key(query):
+    """ Returns the key of a query, which is used to find its recorded reply,
+        or None for an invalid query
+    """
+    split = split_query(query)
+    if split is None:
+        return None
+    api, name, params = split
+    return "%s.%s:%s" % (api, name, json.dumps(params, sort_keys=True, separators=(',', ':')))
+
+
+def load_fixtures(fixtures):
+    """ Returns the recorded replies of a fixture
+
+        :param fixtures: name of a bundled fixture (see :data:`BUNDLED_FIXTURES`),
+            path to a fixture file, or a fixture dict
+    """
+    if isinstance(fixtures, dict):
+        return fixtures
+    path = fixtures
+    if fixtures in BUNDLED_FIXTURES:
+        path = os.path.join(FIXTURE_DIR, fixtures + ".json")
+    with io.open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FixtureRecorder(object):
+    """ Records the queries and replies of rpc calls as fixture for :class:`FakeNode`
+
+        :param str name: name of the fixture (default is None)
+
+        A recorder is passed to :class:`beemapi.graphenerpc.GrapheneRPC` with
+        ``recorder=``, all valid replies of the node are then added to it.
+
+        .. code-block:: python
+
+            from beem import Steem
+            from beem.blockchain import Blockchain
+            from beemapi.fakenode import FixtureRecorder
+            recorder = FixtureRecorder("appbase")
+            stm = Steem(node="https://api.steemit.com", recorder=recorder)
+            for block in Blockchain(steem_instance=stm).blocks(start=25000000, stop=25000100):
+                pass
+            recorder.save("blocks.json")
+
+    """
+    def __init__(self, name=None):
+        self.name = name
+        self.responses = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.responses)
+
+    def record(self, payload, reply):
+        """ Adds the replies of a sent payload
+
+            :param payload: sent query or list of queries
+            :param reply: raw reply of the node
+        """
+        try:
+            reply = jsoncodec.loads(reply)
+        except ValueError:
+            return
+        if isinstance(payload, list):
+            if not isinstance(reply, list):
+                return
+            replies = {r.get("id"): r for r in reply if isinstance(r, dict)}
+            pairs = [(query, replies.get(query.get("id"))) for query in payload]
+        else:
+            pairs = [(payload, reply)]
+        with self._lock:
+            for query, r in pairs:
+                if not isinstance(r, dict) or ("result" not in r and "error" not in r):
+                    continue
+                response = {"request": {"method": query.get("method"), "params": query.get("params")}}
+                if "error" in r:
+                    response["error"] = r["error"]
+                else:
+                    response["result"] = r["result"]
+                self.responses.append(response)
+
+    def get_fixtures(self):
+        """ Returns the recorded replies as fixture dict"""
+        with self._lock:
+            return {"name": self.name, "responses": list(self.responses)}
+
+    def save(self, path):
+        """ Writes the recorded replies as fixture file, with one reply per line"""
+        fixtures = self.get_fixtures()
+        lines = [json.dumps(response, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+                 for response in fixtures["responses"]]
+        with io.open(path, "w", encoding="utf-8") as f:
+            f.write('{"name": %s, "responses": [\n%s\n]}\n' % (json.dumps(fixtures["name"]), ",\n".join(lines)))
+
+
+class FakeNode(object):
+    """ Local JSON-RPC server, which replays recorded replies over http and websocket
+
+        :param fixtures: name of a bundled fixture (``appbase`` or ``pre_appbase``),
+            path to a fixture file or a fixture dict, as written by
+            :class:`FixtureRecorder` (default is ``appbase``)
+        :param str host: host to listen on (default is 127.0.0.1)
+        :param int port: port to listen on, 0 selects a free port (default is 0)
+        :param float latency: delay of every reply in seconds (default is 0)
+        :param float jitter: maximum random delay, which is added to latency (default is 0)
+        :param float error_rate: probability, that a request fails (default is 0)
+        :param str error_type: kind of the injected errors: ``rpc`` for a JSON-RPC
+            error, ``http`` for a 503 status, ``empty`` for an empty reply or
+            ``disconnect`` for a closed connection (default is ``rpc``)
+        :param int seed: seed of the random delays and errors (default is None)
+
+        A query is answered with the recorded reply of the same api, method and
+        parameters. When a query was recorded several times, e.g.
+        ``get_dynamic_global_properties``, the replies are returned in the
+        recorded order and the last one is repeated. Unknown queries get a
+        ``Could not find method`` error. The same port accepts http and websocket
+        connections, batch calls are supported on both.
+
+        .. code-block:: python
+
+            from beem import Steem
+            from beemapi.fakenode import FakeNode
+            with FakeNode("appbase", latency=0.05, jitter=0.02) as node:
+                stm = Steem(node=node.url)
+                print(stm.get_config())
+
+    """
+    def __init__(self, fixtures="appbase", host="127.0.0.1", port=0, latency=0., jitter=0.,
+                 error_rate=0., error_type="rpc", seed=None):
+        if error_type not in ["rpc", "http", "empty", "disconnect"]:
+            raise ValueError("Unknown error type %s" % error_type)
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_type = error_type
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._responses = {}
+        self._served = {}
+        self._server = None
+        self._thread = None
+        self._websockets = set()
+        if fixtures is not None:
+            self.add_fixtures(fixtures)
+
+    @property
+    def url(self):
+        """ Http url of the running node"""
+        return "http://%s:%d" % (self.host, self.port)
+
+    @property
+    def ws_url(self):
+        """ Websocket url of the running node"""
+        return "ws://%s:%d" % (self.host, self.port)
+
+    def add_fixtures(self, fixtures):
+        """ Adds all replies of a fixture, see :func:`load_fixtures`"""
+        for response in load_fixtures(fixtures)["responses"]:
+            request = response["request"]
+            self.add_response(request.get("method"), request.get("params"),
+                              result=response.get("result"), error=response.get("error"))
+
+    def add_response(self, method, params, result=None, error=None):
+        """ Adds a reply
+
+            :param str method: method of the query, e.g. ``condenser_api.get_config`` or ``call``
+            :param params: parameters of the query
+            :param result: result of the reply
+            :param dict error: error of the reply, replaces the result when set
+        """
+        key = get_request_key({"method": method, "params": params})
+        response = {"error": error} if error is not None else {"result": result}
+        with self._lock:
+            self._responses.setdefault(key, []).append(response)
+
+    def start(self):
+        """ Starts the server in a background thread"""
+        self._server = _FakeNodeServer((self.host, self.port), _FakeNodeHandler)
+        self._server.node = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FakeNode")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stops the server and closes all websocket connections"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            websockets = list(self._websockets)
+        for connection in websockets:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except (IOError, OSError):
+                pass
+        self._thread.join()
+        self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def get_reply(self, query):
+        """ Returns the reply of a single query as dict"""
+        reply = {"jsonrpc": "2.0", "id": query.get("id") if isinstance(query, dict) else None}
+        key = get_request_key(query)
+        with self._lock:
+            responses = self._responses.get(key)
+            if responses:
+                served = self._served.get(key, 0)
+                self._served[key] = served + 1
+                reply.update(responses[min(served, len(responses) - 1)])
+                return reply
+        if key is None:
+            reply["error"] = {"code": -32600, "message": "Invalid Request"}
+        else:
+            reply["error"] = {"code": -32601, "message": "Could not find method %s" % key.split(":")[0]}
+        return reply
+
+    def handle(self, data):
+        """ Answers a raw request
+
+            :param bytes data: JSON encoded query or batch of queries
+            :returns: ``(status, reply)``, reply is None, when the connection
+                should be closed
+        """
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter > 0 else 0)
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if delay > 0:
+            time.sleep(delay)
+        if failed and self.error_type == "disconnect":
+            return 200, None
+        elif failed and self.error_type == "empty":
+            return 200, b""
+        elif failed and self.error_type == "http":
+            return 503, b"<html><body><h1>503 Service Temporarily Unavailable</h1></body></html>"
+        try:
+            payload = jsoncodec.loads(data)
+        except ValueError:
+            return 200, jsoncodec.dumps({"jsonrpc": "2.0", "id": None,
+                                         "error": {"code": -32700, "message": "Parse error"}})
+        if failed:
+            reply = {"jsonrpc": "2.0", "id": payload.get("id") if isinstance(payload, dict) else None,
+                     "error": {"code": -32003, "message": "Internal Error"}}
+        elif isinstance(payload, list):
+            reply = [self.get_reply(query) for query in payload]
+        else:
+            reply = self.get_reply(payload)
+        return 200, jsoncodec.dumps(reply)
+
+
+class _FakeNodeServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _FakeNodeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        # headers and body are written separately, without this every reply waits for a delayed ack
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        log.debug(format % args)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(length)
+        status, reply = self.server.node.handle(data)
+        if reply is None:
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def do_GET(self):
+        if self.headers.get("Upgrade", "").lower() != "websocket":
+            self.send_error(405)
+            return
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest())
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept.decode("ascii"))
+        self.end_headers()
+        self.close_connection = True
+        node = self.server.node
+        with node._lock:
+            node._websockets.add(self.connection)
+        self._send_lock = threading.Lock()
+        try:
+            self._serve_websocket()
+        finally:
+            with node._lock:
+                node._websockets.discard(self.connection)
+
+    def _serve_websocket(self):
+        message = bytearray()
+        while True:
+            frame = self._read_frame()
+            if frame is None:
+                return
+            opcode, fin, data = frame
+            if opcode == 0x8:
+                self._send_frame(0x8, data[:2])
+                return
+            elif opcode == 0x9:
+                self._send_frame(0xA, data)
+                continue
+            elif opcode == 0xA:
+                continue
+            message.extend(data)
+            if not fin:
+                continue
+            data = bytes(message)
+            message = bytearray()
+            # replies are sent in parallel, so that slow calls do not block multiplexed calls
+            thread = threading.Thread(target=self._reply_websocket, args=(data, ))
+            thread.daemon = True
+            thread.start()
+
+    def _reply_websocket(self, data):
+        status, reply = self.server.node.handle(data)
+        try:
+            if reply is None:
+                self.connection.shutdown(socket.SHUT_RDWR)
+            elif status != 200:
+                self._send_frame(0x1, ("%d %s" % (status, reply.decode("utf8"))).encode("utf8"))
+            else:
+                self._send_frame(0x1, reply)
+        except (IOError, OSError):
+            pass
+
+    def _read_exactly(self, length):
+        data = b""
+        while len(data) < length:
+            chunk = self.rfile.read(length - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def _read_frame(self):
+        try:
+            header = self._read_exactly(2)
+            if header is None:
+                return None
+            header = bytearray(header)
+            fin = bool(header[0] & 0x80)
+            opcode = header[0] & 0x0F
+            length = header[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self._read_exactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self._read_exactly(8))[0]
+            mask = bytearray(self._read_exactly(4)) if header[1] & 0x80 else None
+            data = bytearray(self._read_exactly(length) if length > 0 else b"")
+        except (IOError, OSError, TypeError, struct.error):
+            return None
+        if mask is not None:
+            for i in range(len(data)):
+                data[i] ^= mask[i % 4]
+        return opcode, fin, bytes(data)
+
+    def _send_frame(self, opcode, data):
+        length = len(data)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+        with self._send_lock:
+            self.wfile.write(header + data)
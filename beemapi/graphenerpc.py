@@ -7,7 +7,6 @@ from builtins import next
 from builtins import str
 from builtins import object
 from itertools import cycle
-import json
 import logging
 import ssl
 import sys
@@ -22,7 +21,8 @@ from .rpcutils import (
     is_network_appbase_ready,
     get_api_name, get_query
 )
-from .node import Nodes
+from .node import Nodes, get_sleep_time
+from . import jsoncodec
 from beemgraphenebase.version import version as beem_version
 from beemgraphenebase.chains import known_chains
 
@@ -34,6 +34,13 @@ if not WEBSOCKET_MODULE:
         WEBSOCKET_MODULE = "websocket"
     except ImportError:
         WEBSOCKET_MODULE = None
+FUTURES_MODULE = None
+if not FUTURES_MODULE:
+    try:
+        from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+        FUTURES_MODULE = "futures"
+    except ImportError:
+        FUTURES_MODULE = None
 REQUEST_MODULE = None
 if not REQUEST_MODULE:
     try:
@@ -80,6 +87,95 @@ def create_ws_instance(use_ssl=True, enable_multithread=True):
         return websocket.WebSocket(enable_multithread=enable_multithread)
 
 
+class WebsocketReader(object):
+    """ Reads the replies of a websocket connection in a background thread and
+        routes them by their JSON-RPC id to the waiting calls. Many threads can
+        therefore have requests in flight on a single connection.
+
+        :param websocket.WebSocket ws: connected websocket
+        :param float timeout: maximum time in seconds to wait for a reply (default is 60)
+
+        The reader belongs to a single connection. When the connection is
+        closed, all waiting calls fail with ``WebSocketConnectionClosedException``.
+    """
+    def __init__(self, ws, timeout=60):
+        self.ws = ws
+        self.timeout = timeout
+        self.futures = {}
+        self.closed = False
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="WebsocketReader")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __len__(self):
+        """ Number of calls waiting for their reply"""
+        return len(self.futures)
+
+    def send(self, payload, request_id):
+        """ Sends the payload and waits for the reply with the id request_id
+
+            :param bytes payload: encoded JSON-RPC request
+            :param int request_id: id of the request, for a batch request the id
+                of its first query
+        """
+        future = Future()
+        with self._lock:
+            if self.closed:
+                raise WebSocketConnectionClosedException("Websocket connection is closed")
+            self.futures[request_id] = future
+        try:
+            with self._send_lock:
+                self.ws.send(payload)
+            return future.result(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self.futures.pop(request_id, None)
+
+    def _run(self):
+        error = WebSocketConnectionClosedException("Websocket connection is closed")
+        try:
+            while not self.closed:
+                reply = self.ws.recv()
+                if not reply:
+                    continue
+                try:
+                    data = jsoncodec.loads(reply)
+                except ValueError:
+                    log.warning("Could not route websocket reply: %s" % str(reply)[:200])
+                    continue
+                if not isinstance(data, list):
+                    data = [data]
+                future = None
+                with self._lock:
+                    for r in data:
+                        if isinstance(r, dict) and r.get("id") in self.futures:
+                            future = self.futures.pop(r.get("id"))
+                            break
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except Exception as e:
+            if not self.closed:
+                error = e
+        finally:
+            with self._lock:
+                self.closed = True
+                futures = list(self.futures.values())
+                self.futures = {}
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+
+    def close(self):
+        """ Closes the connection, waiting calls fail"""
+        self.closed = True
+        try:
+            self.ws.close()
+        except Exception as e:
+            log.warning(str(e))
+
+
 class GrapheneRPC(object):
     """
     This class allows to call API methods synchronously, without callbacks.
@@ -95,6 +191,28 @@ class GrapheneRPC(object):
     :param bool autoconnect: When set to false, connection is performed on the first rpc call (default is True)
     :param bool use_condenser: Use the old condenser_api rpc protocol on nodes with version
         0.19.4 or higher. The settings has no effect on nodes with version of 0.19.3 or lower.
+    :param bool node_scoring: When True, latency, success rate and head block lag of every
+        node are tracked and the node with the lowest costs is chosen (default is False)
+    :param bool circuit_breaker: When True, a failing node is opened (see :class:`beemapi.node.Node`)
+        and a retry is sent to another node right away instead of waiting (default is False)
+    :param float node_probing_interval: When set, all nodes are probed in a background thread
+        every node_probing_interval seconds, see :func:`start_node_probing`
+    :param float hedge_percentile: When set, a read-only call (see :attr:`hedged_methods`)
+        is sent to a second node, when the first node did not answer within this
+        percentile of its latencies, e.g. 95. The first valid reply is used.
+        Only used for https nodes. (default is None)
+    :param bool ws_multiplexing: When True, the replies of a websocket node are read
+        by a :class:`WebsocketReader`, so that calls from several threads share one
+        connection (default is False)
+    :param response_cache: When True or a :class:`beemapi.responsecache.ResponseCache`,
+        results of immutable and slowly changing calls are cached. The cache is bound
+        to the chain of the connected node. A call can skip the cache with
+        ``use_cache=False``. (default is None)
+    :param rpc_stats: When True or a :class:`beemapi.rpcstats.RPCStats`, latency, size,
+        retries and failovers of all calls are counted per node and method (default is None)
+    :param recorder: When True or a :class:`beemapi.fakenode.FixtureRecorder`, the queries and
+        valid replies of all calls are recorded, so that they can be replayed by
+        :class:`beemapi.fakenode.FakeNode` (default is None)
 
     Available APIs:
 
@@ -119,27 +237,65 @@ class GrapheneRPC(object):
 
     """
 
+    #: Read-only api methods, which may be sent to a second node by request hedging
+    hedged_methods = frozenset([
+        "get_block", "get_block_header", "get_ops_in_block", "get_accounts", "find_accounts",
+        "lookup_accounts", "get_account_history", "get_content", "get_content_replies",
+        "get_active_votes", "get_dynamic_global_properties", "get_config", "get_feed_history",
+        "get_current_median_history_price", "get_reward_fund", "get_reward_funds",
+        "get_witness_schedule", "get_hardfork_properties", "get_witness_by_account",
+        "find_witnesses", "get_discussions_by_blog", "get_discussions_by_created",
+        "get_discussions_by_trending", "get_followers", "get_following", "get_vesting_delegations",
+        "get_transaction", "get_key_references", "get_account_references",
+    ])
+    #: Minimum number of measured latencies of a node, before its calls are hedged
+    hedge_min_samples = 10
+
     def __init__(self, urls, user=None, password=None, **kwargs):
         """Init."""
         self.rpc_methods = {'offline': -1, 'ws': 0, 'jsonrpc': 1, 'wsappbase': 2, 'appbase': 3}
         self.current_rpc = self.rpc_methods["ws"]
         self._request_id = 0
+        self._request_id_lock = threading.Lock()
         self.timeout = kwargs.get('timeout', 60)
         num_retries = kwargs.get("num_retries", -1)
         num_retries_call = kwargs.get("num_retries_call", 5)
         self.use_condenser = kwargs.get("use_condenser", False)
-        self.nodes = Nodes(urls, num_retries, num_retries_call)
+        self.nodes = Nodes(urls, num_retries, num_retries_call, scoring=kwargs.get("node_scoring", False),
+                           circuit_breaker=kwargs.get("circuit_breaker", False))
         if self.nodes.working_nodes_count == 0:
             self.current_rpc = self.rpc_methods["offline"]
 
         self.user = user
         self.password = password
         self.ws = None
+        self.ws_multiplexing = kwargs.get("ws_multiplexing", False)
+        self._ws_reader = None
+        self._connect_lock = threading.RLock()
         self.url = None
         self.session = None
         self.rpc_queue = []
+        self._probe_rpcs = {}
+        self.hedge_percentile = kwargs.get("hedge_percentile", None)
+        self.hedging_stats = {"calls": 0, "hedged": 0, "backup_won": 0, "abandoned": 0}
+        self.response_cache = kwargs.get("response_cache", None)
+        if self.response_cache is True:
+            from .responsecache import ResponseCache
+            self.response_cache = ResponseCache()
+        self.rpc_stats = kwargs.get("rpc_stats", None)
+        if self.rpc_stats is True:
+            from .rpcstats import RPCStats
+            self.rpc_stats = RPCStats()
+        self.recorder = kwargs.get("recorder", None)
+        if self.recorder is True:
+            from .fakenode import FixtureRecorder
+            self.recorder = FixtureRecorder()
+        self._hedge_pool = None
+        self._hedge_lock = threading.Lock()
         if kwargs.get("autoconnect", True):
             self.rpcconnect()
+        if kwargs.get("node_probing_interval"):
+            self.start_node_probing(interval=kwargs["node_probing_interval"])
 
     @property
     def num_retries(self):
@@ -159,16 +315,13 @@ class GrapheneRPC(object):
 
     def get_request_id(self):
         """Get request id."""
-        self._request_id += 1
-        return self._request_id
+        with self._request_id_lock:
+            self._request_id += 1
+            return self._request_id
 
     def next(self):
         """Switches to the next node url"""
-        if self.ws:
-            try:
-                self.ws.close()
-            except Exception as e:
-                log.warning(str(e))
+        self._ws_close()
         self.rpcconnect()
 
     def is_appbase_ready(self):
@@ -183,10 +336,23 @@ class GrapheneRPC(object):
         """Connect to next url in a loop."""
         if self.nodes.working_nodes_count == 0:
             return
+        with self._connect_lock:
+            self._rpcconnect(next_url=next_url)
+
+    def _rpcconnect(self, next_url=True):
         while True:
             if next_url:
+                if self._ws_reader is not None:
+                    self._ws_close()
                 self.url = next(self.nodes)
                 self.nodes.reset_error_cnt_call()
+                wait = 0
+                if self.nodes.circuit_breaker and self.nodes.working_nodes_count > 1:
+                    wait = self.nodes.node.open_remaining()
+                if wait > 0:
+                    # the circuit breakers of all nodes are open
+                    log.warning("Waiting %.1f seconds for node %s" % (wait, self.url))
+                    time.sleep(wait)
                 log.debug("Trying to connect to node %s" % self.url)
                 if self.url[:3] == "wss":
                     self.ws = create_ws_instance(use_ssl=True)
@@ -202,18 +368,18 @@ class GrapheneRPC(object):
                                     'content-type': 'application/json'}
             try:
                 if self.ws:
-                    self.ws.connect(self.url)
+                    self._ws_connect()
                     self.rpclogin(self.user, self.password)
                 try:
                     props = None
                     if not self.use_condenser:
-                        props = self.get_config(api="database")
+                        props = self.get_config(api="database", use_cache=False)
                     else:
-                        props = self.get_config()
+                        props = self.get_config(use_cache=False)
                 except Exception as e:
                     if re.search("Bad Cast:Invalid cast from type", str(e)):
                         self.current_rpc += 2
-                        props = self.get_config(api="database")
+                        props = self.get_config(api="database", use_cache=False)
                 if props is None:
                     raise RPCError("Could not recieve answer for get_config")
                 if is_network_appbase_ready(props):
@@ -229,6 +395,10 @@ class GrapheneRPC(object):
                 do_sleep = not next_url or (next_url and self.nodes.working_nodes_count == 1)
                 self.nodes.sleep_and_check_retries(str(e), sleep=do_sleep)
                 next_url = True
+        if self.response_cache is not None:
+            chain_id = props.get("STEEM_CHAIN_ID", props.get("STEEMIT_CHAIN_ID"))
+            if chain_id is not None:
+                self.response_cache.bind(chain_id)
 
     def rpclogin(self, user, password):
         """Login into Websocket"""
@@ -237,8 +407,77 @@ class GrapheneRPC(object):
 
     def rpcclose(self):
         """Close Websocket"""
-        if self.ws:
-            self.ws.close()
+        self.stop_node_probing()
+        self._ws_close()
+
+    def _ws_connect(self):
+        """Connects the websocket and starts the reader of its replies"""
+        if self._ws_reader is not None:
+            reader = self._ws_reader
+            self._ws_reader = None
+            reader.close()
+            if reader.ws is self.ws:
+                # a reader belongs to a single connection
+                self.ws = create_ws_instance(use_ssl=self.url[:3] == "wss")
+        self.ws.connect(self.url)
+        if self.ws_multiplexing and FUTURES_MODULE:
+            self._ws_reader = WebsocketReader(self.ws, timeout=self.timeout)
+
+    def _ws_close(self):
+        """Closes the websocket, calls which wait for a reply fail"""
+        if self._ws_reader is not None:
+            self._ws_reader.close()
+            self._ws_reader = None
+        elif self.ws:
+            try:
+                self.ws.close()
+            except Exception as e:
+                log.warning(str(e))
+
+    def start_node_probing(self, interval=30, timeout=5):
+        """ Probes all nodes in a background thread by requesting the dynamic global
+            properties. Latency, success rate and head block lag are added to the
+            node statistics, so that a degraded node is left and the fastest healthy
+            node is chosen.
+
+            :param float interval: time in seconds between two probing rounds (default is 30)
+            :param float timeout: timeout of a single probe in seconds (default is 5)
+        """
+        def probe(url):
+            rpc = self._probe_rpcs.get(url)
+            if rpc is None:
+                rpc = GrapheneRPC(url, self.user, self.password, num_retries=0, num_retries_call=0,
+                                  timeout=timeout, use_condenser=self.use_condenser,
+                                  node_scoring=False, autoconnect=False)
+                self._probe_rpcs[url] = rpc
+            try:
+                props = rpc.get_dynamic_global_properties(api="database")
+            except Exception:
+                self._probe_rpcs.pop(url, None)
+                raise
+            return props["head_block_number"]
+        self.nodes.start_probing(probe, interval=interval)
+
+    def stop_node_probing(self):
+        """ Stops the node probing thread"""
+        self.nodes.stop_probing()
+
+    def create_pool(self, max_concurrency=4, weights=None, **kwargs):
+        """ Returns a :class:`beemapi.nodepool.NodePool` with the nodes and the
+            settings of this rpc, which spreads concurrent calls over all nodes
+
+            :param int max_concurrency: maximum number of parallel calls per node (default is 4)
+            :param dict weights: capacity of a node relative to the other nodes,
+                given as ``{url: weight}`` (default is 1 for every node)
+        """
+        from .nodepool import NodePool
+        kwargs.setdefault("user", self.user)
+        kwargs.setdefault("password", self.password)
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("use_condenser", self.use_condenser)
+        urls = [self.nodes[i].url for i in range(len(self.nodes))]
+        return NodePool(urls, rpc_class=self.__class__, max_concurrency=max_concurrency,
+                        weights=weights, **kwargs)
 
     def request_send(self, payload):
         response = self.session.post(self.url,
@@ -248,9 +487,12 @@ class GrapheneRPC(object):
                                      auth=(self.user, self.password))
         if response.status_code == 401:
             raise UnauthorizedError
-        return response.text
+        return response.content
 
-    def ws_send(self, payload):
+    def ws_send(self, payload, request_id=None):
+        reader = self._ws_reader
+        if reader is not None and request_id is not None:
+            return reader.send(payload, request_id)
         self.ws.send(payload)
         reply = self.ws.recv()
         return reply
@@ -285,6 +527,8 @@ class GrapheneRPC(object):
 
     def _check_for_server_error(self, reply):
         """Checks for server error message in reply"""
+        if isinstance(reply, bytes):
+            reply = reply.decode('utf8', 'replace')
         if re.search("Internal Server Error", reply) or re.search("500", reply):
             raise RPCErrorDoRetry("Internal Server Error")
         elif re.search("Not Implemented", reply) or re.search("501", reply):
@@ -320,33 +564,179 @@ class GrapheneRPC(object):
         :raises ValueError: if the server does not respond in proper JSON format
         :raises RPCError: if the server returns an error
         """
-        log.debug(json.dumps(payload))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(jsoncodec.dumps(payload))
+        if self.hedge_percentile is not None and self._is_hedged(payload):
+            reply = self._rpcexec_hedged(payload)
+        else:
+            reply = self._rpcexec_raw(payload)
+        if self.recorder is not None:
+            self.recorder.record(payload, reply)
+        if self.rpc_stats is None:
+            return self._process_reply(reply)
+        start = time.time()
+        try:
+            return self._process_reply(reply)
+        finally:
+            self.rpc_stats.record_decode(self.url, payload, time.time() - start)
+
+    def _is_hedged(self, payload):
+        """Returns True, when the payload is a single read-only call"""
+        if not isinstance(payload, dict) or self.current_rpc not in [1, 3]:
+            return False
+        method = payload.get("method", "")
+        if method == "call":
+            method = payload["params"][1]
+        else:
+            method = method.split(".")[-1]
+        return method in self.hedged_methods and "broadcast" not in method
+
+    def _get_hedge_pool(self):
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=8)
+        return self._hedge_pool
+
+    def _count_hedging(self, name):
+        """Increases a counter of :attr:`hedging_stats`, which is shared by all calling threads"""
+        with self._hedge_lock:
+            self.hedging_stats[name] += 1
+
+    def _hedge_send(self, url, data, payload=None):
+        """Sends data to url and adds the result to the statistics of the node"""
+        node = self.nodes.get_node(url)
+        start = time.time()
+        try:
+            response = self.session.post(url, data=data, headers=self.headers,
+                                         timeout=self.timeout, auth=(self.user, self.password))
+            if response.status_code == 401:
+                raise UnauthorizedError
+            reply = response.content
+        except Exception:
+            if node is not None:
+                node.record_failure()
+            if self.rpc_stats is not None and payload is not None:
+                self.rpc_stats.record_request(url, payload, time.time() - start, len(data), error=True)
+            raise
+        if self.rpc_stats is not None and payload is not None:
+            self.rpc_stats.record_request(url, payload, time.time() - start, len(data),
+                                          len(reply) if reply else 0, error=not bool(reply))
+        if node is not None:
+            if reply:
+                node.record_success(time.time() - start)
+            else:
+                node.record_failure()
+        return reply
+
+    @staticmethod
+    def _is_valid_reply(future):
+        if future.exception() is not None:
+            return False
+        reply = future.result()
+        return bool(reply) and reply.lstrip()[:1] in [b"{", b"[", "{", "["]
+
+    def _rpcexec_hedged(self, payload):
+        """ Sends a read-only call to the current node and, when the reply is
+            slower than ``hedge_percentile`` of the node latencies, to a second
+            node. The first valid reply is returned, the slower request is
+            abandoned. When no reply is valid, the call is repeated with the
+            normal retry handling.
+        """
+        if self.url is None:
+            self.rpcconnect()
+        node = self.nodes.get_node(self.url)
+        backup_url = None
+        for url, cost in self.nodes.get_ranking():
+            if url != self.url and url[:4] == "http":
+                backup_url = url
+                break
+        if node is None or backup_url is None or not FUTURES_MODULE or node.samples < self.hedge_min_samples:
+            return self._rpcexec_raw(payload)
+        delay = node.latency_percentile(self.hedge_percentile)
+        data = jsoncodec.dumps(payload)
+        pool = self._get_hedge_pool()
+        self._count_hedging("calls")
+        primary = pool.submit(self._hedge_send, self.url, data, payload)
+        done, pending = wait([primary], timeout=delay)
+        if primary in done and self._is_valid_reply(primary):
+            return primary.result()
+        self._count_hedging("hedged")
+        log.debug("Hedging call to %s on %s" % (self.url, backup_url))
+        backup = pool.submit(self._hedge_send, backup_url, data, payload)
+        pending = set([primary, backup]) - done
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in [primary, backup]:
+                if future in done and self._is_valid_reply(future):
+                    for other in pending:
+                        if not other.cancel():
+                            self._count_hedging("abandoned")
+                    if future is backup:
+                        self._count_hedging("backup_won")
+                    return future.result()
+        return self._rpcexec_raw(payload)
+
+    def _rpcexec_raw(self, payload):
+        """Sends the payload and returns the raw reply. Connection errors
+        and empty replies are handled by retrying and switching the node.
+        """
         if self.nodes.working_nodes_count == 0:
             raise WorkingNodeMissing
         if self.url is None:
             self.rpcconnect()
+        elif self.nodes.better_node_available():
+            log.info("Leaving node %s, as a faster node is available" % self.url)
+            self.next()
         reply = {}
+        if isinstance(payload, list):
+            request_id = payload[0]["id"] if payload else None
+        else:
+            request_id = payload.get("id")
+        data = jsoncodec.dumps(payload)
+        url = None
         while True:
+            if url is not None and self.rpc_stats is not None:
+                self.rpc_stats.record_retry(url, failover=self.url != url)
+            url = self.url
             self.nodes.increase_error_cnt_call()
+            reader = self._ws_reader
             try:
-                if self.current_rpc == 0 or self.current_rpc == 2:
-                    reply = self.ws_send(json.dumps(payload, ensure_ascii=False).encode('utf8'))
-                else:
-                    reply = self.request_send(json.dumps(payload, ensure_ascii=False).encode('utf8'))
+                start = time.time()
+                try:
+                    if self.current_rpc == 0 or self.current_rpc == 2:
+                        reply = self.ws_send(data, request_id=request_id)
+                    else:
+                        reply = self.request_send(data)
+                except Exception:
+                    if self.rpc_stats is not None:
+                        self.rpc_stats.record_request(url, payload, time.time() - start, len(data), error=True)
+                    raise
+                if self.rpc_stats is not None:
+                    self.rpc_stats.record_request(url, payload, time.time() - start, len(data),
+                                                  len(reply) if reply else 0, error=not bool(reply))
                 if not bool(reply):
                     try:
+                        if self.nodes.other_node_available():
+                            # the next node is used right away
+                            raise CallRetriesReached()
                         self.nodes.sleep_and_check_retries("Empty Reply", call_retry=True)
+                        self.nodes.record_failure()
                     except CallRetriesReached:
+                        # records the failure of the node
                         self.nodes.increase_error_cnt()
                         self.nodes.sleep_and_check_retries("Empty Reply", sleep=False, call_retry=False)
                         self.rpcconnect()
                 else:
+                    self.nodes.record_success(time.time() - start)
                     break
             except KeyboardInterrupt:
                 raise
             except WebSocketConnectionClosedException:
                 # self.error_cnt[self.url] += 1
-                self.rpcconnect(next_url=False)
+                with self._connect_lock:
+                    # the connection may have been renewed by another thread
+                    if reader is None or reader is self._ws_reader:
+                        self.rpcconnect(next_url=False)
             except ConnectionError as e:
                 self.nodes.increase_error_cnt()
                 self.nodes.sleep_and_check_retries(str(e), sleep=False, call_retry=False)
@@ -355,29 +745,140 @@ class GrapheneRPC(object):
                 self.nodes.increase_error_cnt()
                 self.nodes.sleep_and_check_retries(str(e), sleep=False, call_retry=False)
                 self.rpcconnect()
+        return reply
+
+    def rpcexec_batch(self, queries, max_batch_size=50):
+        """
+        Execute many queries as JSON-RPC batch calls.
+
+        The queries are split into batches of ``max_batch_size``. Replies are
+        assigned to their query by the request id, so that nodes may answer in any
+        order. Queries which failed or got no reply are sent again, up to
+        ``num_retries_call`` times.
+
+        :param list queries: list of single queries, as build by :func:`beemapi.rpcutils.get_query`
+        :param int max_batch_size: maximum number of queries in a single call (default is 50)
+        :returns: list with the results, in the order of ``queries``
+        :raises RPCError: if a query still failed after all retries
+        """
+        results = [None] * len(queries)
+        pending = list(range(len(queries)))
+        retries = 0
+        while True:
+            failed = []
+            error_msg = None
+            for i in range(0, len(pending), max_batch_size):
+                payload = []
+                id_map = {}
+                for index in pending[i:i + max_batch_size]:
+                    query = dict(queries[index])
+                    query["id"] = self.get_request_id()
+                    id_map[query["id"]] = index
+                    payload.append(query)
+                try:
+                    replies = self._rpcexec_batch_reply(payload)
+                except RPCErrorDoRetry as e:
+                    error_msg = str(e)
+                    replies = []
+                for r in replies:
+                    if not isinstance(r, dict) or r.get("id") not in id_map:
+                        continue
+                    index = id_map.pop(r["id"])
+                    if "error" in r:
+                        error_msg = self._get_error_message(r["error"])
+                        self._check_batch_error(error_msg)
+                        failed.append(index)
+                    elif "result" in r:
+                        results[index] = r["result"]
+                    else:
+                        failed.append(index)
+                failed.extend(id_map.values())
+            if not failed:
+                return results
+            if error_msg is None:
+                error_msg = "Missing reply in batch call"
+            retries += 1
+            if self.num_retries_call >= 0 and retries > self.num_retries_call:
+                raise RPCError(error_msg)
+            log.warning("Retry %d of %d failed batch queries on node %s (%d/%d): %s" % (
+                len(failed), len(queries), self.url, retries, self.num_retries_call, error_msg))
+            self.nodes.record_failure()
+            if self.nodes.other_node_available():
+                self.next()
+            else:
+                time.sleep(get_sleep_time(retries))
+            pending = sorted(failed)
+
+    def _rpcexec_batch_reply(self, payload):
+        """Sends a batch payload and returns the decoded list of replies"""
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(jsoncodec.dumps(payload))
+        reply = self._rpcexec_raw(payload)
+        if self.recorder is not None:
+            self.recorder.record(payload, reply)
+        start = time.time()
+        try:
+            ret = jsoncodec.loads(reply)
+        except ValueError:
+            self._check_for_server_error(reply)
+        if self.rpc_stats is not None:
+            self.rpc_stats.record_decode(self.url, payload, time.time() - start)
+        self.nodes.reset_error_cnt_call()
+        if not isinstance(ret, list):
+            # e.g. a node which does not support batch calls
+            self._process_reply(reply)
+            raise RPCError("Node %s returned no batch reply" % self.url)
+        return ret
+
+    def batch(self, max_batch_size=50):
+        """ Returns a :class:`RPCBatch` which collects api calls and sends them
+            as JSON-RPC batch calls
+
+            :param int max_batch_size: maximum number of queries in a single call (default is 50)
+
+            .. code-block:: python
+
+                with rpc.batch() as batch:
+                    for block_num in range(1, 101):
+                        batch.get_block({"block_num": block_num}, api="block")
+                blocks = batch.results
+
+        """
+        return RPCBatch(self, max_batch_size=max_batch_size)
+
+    def _check_batch_error(self, msg):
+        """Raises the errors of failed batch queries for which a retry is pointless"""
+        pass
+
+    @staticmethod
+    def _get_error_message(error):
+        if 'detail' in error:
+            return error['detail']
+        return error['message']
+
+    def _process_reply(self, reply):
+        """Decodes a raw reply and returns its result
 
+        :param str reply: raw reply from the node
+        :raises RPCError: if the server returns an error
+        """
         ret = {}
         try:
-            ret = json.loads(reply, strict=False)
+            ret = jsoncodec.loads(reply)
         except ValueError:
             self._check_for_server_error(reply)
 
-        log.debug(json.dumps(reply))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(reply)
 
         if isinstance(ret, dict) and 'error' in ret:
-            if 'detail' in ret['error']:
-                raise RPCError(ret['error']['detail'])
-            else:
-                raise RPCError(ret['error']['message'])
+            raise RPCError(self._get_error_message(ret['error']))
         else:
             if isinstance(ret, list):
                 ret_list = []
                 for r in ret:
                     if isinstance(r, dict) and 'error' in r:
-                        if 'detail' in r['error']:
-                            raise RPCError(r['error']['detail'])
-                        else:
-                            raise RPCError(r['error']['message'])
+                        raise RPCError(self._get_error_message(r['error']))
                     elif isinstance(r, dict) and "result" in r:
                         ret_list.append(r["result"])
                     else:
@@ -394,21 +895,24 @@ class GrapheneRPC(object):
                 return ret
         return ret
 
+    def _build_query(self, name, *args, **kwargs):
+        """Returns the query for the api method ``name``"""
+        api_name = get_api_name(self.is_appbase_ready(), *args, **kwargs)
+        if self.is_appbase_ready() and self.use_condenser:
+            api_name = "condenser_api"
+        return get_query(self.is_appbase_ready() and not self.use_condenser, self.get_request_id(), api_name, name, args)
+
     # End of Deprecated methods
     ####################################################################
     def __getattr__(self, name):
         """Map all methods to RPC calls and pass through the arguments."""
         def method(*args, **kwargs):
 
-            api_name = get_api_name(self.is_appbase_ready(), *args, **kwargs)
-            if self.is_appbase_ready() and self.use_condenser:
-                api_name = "condenser_api"
-
             # let's be able to define the num_retries per query
             stored_num_retries_call = self.nodes.num_retries_call
             self.nodes.num_retries_call = kwargs.get("num_retries_call", stored_num_retries_call)
             add_to_queue = kwargs.get("add_to_queue", False)
-            query = get_query(self.is_appbase_ready() and not self.use_condenser, self.get_request_id(), api_name, name, args)
+            query = self._build_query(name, *args, **kwargs)
             if add_to_queue:
                 self.rpc_queue.append(query)
                 self.nodes.num_retries_call = stored_num_retries_call
@@ -417,7 +921,89 @@ class GrapheneRPC(object):
                 self.rpc_queue.append(query)
                 query = self.rpc_queue
                 self.rpc_queue = []
-            r = self.rpcexec(query)
+            if self.response_cache is not None and kwargs.get("use_cache", True):
+                r = self.response_cache.call(query, self.rpcexec)
+            else:
+                r = self.rpcexec(query)
             self.nodes.num_retries_call = stored_num_retries_call
+            self._process_result(name, r)
             return r
         return method
+
+    def _process_result(self, name, result):
+        """Updates the node statistics and the response cache from the
+        result of the api method ``name``
+        """
+        if name == "get_dynamic_global_properties" and isinstance(result, dict):
+            self.nodes.record_head_block(result.get("head_block_number"))
+            if self.response_cache is not None:
+                self.response_cache.set_last_irreversible_block_num(result.get("last_irreversible_block_num"))
+
+
+class RPCBatch(object):
+    """ Collects api calls and executes them as JSON-RPC batch calls
+
+        :param GrapheneRPC rpc: rpc instance which executes the calls
+        :param int max_batch_size: maximum number of queries in a single call (default is 50)
+
+        Api methods are mapped in the same way as for :class:`GrapheneRPC`, but
+        instead of being sent, a call is stored and its position is returned.
+        :func:`execute` (or leaving the ``with`` block) sends all stored calls,
+        the results are found in ``results`` in the order of the calls.
+        A call whose arguments expand into several queries (a list of dicts
+        on appbase) has a list of results.
+
+        .. code-block:: python
+
+            batch = rpc.batch(max_batch_size=100)
+            batch.get_dynamic_global_properties(api="database")
+            batch.get_block({"block_num": 1}, api="block")
+            props, block = batch.execute()
+
+    """
+    def __init__(self, rpc, max_batch_size=50):
+        self.rpc = rpc
+        self.max_batch_size = max_batch_size
+        self.queries = []
+        self.calls = []
+        self.results = None
+
+    def __len__(self):
+        return len(self.calls)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+
+    def execute(self):
+        """ Sends all stored calls and returns their results"""
+        query_results = self.rpc.rpcexec_batch(self.queries, max_batch_size=self.max_batch_size)
+        self.results = []
+        for name, start, count, is_list in self.calls:
+            if is_list:
+                self.results.append(query_results[start:start + count])
+            else:
+                self.results.append(query_results[start])
+                self.rpc._process_result(name, query_results[start])
+        self.queries = []
+        self.calls = []
+        return self.results
+
+    def __getattr__(self, name):
+        """Stores api calls and returns their position in the batch"""
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            query = self.rpc._build_query(name, *args, **kwargs)
+            if isinstance(query, list):
+                self.calls.append((name, len(self.queries), len(query), True))
+                self.queries.extend(query)
+            else:
+                self.calls.append((name, len(self.queries), 1, False))
+                self.queries.append(query)
+            return len(self.calls) - 1
+        return method
@@ -0,0 +1,122 @@
+"""JSON encoding and decoding of rpc calls."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+ORJSON_MODULE = None
+if not ORJSON_MODULE:
+    try:
+        import orjson
+        ORJSON_MODULE = "orjson"
+    except ImportError:
+        ORJSON_MODULE = None
+UJSON_MODULE = None
+if not UJSON_MODULE:
+    try:
+        import ujson
+        UJSON_MODULE = "ujson"
+    except ImportError:
+        UJSON_MODULE = None
+
+
+def _json_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False).encode('utf8')
+
+
+def _json_loads(data):
+    if isinstance(data, bytes):
+        data = data.decode('utf8')
+    # strict=False allows control characters inside of strings
+    return json.loads(data, strict=False)
+
+
+def _orjson_dumps(obj):
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        # e.g. integers with more than 64 bit
+        return _json_dumps(obj)
+
+
+def _orjson_loads(data):
+    try:
+        return orjson.loads(data)
+    except ValueError:
+        return _json_loads(data)
+
+
+def _ujson_dumps(obj):
+    try:
+        return ujson.dumps(obj, ensure_ascii=False).encode('utf8')
+    except (TypeError, OverflowError):
+        return _json_dumps(obj)
+
+
+def _ujson_loads(data):
+    try:
+        return ujson.loads(data)
+    except ValueError:
+        return _json_loads(data)
+
+
+class JSONCodec(object):
+    """ Encodes and decodes the payloads of rpc calls
+
+        :param str name: ``orjson``, ``ujson`` or ``json``. The fastest installed
+            module is used, when not set.
+
+        Payloads which cannot be handled by orjson or ujson, e.g. integers with
+        more than 64 bit or strings with control characters, are passed to the
+        json module of the standard library.
+
+        .. code-block:: python
+
+            from beemapi.jsoncodec import JSONCodec, set_json_codec
+            set_json_codec(JSONCodec("json"))
+
+    """
+    def __init__(self, name=None):
+        if name is None:
+            name = ORJSON_MODULE or UJSON_MODULE or "json"
+        if name == "orjson" and ORJSON_MODULE:
+            self.dumps, self.loads = _orjson_dumps, _orjson_loads
+        elif name == "ujson" and UJSON_MODULE:
+            self.dumps, self.loads = _ujson_dumps, _ujson_loads
+        elif name == "json":
+            self.dumps, self.loads = _json_dumps, _json_loads
+        else:
+            raise ValueError("JSON module %s is not installed" % name)
+        self.name = name
+
+    def __repr__(self):
+        return "<%s %s>" % (self.__class__.__name__, self.name)
+
+
+_codec = JSONCodec()
+
+
+def set_json_codec(codec):
+    """ Sets the codec, which is used for all rpc calls
+
+        :param codec: :class:`JSONCodec` or the name of a JSON module
+    """
+    global _codec
+    if not isinstance(codec, JSONCodec):
+        codec = JSONCodec(codec)
+    _codec = codec
+
+
+def get_json_codec():
+    """ Returns the codec, which is used for all rpc calls"""
+    return _codec
+
+
+def dumps(obj):
+    """ Returns obj as utf8 encoded JSON"""
+    return _codec.dumps(obj)
+
+
+def loads(data):
+    """ Decodes JSON given as str or as utf8 encoded bytes"""
+    return _codec.loads(data)
@@ -7,29 +7,170 @@ from builtins import str
 import json
 import re
 import time
+import threading
 import logging
+from collections import deque
 from .exceptions import (
     UnauthorizedError, RPCConnection, RPCError, NumRetriesReached, CallRetriesReached
 )
 log = logging.getLogger(__name__)
 
 
+def get_sleep_time(cnt):
+    """Returns the waiting time in seconds before retry number ``cnt``"""
+    if cnt < 1:
+        return 0
+    elif cnt < 10:
+        return (cnt - 1) * 1.5 + 0.5
+    else:
+        return 10
+
+
 class Node(object):
+    """ Stores the url and the health statistics of a node
+
+        :param str url: Url of the node
+        :param float ewma_alpha: Weight of a new measurement in the moving
+            averages of latency and success rate (default is 0.3)
+
+        Every node has a circuit breaker. It is ``closed`` while calls succeed and
+        is ``open`` after ``breaker_threshold`` failures in a row. An open node
+        is not used for ``breaker_base_time * 2 ** (n - 1)`` seconds (at most
+        ``breaker_max_time``), where n counts the openings since the last success.
+        Afterwards it is ``half-open``: the next call decides whether it is
+        closed or opened again.
+    """
+    #: Number of failures in a row, which open the circuit breaker
+    breaker_threshold = 3
+    #: Time in seconds for which the breaker stays open after its first opening
+    breaker_base_time = 1.
+    #: Maximum time in seconds for which the breaker stays open
+    breaker_max_time = 60.
+
     def __init__(
         self,
-        url
+        url,
+        ewma_alpha=0.3
     ):
         self.url = url
         self.error_cnt = 0
         self.error_cnt_call = 0
+        self.ewma_alpha = ewma_alpha
+        self.latency = None
+        self.success_rate = 1.
+        self.samples = 0
+        self.head_block_num = None
+        self.head_block_time = None
+        self.latencies = deque(maxlen=100)
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self.open_until = None
+        self._lock = threading.Lock()
 
     def __repr__(self):
         return self.url
 
+    def record_success(self, latency):
+        """ Adds a successful call with the given latency in seconds to the statistics"""
+        with self._lock:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += self.ewma_alpha * (latency - self.latency)
+            self.success_rate += self.ewma_alpha * (1. - self.success_rate)
+            self.samples += 1
+            self.latencies.append(latency)
+            self.consecutive_failures = 0
+            self.open_count = 0
+            self.open_until = None
+
+    def latency_percentile(self, percentile):
+        """ Returns the percentile of the last 100 latencies or None, when no latency is known
+
+            :param float percentile: percentile between 0 and 100
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return None
+        index = int(round(percentile / 100. * (len(latencies) - 1)))
+        return latencies[min(max(index, 0), len(latencies) - 1)]
+
+    def record_failure(self):
+        """ Adds a failed call to the statistics"""
+        with self._lock:
+            self.success_rate -= self.ewma_alpha * self.success_rate
+            self.samples += 1
+            self.consecutive_failures += 1
+            half_open = self.open_until is not None and time.time() >= self.open_until
+            if half_open or (self.open_until is None and self.consecutive_failures >= self.breaker_threshold):
+                self.open_count += 1
+                open_time = min(self.breaker_base_time * 2 ** (self.open_count - 1), self.breaker_max_time)
+                self.open_until = time.time() + open_time
+
+    @property
+    def state(self):
+        """ State of the circuit breaker: ``closed``, ``open`` or ``half-open``"""
+        if self.open_until is None:
+            return "closed"
+        elif time.time() < self.open_until:
+            return "open"
+        return "half-open"
+
+    def open_remaining(self, now=None):
+        """ Returns the time in seconds, until the circuit breaker lets calls pass"""
+        open_until = self.open_until
+        if open_until is None:
+            return 0
+        if now is None:
+            now = time.time()
+        return max(0, open_until - now)
+
+    def is_available(self, now=None):
+        """ Returns True, when the circuit breaker is closed or half-open"""
+        return self.open_remaining(now) == 0
+
+    def record_head_block(self, head_block_num):
+        """ Stores the head block number reported by the node"""
+        with self._lock:
+            self.head_block_num = int(head_block_num)
+            self.head_block_time = time.time()
+
+    def estimated_head_block_num(self, block_interval=3, now=None):
+        """ Returns the head block number, which the node should have now, or None"""
+        if self.head_block_num is None:
+            return None
+        if now is None:
+            now = time.time()
+        return self.head_block_num + (now - self.head_block_time) / block_interval
+
 
 class Nodes(list):
-    """Stores Node URLs and error counts"""
-    def __init__(self, urls, num_retries, num_retries_call):
+    """Stores Node URLs, error counts and health statistics
+
+        :param str/list urls: Either a single Websocket/Http URL, or a list of URLs
+        :param int num_retries: Try x times to num_retries to a node on disconnect, -1 for indefinitely
+        :param int num_retries_call: Repeat num_retries_call times a rpc call on node error
+        :param bool scoring: When True, :func:`next` switches to the node with the lowest
+            :func:`node_cost` instead of the following node (default is False)
+        :param bool circuit_breaker: When True, nodes whose circuit breaker is open are only
+            chosen by :func:`next`, when no other node is available (default is False)
+
+        Nodes without statistics cost nothing, so that they are tried first and
+        all nodes are used in turn as long as no statistics are known.
+    """
+    #: Block interval in seconds, used to estimate the head block lag
+    block_interval = 3
+    #: Latency in seconds of a node, which never answered successfully
+    default_latency = 1.
+    #: Minimum number of calls, before the statistics of a node are trusted
+    min_samples = 3
+    #: A node is left, when its costs are switch_ratio times higher than the costs of another node
+    switch_ratio = 2.
+    #: Minimum time in seconds between two switches due to costs
+    switch_interval = 60
+
+    def __init__(self, urls, num_retries, num_retries_call, scoring=False, circuit_breaker=False):
         if isinstance(urls, str):
             url_list = re.split(r",|;", urls)
             if url_list is None:
@@ -46,11 +187,22 @@ class Nodes(list):
         self.num_retries = num_retries
         self.num_retries_call = num_retries_call
         self.current_node_index = -1
+        self.scoring = scoring
+        self.circuit_breaker = circuit_breaker
+        self.last_switch_time = 0
+        self._probing_thread = None
+        self._probing_stop = None
 
     def __iter__(self):
         return self
 
     def __next__(self):
+        if self.scoring or self.circuit_breaker:
+            index = self._best_node_index()
+            if index is not None:
+                self.current_node_index = index
+                self.last_switch_time = time.time()
+                return self.url
         next_node_count = 0
         while next_node_count == 0 and (self.num_retries < 0 or self.node.error_cnt < self.num_retries):
             self.current_node_index += 1
@@ -70,6 +222,175 @@ class Nodes(list):
                 nodes_list.append(self[i].url)
         return str(nodes_list)
 
+    def _is_working(self, node):
+        return self.num_retries < 0 or node.error_cnt <= self.num_retries
+
+    def _best_node_index(self, known_only=False):
+        """ Returns the index of the working node with the lowest costs, the current
+            node is only returned when no other node is working. Ties are resolved
+            in the order following the current node.
+        """
+        now = time.time()
+        best_head = self._best_head_block_num(now)
+        best_index = None
+        best_key = None
+        n = len(self)
+        for i in range(n):
+            index = (self.current_node_index + 1 + i) % n
+            node = self[index]
+            if index == self.current_node_index or not self._is_working(node):
+                continue
+            if known_only and node.samples < self.min_samples:
+                continue
+            if self.circuit_breaker and not node.is_available(now):
+                # open nodes are sorted by the time until they are half-open
+                key = (1, node.open_remaining(now))
+            else:
+                key = (0, self.node_cost(node, best_head=best_head, now=now) if self.scoring else 0)
+            if best_key is None or key < best_key:
+                best_index = index
+                best_key = key
+        if known_only or not (0 <= self.current_node_index < n) or not self._is_working(self.node):
+            return best_index
+        if best_index is None or (best_key[0] == 1 and (not self.circuit_breaker or self.node.is_available(now))):
+            best_index = self.current_node_index
+        return best_index
+
+    def other_node_available(self):
+        """ Returns True, when the circuit breaker is used and another working node,
+            whose circuit breaker is not open, exists. A failed call can then be
+            sent to that node instead of waiting.
+        """
+        if not self.circuit_breaker:
+            return False
+        now = time.time()
+        for i in range(len(self)):
+            if i != self.current_node_index and self._is_working(self[i]) and self[i].is_available(now):
+                if self.current_node_index >= 0 or i != 0:
+                    return True
+        return False
+
+    def _best_head_block_num(self, now=None):
+        head_blocks = [node.estimated_head_block_num(self.block_interval, now) for node in self[:]]
+        head_blocks = [h for h in head_blocks if h is not None]
+        if not head_blocks:
+            return None
+        return max(head_blocks)
+
+    def node_cost(self, node, best_head=None, now=None):
+        """ Returns the expected costs in seconds of a call to the node, lower is better.
+
+            The costs are the latency divided by the success rate plus the time
+            for which the node lags behind the most advanced node. A lag of a
+            single block is tolerated.
+
+            :param Node node: node
+        """
+        if node.samples == 0:
+            cost = 0.
+        else:
+            latency = node.latency if node.latency is not None else self.default_latency
+            cost = latency / max(node.success_rate, 0.05)
+        if best_head is None:
+            best_head = self._best_head_block_num(now)
+        head = node.estimated_head_block_num(self.block_interval, now)
+        if best_head is not None and head is not None:
+            cost += max(0., best_head - head - 1) * self.block_interval
+        return cost
+
+    def get_ranking(self):
+        """ Returns a list of ``(url, cost)`` tuples of all working nodes, the best node is first"""
+        best_head = self._best_head_block_num()
+        ranking = [(node.url, self.node_cost(node, best_head=best_head)) for node in self[:] if self._is_working(node)]
+        return sorted(ranking, key=lambda x: x[1])
+
+    def better_node_available(self):
+        """ Returns True, when the circuit breaker of the current node is open and
+            another node is available, or when another node with trusted statistics
+            has much lower costs than the current node, so that the current node
+            should be left before it starts failing.
+        """
+        if self.current_node_index < 0 or len(self) < 2:
+            return False
+        if self.circuit_breaker and not self.node.is_available() and self.other_node_available():
+            return True
+        if not self.scoring or time.time() - self.last_switch_time < self.switch_interval:
+            return False
+        node = self.node
+        if node.samples < self.min_samples:
+            return False
+        index = self._best_node_index(known_only=True)
+        if index is None or index == self.current_node_index:
+            return False
+        best_head = self._best_head_block_num()
+        return self.node_cost(node, best_head=best_head) > self.switch_ratio * self.node_cost(self[index], best_head=best_head)
+
+    def get_node(self, url):
+        """ Returns the node with the given url or None"""
+        for node in self[:]:
+            if node.url == url:
+                return node
+        return None
+
+    def record_success(self, latency):
+        """ Adds a successful call to the statistics of the current node"""
+        if self.node is not None:
+            self.node.record_success(latency)
+
+    def record_failure(self):
+        """ Adds a failed call to the statistics of the current node"""
+        if self.node is not None:
+            self.node.record_failure()
+
+    def record_head_block(self, head_block_num):
+        """ Stores the head block number of the current node"""
+        if self.node is not None and head_block_num is not None:
+            self.node.record_head_block(head_block_num)
+
+    def start_probing(self, probe, interval=30):
+        """ Starts a daemon thread, which probes all nodes every ``interval`` seconds
+
+            :param callable probe: function which receives a node url and returns its head
+                block number. Raised exceptions are counted as failure.
+            :param float interval: time in seconds between two rounds
+        """
+        self.stop_probing()
+        stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                # Nodes is its own iterator, self[:] returns the node list
+                for node in self[:]:
+                    if stop.is_set():
+                        break
+                    self.probe_node(node, probe)
+                stop.wait(interval)
+        self._probing_stop = stop
+        self._probing_thread = threading.Thread(target=run, name="beem-node-probing")
+        self._probing_thread.daemon = True
+        self._probing_thread.start()
+
+    def stop_probing(self):
+        """ Stops the probing thread"""
+        if self._probing_stop is not None:
+            self._probing_stop.set()
+        self._probing_stop = None
+        self._probing_thread = None
+
+    @staticmethod
+    def probe_node(node, probe):
+        """ Probes a single node and adds the result to its statistics"""
+        start = time.time()
+        try:
+            head_block_num = probe(node.url)
+        except Exception as e:
+            log.debug("Probing %s failed: %s" % (node.url, str(e)))
+            node.record_failure()
+            return
+        node.record_success(time.time() - start)
+        if head_block_num is not None:
+            node.record_head_block(head_block_num)
+
     @property
     def working_nodes_count(self):
         n = 0
@@ -110,6 +431,7 @@ class Nodes(list):
         """Increase node error count for current node"""
         if self.node is not None:
             self.node.error_cnt += 1
+            self.node.record_failure()
 
     def increase_error_cnt_call(self):
         """Increase call error count for current node"""
@@ -126,6 +448,12 @@ class Nodes(list):
         if self.node is not None:
             self.node.error_cnt = 0
 
+    def sleep_time(self, call_retry=False):
+        """Returns the waiting time in seconds before the next retry"""
+        if call_retry:
+            return get_sleep_time(self.error_cnt_call)
+        return get_sleep_time(self.error_cnt)
+
     def sleep_and_check_retries(self, errorMsg=None, sleep=True, call_retry=False, showMsg=True):
         """Sleep and check if num_retries is reached"""
         if errorMsg:
@@ -146,12 +474,7 @@ class Nodes(list):
                 log.warning("Lost connection or internal error on node: %s (%d/%d) \n" % (self.url, cnt, self.num_retries))
         if not sleep:
             return
-        if cnt < 1:
-            sleeptime = 0
-        elif cnt < 10:
-            sleeptime = (cnt - 1) * 1.5 + 0.5
-        else:
-            sleeptime = 10
+        sleeptime = self.sleep_time(call_retry=call_retry)
         if sleeptime:
             log.warning("Retrying in %d seconds\n" % sleeptime)
             time.sleep(sleeptime)
@@ -0,0 +1,208 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import str
+import logging
+import threading
+import time
+from .exceptions import RPCError, UnauthorizedError, WorkingNodeMissing
+from .node import Nodes
+FUTURES_MODULE = None
+if not FUTURES_MODULE:
+    try:
+        from concurrent.futures import ThreadPoolExecutor
+        FUTURES_MODULE = "futures"
+    except ImportError:
+        FUTURES_MODULE = None
+
+log = logging.getLogger(__name__)
+
+
+class NodePool(object):
+    """ Spreads concurrent rpc calls over all healthy nodes
+
+        :param list urls: node urls
+        :param class rpc_class: rpc class, which is created for a single node url
+            (default is :class:`beemapi.steemnoderpc.SteemNodeRPC`)
+        :param int max_concurrency: maximum number of parallel calls of a node
+            with weight 1 (default is 4)
+        :param dict weights: capacity of a node relative to the other nodes,
+            given as ``{url: weight}`` (default is 1 for every node). A node
+            has ``max_concurrency * weight`` slots, a weight of 0 disables it.
+        :param int num_retries: number of other nodes, which are tried when
+            a call failed on a node (default is the number of nodes)
+        :param float min_success_rate: nodes with a lower success rate are only used,
+            when no other node has a free slot (default is 0.2)
+        :param BatchController controller: When set, the number of used slots of
+            a node is adapted to its latency and errors by a
+            :class:`beemapi.batchcontroller.BatchController` (default is None)
+
+        All other arguments are passed to ``rpc_class``. Every node has its own
+        rpc instances, one per slot of the node. A call goes to the node with the lowest load, which is the
+        number of running calls divided by its weight and its success rate, ties
+        are decided by the node costs of :class:`beemapi.node.Nodes`. When all
+        nodes are busy, the call waits for a free slot. Failed calls are repeated
+        on another node, except for :class:`beemapi.exceptions.RPCError`, which
+        is an answer of the node.
+
+        .. code-block:: python
+
+            from beemapi.nodepool import NodePool
+            pool = NodePool(["https://api.steemit.com", "https://rpc.buildteam.io"])
+            blocks = pool.map(lambda rpc, n: rpc.get_block(n), range(1, 101))
+
+    """
+    def __init__(self, urls, rpc_class=None, max_concurrency=4, weights=None,
+                 num_retries=None, min_success_rate=0.2, controller=None, **kwargs):
+        if rpc_class is None:
+            from .steemnoderpc import SteemNodeRPC
+            rpc_class = SteemNodeRPC
+        self.nodes = Nodes(urls, -1, -1)
+        if len(self.nodes) == 0:
+            raise WorkingNodeMissing
+        self.rpc_class = rpc_class
+        self.max_concurrency = max_concurrency
+        weights = weights or {}
+        self.weights = {node.url: float(weights.get(node.url, 1.)) for node in self.nodes[:]}
+        self.limits = {}
+        for url, weight in self.weights.items():
+            self.limits[url] = max(1, int(round(max_concurrency * weight))) if weight > 0 else 0
+        if self.max_workers == 0:
+            raise WorkingNodeMissing
+        self.num_retries = len(self.nodes) if num_retries is None else num_retries
+        self.min_success_rate = min_success_rate
+        self.controller = controller
+        kwargs.setdefault("num_retries", 0)
+        kwargs.setdefault("num_retries_call", 2)
+        kwargs["autoconnect"] = False
+        self.rpc_kwargs = kwargs
+        self.in_flight = {node.url: 0 for node in self.nodes[:]}
+        self.calls = {node.url: 0 for node in self.nodes[:]}
+        self._idle_rpcs = {node.url: [] for node in self.nodes[:]}
+        self._condition = threading.Condition()
+        self._executor = None
+
+    @property
+    def max_workers(self):
+        """ Number of calls, which can run at the same time"""
+        return sum(self.limits.values())
+
+    def _select_node(self, exclude):
+        best = None
+        best_key = None
+        best_head = self.nodes._best_head_block_num()
+        for node in self.nodes[:]:
+            if node.url in exclude or self.in_flight[node.url] >= self._get_limit(node.url):
+                continue
+            weight = self.weights[node.url]
+            healthy = node.samples == 0 or node.success_rate >= self.min_success_rate
+            load = (self.in_flight[node.url] + 1) / (weight * max(node.success_rate, 0.05))
+            key = (not healthy, load, self.nodes.node_cost(node, best_head=best_head))
+            if best_key is None or key < best_key:
+                best = node
+                best_key = key
+        return best
+
+    def _get_limit(self, url):
+        limit = self.limits[url]
+        if self.controller is not None and limit > 0:
+            limit = min(limit, self.controller.concurrency(url))
+        return limit
+
+    def acquire(self, exclude=[]):
+        """ Waits for a free slot and returns ``(node, rpc)``
+
+            :param list exclude: urls which should not be used, as long as another node exists
+        """
+        with self._condition:
+            while True:
+                node = self._select_node(exclude)
+                if node is None and exclude and all(url in exclude or limit == 0 for url, limit in self.limits.items()):
+                    node = self._select_node([])
+                if node is not None:
+                    break
+                self._condition.wait()
+            self.in_flight[node.url] += 1
+            self.calls[node.url] += 1
+            idle = self._idle_rpcs[node.url]
+            rpc = idle.pop() if idle else None
+        if rpc is None:
+            rpc = self.rpc_class(node.url, **self.rpc_kwargs)
+        return node, rpc
+
+    def release(self, node, rpc, reuse=True):
+        """ Returns the slot of a node, the rpc is reused when reuse is True"""
+        with self._condition:
+            self.in_flight[node.url] -= 1
+            if reuse:
+                self._idle_rpcs[node.url].append(rpc)
+            self._condition.notify()
+
+    def run(self, func, batch_size=None):
+        """ Calls ``func(rpc)`` with the rpc of the node with the lowest load and returns its result
+
+            :param callable func: function, which receives a rpc instance
+            :param int batch_size: number of items which are requested by func,
+                it is passed to the controller (default is None)
+        """
+        tried = []
+        while True:
+            node, rpc = self.acquire(exclude=tried)
+            start = time.time()
+            try:
+                result = func(rpc)
+            except (KeyboardInterrupt, UnauthorizedError, RPCError):
+                self.release(node, rpc)
+                raise
+            except Exception as e:
+                node.record_failure()
+                if self.controller is not None:
+                    self.controller.record(node.url, batch_size, time.time() - start, error=True)
+                # the rpc counts errors over its lifetime, a new one is created
+                self.release(node, rpc, reuse=False)
+                tried.append(node.url)
+                if len(tried) > self.num_retries:
+                    raise
+                log.warning("Call failed on node %s, retrying on another node: %s" % (node.url, str(e)))
+                continue
+            node.record_success(time.time() - start)
+            if self.controller is not None:
+                self.controller.record(node.url, batch_size, time.time() - start)
+            self.release(node, rpc)
+            return result
+
+    def map(self, func, items):
+        """ Calls ``func(rpc, item)`` for all items in parallel and returns the results in order
+
+            :param callable func: function, which receives a rpc instance and an item
+            :param iterable items: items
+        """
+        if not FUTURES_MODULE:
+            raise Exception("concurrent.futures is required for NodePool.map")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = [self._executor.submit(self.run, lambda rpc, item=item: func(rpc, item)) for item in items]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """ Stops the worker threads of :func:`map`"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def get_stats(self):
+        """ Returns the number of calls and running calls per node"""
+        with self._condition:
+            return {url: {"calls": self.calls[url], "in_flight": self.in_flight[url],
+                          "weight": self.weights[url], "limit": self.limits[url]} for url in self.calls}
+
+    def __getattr__(self, name):
+        """Map all methods to rpc calls on the node with the lowest load"""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            return self.run(lambda rpc: getattr(rpc, name)(*args, **kwargs))
+        return method
@@ -0,0 +1,267 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from collections import OrderedDict
+import json
+import logging
+import sqlite3
+import threading
+import time
+from . import jsoncodec
+from .rpcutils import split_query
+
+log = logging.getLogger(__name__)
+
+
+class CachePolicy(object):
+    """ Decides which rpc calls are cached and for how long
+
+        :param dict ttls: lifetime in seconds per api method, e.g.
+            ``{"get_accounts": 3}``. The method can be given with its api, e.g.
+            ``"condenser_api.get_accounts"``. None means that the result never
+            expires, 0 disables the cache for a method. The values extend and
+            overwrite :attr:`default_ttls`.
+        :param bool immutable_below_lib: When True, the results of
+            :attr:`immutable_methods` are cached without expiration, when
+            their block number is not above the last irreversible block (default is True)
+
+        Methods which are neither in ``ttls`` nor in :attr:`immutable_methods`
+        are not cached.
+    """
+    #: Lifetime of slowly changing results in seconds, None never expires
+    default_ttls = {
+        "get_config": None,
+        "get_chain_properties": 60,
+        "get_hardfork_version": 60,
+        "get_feed_history": 60,
+        "get_current_median_history_price": 60,
+        "get_reward_fund": 60,
+        "get_reward_funds": 60,
+    }
+    #: Methods whose result does not change, when their block is irreversible
+    immutable_methods = frozenset(["get_block", "get_block_header", "get_ops_in_block"])
+
+    def __init__(self, ttls=None, immutable_below_lib=True):
+        self.ttls = dict(self.default_ttls)
+        if ttls:
+            self.ttls.update(ttls)
+        self.immutable_below_lib = immutable_below_lib
+
+    def get_ttl(self, api, name, params, last_irreversible_block_num=0):
+        """ Returns the lifetime of a result in seconds, None when it never
+            expires and 0 when it is not cached
+
+            :param str api: api name, e.g. ``block_api``
+            :param str name: method name, e.g. ``get_block``
+            :param params: parameters of the call
+            :param int last_irreversible_block_num: last irreversible block number
+        """
+        if self.immutable_below_lib and name in self.immutable_methods:
+            block_num = self._get_block_num(params)
+            if block_num is not None and 0 < block_num <= last_irreversible_block_num:
+                return None
+        full_name = "%s.%s" % (api, name)
+        if full_name in self.ttls:
+            return self.ttls[full_name]
+        return self.ttls.get(name, 0)
+
+    @staticmethod
+    def _get_block_num(params):
+        if isinstance(params, dict):
+            block_num = params.get("block_num")
+        elif isinstance(params, list) and len(params) > 0:
+            block_num = params[0]
+        else:
+            return None
+        try:
+            return int(block_num)
+        except (TypeError, ValueError):
+            return None
+
+
+class ResponseCache(object):
+    """ Caches the results of rpc calls, keyed by api, method and parameters
+
+        :param CachePolicy policy: decides which calls are cached (default is :class:`CachePolicy`)
+        :param int max_entries: maximum number of results in memory (default is 10000)
+        :param int max_bytes: maximum summed size of the JSON encoded results
+            in memory, unbounded for None (default is 64 MB)
+        :param str path: When set, results are also stored in a sqlite database at
+            this path. It is read, when a result is not in memory, and can be shared
+            between processes.
+        :param str chain_id: Chain id of the cached results. When not set, the cache
+            is bound to the chain of the first node, which uses it (see :func:`bind`)
+
+        Keys start with the chain id, so that the results of different chains
+        are never mixed, even when they share the same disk tier. Nothing is
+        cached, until the chain id is known.
+
+        Results are stored as JSON, so that every hit returns a new object,
+        which can be changed by the caller. The memory tier evicts the least
+        recently used result. Results of calls in a batch are not cached.
+
+        .. code-block:: python
+
+            from beem import Steem
+            from beemapi.responsecache import ResponseCache, CachePolicy
+            cache = ResponseCache(CachePolicy(ttls={"get_accounts": 3}), path="rpc_cache.sqlite")
+            stm = Steem(response_cache=cache)
+
+    """
+    def __init__(self, policy=None, max_entries=10000, max_bytes=64 * 1024 * 1024, path=None, chain_id=None):
+        self.policy = policy if policy is not None else CachePolicy()
+        self.chain_id = chain_id
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.last_irreversible_block_num = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._db = None
+        if path is not None:
+            # the connection is shared by all threads, every access holds self._lock
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            if path != ":memory:":
+                # WAL with synchronous=NORMAL keeps the shared file consistent after a crash
+                try:
+                    self._db.execute("PRAGMA journal_mode=WAL")
+                except sqlite3.OperationalError:
+                    log.warning("Could not enable WAL mode (database: %s)" % (path))
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses "
+                             "(key TEXT PRIMARY KEY, expires REAL, data BLOB)")
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._data)
+
+    def bind(self, chain_id):
+        """ Binds the cache to a chain id
+
+            :param str chain_id: chain id of the connected node
+            :raises ValueError: when the cache is already bound to another chain
+        """
+        with self._lock:
+            if self.chain_id is None:
+                self.chain_id = chain_id
+            elif self.chain_id != chain_id:
+                raise ValueError("The response cache is bound to chain %s, not to %s" % (self.chain_id, chain_id))
+
+    def set_last_irreversible_block_num(self, block_num):
+        """ Sets the last irreversible block number, the value can only grow"""
+        if block_num is not None and int(block_num) > self.last_irreversible_block_num:
+            self.last_irreversible_block_num = int(block_num)
+
+    def get_key(self, query):
+        """ Returns the key and the lifetime of a query or ``(None, 0)``, when it is not cached
+
+            :param dict query: query, as build by :func:`beemapi.rpcutils.get_query`
+        """
+        split = split_query(query)
+        if split is None or self.chain_id is None:
+            return None, 0
+        api, name, params = split
+        ttl = self.policy.get_ttl(api, name, params, self.last_irreversible_block_num)
+        if ttl is not None and ttl <= 0:
+            return None, 0
+        key = "%s:%s.%s:%s" % (self.chain_id[:16], api, name, json.dumps(params, sort_keys=True, separators=(',', ':')))
+        return key, ttl
+
+    def get(self, key):
+        """ Returns the stored result as JSON or None"""
+        now = time.time()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                if item[0] is None or now < item[0]:
+                    self.hits += 1
+                    self._touch(key)
+                    return item[1]
+                self._remove(key)
+            if self._db is not None:
+                row = self._db.execute("SELECT expires, data FROM responses WHERE key=?", (key, )).fetchone()
+                if row is not None and (row[0] is None or now < row[0]):
+                    self.disk_hits += 1
+                    self._store(key, row[0], bytes(row[1]))
+                    return bytes(row[1])
+            self.misses += 1
+        return None
+
+    def put(self, key, data, ttl=None):
+        """ Stores a JSON encoded result
+
+            :param str key: key, as returned by :func:`get_key`
+            :param bytes data: JSON encoded result
+            :param float ttl: lifetime in seconds, None for results which never expire
+        """
+        expires = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._store(key, expires, data)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO responses (key, expires, data) VALUES (?, ?, ?)",
+                                 (key, expires, sqlite3.Binary(data)))
+                self._db.commit()
+
+    def call(self, query, rpcexec):
+        """ Returns the cached result of a query or calls ``rpcexec(query)`` and stores its result
+
+            :param dict query: query, as build by :func:`beemapi.rpcutils.get_query`
+            :param callable rpcexec: function, which sends the query and returns its result
+        """
+        key, ttl = self.get_key(query)
+        if key is None:
+            return rpcexec(query)
+        data = self.get(key)
+        if data is not None:
+            return jsoncodec.loads(data)
+        result = rpcexec(query)
+        if result is not None:
+            self.put(key, jsoncodec.dumps(result), ttl)
+        return result
+
+    def clear(self):
+        """ Removes all results from memory and disk"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self):
+        """ Closes the disk tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self):
+        """ Returns the number of results in memory, their size and the hit and miss counters"""
+        with self._lock:
+            return {"entries": len(self._data), "bytes": self._bytes, "hits": self.hits,
+                    "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def _store(self, key, expires, data):
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (expires, data)
+        self._bytes += len(data)
+        while self._data and ((self.max_entries is not None and len(self._data) > self.max_entries) or
+                              (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            self._remove(next(iter(self._data)))
+
+    def _remove(self, key):
+        item = self._data.pop(key)
+        self._bytes -= len(item[1])
+
+    def _touch(self, key):
+        try:
+            self._data.move_to_end(key)
+        except AttributeError:
+            self._data[key] = self._data.pop(key)
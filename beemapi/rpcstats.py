@@ -0,0 +1,195 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import bisect
+import threading
+
+
+def get_method_name(payload):
+    """ Returns the api method of a payload as ``api.method``. For a batch
+        call, the method of the first query is returned.
+    """
+    if isinstance(payload, list):
+        if not payload:
+            return ""
+        payload = payload[0]
+    method = payload.get("method", "")
+    if method == "call":
+        params = payload.get("params")
+        if isinstance(params, list) and len(params) >= 2:
+            return "%s.%s" % (params[0], params[1])
+    return method
+
+
+class RPCStats(object):
+    """ Collects statistics of rpc calls per node and api method
+
+        :param list buckets: upper bounds of the latency histogram in seconds
+            (default is :attr:`default_buckets`)
+        :param callable callback: When set, it is called with a dict for every
+            sent request, which has the keys ``node``, ``method``, ``latency``,
+            ``request_bytes``, ``response_bytes``, ``batch_size`` and ``error``
+
+        Per node and method, the number of requests and errors, a latency
+        histogram, the request and response bytes, the number of batched
+        queries and the JSON decode time are counted. Retries on the same node
+        and failovers to another node are counted per node.
+
+        .. code-block:: python
+
+            from beem import Steem
+            stm = Steem(rpc_stats=True)
+            stm.get_config()
+            print(stm.rpc.rpc_stats.get_stats())
+            print(stm.rpc.rpc_stats.to_prometheus())
+
+    """
+    #: Upper bounds of the latency histogram in seconds
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10.)
+
+    def __init__(self, buckets=None, callback=None):
+        self.buckets = tuple(sorted(buckets if buckets is not None else self.default_buckets))
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """ Removes all statistics"""
+        with self._lock:
+            self._methods = {}
+            self._nodes = {}
+
+    def _get_method(self, node, method):
+        stats = self._methods.get((node, method))
+        if stats is None:
+            stats = {"requests": 0, "errors": 0, "latency_sum": 0.,
+                     "latency_buckets": [0] * (len(self.buckets) + 1),
+                     "request_bytes": 0, "response_bytes": 0,
+                     "batch_queries": 0, "decode_count": 0, "decode_time": 0.}
+            self._methods[(node, method)] = stats
+        return stats
+
+    def _get_node(self, node):
+        stats = self._nodes.get(node)
+        if stats is None:
+            stats = {"retries": 0, "failovers": 0}
+            self._nodes[node] = stats
+        return stats
+
+    def record_request(self, node, payload, latency, request_bytes=0, response_bytes=0, error=False):
+        """ Adds a sent request
+
+            :param str node: node url
+            :param payload: sent payload, a dict or a list for a batch call
+            :param float latency: time in seconds until the reply was received
+            :param int request_bytes: size of the sent payload
+            :param int response_bytes: size of the reply
+            :param bool error: True, when no valid reply was received
+        """
+        method = get_method_name(payload)
+        batch_size = len(payload) if isinstance(payload, list) else 1
+        with self._lock:
+            stats = self._get_method(node, method)
+            stats["requests"] += 1
+            if error:
+                stats["errors"] += 1
+            stats["latency_sum"] += latency
+            stats["latency_buckets"][bisect.bisect_left(self.buckets, latency)] += 1
+            stats["request_bytes"] += request_bytes
+            stats["response_bytes"] += response_bytes
+            stats["batch_queries"] += batch_size
+        if self.callback is not None:
+            self.callback({"node": node, "method": method, "latency": latency,
+                           "request_bytes": request_bytes, "response_bytes": response_bytes,
+                           "batch_size": batch_size, "error": error})
+
+    def record_decode(self, node, payload, duration):
+        """ Adds the time in seconds, which was needed to decode a reply"""
+        method = get_method_name(payload)
+        with self._lock:
+            stats = self._get_method(node, method)
+            stats["decode_count"] += 1
+            stats["decode_time"] += duration
+
+    def record_retry(self, node, failover=False):
+        """ Counts a failed call of a node, which is repeated on the same node
+            or, when failover is True, on another node
+        """
+        with self._lock:
+            stats = self._get_node(node)
+            if failover:
+                stats["failovers"] += 1
+            else:
+                stats["retries"] += 1
+
+    def get_stats(self):
+        """ Returns the statistics as dict
+
+            ``{"nodes": {url: {"retries", "failovers", "methods": {method: {...}}}}}``
+            The latency histogram is returned as list of ``(upper bound, count)``,
+            the last bound is ``inf``.
+        """
+        bounds = list(self.buckets) + [float("inf")]
+        with self._lock:
+            nodes = {}
+            for node, stats in self._nodes.items():
+                nodes[node] = dict(stats, methods={})
+            for (node, method), stats in self._methods.items():
+                if node not in nodes:
+                    nodes[node] = {"retries": 0, "failovers": 0, "methods": {}}
+                stats = dict(stats)
+                stats["latency_buckets"] = list(zip(bounds, stats["latency_buckets"]))
+                nodes[node]["methods"][method] = stats
+        return {"nodes": nodes}
+
+    def to_prometheus(self, prefix="beem_rpc"):
+        """ Returns the statistics in the Prometheus text exposition format
+
+            :param str prefix: prefix of the metric names (default is ``beem_rpc``)
+        """
+        lines = []
+        stats = self.get_stats()["nodes"]
+
+        def labels(node, method=None, **extra):
+            items = [("node", node)]
+            if method is not None:
+                items.append(("method", method))
+            items.extend(sorted(extra.items()))
+            return "{%s}" % ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+                                     for k, v in items)
+
+        def header(name, kind, description):
+            lines.append("# HELP %s_%s %s" % (prefix, name, description))
+            lines.append("# TYPE %s_%s %s" % (prefix, name, kind))
+
+        header("request_duration_seconds", "histogram", "Latency of rpc requests")
+        for node in sorted(stats):
+            for method in sorted(stats[node]["methods"]):
+                s = stats[node]["methods"][method]
+                count = 0
+                for bound, n in s["latency_buckets"]:
+                    count += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append("%s_request_duration_seconds_bucket%s %d" % (prefix, labels(node, method, le=le), count))
+                lines.append("%s_request_duration_seconds_sum%s %r" % (prefix, labels(node, method), s["latency_sum"]))
+                lines.append("%s_request_duration_seconds_count%s %d" % (prefix, labels(node, method), s["requests"]))
+        counters = [
+            ("errors_total", "errors", "Requests without valid reply"),
+            ("request_bytes_total", "request_bytes", "Size of the sent payloads"),
+            ("response_bytes_total", "response_bytes", "Size of the received replies"),
+            ("batch_queries_total", "batch_queries", "Number of queries, batch calls count every query"),
+            ("decode_seconds_total", "decode_time", "Time spent decoding replies"),
+        ]
+        for name, key, description in counters:
+            header(name, "counter", description)
+            for node in sorted(stats):
+                for method in sorted(stats[node]["methods"]):
+                    lines.append("%s_%s%s %r" % (prefix, name, labels(node, method), stats[node]["methods"][method][key]))
+        for name, key, description in [("retries_total", "retries", "Calls repeated on the same node"),
+                                       ("failovers_total", "failovers", "Calls repeated on another node")]:
+            header(name, "counter", description)
+            for node in sorted(stats):
+                lines.append("%s_%s%s %d" % (prefix, name, labels(node), stats[node][key]))
+        return "\n".join(lines) + "\n"
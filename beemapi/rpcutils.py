@@ -4,7 +4,6 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import time
-import json
 import logging
 from .exceptions import (
     UnauthorizedError, RPCConnection, RPCError, NumRetriesReached, CallRetriesReached
@@ -24,22 +23,32 @@ def is_network_appbase_ready(props):
     return network_version >= '0.19.4'
 
 
+def _copy_params(params):
+    """Copies the dicts and lists of the rpc parameters, so that a query
+    is not changed, when the caller changes its parameters afterwards
+    """
+    if isinstance(params, dict):
+        return {k: _copy_params(v) for k, v in params.items()}
+    elif isinstance(params, (list, tuple)):
+        return [_copy_params(v) for v in params]
+    return params
+
+
 def get_query(appbase, request_id, api_name, name, args):
     query = []
+    args = _copy_params(list(args))
     if not appbase:
         query = {"method": "call",
-                 "params": [api_name, name, list(args)],
+                 "params": [api_name, name, args],
                  "jsonrpc": "2.0",
                  "id": request_id}
     else:
-        args = json.loads(json.dumps(args))
-        # print(args)
-        if len(args) > 0 and isinstance(args, list) and isinstance(args[0], dict):
+        if len(args) > 0 and isinstance(args[0], dict):
             query = {"method": api_name + "." + name,
                      "params": args[0],
                      "jsonrpc": "2.0",
                      "id": request_id}
-        elif len(args) > 0 and isinstance(args, list) and isinstance(args[0], list) and len(args[0]) > 0 and isinstance(args[0][0], dict):
+        elif len(args) > 0 and isinstance(args[0], list) and len(args[0]) > 0 and isinstance(args[0][0], dict):
             for a in args[0]:
                 query.append({"method": api_name + "." + name,
                               "params": a,
@@ -48,7 +57,7 @@ def get_query(appbase, request_id, api_name, name, args):
                 request_id += 1
         elif args:
             query = {"method": "call",
-                     "params": [api_name, name, list(args)],
+                     "params": [api_name, name, args],
                      "jsonrpc": "2.0",
                      "id": request_id}
             request_id += 1
@@ -65,6 +74,23 @@ def get_query(appbase, request_id, api_name, name, args):
     return query
 
 
+def split_query(query):
+    """ Returns api, method name and parameters of a single query or None,
+        when it is not a valid query. Both the ``call`` and the
+        ``api.method`` form are accepted.
+    """
+    if not isinstance(query, dict):
+        return None
+    method = query.get("method", "")
+    params = query.get("params")
+    if method == "call":
+        if not isinstance(params, list) or len(params) != 3:
+            return None
+        return params[0], params[1], params[2]
+    api, _, name = method.partition(".")
+    return api, name, params
+
+
 def get_api_name(appbase, *args, **kwargs):
     if not appbase:
         # Sepcify the api to talk to
@@ -58,6 +58,7 @@ class SteemNodeRPC(GrapheneRPC):
         maxRetryCountReached = False
         while doRetry and not maxRetryCountReached:
             doRetry = False
+            url = self.url
             try:
                 # Forward call to GrapheneWebsocketRPC and catch+evaluate errors
                 reply = super(SteemNodeRPC, self).rpcexec(payload)
@@ -71,7 +72,7 @@ class SteemNodeRPC(GrapheneRPC):
             except exceptions.RPCErrorDoRetry as e:
                 msg = exceptions.decodeRPCErrorMsg(e).strip()
                 try:
-                    self.nodes.sleep_and_check_retries(str(msg), call_retry=True)
+                    self._retry_call(msg)
                     doRetry = True
                 except exceptions.CallRetriesReached:
                     if self.nodes.working_nodes_count > 1:
@@ -94,6 +95,8 @@ class SteemNodeRPC(GrapheneRPC):
             except Exception as e:
                 self.next_node_on_empty_reply = False
                 raise e
+            if doRetry and self.rpc_stats is not None and url is not None:
+                self.rpc_stats.record_retry(url, failover=self.url != url)
             maxRetryCountReached = self.nodes.num_retries_call_reached
         self.next_node_on_empty_reply = False
 
@@ -102,6 +105,19 @@ class SteemNodeRPC(GrapheneRPC):
         self.nodes.sleep_and_check_retries(error_msg, sleep=False, call_retry=False)
         self.next()
 
+    def _retry_call(self, error_msg):
+        """ Prepares the retry of a failed call. The call is repeated on
+            another node right away if one is available. Otherwise the call
+            waits and is repeated on the same node. The failure is recorded
+            once in the statistics of the node.
+        """
+        if self.nodes.other_node_available():
+            # increase_error_cnt records the failure
+            self._retry_on_next_node(error_msg)
+        else:
+            self.nodes.sleep_and_check_retries(str(error_msg), call_retry=True)
+            self.nodes.record_failure()
+
     def _check_error_message(self, e, cnt):
         """Check error message and decide what to do"""
         doRetry = False
@@ -124,10 +140,10 @@ class SteemNodeRPC(GrapheneRPC):
         elif re.search("WinError", msg):
             raise exceptions.RPCError(msg)
         elif re.search("Unable to acquire database lock", msg):
-            self.nodes.sleep_and_check_retries(str(msg), call_retry=True)
+            self._retry_call(msg)
             doRetry = True
         elif re.search("Internal Error", msg) or re.search("Unknown exception", msg):
-            self.nodes.sleep_and_check_retries(str(msg), call_retry=True)
+            self._retry_call(msg)
             doRetry = True
         elif re.search("!check_max_block_age", str(e)):
             if self.nodes.working_nodes_count == 1:
@@ -144,6 +160,18 @@ class SteemNodeRPC(GrapheneRPC):
             raise e
         return doRetry
 
+    def _check_batch_error(self, msg):
+        """Raises the errors of failed batch queries for which a retry is pointless"""
+        if re.match("^no method with name.*", msg) or re.search("Could not find method", msg):
+            raise exceptions.NoMethodWithName(msg)
+        elif re.search("Could not find API", msg):
+            if self._check_api_name(msg):
+                raise exceptions.ApiNotSupported(msg)
+            else:
+                raise exceptions.NoApiWithName(msg)
+        elif re.search("out_of_rangeEEEE: unknown key", msg) or re.search("unknown key:unknown key", msg):
+            raise exceptions.UnkownKey(msg)
+
     def _check_api_name(self, msg):
         error_start = "Could not find API "
         if re.search(error_start + "account_history_api", msg):
@@ -8,7 +8,6 @@ import traceback
 import threading
 import ssl
 import time
-import json
 import logging
 import websocket
 from itertools import cycle
@@ -19,6 +18,7 @@ from beemapi.rpcutils import (
     RPCConnection, RPCError, NumRetriesReached
 )
 from beemapi.node import Nodes
+from beemapi import jsoncodec
 from events import Events
 
 log = logging.getLogger(__name__)
@@ -168,7 +168,7 @@ class SteemWebsocket(Events):
         log.debug("Received message: %s" % str(reply))
         data = {}
         try:
-            data = json.loads(reply, strict=False)
+            data = jsoncodec.loads(reply)
         except ValueError:
             raise ValueError("API node returned invalid format. Expected JSON!")
 
@@ -281,8 +281,10 @@ class SteemWebsocket(Events):
         :raises ValueError: if the server does not respond in proper JSON format
         :raises RPCError: if the server returns an error
         """
-        log.debug(json.dumps(payload))
-        self.ws.send(json.dumps(payload, ensure_ascii=False).encode('utf8'))
+        data = jsoncodec.dumps(payload)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(data)
+        self.ws.send(data)
 
     def __getattr__(self, name):
         """ Map all methods to RPC calls and pass through the arguments
@@ -1,6 +1,7 @@
 """ beembase."""
 from .version import version as __version__
 __all__ = [
+    'deserializer',
     'memo',
     'objects',
     'objecttypes',
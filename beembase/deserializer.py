@@ -0,0 +1,276 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from binascii import unhexlify
+from beemgraphenebase.py23 import string_types
+from beemgraphenebase.deserializer import (
+    read_varint, read_int16, read_uint16, read_uint32,
+    read_bool, read_string, read_point_in_time,
+    read_signature, read_public_key, read_array, read_map,
+    read_optional, read_static_variant, read_empty_extensions
+)
+from .objects import Operation, read_amount
+from .operationids import ops
+from .operations import operation_classes
+from beemgraphenebase.objects import SchemaObject
+from .signedtransactions import Signed_Transaction
+
+default_prefix = "STM"
+
+
+def read_price(data, offset):
+    """Reads a Price or ExchangeRate"""
+    result = {}
+    result["base"], offset = read_amount(data, offset)
+    result["quote"], offset = read_amount(data, offset)
+    return result, offset
+
+
+def read_permission(data, offset, prefix=default_prefix):
+    """Reads a Permission"""
+    result = {}
+    result["weight_threshold"], offset = read_uint32(data, offset)
+    result["account_auths"], offset = read_map(data, offset, read_string, read_uint16)
+    result["key_auths"], offset = read_map(
+        data, offset, lambda d, o: read_public_key(d, o, prefix=prefix), read_uint16)
+    return result, offset
+
+
+def read_witness_props(data, offset):
+    """Reads WitnessProps"""
+    result = {}
+    result["account_creation_fee"], offset = read_amount(data, offset)
+    result["maximum_block_size"], offset = read_uint32(data, offset)
+    result["sbd_interest_rate"], offset = read_uint16(data, offset)
+    return result, offset
+
+
+def read_beneficiary(data, offset):
+    """Reads a Beneficiary"""
+    result = {}
+    result["account"], offset = read_string(data, offset)
+    result["weight"], offset = read_int16(data, offset)
+    return result, offset
+
+
+def read_beneficiaries(data, offset):
+    """Reads Beneficiaries"""
+    beneficiaries, offset = read_array(data, offset, read_beneficiary)
+    return {"beneficiaries": beneficiaries}, offset
+
+
+def read_comment_option_extension(data, offset):
+    """Reads a CommentOptionExtensions static variant"""
+    return read_static_variant(data, offset, {0: read_beneficiaries})
+
+
+def read_feed_publish(data, offset, prefix=default_prefix):
+    result = {}
+    result["publisher"], offset = read_string(data, offset)
+    result["exchange_rate"], offset = read_price(data, offset)
+    return result, offset
+
+
+def read_account_create(data, offset, prefix=default_prefix):
+    result = {}
+    result["fee"], offset = read_amount(data, offset)
+    result["creator"], offset = read_string(data, offset)
+    result["new_account_name"], offset = read_string(data, offset)
+    result["owner"], offset = read_permission(data, offset, prefix=prefix)
+    result["active"], offset = read_permission(data, offset, prefix=prefix)
+    result["posting"], offset = read_permission(data, offset, prefix=prefix)
+    result["memo_key"], offset = read_public_key(data, offset, prefix=prefix)
+    result["json_metadata"], offset = read_string(data, offset)
+    return result, offset
+
+
+def read_account_update(data, offset, prefix=default_prefix):
+    result = {}
+    result["account"], offset = read_string(data, offset)
+    for role in ["owner", "active", "posting"]:
+        permission, offset = read_optional(
+            data, offset, lambda d, o: read_permission(d, o, prefix=prefix))
+        if permission is not None:
+            result[role] = permission
+    result["memo_key"], offset = read_public_key(data, offset, prefix=prefix)
+    result["json_metadata"], offset = read_string(data, offset)
+    return result, offset
+
+
+def read_witness_update(data, offset, prefix=default_prefix):
+    result = {}
+    result["owner"], offset = read_string(data, offset)
+    result["url"], offset = read_string(data, offset)
+    result["block_signing_key"], offset = read_public_key(data, offset, prefix=prefix)
+    result["props"], offset = read_witness_props(data, offset)
+    result["fee"], offset = read_amount(data, offset)
+    return result, offset
+
+
+def read_comment_options(data, offset, prefix=default_prefix):
+    result = {}
+    result["author"], offset = read_string(data, offset)
+    result["permlink"], offset = read_string(data, offset)
+    result["max_accepted_payout"], offset = read_amount(data, offset)
+    result["percent_steem_dollars"], offset = read_uint16(data, offset)
+    result["allow_votes"], offset = read_bool(data, offset)
+    result["allow_curation_rewards"], offset = read_bool(data, offset)
+    result["extensions"], offset = read_array(data, offset, read_comment_option_extension)
+    return result, offset
+
+
+def read_limit_order_create2(data, offset, prefix=default_prefix):
+    result = {}
+    result["owner"], offset = read_string(data, offset)
+    result["orderid"], offset = read_uint32(data, offset)
+    result["amount_to_sell"], offset = read_amount(data, offset)
+    result["fill_or_kill"], offset = read_bool(data, offset)
+    result["exchange_rate"], offset = read_price(data, offset)
+    result["expiration"], offset = read_point_in_time(data, offset)
+    return result, offset
+
+
+def read_request_account_recovery(data, offset, prefix=default_prefix):
+    result = {}
+    result["recovery_account"], offset = read_string(data, offset)
+    result["account_to_recover"], offset = read_string(data, offset)
+    result["new_owner_authority"], offset = read_permission(data, offset, prefix=prefix)
+    result["extensions"], offset = read_empty_extensions(data, offset)
+    return result, offset
+
+
+def read_recover_account(data, offset, prefix=default_prefix):
+    result = {}
+    result["account_to_recover"], offset = read_string(data, offset)
+    result["new_owner_authority"], offset = read_permission(data, offset, prefix=prefix)
+    result["recent_owner_authority"], offset = read_permission(data, offset, prefix=prefix)
+    result["extensions"], offset = read_empty_extensions(data, offset)
+    return result, offset
+
+
+def read_account_create_with_delegation(data, offset, prefix=default_prefix):
+    result = {}
+    result["fee"], offset = read_amount(data, offset)
+    result["delegation"], offset = read_amount(data, offset)
+    result["creator"], offset = read_string(data, offset)
+    result["new_account_name"], offset = read_string(data, offset)
+    result["owner"], offset = read_permission(data, offset, prefix=prefix)
+    result["active"], offset = read_permission(data, offset, prefix=prefix)
+    result["posting"], offset = read_permission(data, offset, prefix=prefix)
+    result["memo_key"], offset = read_public_key(data, offset, prefix=prefix)
+    result["json_metadata"], offset = read_string(data, offset)
+    result["extensions"], offset = read_empty_extensions(data, offset)
+    return result, offset
+
+
+#: Readers of all operations, which are implemented in :mod:`beembase.operations`
+operation_readers = {
+    "feed_publish": read_feed_publish,
+    "account_create": read_account_create,
+    "account_update": read_account_update,
+    "witness_update": read_witness_update,
+    "comment_options": read_comment_options,
+    "limit_order_create2": read_limit_order_create2,
+    "request_account_recovery": read_request_account_recovery,
+    "recover_account": read_recover_account,
+    "account_create_with_delegation": read_account_create_with_delegation,
+}
+# the readers of operations with a schema are compiled from the schema
+for _name, _klass in operation_classes.items():
+    if issubclass(_klass, SchemaObject):
+        operation_readers[_name] = _klass.schema.decode
+
+
+def read_operation(data, offset, prefix=default_prefix):
+    """Reads an Operation as ``[name, op]``"""
+    op_id, offset = read_varint(data, offset)
+    if op_id >= len(ops):
+        raise ValueError("Unknown operation id %d" % op_id)
+    name = ops[op_id]
+    if name not in operation_readers:
+        raise NotImplementedError("Unimplemented Operation %s" % name)
+    op, offset = operation_readers[name](data, offset, prefix=prefix)
+    return [name, op], offset
+
+
+def read_transaction(data, offset, prefix=default_prefix):
+    """ Reads a (signed) transaction. The signatures are optional,
+        so that the serialized transaction digest can also be read.
+    """
+    result = {}
+    result["ref_block_num"], offset = read_uint16(data, offset)
+    result["ref_block_prefix"], offset = read_uint32(data, offset)
+    result["expiration"], offset = read_point_in_time(data, offset)
+    result["operations"], offset = read_array(
+        data, offset, lambda d, o: read_operation(d, o, prefix=prefix))
+    result["extensions"], offset = read_empty_extensions(data, offset)
+    if offset < len(data):
+        result["signatures"], offset = read_array(data, offset, read_signature)
+    else:
+        result["signatures"] = []
+    return result, offset
+
+
+def _to_bytearray(data):
+    if isinstance(data, string_types):
+        data = unhexlify(data)
+    return bytearray(data)
+
+
+def deserialize_operation(data, prefix=default_prefix):
+    """ Returns the json representation of a serialized operation
+
+        :param bytes data: serialized operation (bytes or hex string)
+        :param str prefix: public key prefix (default is STM)
+    """
+    data = _to_bytearray(data)
+    op, offset = read_operation(data, 0, prefix=prefix)
+    if offset != len(data):
+        raise ValueError("%d bytes left after the operation" % (len(data) - offset))
+    return op
+
+
+def deserialize_transaction(data, prefix=default_prefix):
+    """ Returns the json representation of a serialized (signed) transaction
+
+        :param bytes data: serialized transaction (bytes or hex string),
+            e.g. returned by ``get_transaction_hex``
+        :param str prefix: public key prefix (default is STM)
+
+        .. code-block:: python
+
+            from beembase.deserializer import deserialize_transaction
+            tx = deserialize_transaction(stm.rpc.get_transaction_hex(tx_json))
+
+    """
+    data = _to_bytearray(data)
+    tx, offset = read_transaction(data, 0, prefix=prefix)
+    if offset != len(data):
+        raise ValueError("%d bytes left after the transaction" % (len(data) - offset))
+    return tx
+
+
+def operation_from_bytes(data, prefix=default_prefix):
+    """ Returns a :class:`beembase.objects.Operation` from a serialized operation
+
+        :param bytes data: serialized operation (bytes or hex string)
+        :param str prefix: public key prefix (default is STM)
+    """
+    op = deserialize_operation(data, prefix=prefix)
+    op[1]["prefix"] = prefix
+    return Operation(op)
+
+
+def transaction_from_bytes(data, prefix=default_prefix):
+    """ Returns a :class:`beembase.signedtransactions.Signed_Transaction`
+        from a serialized (signed) transaction
+
+        :param bytes data: serialized transaction (bytes or hex string)
+        :param str prefix: public key prefix (default is STM)
+    """
+    tx = deserialize_transaction(data, prefix=prefix)
+    for op in tx["operations"]:
+        op[1]["prefix"] = prefix
+    return Signed_Transaction(**tx)
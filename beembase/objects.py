@@ -13,13 +13,15 @@ from beemgraphenebase.types import (
     Varint32, Int64, String, Bytes, Void,
     Array, PointInTime, Signature, Bool,
     Set, Fixed_array, Optional, Static_variant,
-    Map, Id
+    Map
 )
 from beemgraphenebase.objects import GrapheneObject, isArgsThisClass
 from .objecttypes import object_type
 from beemgraphenebase.account import PublicKey
 from beemgraphenebase.objects import Operation as GPHOperation
-from .operationids import operations
+from beemgraphenebase.schema import FieldType, json_value
+from beemgraphenebase.deserializer import read_int64, read_uint8
+from .operationids import operations, getOperationNameForId
 import struct
 default_prefix = "STM"
 
@@ -41,7 +43,7 @@ class Amount(object):
                 self.precision = asset_precision[self.asset]
             else:
                 raise Exception("Asset unknown")
-            self.amount = int(float(self.amount) * 10 ** self.precision)
+            self.amount = int(round(float(self.amount) * 10 ** self.precision))
 
             self.str_repr = '{:.{}f} {}'.format((float(self.amount) / 10 ** self.precision), self.precision, self.asset)
         elif isinstance(d, list):
@@ -67,15 +69,51 @@ class Amount(object):
         return self.str_repr
 
 
+def read_amount(data, offset):
+    """ Reads an Amount. Amounts of known assets are returned as string,
+        e.g. ``"1.000 STEEM"``, others as ``[amount, precision, asset]``
+    """
+    amount, offset = read_int64(data, offset)
+    precision, offset = read_uint8(data, offset)
+    if data[offset:offset + 2] == b"@@":
+        # Amounts given as [amount, precision, nai] are serialized with the full nai
+        asset = data[offset:offset + 11].decode("ascii")
+        offset += 11
+    else:
+        asset = data[offset:offset + 7].rstrip(b"\x00").decode("ascii")
+        offset += 7
+    if asset not in asset_precision or asset_precision[asset] != precision:
+        return [str(amount), precision, asset], offset
+    sign = "-" if amount < 0 else ""
+    whole, fraction = divmod(abs(amount), 10 ** precision)
+    if precision > 0:
+        return "%s%d.%0*d %s" % (sign, whole, precision, fraction, asset), offset
+    return "%s%d %s" % (sign, whole, asset), offset
+
+
+#: Schema field type of an Amount
+amount_type = FieldType(
+    normalize=lambda value: value if isinstance(value, Amount) else Amount(value),
+    write=lambda buf, value: buf.extend(value.__bytes__()),
+    to_json=json_value,
+    read=read_amount,
+    inline="buf.extend({v}.__bytes__())")
+
+# Operation classes by class name, filled on first use
+_operation_klasses = {}
+
+
 @python_2_unicode_compatible
 class Operation(GPHOperation):
     def __init__(self, *args, **kwargs):
         super(Operation, self).__init__(*args, **kwargs)
 
     def _getklass(self, name):
-        module = __import__("beembase.operations", fromlist=["operations"])
-        class_ = getattr(module, name)
-        return class_
+        if not _operation_klasses:
+            from .operations import operation_classes
+            for op_name, klass in operation_classes.items():
+                _operation_klasses[op_name[0].upper() + op_name[1:]] = klass
+        return _operation_klasses[name]
 
     def operations(self):
         return operations
@@ -83,18 +121,12 @@ class Operation(GPHOperation):
     def getOperationNameForId(self, i):
         """ Convert an operation id into the corresponding string
         """
-        for key in operations:
-            if int(operations[key]) is int(i):
-                return key
-        return "Unknown Operation ID %d" % i
+        return getOperationNameForId(i)
 
     def json(self):
         return json.loads(str(self))
         # return json.loads(str(json.dumps([self.name, self.op.toJson()])))
 
-    def __bytes__(self):
-        return py23_bytes(Id(self.opId)) + py23_bytes(self.op)
-
     def __str__(self):
         return json.dumps([self.name.lower(), self.op.toJson()])
 
@@ -62,13 +62,13 @@ ops = [
     'return_vesting_delegation',
     'comment_benefactor_reward',
 ]
-operations = {o: ops.index(o) for o in ops}
+operations = {o: i for i, o in enumerate(ops)}
 
 
 def getOperationNameForId(i):
     """ Convert an operation id into the corresponding string
     """
-    for key in operations:
-        if int(operations[key]) is int(i):
-            return key
+    i = int(i)
+    if 0 <= i < len(ops):
+        return ops[i]
     return "Unknown Operation ID %d" % i
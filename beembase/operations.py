@@ -7,19 +7,24 @@ from beemgraphenebase.py23 import bytes_types, integer_types, string_types, text
 from collections import OrderedDict
 import json
 from beemgraphenebase.types import (
-    Uint8, Int16, Uint16, Uint32, Uint64,
+    Uint8, Uint16, Uint32, Uint64,
     Varint32, Int64, String, Bytes, Void,
     Array, PointInTime, Signature, Bool,
     Set, Fixed_array, Optional, Static_variant,
     Map, Id
 )
 from .objects import GrapheneObject, isArgsThisClass
+from beemgraphenebase.objects import SchemaObject
+from beemgraphenebase.schema import Schema, FieldType, json_value
+from beemgraphenebase.types import write_string, write_bytes
+from beemgraphenebase.deserializer import read_string
 from beemgraphenebase.account import PublicKey
 from .operationids import operations
 from .objects import (
     Operation,
     Memo,
     Amount,
+    amount_type,
     Extension,
     Price,
     WitnessProps,
@@ -33,6 +38,30 @@ from .objects import (
 default_prefix = "STM"
 
 
+def _normalize_memo(memo):
+    if isinstance(memo, string_types):
+        return memo
+    elif isinstance(memo, dict):
+        return Optional(Memo(**memo))
+    return Optional(Memo(memo))
+
+
+def _write_memo(buf, memo):
+    if isinstance(memo, string_types):
+        write_string(buf, memo)
+    else:
+        write_bytes(buf, memo)
+
+
+#: Schema field type of a transfer memo, which is either a string or an encrypted Memo
+memo_type = FieldType(
+    normalize=_normalize_memo,
+    write=_write_memo,
+    to_json=lambda memo: memo if isinstance(memo, string_types) else json_value(memo),
+    wrap=lambda memo: String(memo) if isinstance(memo, string_types) else memo,
+    read=read_string)
+
+
 def check_for_class(self, args):
     if isArgsThisClass(self, args):
             self.data = args[0].data
@@ -41,120 +70,77 @@ def check_for_class(self, args):
         return False
 
 
-class Transfer(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        # Allow for overwrite of prefix
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        prefix = kwargs.get("prefix", default_prefix)
+class Transfer(SchemaObject):
+    schema = Schema("transfer", [
+        ("from", "string"),
+        ("to", "string"),
+        ("amount", amount_type),
+        ("memo", memo_type),
+    ])
+
+    def prepare(self, kwargs):
         if "memo" not in kwargs:
-            kwargs["memo"] = ""
-        if isinstance(kwargs["memo"], dict):
-            kwargs["memo"]["prefix"] = prefix
-            memo = Optional(Memo(**kwargs["memo"]))
-        elif isinstance(kwargs["memo"], string_types):
-            memo = (String(kwargs["memo"]))
-        else:
-            memo = Optional(Memo(kwargs["memo"]))
+            kwargs = dict(kwargs, memo="")
+        elif isinstance(kwargs["memo"], dict):
+            kwargs["memo"]["prefix"] = kwargs.get("prefix", default_prefix)
+        return kwargs
 
-        super(Transfer, self).__init__(OrderedDict([
-            ('from', String(kwargs["from"])),
-            ('to', String(kwargs["to"])),
-            ('amount', Amount(kwargs["amount"])),
-            ('memo', memo),
-        ]))
 
+class Vote(SchemaObject):
+    schema = Schema("vote", [
+        ("voter", "string"),
+        ("author", "string"),
+        ("permlink", "string"),
+        ("weight", "int16"),
+    ])
 
-class Vote(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Vote, self).__init__(OrderedDict([
-            ('voter', String(kwargs["voter"])),
-            ('author', String(kwargs["author"])),
-            ('permlink', String(kwargs["permlink"])),
-            ('weight', Int16(kwargs["weight"])),
-        ]))
 
+class Transfer_to_vesting(SchemaObject):
+    schema = Schema("transfer_to_vesting", [
+        ("from", "string"),
+        ("to", "string"),
+        ("amount", amount_type),
+    ])
 
-class Transfer_to_vesting(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Transfer_to_vesting, self).__init__(OrderedDict([
-            ('from', String(kwargs["from"])),
-            ('to', String(kwargs["to"])),
-            ('amount', Amount(kwargs["amount"])),
-        ]))
 
+class Withdraw_vesting(SchemaObject):
+    schema = Schema("withdraw_vesting", [
+        ("account", "string"),
+        ("vesting_shares", amount_type),
+    ])
 
-class Withdraw_vesting(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Withdraw_vesting, self).__init__(OrderedDict([
-            ('account', String(kwargs["account"])),
-            ('vesting_shares', Amount(kwargs["vesting_shares"])),
-        ]))
 
+class Account_witness_vote(SchemaObject):
+    schema = Schema("account_witness_vote", [
+        ("account", "string"),
+        ("witness", "string"),
+        ("approve", "bool"),
+    ])
 
-class Account_witness_vote(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Account_witness_vote, self).__init__(OrderedDict([
-            ('account', String(kwargs["account"])),
-            ('witness', String(kwargs["witness"])),
-            ('approve', Bool(bool(kwargs["approve"]))),
-        ]))
+    def prepare(self, kwargs):
+        return dict(kwargs, approve=bool(kwargs["approve"]))
 
 
-class Account_witness_proxy(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Account_witness_proxy, self).__init__(OrderedDict([
-            ('account', String(kwargs["account"])),
-            ('proxy', String(kwargs["proxy"])),
-        ]))
+class Account_witness_proxy(SchemaObject):
+    schema = Schema("account_witness_proxy", [
+        ("account", "string"),
+        ("proxy", "string"),
+    ])
 
 
-class Custom(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Custom, self).__init__(OrderedDict([
-            ('required_auths',
-                Array([String(o) for o in kwargs["required_auths"]])),
-            ('id', Uint16(int(kwargs["id"]))),
-            ('data', String(kwargs["data"])),
-        ]))
+class Custom(SchemaObject):
+    schema = Schema("custom", [
+        ("required_auths", ("array", "string")),
+        ("id", "uint16"),
+        ("data", "string"),
+    ])
 
 
-class Custom_binary(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Custom_binary, self).__init__(OrderedDict([
-            ('id', Uint16(int(kwargs["id"]))),
-            ('data', String(kwargs["data"])),
-        ]))
+class Custom_binary(SchemaObject):
+    schema = Schema("custom_binary", [
+        ("id", "uint16"),
+        ("data", "string"),
+    ])
 
 
 class Op_wrapper(GrapheneObject):
@@ -295,57 +281,45 @@ class Witness_update(GrapheneObject):
         ]))
 
 
-class Comment(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
+class Comment(SchemaObject):
+    schema = Schema("comment", [
+        ("parent_author", "string"),
+        ("parent_permlink", "string"),
+        ("author", "string"),
+        ("permlink", "string"),
+        ("title", "string"),
+        ("body", "string"),
+        ("json_metadata", "string"),
+    ])
+
+    def prepare(self, kwargs):
+        kwargs = dict(kwargs)
         meta = ""
         if "json_metadata" in kwargs and kwargs["json_metadata"]:
             if (isinstance(kwargs["json_metadata"], dict) or isinstance(kwargs["json_metadata"], list)):
                 meta = json.dumps(kwargs["json_metadata"])
             else:
                 meta = kwargs["json_metadata"]
+        kwargs["json_metadata"] = meta
+        return kwargs
 
-        super(Comment, self).__init__(
-            OrderedDict([
-                ('parent_author', String(kwargs["parent_author"])),
-                ('parent_permlink', String(kwargs["parent_permlink"])),
-                ('author', String(kwargs["author"])),
-                ('permlink', String(kwargs["permlink"])),
-                ('title', String(kwargs["title"])),
-                ('body', String(kwargs["body"])),
-                ('json_metadata', String(meta)),
-            ]))
 
+class Custom_json(SchemaObject):
+    schema = Schema("custom_json", [
+        ("required_auths", ("array", "string")),
+        ("required_posting_auths", ("array", "string")),
+        ("id", "string"),
+        ("json", "string"),
+    ])
 
-class Custom_json(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
+    def prepare(self, kwargs):
         if "json" in kwargs and kwargs["json"]:
             if (isinstance(kwargs["json"], dict) or isinstance(kwargs["json"], list)):
-                js = json.dumps(kwargs["json"])
-            else:
-                js = kwargs["json"]
+                kwargs = dict(kwargs, json=json.dumps(kwargs["json"]))
 
         if len(kwargs["id"]) > 32:
             raise Exception("'id' too long")
-
-        super(Custom_json, self).__init__(
-            OrderedDict([
-                ('required_auths',
-                 Array([String(o) for o in kwargs["required_auths"]])),
-                ('required_posting_auths',
-                 Array([
-                     String(o) for o in kwargs["required_posting_auths"]
-                 ])),
-                ('id', String(kwargs["id"])),
-                ('json', String(js)),
-            ]))
+        return kwargs
 
 
 class Comment_options(GrapheneObject):
@@ -358,6 +332,10 @@ class Comment_options(GrapheneObject):
         # handle beneficiaries
         extensions = Array([])
         beneficiaries = kwargs.get('beneficiaries')
+        if not beneficiaries:
+            for ext in kwargs.get('extensions', []):
+                if isinstance(ext, list) and len(ext) == 2 and ext[0] == 0:
+                    beneficiaries = ext[1]['beneficiaries']
         if beneficiaries and type(beneficiaries) == list:
             ext_obj = [0, {'beneficiaries': beneficiaries}]
             ext = CommentOptionExtensions(ext_obj)
@@ -378,17 +356,11 @@ class Comment_options(GrapheneObject):
             ]))
 
 
-class Delete_comment(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Delete_comment, self).__init__(
-            OrderedDict([
-                ('author', String(kwargs["author"])),
-                ('permlink', String(kwargs["permlink"])),
-            ]))
+class Delete_comment(SchemaObject):
+    schema = Schema("delete_comment", [
+        ("author", "string"),
+        ("permlink", "string"),
+    ])
 
 
 class Feed_publish(GrapheneObject):
@@ -404,90 +376,54 @@ class Feed_publish(GrapheneObject):
             ]))
 
 
-class Convert(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Convert, self).__init__(
-            OrderedDict([
-                ('owner', String(kwargs["owner"])),
-                ('requestid', Uint32(kwargs["requestid"])),
-                ('amount', Amount(kwargs["amount"])),
-            ]))
+class Convert(SchemaObject):
+    schema = Schema("convert", [
+        ("owner", "string"),
+        ("requestid", "uint32"),
+        ("amount", amount_type),
+    ])
 
 
-class Set_withdraw_vesting_route(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Set_withdraw_vesting_route, self).__init__(
-            OrderedDict([
-                ('from_account', String(kwargs["from_account"])),
-                ('to_account', String(kwargs["to_account"])),
-                ('percent', Uint16((kwargs["percent"]))),
-                ('auto_vest', Bool(kwargs["auto_vest"])),
-            ]))
+class Set_withdraw_vesting_route(SchemaObject):
+    schema = Schema("set_withdraw_vesting_route", [
+        ("from_account", "string"),
+        ("to_account", "string"),
+        ("percent", "uint16"),
+        ("auto_vest", "bool"),
+    ])
 
 
-class Limit_order_cancel(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Limit_order_cancel, self).__init__(
-            OrderedDict([
-                ('owner', String(kwargs["owner"])),
-                ('orderid', Uint32(kwargs["orderid"])),
-            ]))
+class Limit_order_cancel(SchemaObject):
+    schema = Schema("limit_order_cancel", [
+        ("owner", "string"),
+        ("orderid", "uint32"),
+    ])
 
 
-class Prove_authority(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Prove_authority, self).__init__(
-            OrderedDict([
-                ('challenged', String(kwargs["challenged"])),
-                ('require_owner', Bool(kwargs["require_owner"])),
-            ]))
+class Prove_authority(SchemaObject):
+    schema = Schema("prove_authority", [
+        ("challenged", "string"),
+        ("require_owner", "bool"),
+    ])
 
 
-class Delegate_vesting_shares(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Delegate_vesting_shares, self).__init__(
-            OrderedDict([
-                ('delegator', String(kwargs["delegator"])),
-                ('delegatee', String(kwargs["delegatee"])),
-                ('vesting_shares', Amount(kwargs["vesting_shares"])),
-            ]))
+class Delegate_vesting_shares(SchemaObject):
+    schema = Schema("delegate_vesting_shares", [
+        ("delegator", "string"),
+        ("delegatee", "string"),
+        ("vesting_shares", amount_type),
+    ])
 
 
-class Limit_order_create(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Limit_order_create, self).__init__(
-            OrderedDict([
-                ('owner', String(kwargs["owner"])),
-                ('orderid', Uint32(kwargs["orderid"])),
-                ('amount_to_sell', Amount(kwargs["amount_to_sell"])),
-                ('min_to_receive', Amount(kwargs["min_to_receive"])),
-                ('fill_or_kill', Bool(kwargs["fill_or_kill"])),
-                ('expiration', PointInTime(kwargs["expiration"])),
-            ]))
+class Limit_order_create(SchemaObject):
+    schema = Schema("limit_order_create", [
+        ("owner", "string"),
+        ("orderid", "uint32"),
+        ("amount_to_sell", amount_type),
+        ("min_to_receive", amount_type),
+        ("fill_or_kill", "bool"),
+        ("expiration", "point_in_time"),
+    ])
 
 
 class Limit_order_create2(GrapheneObject):
@@ -507,82 +443,57 @@ class Limit_order_create2(GrapheneObject):
             ]))
 
 
-class Change_recovery_account(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Change_recovery_account, self).__init__(
-            OrderedDict([
-                ('account_to_recover', String(kwargs["account_to_recover"])),
-                ('new_recovery_account', String(kwargs["new_recovery_account"])),
-                ('extensions', Array([])),
-            ]))
+class Change_recovery_account(SchemaObject):
+    schema = Schema("change_recovery_account", [
+        ("account_to_recover", "string"),
+        ("new_recovery_account", "string"),
+        ("extensions", "empty_extensions"),
+    ])
 
 
-class Transfer_from_savings(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
+class Transfer_from_savings(SchemaObject):
+    schema = Schema("transfer_from_savings", [
+        ("from", "string"),
+        ("request_id", "uint32"),
+        ("to", "string"),
+        ("amount", amount_type),
+        ("memo", "string"),
+    ])
+
+    def prepare(self, kwargs):
         if "memo" not in kwargs:
-            kwargs["memo"] = ""
+            kwargs = dict(kwargs, memo="")
+        return kwargs
 
-        super(Transfer_from_savings, self).__init__(
-            OrderedDict([
-                ('from', String(kwargs["from"])),
-                ('request_id', Uint32(kwargs["request_id"])),
-                ('to', String(kwargs["to"])),
-                ('amount', Amount(kwargs["amount"])),
-                ('memo', String(kwargs["memo"])),
-            ]))
 
+class Cancel_transfer_from_savings(SchemaObject):
+    schema = Schema("cancel_transfer_from_savings", [
+        ("from", "string"),
+        ("request_id", "uint32"),
+    ])
 
-class Cancel_transfer_from_savings(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Cancel_transfer_from_savings, self).__init__(
-            OrderedDict([
-                ('from', String(kwargs["from"])),
-                ('request_id', Uint32(kwargs["request_id"])),
-            ]))
 
+class Claim_reward_balance(SchemaObject):
+    schema = Schema("claim_reward_balance", [
+        ("account", "string"),
+        ("reward_steem", amount_type),
+        ("reward_sbd", amount_type),
+        ("reward_vests", amount_type),
+    ])
 
-class Claim_reward_balance(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Claim_reward_balance, self).__init__(
-            OrderedDict([
-                ('account', String(kwargs["account"])),
-                ('reward_steem', Amount(kwargs["reward_steem"])),
-                ('reward_sbd', Amount(kwargs["reward_sbd"])),
-                ('reward_vests', Amount(kwargs["reward_vests"])),
-            ]))
 
+class Transfer_to_savings(SchemaObject):
+    schema = Schema("transfer_to_savings", [
+        ("from", "string"),
+        ("to", "string"),
+        ("amount", amount_type),
+        ("memo", "string"),
+    ])
 
-class Transfer_to_savings(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
+    def prepare(self, kwargs):
         if "memo" not in kwargs:
-            kwargs["memo"] = ""
-        super(Transfer_to_savings, self).__init__(
-            OrderedDict([
-                ('from', String(kwargs["from"])),
-                ('to', String(kwargs["to"])),
-                ('amount', Amount(kwargs["amount"])),
-                ('memo', String(kwargs["memo"])),
-            ]))
+            kwargs = dict(kwargs, memo="")
+        return kwargs
 
 
 class Request_account_recovery(GrapheneObject):
@@ -620,90 +531,73 @@ class Recover_account(GrapheneObject):
             ]))
 
 
-class Escrow_transfer(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
+class Escrow_transfer(SchemaObject):
+    schema = Schema("escrow_transfer", [
+        ("from", "string"),
+        ("to", "string"),
+        ("agent", "string"),
+        ("escrow_id", "uint32"),
+        ("sbd_amount", amount_type),
+        ("steem_amount", amount_type),
+        ("fee", amount_type),
+        ("ratification_deadline", "point_in_time"),
+        ("escrow_expiration", "point_in_time"),
+        ("json_meta", "string"),
+    ])
+
+    def prepare(self, kwargs):
+        kwargs = dict(kwargs)
         meta = ""
         if "json_meta" in kwargs and kwargs["json_meta"]:
             if (isinstance(kwargs["json_meta"], dict) or isinstance(kwargs["json_meta"], list)):
                 meta = json.dumps(kwargs["json_meta"])
             else:
                 meta = kwargs["json_meta"]
-        super(Escrow_transfer, self).__init__(
-            OrderedDict([
-                ('from', String(kwargs["from"])),
-                ('to', String(kwargs["to"])),
-                ('agent', String(kwargs["agent"])),
-                ('escrow_id', Uint32(kwargs["escrow_id"])),
-                ('sbd_amount', Amount(kwargs["sbd_amount"])),
-                ('steem_amount', Amount(kwargs["steem_amount"])),
-                ('fee', Amount(kwargs["fee"])),
-                ('ratification_deadline', PointInTime(kwargs["ratification_deadline"])),
-                ('escrow_expiration', PointInTime(kwargs["escrow_expiration"])),
-                ('json_meta', String(meta)),
-            ]))
-
-
-class Escrow_dispute(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Escrow_dispute, self).__init__(
-            OrderedDict([
-                ('from', String(kwargs["from"])),
-                ('to', String(kwargs["to"])),
-                ('who', String(kwargs["who"])),
-                ('escrow_id', Uint32(kwargs["escrow_id"])),
-            ]))
-
-
-class Escrow_release(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Escrow_release, self).__init__(
-            OrderedDict([
-                ('from', String(kwargs["from"])),
-                ('to', String(kwargs["to"])),
-                ('who', String(kwargs["who"])),
-                ('escrow_id', Uint32(kwargs["escrow_id"])),
-                ('sbd_amount', Amount(kwargs["sbd_amount"])),
-                ('steem_amount', Amount(kwargs["steem_amount"])),
-            ]))
-
-
-class Escrow_approve(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Escrow_approve, self).__init__(
-            OrderedDict([
-                ('from', String(kwargs["from"])),
-                ('to', String(kwargs["to"])),
-                ('agent', String(kwargs["agent"])),
-                ('who', String(kwargs["who"])),
-                ('escrow_id', Uint32(kwargs["escrow_id"])),
-                ('approve', Bool(kwargs["approve"])),
-            ]))
-
-
-class Decline_voting_rights(GrapheneObject):
-    def __init__(self, *args, **kwargs):
-        if check_for_class(self, args):
-            return
-        if len(args) == 1 and len(kwargs) == 0:
-            kwargs = args[0]
-        super(Decline_voting_rights, self).__init__(
-            OrderedDict([
-                ('account', String(kwargs["account"])),
-                ('decline', Bool(kwargs["decline"])),
-            ]))
+        kwargs["json_meta"] = meta
+        return kwargs
+
+
+class Escrow_dispute(SchemaObject):
+    schema = Schema("escrow_dispute", [
+        ("from", "string"),
+        ("to", "string"),
+        ("who", "string"),
+        ("escrow_id", "uint32"),
+    ])
+
+
+class Escrow_release(SchemaObject):
+    schema = Schema("escrow_release", [
+        ("from", "string"),
+        ("to", "string"),
+        ("who", "string"),
+        ("escrow_id", "uint32"),
+        ("sbd_amount", amount_type),
+        ("steem_amount", amount_type),
+    ])
+
+
+class Escrow_approve(SchemaObject):
+    schema = Schema("escrow_approve", [
+        ("from", "string"),
+        ("to", "string"),
+        ("agent", "string"),
+        ("who", "string"),
+        ("escrow_id", "uint32"),
+        ("approve", "bool"),
+    ])
+
+
+class Decline_voting_rights(SchemaObject):
+    schema = Schema("decline_voting_rights", [
+        ("account", "string"),
+        ("decline", "bool"),
+    ])
+
+
+#: Operation classes by operation name
+operation_classes = {}
+for _name in operations:
+    _klass = globals().get(_name[0].upper() + _name[1:])
+    if isinstance(_klass, type) and issubclass(_klass, GrapheneObject):
+        operation_classes[_name] = _klass
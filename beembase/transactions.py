@@ -18,6 +18,18 @@ def getBlockParams(ws):
         witness node!
     """
     dynBCParams = ws.get_dynamic_global_properties()
-    ref_block_num = dynBCParams["head_block_number"] & 0xFFFF
-    ref_block_prefix = struct.unpack_from("<I", unhexlify(dynBCParams["head_block_id"]), 4)[0]
+    return getRefBlockParams(dynBCParams["head_block_id"], dynBCParams["head_block_number"])
+
+
+def getRefBlockParams(block_id, block_num=None):
+    """ Returns ``ref_block_num`` and ``ref_block_prefix`` of a block
+
+        :param str block_id: id of the reference block
+        :param int block_num: number of the reference block (default is the
+            number, which is stored in the first four bytes of the block id)
+    """
+    if block_num is None:
+        block_num = int(block_id[:8], 16)
+    ref_block_num = block_num & 0xFFFF
+    ref_block_prefix = struct.unpack_from("<I", unhexlify(block_id), 4)[0]
     return ref_block_num, ref_block_prefix
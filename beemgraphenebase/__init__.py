@@ -10,12 +10,15 @@ from .version import version as __version__
 __all__ = ['account',
            'base58',
            'bip38',
+           'deserializer',
            'transactions',
            'types',
            'ecdasig',
            'chains',
            'objects',
            'operations',
+           'schema',
            'signedtransactions',
+           'signatureverifier',
            'objecttypes',
            'py23']
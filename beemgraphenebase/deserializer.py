@@ -0,0 +1,184 @@
+"""Deserialization of the graphene wire format.
+
+Every reader takes the serialized data as ``bytearray`` and the offset of
+the value and returns the decoded value together with the offset of the
+next value. The decoded values have the json representation, which is
+accepted by the classes in :mod:`beemgraphenebase.types`, so that
+serializing them again gives the original bytes.
+"""
+# encoding=utf8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from builtins import bytes
+from builtins import str
+import struct
+from binascii import hexlify
+from datetime import datetime, timedelta
+from .base58 import Base58
+
+timeformat = '%Y-%m-%dT%H:%M:%S'
+epoch = datetime(1970, 1, 1)
+
+_uint8 = struct.Struct("<B")
+_int16 = struct.Struct("<h")
+_uint16 = struct.Struct("<H")
+_uint32 = struct.Struct("<I")
+_uint64 = struct.Struct("<Q")
+_int64 = struct.Struct("<q")
+
+
+def read_varint(data, offset):
+    """Reads a varint"""
+    shift = 0
+    result = 0
+    while True:
+        b = data[offset]
+        offset += 1
+        result |= ((b & 0x7f) << shift)
+        if not (b & 0x80):
+            return result, offset
+        shift += 7
+
+
+def read_uint8(data, offset):
+    return _uint8.unpack_from(data, offset)[0], offset + 1
+
+
+def read_int16(data, offset):
+    return _int16.unpack_from(data, offset)[0], offset + 2
+
+
+def read_uint16(data, offset):
+    return _uint16.unpack_from(data, offset)[0], offset + 2
+
+
+def read_uint32(data, offset):
+    return _uint32.unpack_from(data, offset)[0], offset + 4
+
+
+def read_uint64(data, offset):
+    return _uint64.unpack_from(data, offset)[0], offset + 8
+
+
+def read_int64(data, offset):
+    return _int64.unpack_from(data, offset)[0], offset + 8
+
+
+def read_bool(data, offset):
+    """Reads a Bool"""
+    return data[offset] != 0, offset + 1
+
+
+def read_string(data, offset):
+    """Reads a String"""
+    length, offset = read_varint(data, offset)
+    end = offset + length
+    if end > len(data):
+        raise ValueError("String exceeds the data length")
+    return data[offset:end].decode("utf-8"), end
+
+
+def read_bytes(data, offset):
+    """Reads Bytes, the result is hex encoded"""
+    length, offset = read_varint(data, offset)
+    end = offset + length
+    if end > len(data):
+        raise ValueError("Bytes exceed the data length")
+    return hexlify(bytes(data[offset:end])).decode("ascii"), end
+
+
+def read_point_in_time(data, offset):
+    """Reads a PointInTime"""
+    unixtime, offset = read_uint32(data, offset)
+    return (epoch + timedelta(seconds=unixtime)).strftime(timeformat), offset
+
+
+def read_signature(data, offset):
+    """Reads a compact signature of 65 bytes, the result is hex encoded"""
+    end = offset + 65
+    if end > len(data):
+        raise ValueError("Signature exceeds the data length")
+    return hexlify(bytes(data[offset:end])).decode("ascii"), end
+
+
+def read_public_key(data, offset, prefix="STM"):
+    """Reads a compressed PublicKey and returns it in its base58 representation"""
+    end = offset + 33
+    if end > len(data):
+        raise ValueError("PublicKey exceeds the data length")
+    return format(Base58(hexlify(bytes(data[offset:end])).decode("ascii"), prefix=prefix), prefix), end
+
+
+def read_array(data, offset, read_item):
+    """ Reads an Array (or Set)
+
+        :param function read_item: reader of a single item
+    """
+    length, offset = read_varint(data, offset)
+    result = []
+    for i in range(length):
+        item, offset = read_item(data, offset)
+        result.append(item)
+    return result, offset
+
+
+def read_map(data, offset, read_key, read_value):
+    """ Reads a Map as list of ``[key, value]`` pairs
+
+        :param function read_key: reader of a key
+        :param function read_value: reader of a value
+    """
+    length, offset = read_varint(data, offset)
+    result = []
+    for i in range(length):
+        key, offset = read_key(data, offset)
+        value, offset = read_value(data, offset)
+        result.append([key, value])
+    return result, offset
+
+
+def read_optional(data, offset, read_item):
+    """ Reads an Optional, None is returned when it is not set
+
+        :param function read_item: reader of the value
+    """
+    is_set, offset = read_bool(data, offset)
+    if not is_set:
+        return None, offset
+    return read_item(data, offset)
+
+
+def read_static_variant(data, offset, readers):
+    """ Reads a Static_variant as ``[type_id, value]``
+
+        :param dict readers: reader for every known type id
+    """
+    type_id, offset = read_varint(data, offset)
+    if type_id not in readers:
+        raise ValueError("Unknown static variant type id %d" % type_id)
+    value, offset = readers[type_id](data, offset)
+    return [type_id, value], offset
+
+
+def read_empty_extensions(data, offset):
+    """ Reads an extension Array, which has to be empty as no
+        extension type is known
+    """
+    length, offset = read_varint(data, offset)
+    if length != 0:
+        raise ValueError("Unknown extensions")
+    return [], offset
+
+
+def read_fields(data, offset, fields):
+    """ Reads an object, whose members are serialized one after another
+
+        :param list fields: list of ``(name, reader)`` tuples
+    """
+    result = {}
+    for name, read_item in fields:
+        result[name], offset = read_item(data, offset)
+    return result, offset
@@ -38,7 +38,7 @@ if not SECP256K1_MODULE:
         from cryptography.hazmat.primitives import hashes
         from cryptography.hazmat.primitives.asymmetric import ec
         from cryptography.hazmat.primitives.asymmetric.utils \
-            import decode_dss_signature, encode_dss_signature
+            import decode_dss_signature, encode_dss_signature, Prehashed
         from cryptography.exceptions import InvalidSignature
         CRYPTOGRAPHY_AVAILABLE = True
     except ImportError:
@@ -108,6 +108,139 @@ def recover_public_key(digest, signature, i, message=None):
         return ecdsa.VerifyingKey.from_public_point(Q, curve=ecdsa.SECP256k1)
 
 
+_CURVE_P = ecdsa.SECP256k1.curve.p()
+_CURVE_N = ecdsa.SECP256k1.order
+_CURVE_G = (ecdsa.SECP256k1.generator.x(), ecdsa.SECP256k1.generator.y())
+_secp256k1_pub = None
+
+
+def _jacobian_double(p):
+    X, Y, Z = p
+    if Y == 0 or Z == 0:
+        return 0, 1, 0
+    P = _CURVE_P
+    YY = Y * Y % P
+    S = 4 * X * YY % P
+    M = 3 * X * X % P
+    X3 = (M * M - 2 * S) % P
+    return X3, (M * (S - X3) - 8 * YY * YY) % P, 2 * Y * Z % P
+
+
+def _jacobian_add(p1, p2):
+    if p1[2] == 0:
+        return p2
+    if p2[2] == 0:
+        return p1
+    P = _CURVE_P
+    X1, Y1, Z1 = p1
+    X2, Y2, Z2 = p2
+    Z1Z1 = Z1 * Z1 % P
+    Z2Z2 = Z2 * Z2 % P
+    U1 = X1 * Z2Z2 % P
+    U2 = X2 * Z1Z1 % P
+    S1 = Y1 * Z2 * Z2Z2 % P
+    S2 = Y2 * Z1 * Z1Z1 % P
+    if U1 == U2:
+        if S1 != S2:
+            return 0, 1, 0
+        return _jacobian_double(p1)
+    H = (U2 - U1) % P
+    R = (S2 - S1) % P
+    HH = H * H % P
+    HHH = H * HH % P
+    V = U1 * HH % P
+    X3 = (R * R - HHH - 2 * V) % P
+    return X3, (R * (V - X3) - S1 * HHH) % P, H * Z1 * Z2 % P
+
+
+def _mul_add(k1, p1, k2, p2):
+    """ Returns ``k1 * p1 + k2 * p2`` for affine points with Shamir's trick"""
+    j1 = (p1[0], p1[1], 1)
+    j2 = (p2[0], p2[1], 1)
+    table = [None, j1, j2, _jacobian_add(j1, j2)]
+    result = (0, 1, 0)
+    for bit in range(max(k1.bit_length(), k2.bit_length()) - 1, -1, -1):
+        result = _jacobian_double(result)
+        index = ((k1 >> bit) & 1) | (((k2 >> bit) & 1) << 1)
+        if index:
+            result = _jacobian_add(result, table[index])
+    X, Y, Z = result
+    if Z == 0:
+        return None
+    P = _CURVE_P
+    z_inv = pow(Z, P - 2, P)
+    z_inv2 = z_inv * z_inv % P
+    return X * z_inv2 % P, Y * z_inv2 * z_inv % P
+
+
+def _bytes_to_int(data):
+    return int(hexlify(data), 16)
+
+
+def _recover_point(digest, signature, i):
+    """ Recovers the public key point of a 64 byte signature and the recovery
+        parameter i. The signature is valid for the returned key by
+        construction, so that no further verification is needed.
+    """
+    P = _CURVE_P
+    N = _CURVE_N
+    r = _bytes_to_int(signature[:32])
+    s = _bytes_to_int(signature[32:64])
+    if not 0 < r < N or not 0 < s < N or not 0 <= i < 4:
+        return None
+    x = r + (i // 2) * N
+    if x >= P:
+        return None
+    alpha = (x * x * x + 7) % P
+    beta = pow(alpha, (P + 1) // 4, P)
+    if beta * beta % P != alpha:
+        return None
+    y = beta if beta % 2 == i % 2 else P - beta
+    e = _bytes_to_int(digest) % N
+    r_inv = pow(r, N - 2, N)
+    u1 = -e * r_inv % N
+    u2 = s * r_inv % N
+    return _mul_add(u1, _CURVE_G, u2, (x, y))
+
+
+def recover_pubkey_from_digest(digest, signature):
+    """ Returns the compressed public key, which has created a compact signature
+
+        :param bytes digest: 32 byte sha256 digest of the signed message
+        :param bytes signature: 65 byte signature, the first byte contains the
+            recovery parameter
+
+        The embedded recovery parameter is used, so that only one public key
+        is recovered. None is returned for an invalid signature.
+        On the ``ecdsa`` and ``cryptography`` backends, the key is recovered
+        with jacobian coordinates and Shamir's trick. No verification is
+        needed afterwards, as the signature is valid for the recovered key
+        by construction.
+    """
+    global _secp256k1_pub
+    signature = py23_bytes(signature)
+    if len(signature) != 65:
+        return None
+    i = bytearray(signature)[0] - 4 - 27
+    if not 0 <= i < 4:
+        return None
+    if SECP256K1_MODULE == "secp256k1":
+        if _secp256k1_pub is None:
+            _secp256k1_pub = secp256k1.PublicKey(
+                flags=secp256k1.lib.SECP256K1_CONTEXT_VERIFY | secp256k1.lib.SECP256K1_CONTEXT_SIGN)
+        try:
+            sig = _secp256k1_pub.ecdsa_recoverable_deserialize(signature[1:], i)
+            # the context is shared, creating a new one is expensive
+            p = secp256k1.PublicKey(_secp256k1_pub.ecdsa_recover(digest, sig, raw=True), ctx=_secp256k1_pub.ctx)
+        except Exception:
+            return None
+        return p.serialize(compressed=True)
+    point = _recover_point(digest, signature[1:], i)
+    if point is None:
+        return None
+    return py23_bytes(chr(2 + (point[1] & 1)), 'ascii') + ecdsa.util.number_to_string(point[0], _CURVE_N)
+
+
 def recoverPubkeyParameter(message, digest, signature, pubkey):
     """ Use to derive a number that allows to easily recover the
         public key from the signature
@@ -140,117 +273,147 @@ def recoverPubkeyParameter(message, digest, signature, pubkey):
     return None
 
 
-def sign_message(message, wif, hashfn=hashlib.sha256):
-    """ Sign a digest with a wif key
+class Signer(object):
+    """ Signs digests with one private key, which is loaded only once
+
+        :param str wif: Private key in wif format or as
+            :class:`beemgraphenebase.account.PrivateKey`
+
+        The key handle of the backend and the public key point are kept, so
+        that signing many transactions with the same key does not parse the
+        wif and derive the backend key again. The recovery parameter is
+        computed from the signature and the public key point instead of
+        recovering all four candidates.
+
+        .. code-block:: python
+
+            from beemgraphenebase.ecdsasig import Signer
+            signer = Signer("5J4KCbg1G3my9b9hCaQXnHSm6vrwW9xQTJS6ZciW2Kek7cCkCEk")
+            signatures = signer.sign_digests(digests)
 
-        :param str wif: Private key in
     """
+    def __init__(self, wif):
+        if isinstance(wif, PrivateKey):
+            self.private_key = wif
+        else:
+            self.private_key = PrivateKey(wif)
+        self.module = SECP256K1_MODULE
+        self._secret_bytes = py23_bytes(self.private_key)
+        self._secret = _bytes_to_int(self._secret_bytes)
+        self._point = _mul_add(self._secret, _CURVE_G, 0, _CURVE_G)
+        if self.module == "secp256k1":
+            self._key = secp256k1.PrivateKey(self._secret_bytes, raw=True)
+            self._ndata = secp256k1.ffi.new("const int *ndata")
+        elif self.module == "cryptography":
+            self._key = ec.derive_private_key(self._secret, ec.SECP256K1(), default_backend())
+        else:
+            self._key = None
 
-    if not isinstance(message, bytes_types):
-        message = py23_bytes(message, "utf-8")
+    def __eq__(self, other):
+        return isinstance(other, Signer) and self._secret == other._secret
 
-    digest = hashfn(message).digest()
-    priv_key = PrivateKey(wif)
-    if SECP256K1_MODULE == "secp256k1":
-        p = py23_bytes(priv_key)
-        ndata = secp256k1.ffi.new("const int *ndata")
-        ndata[0] = 0
-        while True:
-            ndata[0] += 1
-            privkey = secp256k1.PrivateKey(p, raw=True)
-            sig = secp256k1.ffi.new('secp256k1_ecdsa_recoverable_signature *')
-            signed = secp256k1.lib.secp256k1_ecdsa_sign_recoverable(
-                privkey.ctx,
-                sig,
-                digest,
-                privkey.private_key,
-                secp256k1.ffi.NULL,
-                ndata
-            )
-            if not signed == 1:
-                raise AssertionError()
-            signature, i = privkey.ecdsa_recoverable_serialize(sig)
-            if _is_canonical(signature):
-                i += 4   # compressed
-                i += 27  # compact
-                break
-    elif SECP256K1_MODULE == "cryptography":
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._secret)
+
+    @property
+    def pubkey(self):
+        """ Returns the compressed public key as bytes"""
+        return py23_bytes(chr(2 + (self._point[1] & 1)), 'ascii') + ecdsa.util.number_to_string(self._point[0], _CURVE_N)
+
+    def _recovery_parameter(self, digest, r, s):
+        """ Derives the recovery parameter from ``R = s^-1 * (e * G + r * Q)``"""
+        N = _CURVE_N
+        e = _bytes_to_int(digest) % N
+        s_inv = pow(s, N - 2, N)
+        point = _mul_add(e * s_inv % N, _CURVE_G, r * s_inv % N, self._point)
+        return (point[1] & 1) | (2 if point[0] != r else 0)
+
+    def sign_digest(self, digest):
+        """ Returns the 65 byte compact signature of a digest
+
+            :param bytes digest: 32 byte sha256 digest
+        """
+        digest = py23_bytes(digest)
+        N = _CURVE_N
         cnt = 0
-        private_key = ec.derive_private_key(int(repr(priv_key), 16), ec.SECP256K1(), default_backend())
-        public_key = private_key.public_key()
         while True:
             cnt += 1
             if not cnt % 20:
                 log.info("Still searching for a canonical signature. Tried %d times already!" % cnt)
-            order = ecdsa.SECP256k1.order
-            sigder = private_key.sign(message, ec.ECDSA(hashes.SHA256()))
-            r, s = decode_dss_signature(sigder)
-            signature = ecdsa.util.sigencode_string(r, s, order)
-            # Make sure signature is canonical!
-            #
-            sigder = bytearray(sigder)
-            lenR = sigder[3]
-            lenS = sigder[5 + lenR]
-            if lenR is 32 and lenS is 32:
-                # Derive the recovery parameter
+            if self.module == "secp256k1":
+                self._ndata[0] = cnt
+                sig = secp256k1.ffi.new('secp256k1_ecdsa_recoverable_signature *')
+                signed = secp256k1.lib.secp256k1_ecdsa_sign_recoverable(
+                    self._key.ctx,
+                    sig,
+                    digest,
+                    self._key.private_key,
+                    secp256k1.ffi.NULL,
+                    self._ndata
+                )
+                if not signed == 1:
+                    raise AssertionError()
+                signature, i = self._key.ecdsa_recoverable_serialize(sig)
+            elif self.module == "cryptography":
+                sigder = self._key.sign(digest, ec.ECDSA(Prehashed(hashes.SHA256())))
+                r, s = decode_dss_signature(sigder)
+                signature = ecdsa.util.sigencode_string(r, s, N)
+                if not _is_canonical(signature):
+                    continue
+                i = self._recovery_parameter(digest, r, s)
+            else:
+                # Deterministic k
                 #
-                i = recoverPubkeyParameter(
-                    message, digest, signature, public_key)
-                i += 4   # compressed
-                i += 27  # compact
+                k = ecdsa.rfc6979.generate_k(
+                    N,
+                    self._secret,
+                    hashlib.sha256,
+                    hashlib.sha256(
+                        digest +
+                        struct.pack("d", time.time())  # use the local time to randomize the signature
+                    ).digest())
+                point = _mul_add(k, _CURVE_G, 0, _CURVE_G)
+                r = point[0] % N
+                s = pow(k, N - 2, N) * (_bytes_to_int(digest) + r * self._secret) % N
+                if r == 0 or s == 0:
+                    continue
+                signature = ecdsa.util.sigencode_string(r, s, N)
+                i = (point[1] & 1) | (2 if point[0] >= N else 0)
+            if _is_canonical(signature):
                 break
-    else:
-        cnt = 0
-        p = py23_bytes(priv_key)
-        sk = ecdsa.SigningKey.from_string(p, curve=ecdsa.SECP256k1)
-        while 1:
-            cnt += 1
-            if not cnt % 20:
-                log.info("Still searching for a canonical signature. Tried %d times already!" % cnt)
+        i += 4   # compressed
+        i += 27  # compact
+        return struct.pack("<B", i) + signature
 
-            # Deterministic k
-            #
-            k = ecdsa.rfc6979.generate_k(
-                sk.curve.generator.order(),
-                sk.privkey.secret_multiplier,
-                hashlib.sha256,
-                hashlib.sha256(
-                    digest +
-                    struct.pack("d", time.time())  # use the local time to randomize the signature
-                ).digest())
-
-            # Sign message
-            #
-            sigder = sk.sign_digest(
-                digest,
-                sigencode=ecdsa.util.sigencode_der,
-                k=k)
-
-            # Reformating of signature
-            #
-            r, s = ecdsa.util.sigdecode_der(sigder, sk.curve.generator.order())
-            signature = ecdsa.util.sigencode_string(r, s, sk.curve.generator.order())
-
-            # Make sure signature is canonical!
-            #
-            sigder = bytearray(sigder)
-            lenR = sigder[3]
-            lenS = sigder[5 + lenR]
-            if lenR is 32 and lenS is 32:
-                # Derive the recovery parameter
-                #
-                i = recoverPubkeyParameter(
-                    message, digest, signature, sk.get_verifying_key())
-                i += 4   # compressed
-                i += 27  # compact
-                break
+    def sign_digests(self, digests):
+        """ Returns the compact signatures of many digests
+
+            :param list digests: list of 32 byte sha256 digests
+        """
+        return [self.sign_digest(digest) for digest in digests]
 
-    # pack signature
-    #
-    sigstr = struct.pack("<B", i)
-    sigstr += signature
+    def sign_message(self, message, hashfn=hashlib.sha256):
+        """ Returns the compact signature of a message
 
-    return sigstr
+            :param message: message as bytes or str
+        """
+        if not isinstance(message, bytes_types):
+            message = py23_bytes(message, "utf-8")
+        return self.sign_digest(hashfn(message).digest())
+
+
+def sign_message(message, wif, hashfn=hashlib.sha256):
+    """ Sign a digest with a wif key
+
+        :param str wif: Private key in
+
+        For signing many messages with the same key, use
+        :class:`beemgraphenebase.ecdsasig.Signer`.
+    """
+    return Signer(wif).sign_message(message, hashfn)
 
 
 def verify_message(message, signature, hashfn=hashlib.sha256, recover_parameter=None):
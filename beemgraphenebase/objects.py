@@ -12,7 +12,7 @@ from beemgraphenebase.types import (
     Varint32, Int64, String, Bytes, Void,
     Array, PointInTime, Signature, Bool,
     Set, Fixed_array, Optional, Static_variant,
-    Map, Id, JsonObj
+    Map, Id, JsonObj, varint, write_bytes, to_bytes
 )
 from .py23 import py23_bytes, bytes_types, integer_types, string_types
 from .chains import known_chains
@@ -60,7 +60,12 @@ class Operation(object):
         return class_
 
     def __bytes__(self):
-        return py23_bytes(Id(self.opId)) + py23_bytes(self.op)
+        return to_bytes(self)
+
+    def write(self, buf):
+        """ Appends the operation id and the operation to buf"""
+        buf.extend(varint(self.opId))
+        write_bytes(buf, self.op)
 
     def __str__(self):
         return json.dumps([self.opId, self.op.toJson()])
@@ -74,6 +79,7 @@ class GrapheneObject(object):
 
         * ``instance.__json__()``: encodes data into json format
         * ``bytes(instance)``: encodes data into wire format
+        * ``instance.write(buf)``: appends the wire format to a bytearray
         * ``str(instances)``: dumps json object as string
 
     """
@@ -83,13 +89,21 @@ class GrapheneObject(object):
     def __bytes__(self):
         if self.data is None:
             return py23_bytes()
-        b = b""
-        for name, value in list(self.data.items()):
+        return to_bytes(self)
+
+    def write(self, buf):
+        """ Appends the wire format of all fields to the bytearray buf
+
+            Nested objects and types append into the same buffer, so that
+            the object is serialized in a single pass.
+        """
+        if self.data is None:
+            return
+        for value in self.data.values():
             if isinstance(value, string_types):
-                b += py23_bytes(value, 'utf-8')
+                buf.extend(py23_bytes(value, 'utf-8'))
             else:
-                b += py23_bytes(value)
-        return b
+                write_bytes(buf, value)
 
     def __json__(self):
         if self.data is None:
@@ -118,5 +132,59 @@ class GrapheneObject(object):
         return self.__json__()
 
 
+class SchemaObject(GrapheneObject):
+    """ GrapheneObject, whose fields are declared once in the class attribute
+        ``schema`` (:class:`beemgraphenebase.schema.Schema`)
+
+        Only the normalized field values are stored. They are encoded by the
+        compiled encoder of the schema without creating the objects of
+        :mod:`beemgraphenebase.types`. These objects are only built when
+        ``data`` is accessed, the object is serialized from them afterwards,
+        so that changes of ``data`` are kept.
+    """
+    schema = None
+
+    def __init__(self, *args, **kwargs):
+        if isArgsThisClass(self, args):
+            self._values = args[0]._values
+            self._data = args[0]._data
+            return
+        if len(args) == 1 and len(kwargs) == 0:
+            kwargs = args[0]
+        self._values = self.schema.normalize(self.prepare(kwargs))
+        self._data = None
+
+    def prepare(self, kwargs):
+        """ Returns the given values with defaults and converted values, which
+            are then normalized by the schema
+        """
+        return kwargs
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = self.schema.wrap(self._values)
+        self._values = None
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._values = None
+
+    def __bytes__(self):
+        return to_bytes(self)
+
+    def write(self, buf):
+        if self._values is None:
+            return super(SchemaObject, self).write(buf)
+        self.schema.encode(buf, self._values)
+
+    def __json__(self):
+        if self._values is None:
+            return super(SchemaObject, self).__json__()
+        return self.schema.to_json(self._values)
+
+
 def isArgsThisClass(self, args):
     return (len(args) == 1 and type(args[0]).__name__ == type(self).__name__)
@@ -0,0 +1,226 @@
+"""Object schemas, which are declared once as data.
+
+A schema is a list of ``(name, type)`` tuples. The functions, which
+normalize the given values, encode them into the wire format, decode them
+and return their json representation, are compiled once per schema, so
+that objects with a schema keep a tuple of plain values instead of one
+wrapper object of :mod:`beemgraphenebase.types` per field.
+
+.. code-block:: python
+
+    from beemgraphenebase.schema import Schema
+    vote = Schema("vote", [
+        ("voter", "string"),
+        ("author", "string"),
+        ("permlink", "string"),
+        ("weight", "int16"),
+    ])
+    values = vote.normalize({"voter": "a", "author": "b", "permlink": "c", "weight": 10000})
+    buf = bytearray()
+    vote.encode(buf, values)
+
+"""
+# encoding=utf8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from builtins import str
+from builtins import object
+from builtins import int
+import json
+import struct
+from collections import OrderedDict
+from .types import (
+    Uint8, Int16, Uint16, Uint32, Uint64, Int64, String, Array, PointInTime, Bool,
+    varint, write_string, pack_point_in_time
+)
+from .deserializer import (
+    read_uint8, read_int16, read_uint16, read_uint32, read_uint64, read_int64,
+    read_bool, read_string, read_point_in_time, read_array, read_empty_extensions
+)
+
+
+def _identity(value):
+    return value
+
+
+def json_value(value):
+    """ Returns the json representation of a value, in the same way as
+        :class:`beemgraphenebase.objects.GrapheneObject`
+    """
+    try:
+        return json.loads(str(value))
+    except Exception:
+        return value.__str__()
+
+
+class FieldType(object):
+    """ Describes how values of one field type are handled
+
+        :param function normalize: converts a given value into the stored value
+            (default keeps the value)
+        :param function write: appends a stored value to a bytearray
+        :param function to_json: returns the json representation of a stored value
+        :param function wrap: returns the :mod:`beemgraphenebase.types` object of a
+            stored value
+        :param function read: reader of :mod:`beemgraphenebase.deserializer`
+        :param str inline: python expression, which appends the stored value
+            ``{v}`` to ``buf``. It is compiled into the encoder instead of
+            calling ``write``.
+        :param struct.Struct packer: packer which is available as ``_packer``
+            in ``inline``
+        :param bool constant: when True, the field is not read from the given
+            values and ``normalize`` is called with None
+    """
+    def __init__(self, normalize=None, write=None, to_json=None, wrap=None, read=None,
+                 inline=None, packer=None, constant=False):
+        self.normalize = normalize
+        self.write = write
+        self.to_json = to_json or _identity
+        self.wrap = wrap or _identity
+        self.read = read
+        self.inline = inline
+        self.packer = packer
+        self.constant = constant
+
+
+def _struct_type(fmt, wrap, read):
+    packer = struct.Struct(fmt)
+    return FieldType(normalize=int, to_json=int, wrap=wrap, read=read,
+                     write=lambda buf, value: buf.extend(packer.pack(value)),
+                     inline="buf.extend(_packer.pack({v}))", packer=packer)
+
+
+def array_type(item_type):
+    """ Returns the type of an Array with items of ``item_type``"""
+    item_type = get_field_type(item_type)
+    item_normalize = item_type.normalize or _identity
+    item_write = item_type.write
+    item_json = item_type.to_json
+    item_wrap = item_type.wrap
+    item_read = item_type.read
+
+    def write(buf, value):
+        buf.extend(varint(len(value)))
+        for item in value:
+            item_write(buf, item)
+
+    return FieldType(
+        normalize=lambda value: [item_normalize(item) for item in value],
+        write=write,
+        to_json=lambda value: [item_json(item) for item in value],
+        wrap=lambda value: Array([item_wrap(item) for item in value]),
+        read=lambda data, offset: read_array(data, offset, item_read))
+
+
+#: Known field types by name
+field_types = {
+    "uint8": _struct_type("<B", Uint8, read_uint8),
+    "int16": _struct_type("<h", Int16, read_int16),
+    "uint16": _struct_type("<H", Uint16, read_uint16),
+    "uint32": _struct_type("<I", Uint32, read_uint32),
+    "uint64": _struct_type("<Q", Uint64, read_uint64),
+    "int64": _struct_type("<q", Int64, read_int64),
+    "bool": FieldType(normalize=int, to_json=bool, wrap=Bool, read=read_bool,
+                      write=lambda buf, value: buf.extend(struct.pack("<B", value)),
+                      inline="buf.extend(_packer.pack({v}))", packer=struct.Struct("<B")),
+    "string": FieldType(write=write_string, to_json=str, wrap=String, read=read_string,
+                        inline="write_string(buf, {v})"),
+    "point_in_time": FieldType(write=lambda buf, value: buf.extend(pack_point_in_time(value)),
+                               to_json=str, wrap=PointInTime, read=read_point_in_time,
+                               inline="buf.extend(pack_point_in_time({v}))"),
+    "empty_extensions": FieldType(normalize=lambda value: [], write=lambda buf, value: buf.append(0),
+                                  to_json=lambda value: [], wrap=lambda value: Array([]),
+                                  read=read_empty_extensions, inline="buf.append(0)", constant=True),
+}
+
+
+def get_field_type(field_type):
+    """ Returns a :class:`FieldType` for a name, a ``("array", item_type)`` tuple
+        or a :class:`FieldType`
+    """
+    if isinstance(field_type, FieldType):
+        return field_type
+    if isinstance(field_type, (tuple, list)) and len(field_type) == 2 and field_type[0] == "array":
+        return array_type(field_type[1])
+    if field_type not in field_types:
+        raise ValueError("Unknown field type %s" % str(field_type))
+    return field_types[field_type]
+
+
+class Schema(object):
+    """ Compiles the functions of an object, whose fields are declared as data
+
+        :param str name: name of the object, e.g. the operation name
+        :param list fields: list of ``(name, type)`` tuples in wire order. A
+            type is the name of a type in :data:`field_types`, a
+            ``("array", type)`` tuple or a :class:`FieldType`.
+
+        The compiled functions are
+
+        * ``normalize(kwargs)``: returns the tuple of stored values
+        * ``encode(buf, values)``: appends the wire format to a bytearray
+        * ``decode(data, offset, prefix)``: reads the json representation from
+          serialized data and returns it together with the next offset
+        * ``to_json(values)``: returns the json representation
+    """
+    def __init__(self, name, fields):
+        self.name = name
+        self.names = tuple(field_name for field_name, field_type in fields)
+        self.types = tuple(get_field_type(field_type) for field_name, field_type in fields)
+        self._compile()
+
+    def _compile(self):
+        namespace = {"write_string": write_string, "pack_point_in_time": pack_point_in_time}
+        normalize = []
+        encode = []
+        decode = []
+        to_json = []
+        for i, (name, field_type) in enumerate(zip(self.names, self.types)):
+            namespace["_normalize%d" % i] = field_type.normalize
+            namespace["_write%d" % i] = field_type.write
+            namespace["_json%d" % i] = field_type.to_json
+            namespace["_read%d" % i] = field_type.read
+            namespace["_packer%d" % i] = field_type.packer
+            if field_type.constant:
+                normalize.append("_normalize%d(None)" % i)
+            elif field_type.normalize is None:
+                normalize.append("kwargs[%r]" % name)
+            else:
+                normalize.append("_normalize%d(kwargs[%r])" % (i, name))
+            if field_type.inline:
+                encode.append("    " + field_type.inline.replace("_packer", "_packer%d" % i).format(v="values[%d]" % i))
+            else:
+                encode.append("    _write%d(buf, values[%d])" % (i, i))
+            decode.append("    result[%r], offset = _read%d(data, offset)" % (name, i))
+            to_json.append("    result[%r] = _json%d(values[%d])" % (name, i, i))
+        source = "\n".join([
+            "def normalize(kwargs):",
+            "    return (%s)" % "".join(n + ", " for n in normalize),
+            "",
+            "def encode(buf, values):",
+        ] + (encode or ["    pass"]) + [
+            "",
+            "def decode(data, offset, prefix=None):",
+            "    result = {}",
+        ] + decode + [
+            "    return result, offset",
+            "",
+            "def to_json(values):",
+            "    result = {}",
+        ] + to_json + [
+            "    return result",
+        ]) + "\n"
+        exec(compile(source, "<schema %s>" % self.name, "exec"), namespace)
+        self.source = source
+        self.normalize = namespace["normalize"]
+        self.encode = namespace["encode"]
+        self.decode = namespace["decode"]
+        self.to_json = namespace["to_json"]
+
+    def wrap(self, values):
+        """ Returns the fields as OrderedDict of :mod:`beemgraphenebase.types` objects"""
+        return OrderedDict([(name, field_type.wrap(value))
+                            for name, field_type, value in zip(self.names, self.types, values)])
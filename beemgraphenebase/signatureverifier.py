@@ -0,0 +1,151 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from builtins import range
+from binascii import hexlify
+from collections import OrderedDict
+import threading
+from . import ecdsasig
+from .py23 import py23_bytes
+FUTURES_MODULE = None
+if not FUTURES_MODULE:
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+        FUTURES_MODULE = "futures"
+    except ImportError:
+        FUTURES_MODULE = None
+
+
+def _recover_items(items, module):
+    """ Recovers the public keys of ``(digest, signature)`` pairs in a worker process"""
+    ecdsasig.SECP256K1_MODULE = module
+    return [ecdsasig.recover_pubkey_from_digest(digest, signature) for digest, signature in items]
+
+
+class SignatureVerifier(object):
+    """ Recovers the public keys of many signatures at once
+
+        :param int processes: number of worker processes. With 1 or less, all
+            signatures are recovered in the calling process (default is 1)
+        :param int cache_size: maximum number of stored public keys (default is 100000)
+        :param int chunk_size: number of signatures, which are sent to a worker
+            process at once (default is 64)
+
+        The recovery parameter, which is embedded in every signature, is used
+        directly, see :func:`beemgraphenebase.ecdsasig.recover_pubkey_from_digest`.
+        Recovered public keys are stored by digest and signature, so that a
+        signature which is verified again, e.g. when a block is read twice,
+        is not recovered again.
+
+        .. code-block:: python
+
+            from beembase.signedtransactions import Signed_Transaction
+            from beemgraphenebase.signatureverifier import SignatureVerifier
+            with SignatureVerifier(processes=4) as verifier:
+                txs = [Signed_Transaction(**tx) for tx in block["transactions"]]
+                pubkeys = verifier.verify_transactions(txs, chain="STEEM")
+
+    """
+    def __init__(self, processes=1, cache_size=100000, chunk_size=64):
+        self.processes = processes
+        self.cache_size = cache_size
+        self.chunk_size = chunk_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """ Stops the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def clear(self):
+        """ Removes all stored public keys"""
+        with self._lock:
+            self._cache.clear()
+
+    def recover(self, items):
+        """ Returns the compressed public keys of ``(digest, signature)`` pairs
+
+            :param list items: pairs of a 32 byte sha256 digest and a 65 byte signature
+            :returns: list of compressed public keys as bytes, None for an invalid signature
+        """
+        keys = [py23_bytes(digest) + py23_bytes(signature) for digest, signature in items]
+        results = [None] * len(keys)
+        todo = OrderedDict()
+        with self._lock:
+            for index, key in enumerate(keys):
+                if key in self._cache:
+                    self.hits += 1
+                    results[index] = self._cache.pop(key)
+                    self._cache[key] = results[index]
+                elif key in todo:
+                    todo[key].append(index)
+                else:
+                    self.misses += 1
+                    todo[key] = [index]
+        todo_keys = list(todo.keys())
+        pubkeys = self._recover_keys(todo_keys)
+        with self._lock:
+            for key, pubkey in zip(todo_keys, pubkeys):
+                for index in todo[key]:
+                    results[index] = pubkey
+                self._cache[key] = pubkey
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+    def _recover_keys(self, keys):
+        items = [(key[:32], key[32:]) for key in keys]
+        if self.processes <= 1 or not FUTURES_MODULE or len(items) <= self.chunk_size:
+            return _recover_items(items, ecdsasig.SECP256K1_MODULE)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        futures = [self._executor.submit(_recover_items, chunk, ecdsasig.SECP256K1_MODULE) for chunk in chunks]
+        pubkeys = []
+        for future in futures:
+            pubkeys.extend(future.result())
+        return pubkeys
+
+    def verify_transactions(self, transactions, chain):
+        """ Returns the public keys of all signatures of signed transactions
+
+            :param list transactions: list of :class:`beemgraphenebase.signedtransactions.Signed_Transaction`
+            :param chain: identifier or parameters of the chain
+            :returns: one list per transaction with the public key of every signature
+                as hex string, None for an invalid signature
+
+            As for :func:`beemgraphenebase.signedtransactions.Signed_Transaction.verify`,
+            the returned public keys have to be checked against the required authorities.
+        """
+        items = []
+        counts = []
+        for tx in transactions:
+            tx.deriveDigest(chain)
+            signatures = tx.data["signatures"].data
+            counts.append(len(signatures))
+            items.extend((tx.digest, py23_bytes(signature)) for signature in signatures)
+        pubkeys = [hexlify(p).decode('ascii') if p is not None else None for p in self.recover(items)]
+        results = []
+        start = 0
+        for count in counts:
+            results.append(pubkeys[start:start + count])
+            start += count
+        return results
+
+    def stats(self):
+        """ Returns the number of stored public keys and the hit and miss counters"""
+        with self._lock:
+            return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses}
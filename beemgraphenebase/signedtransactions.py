@@ -17,11 +17,12 @@ from .types import (
     PointInTime,
     Uint16,
     Uint32,
+    write_bytes,
 )
 from .objects import GrapheneObject, isArgsThisClass
 from .operations import Operation
 from .chains import known_chains
-from .ecdsasig import sign_message, verify_message
+from .ecdsasig import Signer, verify_message, recover_pubkey_from_digest
 import logging
 log = logging.getLogger(__name__)
 
@@ -79,20 +80,24 @@ class Signed_Transaction(GrapheneObject):
     def id(self):
         """ The transaction id of this transaction
         """
-        # Store signatures temporarily since they are not part of
-        # transaction id
-        sigs = self.data["signatures"]
-        self.data.pop("signatures", None)
-
-        # Generage Hash of the seriliazed version
-        h = hashlib.sha256(py23_bytes(self)).digest()
-
-        # recover signatures
-        self.data["signatures"] = sigs
+        # Signatures are not part of the transaction id
+        h = hashlib.sha256(self._get_unsigned_bytes()).digest()
 
         # Return properly truncated tx hash
         return hexlify(h[:20]).decode("ascii")
 
+    def _get_unsigned_bytes(self):
+        """ Returns the serialized transaction without signatures
+
+            The transaction is serialized on every call, so that changes of
+            the operations are never missed.
+        """
+        buf = bytearray()
+        for name, value in self.data.items():
+            if name != "signatures":
+                write_bytes(buf, value)
+        return bytes(buf)
+
     def getOperationKlass(self):
         return Operation
 
@@ -129,19 +134,12 @@ class Signed_Transaction(GrapheneObject):
         # Chain ID
         self.chainid = chain_params["chain_id"]
 
-        # Do not serialize signatures
-        sigs = self.data["signatures"]
-        self.data["signatures"] = []
-
         # Get message to sign
-        #   bytes(self) will give the wire formated data according to
-        #   GrapheneObject and the data given in __init__()
-        self.message = unhexlify(self.chainid) + py23_bytes(self)
+        #   the wire formated data according to GrapheneObject and the data
+        #   given in __init__(), without signatures
+        self.message = unhexlify(self.chainid) + self._get_unsigned_bytes()
         self.digest = hashlib.sha256(self.message).digest()
 
-        # restore signatures
-        self.data["signatures"] = sigs
-
     def verify(self, pubkeys=[], chain=None, recover_parameter=False):
         """Returned pubkeys have to be checked if they are existing"""
         if not chain:
@@ -153,10 +151,7 @@ class Signed_Transaction(GrapheneObject):
 
         for signature in signatures:
             if recover_parameter:
-                p = verify_message(
-                    self.message,
-                    py23_bytes(signature)
-                )
+                p = recover_pubkey_from_digest(self.digest, py23_bytes(signature))
             else:
                 p = None
             if p is None:
@@ -189,9 +184,12 @@ class Signed_Transaction(GrapheneObject):
     def sign(self, wifkeys, chain=None):
         """ Sign the transaction with the provided private keys.
 
-            :param array wifkeys: Array of wif keys
+            :param array wifkeys: Array of wif keys or
+                :class:`beemgraphenebase.ecdsasig.Signer` objects
             :param str chain: identifier for the chain
 
+            Passing :class:`beemgraphenebase.ecdsasig.Signer` objects avoids
+            loading the keys again for every transaction.
         """
         if not chain:
             raise Exception("Chain needs to be provided!")
@@ -204,8 +202,8 @@ class Signed_Transaction(GrapheneObject):
         # Sign the message with every private key given!
         sigs = []
         for wif in self.privkeys:
-            signature = sign_message(self.message, wif)
-            sigs.append(Signature(signature))
+            signer = wif if isinstance(wif, Signer) else Signer(wif)
+            sigs.append(Signature(signer.sign_digest(self.digest)))
 
         self.data["signatures"] = Array(sigs)
         return self
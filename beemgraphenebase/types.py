@@ -53,6 +53,26 @@ def variable_buffer(s):
     return varint(len(s)) + s
 
 
+def write_bytes(buf, value):
+    """Appends the wire format of value to the bytearray buf.
+
+    Types with a ``write`` method append their fields directly, all
+    other values are converted with ``py23_bytes``.
+    """
+    write = getattr(value, "write", None)
+    if write is not None:
+        write(buf)
+    else:
+        buf.extend(py23_bytes(value))
+
+
+def to_bytes(value):
+    """Serializes value in a single pass into one buffer."""
+    buf = bytearray()
+    value.write(buf)
+    return bytes(buf)
+
+
 def JsonObj(data):
     """Returns json object from data."""
     return json.loads(str(data))
@@ -170,33 +190,33 @@ class String(object):
         d = self.unicodify()
         return varint(len(d)) + d
 
+    def write(self, buf):
+        """Appends the bytes representation to buf."""
+        write_string(buf, self.data)
+
     def __str__(self):
         """Returns data as string."""
         return '%s' % str(self.data)
 
     def unicodify(self):
-        r = []
-        for s in self.data:
-            o = ord(s)
-            if o <= 7:
-                r.append("u%04x" % o)
-            elif o == 8:
-                r.append("b")
-            elif o == 9:
-                r.append("\t")
-            elif o == 10:
-                r.append("\n")
-            elif o == 11:
-                r.append("u%04x" % o)
-            elif o == 12:
-                r.append("f")
-            elif o == 13:
-                r.append("\r")
-            elif o > 13 and o < 32:
-                r.append("u%04x" % o)
-            else:
-                r.append(s)
-        return bytes("".join(r), "utf-8")
+        return unicodify(self.data)
+
+
+# Replacements of control characters in strings, all other characters are kept
+_unicodify_table = dict((o, "u%04x" % o) for o in range(32))
+_unicodify_table.update({8: "b", 9: "\t", 10: "\n", 12: "f", 13: "\r"})
+
+
+def unicodify(data):
+    """Returns the utf-8 encoded string with replaced control characters."""
+    return bytes(str(data).translate(_unicodify_table), "utf-8")
+
+
+def write_string(buf, data):
+    """Appends a String to buf."""
+    d = unicodify(data)
+    buf.extend(varint(len(d)))
+    buf.extend(d)
 
 
 @python_2_unicode_compatible
@@ -241,7 +261,13 @@ class Array(object):
 
     def __bytes__(self):
         """Returns bytes representation."""
-        return py23_bytes(self.length) + b"".join([py23_bytes(a) for a in self.data])
+        return to_bytes(self)
+
+    def write(self, buf):
+        """Appends the bytes representation to buf."""
+        buf.extend(varint(len(self.data)))
+        for a in self.data:
+            write_bytes(buf, a)
 
     def __str__(self):
         """Returns data as string."""
@@ -264,19 +290,24 @@ class PointInTime(object):
 
     def __bytes__(self):
         """Returns bytes representation."""
-        if sys.version > '3':
-            unixtime = timegm(time.strptime((self.data + "UTC"), timeformat))
-        else:
-            unixtime = timegm(time.strptime((self.data + "UTC"), timeformat.encode("utf-8")))
-        if unixtime < 0:
-            return struct.pack("<i", unixtime)
-        return struct.pack("<I", unixtime)
+        return pack_point_in_time(self.data)
 
     def __str__(self):
         """Returns data as string."""
         return self.data
 
 
+def pack_point_in_time(data):
+    """Returns the bytes representation of a PointInTime string."""
+    if sys.version > '3':
+        unixtime = timegm(time.strptime((data + "UTC"), timeformat))
+    else:
+        unixtime = timegm(time.strptime((data + "UTC"), timeformat.encode("utf-8")))
+    if unixtime < 0:
+        return struct.pack("<i", unixtime)
+    return struct.pack("<I", unixtime)
+
+
 @python_2_unicode_compatible
 class Signature(object):
     def __init__(self, d):
@@ -327,10 +358,17 @@ class Optional(object):
 
     def __bytes__(self):
         """Returns data as bytes."""
-        if not self.data:
-            return py23_bytes(Bool(0))
-        else:
-            return py23_bytes(Bool(1)) + py23_bytes(self.data) if py23_bytes(self.data) else py23_bytes(Bool(0))
+        return to_bytes(self)
+
+    def write(self, buf):
+        """Appends the bytes representation to buf."""
+        start = len(buf)
+        buf.append(0)
+        if self.data:
+            write_bytes(buf, self.data)
+            # data without a wire representation is stored as empty
+            if len(buf) > start + 1:
+                buf[start] = 1
 
     def __str__(self):
         """Returns data as string."""
@@ -350,7 +388,12 @@ class Static_variant(object):
 
     def __bytes__(self):
         """Returns bytes representation."""
-        return varint(self.type_id) + py23_bytes(self.data)
+        return to_bytes(self)
+
+    def write(self, buf):
+        """Appends the bytes representation to buf."""
+        buf.extend(varint(self.type_id))
+        write_bytes(buf, self.data)
 
     def __str__(self):
         """Returns data as string."""
@@ -364,11 +407,14 @@ class Map(object):
 
     def __bytes__(self):
         """Returns bytes representation."""
-        b = b""
-        b += varint(len(self.data))
+        return to_bytes(self)
+
+    def write(self, buf):
+        """Appends the bytes representation to buf."""
+        buf.extend(varint(len(self.data)))
         for e in self.data:
-            b += py23_bytes(e[0]) + py23_bytes(e[1])
-        return b
+            write_bytes(buf, e[0])
+            write_bytes(buf, e[1])
 
     def __str__(self):
         """Returns data as string."""
@@ -0,0 +1,53 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+from beembase.objects import Operation
+from beembase.signedtransactions import Signed_Transaction
+from beembase.deserializer import deserialize_transaction, transaction_from_bytes
+from beemgraphenebase.py23 import py23_bytes
+
+
+class Benchmark(object):
+    goal_time = 2
+
+
+class Deserializer(Benchmark):
+    """Decodes a block with 50 typical transactions from its json and its wire format"""
+    def setup(self):
+        wif = "5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3"
+        ops = [
+            ["vote", {"voter": "foobara", "author": "foobarc", "permlink": "foobard", "weight": 1000}],
+            ["comment", {"parent_author": "foobara", "parent_permlink": "foobarb",
+                         "author": "foobarc", "permlink": "foobard", "title": "Re: foobar",
+                         "body": "Lorem ipsum dolor sit amet " * 20,
+                         "json_metadata": "{\"tags\":[\"beem\"],\"app\":\"beem/0.19\"}"}],
+            ["transfer", {"from": "foo", "to": "baar", "amount": "111.110 STEEM", "memo": "Fooo"}],
+            ["custom_json", {"required_auths": [], "required_posting_auths": ["xeroc"], "id": "follow",
+                             "json": "[\"reblog\",{\"account\":\"xeroc\",\"author\":\"chainsquad\",\"permlink\":\"streemian-com\"}]"}],
+            ["claim_reward_balance", {"account": "foo", "reward_steem": "0.017 STEEM",
+                                      "reward_sbd": "0.011 SBD", "reward_vests": "22.000000 VESTS"}],
+        ]
+        self.txs_json = []
+        self.txs_bytes = []
+        for i in range(50):
+            tx = Signed_Transaction(ref_block_num=34294, ref_block_prefix=3707022213,
+                                    expiration="2016-04-06T08:29:27",
+                                    operations=[Operation(ops[i % len(ops)])])
+            tx = tx.sign([wif], chain="STEEM")
+            self.txs_json.append(tx.json())
+            self.txs_bytes.append(py23_bytes(tx))
+        self.block_json = json.dumps({"transactions": self.txs_json})
+
+    def time_json_loads(self):
+        json.loads(self.block_json)
+
+    def time_deserialize(self):
+        for tx in self.txs_bytes:
+            deserialize_transaction(tx)
+
+    def time_transaction_from_bytes(self):
+        for tx in self.txs_bytes:
+            transaction_from_bytes(tx)
@@ -4,10 +4,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import hashlib
+import time
 import ecdsa
 from binascii import hexlify, unhexlify
 from beemgraphenebase.account import PrivateKey, PublicKey, Address
 import beemgraphenebase.ecdsasig as ecda
+from beemgraphenebase.signatureverifier import SignatureVerifier
 from beemgraphenebase.py23 import py23_bytes
 
 
@@ -118,3 +120,69 @@ class Secp256k1(Benchmark):
         signature = b' 7\x82\xe2\xad\xdc\xdb]~\xd6\xa8J\xdc\xa5\xf4\x13<i\xb9\xc0\xdcEc\x10\xd0)t\xc7^\xecw\x05 U\x91\x0f\xa2\xce\x04\xa1\xdb\xb0\nQ\xbd\xafP`\\\x8bb\x99\xcf\xe0;\x01*\xe9D]\xad\xd9l\x1f\x05'        
         pubkey = ecda.verify_message(message, signature)
 
+
+class BatchVerify(Benchmark):
+    """Recovers the public keys of 50 signatures with the embedded recovery parameter"""
+    params = ["secp256k1", "cryptography", "ecdsa"]
+    param_names = ["backend"]
+    number_of_signatures = 50
+
+    def setup(self, backend):
+        if backend == "secp256k1" and not ecda.SECP256K1_AVAILABLE:
+            raise NotImplementedError("secp256k1 not available")
+        if backend == "cryptography" and not ecda.CRYPTOGRAPHY_AVAILABLE:
+            raise NotImplementedError("cryptography not available")
+        ecda.SECP256K1_MODULE = backend
+        wif = "5J4KCbg1G3my9b9hCaQXnHSm6vrwW9xQTJS6ZciW2Kek7cCkCEk"
+        self.items = []
+        for i in range(self.number_of_signatures):
+            message = py23_bytes("message %d" % i, "utf-8")
+            self.items.append((hashlib.sha256(message).digest(), ecda.sign_message(message, wif)))
+
+    def time_recover(self, backend):
+        for digest, signature in self.items:
+            ecda.recover_pubkey_from_digest(digest, signature)
+
+    def time_verify_batch(self, backend):
+        SignatureVerifier().recover(self.items)
+
+    def time_verify_batch_processes(self, backend):
+        with SignatureVerifier(processes=2, chunk_size=10) as verifier:
+            verifier.recover(self.items)
+
+    def track_throughput(self, backend):
+        start = time.time()
+        SignatureVerifier().recover(self.items)
+        return self.number_of_signatures / (time.time() - start)
+    track_throughput.unit = "signatures/s"
+
+
+class BatchSign(Benchmark):
+    """Signs 50 digests with a reused signer and with a new key for every signature"""
+    params = ["secp256k1", "cryptography", "ecdsa"]
+    param_names = ["backend"]
+    number_of_signatures = 50
+
+    def setup(self, backend):
+        if backend == "secp256k1" and not ecda.SECP256K1_AVAILABLE:
+            raise NotImplementedError("secp256k1 not available")
+        if backend == "cryptography" and not ecda.CRYPTOGRAPHY_AVAILABLE:
+            raise NotImplementedError("cryptography not available")
+        ecda.SECP256K1_MODULE = backend
+        self.wif = "5J4KCbg1G3my9b9hCaQXnHSm6vrwW9xQTJS6ZciW2Kek7cCkCEk"
+        self.signer = ecda.Signer(self.wif)
+        self.messages = [py23_bytes("message %d" % i, "utf-8") for i in range(self.number_of_signatures)]
+        self.digests = [hashlib.sha256(message).digest() for message in self.messages]
+
+    def time_sign_message(self, backend):
+        for message in self.messages:
+            ecda.sign_message(message, self.wif)
+
+    def time_sign_digests(self, backend):
+        self.signer.sign_digests(self.digests)
+
+    def track_throughput(self, backend):
+        start = time.time()
+        self.signer.sign_digests(self.digests)
+        return self.number_of_signatures / (time.time() - start)
+    track_throughput.unit = "signatures/s"
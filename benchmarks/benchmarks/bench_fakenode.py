@@ -0,0 +1,45 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+from beem import Steem
+from beem.account import Account
+from beem.blockchain import Blockchain
+from beemapi.fakenode import FakeNode, FIXTURE_BLOCKS, FIXTURE_ACCOUNT
+
+
+class Benchmark(object):
+    goal_time = 2
+
+
+class FakeNodeBenchmark(Benchmark):
+    """Network-bound code paths against a local node, which replays the bundled appbase fixture"""
+    params = (["http", "ws"], [0., 0.01])
+    param_names = ["protocol", "latency"]
+
+    def setup(self, protocol, latency):
+        self.node = FakeNode("appbase", latency=latency, jitter=latency / 2, seed=1).start()
+        url = self.node.url if protocol == "http" else self.node.ws_url
+        self.stm = Steem(node=url, num_retries=2, timeout=10)
+        self.blockchain = Blockchain(steem_instance=self.stm, mode="head")
+        self.account = Account(FIXTURE_ACCOUNT, steem_instance=self.stm)
+
+    def teardown(self, protocol, latency):
+        self.stm.rpc.rpcclose()
+        self.node.stop()
+
+    def time_refresh_data(self, protocol, latency):
+        self.stm.refresh_data(force_refresh=True)
+
+    def time_blocks(self, protocol, latency):
+        for block in self.blockchain.blocks(start=FIXTURE_BLOCKS[0], stop=FIXTURE_BLOCKS[1]):
+            pass
+
+    def time_blocks_batch(self, protocol, latency):
+        for block in self.blockchain.blocks(start=FIXTURE_BLOCKS[0], stop=FIXTURE_BLOCKS[1], max_batch_size=25):
+            pass
+
+    def time_account_history(self, protocol, latency):
+        for op in self.account.history(batch_size=40):
+            pass
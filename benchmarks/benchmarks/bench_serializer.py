@@ -0,0 +1,65 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+from beembase import operations
+from beembase.objects import Operation
+from beembase.signedtransactions import Signed_Transaction
+from beemgraphenebase.py23 import py23_bytes
+
+
+class Benchmark(object):
+    goal_time = 2
+
+
+class Serializer(Benchmark):
+    """Serializes transactions with many operations and large custom_json payloads"""
+    params = ([1, 10, 100], [100, 10000])
+    param_names = ["operations", "json_size"]
+
+    def setup(self, number_of_ops, json_size):
+        op = operations.Custom_json(**{
+            "json": json.dumps({"data": "x" * json_size}),
+            "required_auths": [],
+            "required_posting_auths": ["test"],
+            "id": "test"
+        })
+        self.ops = [Operation(op) for i in range(number_of_ops)]
+
+    def new_tx(self):
+        return Signed_Transaction(ref_block_num=34294,
+                                  ref_block_prefix=3707022213,
+                                  expiration="2016-04-06T08:29:27",
+                                  operations=self.ops)
+
+    def time_serialize(self, number_of_ops, json_size):
+        py23_bytes(self.new_tx())
+
+    def time_digest_and_id(self, number_of_ops, json_size):
+        tx = self.new_tx()
+        tx.deriveDigest("STEEM")
+        tx.id
+
+
+class OperationBuilding(Benchmark):
+    """Builds and serializes a transaction with 100 votes or transfers"""
+    params = ["vote", "transfer"]
+    param_names = ["operation"]
+
+    def setup(self, name):
+        if name == "vote":
+            self.op = ["vote", {"voter": "foo", "author": "bar", "permlink": "a-post", "weight": 10000}]
+        else:
+            self.op = ["transfer", {"from": "foo", "to": "bar", "amount": "1.000 STEEM", "memo": "a memo"}]
+
+    def time_build(self, name):
+        [Operation(self.op) for i in range(100)]
+
+    def time_build_and_serialize(self, name):
+        tx = Signed_Transaction(ref_block_num=34294,
+                                ref_block_prefix=3707022213,
+                                expiration="2016-04-06T08:29:27",
+                                operations=[Operation(self.op) for i in range(100)])
+        tx.deriveDigest("STEEM")
@@ -32,7 +32,7 @@ if __name__ == "__main__":
     for node in nodes:
         print("Current node:", node)
         try:
-            stm = Steem(node=node, num_retries=3)
+            stm = Steem(node=node, num_retries=3, rpc_stats=True)
             blockchain = Blockchain(steem_instance=stm)
             account = Account("gtg", steem_instance=stm)
             virtual_op_count = account.virtual_op_count()
@@ -81,6 +81,10 @@ if __name__ == "__main__":
             print("* Processed %d blockchain minutes in %s" % (how_many_minutes, total_duration))
             print("* Processed %d account ops in %s" % (i, total_duration_acc))
             print("* blockchain version: %s" % (blockchain_version))
+            for url, node_stats in stm.rpc.rpc_stats.get_stats()["nodes"].items():
+                for method, s in sorted(node_stats["methods"].items()):
+                    print("* %s: %d requests, %.3f s mean latency, %d kB received" % (
+                        method, s["requests"], s["latency_sum"] / s["requests"], s["response_bytes"] // 1024))
             t.add_row([
                 node,
                 total_duration,
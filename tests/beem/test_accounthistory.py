@@ -0,0 +1,190 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import mock
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from beem import Steem
+from beem.account import Account
+from beem.accounthistory import AccountHistoryBatch, AccountHistoryDownloader, timestamp_to_epoch, op_type_names, get_op_type_id
+from beemapi.steemnoderpc import SteemNodeRPC
+
+max_index = 2500
+op_names = ["vote", "transfer", "producer_reward", "claim_account"]
+start_time = datetime(2018, 1, 1)
+
+
+def get_event(i):
+    op = {"voter": "test", "weight": i} if i % 4 == 0 else {"account": "test", "amount": "%d.000 STEEM" % i}
+    return [i, {
+        "trx_id": "%040x" % i,
+        "block": 1000 + i // 3,
+        "trx_in_block": 0,
+        "op_in_trx": 0,
+        "virtual_op": 0,
+        "timestamp": (start_time + timedelta(seconds=3 * (i // 3))).strftime("%Y-%m-%dT%H:%M:%S"),
+        "op": [op_names[i % 4], op],
+    }]
+
+
+def get_account_history(account=None, start=-1, limit=0):
+    if start == -1:
+        start = max_index
+    return [get_event(i) for i in range(max(0, start - limit), min(start, max_index) + 1)]
+
+
+class FakeRPC(object):
+    calls = []
+    lock = threading.Lock()
+
+    def __init__(self, url, **kwargs):
+        self.url = url
+
+    def get_use_appbase(self):
+        return True
+
+    def get_account_history(self, query, api=None):
+        node = self.url
+        with self.lock:
+            self.calls.append((node, query["start"], query["limit"]))
+        time.sleep(0.01)
+        history = get_account_history(start=query["start"], limit=query["limit"])
+        if node == "http://lagging":
+            # the node is behind and knows only the first 1000 operations
+            history = [h for h in history if h[0] < 1000]
+        return {"history": history}
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        stm = Steem(offline=True)
+        self.account = Account({"name": "test"}, steem_instance=stm)
+        stm.rpc = SteemNodeRPC(["http://node1", "http://node2"], autoconnect=False)
+        patcher = mock.patch.object(Account, "_get_account_history", side_effect=get_account_history)
+        self.rpc_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_timestamp_to_epoch(self):
+        self.assertEqual(timestamp_to_epoch("1970-01-01T00:00:00"), 0)
+        self.assertEqual(timestamp_to_epoch("2018-03-01T12:34:56"), 1519907696)
+
+    def test_op_type_id(self):
+        self.assertEqual(op_type_names[get_op_type_id("transfer")], "transfer")
+        type_id = get_op_type_id("claim_account")
+        self.assertEqual(get_op_type_id("claim_account"), type_id)
+        self.assertEqual(op_type_names[type_id], "claim_account")
+
+    def test_batch_columns(self):
+        batch = AccountHistoryBatch("test", get_account_history(start=10, limit=10))
+        self.assertEqual(len(batch), 11)
+        self.assertEqual(list(batch.index), list(range(11)))
+        self.assertEqual(batch.block[10], 1003)
+        self.assertEqual(batch.timestamp[10] - batch.timestamp[0], 9)
+        self.assertEqual(batch.op_type_names[:4], op_names)
+        self.assertEqual(batch.trx_id[1], "%040x" % 1)
+        self.assertEqual(batch.op[0], ["vote", {"voter": "test", "weight": 0}])
+        self.assertEqual(batch.raw(), get_account_history(start=10, limit=10))
+
+    def test_batch_filter(self):
+        batch = AccountHistoryBatch("test", get_account_history(start=99, limit=99))
+        filtered = batch.filter(only_ops=["transfer", "vote"], exclude_ops=["vote"])
+        self.assertEqual(list(filtered.index), list(range(1, 100, 4)))
+        filtered = batch.filter(start=10, stop=20, use_block_num=False)
+        self.assertEqual(list(filtered.index), list(range(10, 21)))
+        filtered = batch.filter(start=1010, stop=1011)
+        self.assertEqual(list(filtered.index), list(range(30, 36)))
+        filtered = batch.filter(start=start_time + timedelta(seconds=30), stop=start_time + timedelta(seconds=35))
+        self.assertEqual(list(filtered.index), list(range(30, 36)))
+        self.assertTrue(batch.is_past(90, use_block_num=False))
+        self.assertFalse(batch.is_past(99, use_block_num=False))
+
+    def test_hashes_match_history(self):
+        batch = AccountHistoryBatch("test", get_account_history(start=20, limit=20))
+        self.assertIsNone(batch._hashes)
+        expected = list(self.account.get_account_history(20, 20, order=1))
+        self.assertEqual(batch.to_dicts(), expected)
+        self.assertEqual(batch.hashes(), [h["_id"] for h in expected])
+        selected = batch.filter(only_ops=["vote"])
+        self.assertEqual(selected.hashes(), [h["_id"] for h in expected if h["type"] == "vote"])
+
+    def test_history_batches(self):
+        batches = list(self.account.history_batches(batch_size=1000))
+        self.assertEqual(len(batches), 3)
+        index = [i for batch in batches for i in batch.index]
+        self.assertEqual(index, list(range(max_index + 1)))
+
+        index = [i for batch in self.account.history_batches(start=5, stop=1500, use_block_num=False, batch_size=1000)
+                 for i in batch.index]
+        self.assertEqual(index, list(range(5, 1501)))
+        # the scan stops after the batch containing stop
+        self.assertEqual(self.rpc_mock.call_args[1], {"start": 2006, "limit": 1000})
+
+        index = [i for batch in self.account.history_batches(stop=1100, only_ops=["producer_reward"], batch_size=100)
+                 for i in batch.index]
+        self.assertEqual(index, list(range(2, 303, 4)))
+
+        expected = [h["index"] for h in self.account.history(stop=1100, only_ops=["producer_reward"], batch_size=100)]
+        self.assertEqual(index, expected)
+
+    def test_downloader(self):
+        FakeRPC.calls = []
+        with mock.patch("beem.accounthistory.SteemNodeRPC", FakeRPC):
+            downloader = AccountHistoryDownloader("test", nodes=["http://node%d" % i for i in range(3)],
+                                                  max_concurrency=2, batch_size=100)
+            batches = list(downloader.download())
+        self.assertEqual([i for batch in batches for i in batch.index], list(range(max_index + 1)))
+        self.assertEqual(len(batches), 26)
+        self.assertEqual(downloader.checkpoint, max_index + 1)
+        # the latest index and 26 ranges
+        self.assertEqual(len(FakeRPC.calls), 27)
+        self.assertEqual(set(call[0] for call in FakeRPC.calls), set(["http://node0", "http://node1", "http://node2"]))
+        self.assertEqual(sum(stats["calls"] for stats in downloader.pool.get_stats().values()), 27)
+        self.assertIn((2499, 99), [call[1:] for call in FakeRPC.calls])
+
+        # resume from the checkpoint of an interrupted download
+        with mock.patch("beem.accounthistory.SteemNodeRPC", FakeRPC):
+            downloader = AccountHistoryDownloader("test", nodes=["http://node1"], thread_num=2, batch_size=1000)
+            download = downloader.download(start=0, stop=2200)
+            next(download)
+            download.close()
+            self.assertEqual(downloader.checkpoint, 1000)
+            batches = list(downloader.download(start=downloader.checkpoint, stop=2200))
+        self.assertEqual([i for batch in batches for i in batch.index], list(range(1000, 2201)))
+
+    def test_downloader_adaptive(self):
+        FakeRPC.calls = []
+        with mock.patch("beem.accounthistory.SteemNodeRPC", FakeRPC):
+            downloader = AccountHistoryDownloader("test", nodes=["http://node0", "http://node1"], max_concurrency=2)
+            batches = list(downloader.download())
+        self.assertEqual([i for batch in batches for i in batch.index], list(range(max_index + 1)))
+        # the range size grows from 100 on fast replies
+        limits = [call[2] for call in FakeRPC.calls[1:]]
+        self.assertEqual(limits[0], 99)
+        self.assertGreater(max(limits), 99)
+        self.assertEqual(sum(stats["requests"] for stats in downloader.controller.get_stats().values()),
+                         len(FakeRPC.calls))
+
+    def test_downloader_incomplete_range(self):
+        FakeRPC.calls = []
+        with mock.patch("beem.accounthistory.SteemNodeRPC", FakeRPC):
+            downloader = AccountHistoryDownloader("test", nodes=["http://lagging", "http://node1"],
+                                                  thread_num=1, batch_size=500, retry_delay=0)
+            batches = list(downloader.download(stop=1499))
+        self.assertEqual([i for batch in batches for i in batch.index], list(range(1500)))
+        self.assertIn(("http://node1", 1499, 499), FakeRPC.calls)
+
+    def test_history_batches_threading(self):
+        with mock.patch("beem.accounthistory.SteemNodeRPC", FakeRPC):
+            index = [i for batch in self.account.history_batches(start=5, stop=2200, use_block_num=False, batch_size=500,
+                                                                 only_ops=["vote"], threading=True)
+                     for i in batch.index]
+        self.assertEqual(index, list(range(8, 2201, 4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 from builtins import super
+import mock
 import unittest
 from parameterized import parameterized
 from datetime import datetime, timedelta
@@ -15,6 +16,7 @@ from beem.block import Block
 from beem.instance import set_shared_steem_instance
 from beem.utils import formatTimeString
 from beem.nodelist import NodeList
+from beemapi.batchcontroller import BatchController
 
 wif = "5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3"
 
@@ -70,3 +72,25 @@ class Testcases(unittest.TestCase):
             self.assertTrue(block.identifier <= self.stop)
         self.assertEqual(op_stat["transfer"], op_stat4["transfer"])
         self.assertEqual(op_stat["vote"], op_stat4["vote"])
+
+
+class AdaptiveBatchTestcases(unittest.TestCase):
+
+    def test_get_blocks_adaptive(self):
+        stm = Steem(offline=True)
+        stm.rpc = mock.Mock(url="http://a")
+        sizes = []
+
+        def get_block_batch(block_nums, only_ops=False, only_virtual_ops=False):
+            sizes.append(len(block_nums))
+            if len(sizes) == 3:
+                raise IOError("Payload too large")
+            return list(block_nums)
+        controller = BatchController(batch_size=5, max_batch_size=20)
+        b = Blockchain(steem_instance=stm, batch_controller=controller)
+        with mock.patch.object(Blockchain, "_get_block_batch", side_effect=get_block_batch):
+            blocks = list(b._get_blocks_adaptive(1, 100))
+        self.assertEqual(blocks, list(range(1, 101)))
+        # the failed batch of 20 blocks is repeated with 10 blocks, then it grows slowly
+        self.assertEqual(sizes[:5], [5, 10, 20, 10, 12])
+        self.assertEqual(controller.get_stats()["http://a"]["errors"], 1)
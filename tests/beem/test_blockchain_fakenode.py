@@ -0,0 +1,49 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import mock
+import unittest
+from beem import Steem
+from beem.block import Block
+from beem.blockchain import Blockchain, BlockFetcher
+from beemapi.fakenode import FakeNode, FIXTURE_BLOCKS
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.node = FakeNode("appbase").start()
+        self.stm = Steem(node=self.node.url, num_retries=1)
+
+    def tearDown(self):
+        self.stm.rpc.rpcclose()
+        self.node.stop()
+
+    def test_blocks_threading(self):
+        b = Blockchain(steem_instance=self.stm, mode="head")
+        start = FIXTURE_BLOCKS[0]
+        with mock.patch("beem.blockchain.BlockFetcher", wraps=BlockFetcher) as fetcher_class:
+            blocks = [block.identifier for block in b.blocks(start=start, stop=start + 9, threading=True, thread_num=4)]
+        self.assertEqual(blocks, list(range(start, start + 10)))
+        self.assertEqual(fetcher_class.call_count, 1)
+
+    def test_blocks_threading_passes(self):
+        # the head block grows between the passes
+        b = Blockchain(steem_instance=self.stm, mode="head")
+        start = FIXTURE_BLOCKS[0]
+        head_blocks = [start + 2, start + 5, start + 9]
+        auto_clean = Block(start, steem_instance=self.stm).get_cache_auto_clean()
+        with mock.patch.object(b, "get_current_block_num", side_effect=lambda: head_blocks[0]), \
+                mock.patch.object(b, "wait_for_and_get_block", wraps=b.wait_for_and_get_block) as wait_for_block, \
+                mock.patch("beem.blockchain.time.sleep", side_effect=lambda seconds: head_blocks.pop(0)), \
+                mock.patch("beem.blockchain.BlockFetcher", wraps=BlockFetcher) as fetcher_class:
+            stream = b.blocks(start=start, threading=True, thread_num=4)
+            blocks = [next(stream).identifier for i in range(10)]
+            stream.close()
+        self.assertEqual(blocks, list(range(start, start + 10)))
+        self.assertEqual(fetcher_class.call_count, 1)
+        # only the first pass up to the head block uses the threads
+        self.assertEqual(wait_for_block.call_count, 7)
+        self.assertEqual(Block(start, steem_instance=self.stm).get_cache_auto_clean(), auto_clean)
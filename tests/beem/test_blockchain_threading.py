@@ -7,10 +7,12 @@ import unittest
 from parameterized import parameterized
 from datetime import datetime, timedelta
 import pytz
+import random
+import threading
 import time
 from pprint import pprint
 from beem import Steem
-from beem.blockchain import Blockchain
+from beem.blockchain import Blockchain, BlockFetcher
 from beem.block import Block
 from beem.instance import set_shared_steem_instance
 from beem.nodelist import NodeList
@@ -62,3 +64,59 @@ class Testcases(unittest.TestCase):
             self.assertTrue(block.identifier <= self.stop)
         self.assertEqual(op_stat["transfer"], op_stat4["transfer"])
         self.assertEqual(op_stat["vote"], op_stat4["vote"])
+
+
+class BlockFetcherTestcases(unittest.TestCase):
+
+    def test_fetch_range_in_order(self):
+        def fetch(block_num):
+            time.sleep(random.random() * 0.01)
+            return {"id": block_num}
+        with BlockFetcher(fetch, thread_num=4) as fetcher:
+            blocks = [b["id"] for b in fetcher.fetch_range(10, 60)]
+        self.assertEqual(blocks, list(range(10, 61)))
+
+    def test_fetch_items(self):
+        received = []
+
+        def get_ranges():
+            start = 0
+            while start < 100:
+                # the next range depends on the results received so far
+                size = 10 if len(received) < 3 else 30
+                yield (start, min(start + size, 100))
+                start += size
+        with BlockFetcher(lambda item: list(range(*item)), thread_num=2, read_ahead=2) as fetcher:
+            for result in fetcher.fetch_items(get_ranges()):
+                received.append(result)
+        self.assertEqual([i for r in received for i in r], list(range(100)))
+        self.assertGreater(max(len(r) for r in received), 10)
+
+    def test_read_ahead(self):
+        requested = []
+        lock = threading.Lock()
+
+        def fetch(block_num):
+            with lock:
+                requested.append(block_num)
+            return block_num
+        with BlockFetcher(fetch, thread_num=2, read_ahead=5) as fetcher:
+            gen = fetcher.fetch_range(1, 100)
+            self.assertEqual(next(gen), 1)
+            time.sleep(0.1)
+            self.assertTrue(max(requested) <= 6)
+            gen.close()
+
+    def test_retry(self):
+        errors = {}
+
+        def fetch(block_num):
+            if errors.get(block_num, 0) < 2:
+                errors[block_num] = errors.get(block_num, 0) + 1
+                raise ValueError("block %d not ready" % block_num)
+            return block_num
+        with BlockFetcher(fetch, thread_num=3, num_retries=2, retry_delay=0) as fetcher:
+            self.assertEqual(list(fetcher.fetch_range(1, 10)), list(range(1, 11)))
+        with BlockFetcher(lambda block_num: 1 // 0, thread_num=3, num_retries=1, retry_delay=0) as fetcher:
+            with self.assertRaises(ZeroDivisionError):
+                list(fetcher.fetch_range(1, 10))
@@ -0,0 +1,61 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import shutil
+import tempfile
+import unittest
+from beem import Steem
+from beem.block import Block
+from beem.blockstore import BlockStore
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_put_get(self):
+        store = BlockStore(directory=self.directory, segment_size=10)
+        block = {"previous": "0000000a", "timestamp": "2016-03-24T16:05:00", "transactions": [], "transaction_ids": []}
+        self.assertFalse(store.put(11, block))
+        self.assertIsNone(store.get(11))
+        store.set_last_irreversible_block_num(25)
+        store.set_last_irreversible_block_num(20)
+        self.assertEqual(store.last_irreversible_block_num, 25)
+        for block_num in [11, 25, 3, 12]:
+            block["previous"] = "%08x" % (block_num - 1)
+            self.assertTrue(store.put(block_num, block))
+        self.assertFalse(store.put(26, block))
+        self.assertFalse(store.put(12, block))
+        self.assertIn(12, store)
+        self.assertNotIn(13, store)
+        self.assertNotIn(26, store)
+        self.assertIsNone(store.get(1000))
+        store.close()
+
+        store = BlockStore(directory=self.directory, segment_size=10)
+        for block_num in [11, 25, 3, 12]:
+            self.assertEqual(store.get(block_num)["previous"], "%08x" % (block_num - 1))
+        store.close()
+
+    def test_chain_id(self):
+        store = BlockStore(directory=self.directory)
+        store.set_last_irreversible_block_num(10)
+        store.put(1, {"previous": "00000000"})
+        store2 = BlockStore(chain_id="79276aea5d4877d9a25892eaa01b0adf019d3e5cb12a97478df3298ccdd01673", directory=self.directory)
+        self.assertIn(1, store)
+        self.assertNotIn(1, store2)
+
+    def test_block(self):
+        store = BlockStore(directory=self.directory)
+        store.set_last_irreversible_block_num(10)
+        store.put(5, {"previous": "00000004", "timestamp": "2016-03-24T16:05:00", "transactions": [], "transaction_ids": []})
+        stm = Steem(offline=True, block_store=store)
+        block = Block(5, steem_instance=stm)
+        self.assertEqual(block["previous"], "00000004")
+        self.assertEqual(block.block_num, 5)
@@ -8,7 +8,7 @@ import time
 import unittest
 from beem import Steem, exceptions
 from beem.instance import set_shared_steem_instance
-from beem.blockchainobject import ObjectCache
+from beem.blockchainobject import ObjectCache, BlockchainObject
 from beem.account import Account
 from beem.nodelist import NodeList
 
@@ -51,3 +51,62 @@ class Testcases(unittest.TestCase):
 
         # Get
         self.assertEqual(cache.get("foo", "New"), "New")
+
+    def test_cache_lru(self):
+        cache = ObjectCache(default_expiration=60, max_entries=3)
+        for key in ["a", "b", "c"]:
+            cache[key] = key
+        self.assertEqual(cache["a"], "a")
+        cache["d"] = "d"
+        self.assertNotIn("b", cache)
+        self.assertEqual(sorted(cache.keys()), ["a", "c", "d"])
+        cache["c"] = "c2"
+        cache["e"] = "e"
+        self.assertEqual(sorted(cache.keys()), ["c", "d", "e"])
+        self.assertEqual(cache["c"], "c2")
+        self.assertIsNone(cache["b"])
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 3)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_cache_max_bytes(self):
+        cache = ObjectCache(default_expiration=60, max_bytes=25)
+        cache[1] = "x" * 10
+        cache[2] = "y" * 10
+        self.assertEqual(len(cache), 2)
+        cache[3] = "z" * 10
+        self.assertEqual(cache.keys(), [2, 3])
+        self.assertEqual(cache.stats()["bytes"], 24)
+        del cache[2]
+        self.assertEqual(cache.stats()["bytes"], 12)
+
+    def test_cache_expiration_heap(self):
+        cache = ObjectCache(default_expiration=1, auto_clean=True)
+        for i in range(100):
+            cache[i] = i
+        cache.default_expiration = 60
+        cache[5] = 5
+        time.sleep(1.1)
+        cache["foo"] = "bar"
+        self.assertEqual(sorted(cache.keys(), key=str), [5, "foo"])
+        self.assertEqual(cache.stats()["expirations"], 99)
+
+    def test_class_caches(self):
+        class Object1(BlockchainObject):
+            pass
+
+        class Object2(BlockchainObject):
+            cache_max_entries = 1
+
+        stm = Steem(offline=True)
+        Object1({"id": "foo", "value": 1}, steem_instance=stm)
+        Object2({"id": "foo", "value": 2}, steem_instance=stm)
+        Object2({"id": "bar", "value": 2}, steem_instance=stm)
+        self.assertEqual(Object1.get_object_cache()["foo"]["value"], 1)
+        self.assertNotIn("foo", Object2.get_object_cache())
+        self.assertEqual(Object2.get_object_cache()["bar"]["value"], 2)
+        self.assertEqual(BlockchainObject.get_cache_stats()["Object2"]["evictions"], 1)
+        BlockchainObject.clear_cache()
+        self.assertNotIn("foo", Object1.get_object_cache())
@@ -0,0 +1,126 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import time
+import unittest
+from beem import Steem
+from beem.refblock import RefBlockProvider
+from beem.transactionbuilder import TransactionBuilder
+from beem.utils import formatTimeFromNow
+from beembase.operations import Transfer
+from beembase.transactions import getRefBlockParams
+from beemapi.fakenode import FakeNode
+
+block_id = "01544e31e9f3f6c2cc6a2a5a4f3b6e2a0c8d9d5b"
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.node = FakeNode("appbase").start()
+        self.stm = Steem(node=self.node.url, nobroadcast=True, num_retries=1)
+        # the fixture is old, the head block has to be younger than max_age
+        props = self.stm.rpc.get_dynamic_global_properties(api="database")
+        props["time"] = formatTimeFromNow(0)
+        self.props = props
+        self.node.add_response("database_api.get_dynamic_global_properties", {}, props)
+        self.node.add_response("condenser_api.get_dynamic_global_properties", [], props)
+        # the parent of the last irreversible block is the reference block
+        lib = props["last_irreversible_block_num"]
+        block = self.stm.rpc.get_block({"block_num": lib}, api="block")["block"]
+        header = {"previous": block["previous"], "timestamp": formatTimeFromNow(-3),
+                  "witness": block["witness"], "transaction_merkle_root": block["transaction_merkle_root"],
+                  "extensions": []}
+        self.node.add_response("block_api.get_block_header", {"block_num": lib}, {"header": header})
+        self.ref_block_id = block["previous"]
+
+    def tearDown(self):
+        self.stm.rpc.rpcclose()
+        self.node.stop()
+
+    def test_get_ref_block_params(self):
+        self.assertEqual(getRefBlockParams(block_id), (0x4e31, 3270964201))
+        self.assertEqual(getRefBlockParams(block_id, 0x1544e31), (0x4e31, 3270964201))
+
+    def test_update(self):
+        provider = RefBlockProvider(steem_instance=self.stm)
+        self.assertIsNone(provider.age)
+        self.assertTrue(provider.update(block_id, timestamp=formatTimeFromNow(-3)))
+        self.assertEqual(provider.block_num, 0x1544e31)
+        self.assertTrue(2 < provider.age < 10)
+        # older blocks are ignored
+        self.assertFalse(provider.update("01544e30" + block_id[8:], timestamp=formatTimeFromNow(0)))
+        self.assertFalse(provider.update_from_block({"timestamp": formatTimeFromNow(0)}))
+        self.assertEqual(provider.get_block_params(), getRefBlockParams(block_id))
+        self.assertEqual(provider.refreshes, 0)
+        with self.assertRaises(ValueError):
+            RefBlockProvider(steem_instance=self.stm, max_age=3 * 0x10000)
+
+    def test_update_from_block(self):
+        provider = RefBlockProvider(steem_instance=self.stm)
+        # reversible blocks are never used
+        self.assertFalse(provider.update_from_block({"block_id": block_id, "timestamp": formatTimeFromNow(0)}))
+        self.assertTrue(provider.update_from_properties({"last_irreversible_block_num": 0x1544e30}))
+        self.assertFalse(provider.update_from_properties({"last_irreversible_block_num": 0x1544e2f}))
+        self.assertFalse(provider.update_from_block({"block_id": block_id, "timestamp": formatTimeFromNow(0)}))
+        self.assertIsNone(provider.block_id)
+        irreversible_id = "01544e30" + block_id[8:]
+        self.assertTrue(provider.update_from_block({"block_id": irreversible_id, "timestamp": formatTimeFromNow(0)}))
+        self.assertEqual(provider.block_num, 0x1544e30)
+        self.assertEqual(provider.get_block_params(), getRefBlockParams(irreversible_id))
+
+    def test_get_block_params(self):
+        provider = RefBlockProvider(steem_instance=self.stm, max_age=60)
+        params = provider.get_block_params()
+        self.assertEqual(params, getRefBlockParams(self.ref_block_id))
+        self.assertEqual(provider.block_num, self.props["last_irreversible_block_num"] - 1)
+        requests = self.node.requests
+        for i in range(10):
+            self.assertEqual(provider.get_block_params(), params)
+        self.assertEqual(self.node.requests, requests)
+        self.assertEqual(provider.stats()["hits"], 10)
+        # an old reference block is refreshed
+        provider.block_timestamp -= 60
+        provider.get_block_params()
+        self.assertEqual(provider.refreshes, 2)
+        # blocks of a replayed stream are not used
+        provider = RefBlockProvider(steem_instance=self.stm)
+        provider.update_from_properties({"last_irreversible_block_num": 0x1544e31})
+        self.assertTrue(provider.update_from_block({"block_id": block_id, "timestamp": "2018-08-01T12:00:00"}))
+        self.assertEqual(provider.get_block_params(), params)
+        self.assertEqual(provider.refreshes, 1)
+
+    def test_refresh_data(self):
+        stm = Steem(node=self.node.url, num_retries=1, ref_block_provider=True)
+        self.assertIsInstance(stm.ref_block_provider, RefBlockProvider)
+        stm.refresh_data(force_refresh=True)
+        self.assertEqual(stm.ref_block_provider.last_irreversible_block_num, self.props["last_irreversible_block_num"])
+        self.assertIsNone(self.stm.ref_block_provider)
+        stm.rpc.rpcclose()
+
+    def test_transactionbuilder(self):
+        provider = RefBlockProvider(steem_instance=self.stm)
+        stm = Steem(node=self.node.url, nobroadcast=True, num_retries=1, ref_block_provider=provider)
+        self.assertIs(stm.ref_block_provider, provider)
+        tx = TransactionBuilder(steem_instance=stm)
+        tx.appendOps(Transfer(**{"from": "beem-test", "to": "test1", "amount": "1.000 STEEM", "memo": ""}))
+        tx.constructTx()
+        requests = self.node.requests
+        for i in range(5):
+            tx.constructTx()
+            self.assertEqual((tx["ref_block_num"], tx["ref_block_prefix"]),
+                             getRefBlockParams(self.ref_block_id))
+        self.assertEqual(self.node.requests, requests)
+        self.assertEqual(provider.refreshes, 1)
+        stm.rpc.rpcclose()
+
+    def test_background_refresh(self):
+        with RefBlockProvider(steem_instance=self.stm, refresh_interval=0.01) as provider:
+            start = time.time()
+            while provider.refreshes < 2 and time.time() - start < 5:
+                time.sleep(0.01)
+        self.assertGreaterEqual(provider.refreshes, 2)
+        self.assertEqual(provider.block_id, self.ref_block_id)
+        self.assertIsNone(provider._thread)
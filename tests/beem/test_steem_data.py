@@ -0,0 +1,73 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import mock
+import unittest
+from beem import Steem
+from beemapi.steemnoderpc import SteemNodeRPC
+
+results = {
+    "database_api.get_dynamic_global_properties": {"head_block_number": 1},
+    "database_api.get_feed_history": {"current_median_history": {"base": "1.000 SBD", "quote": "1.000 STEEM"}},
+    "database_api.get_hardfork_properties": {"current_hardfork_version": "0.19.0"},
+    "database_api.get_config": {"STEEM_CHAIN_ID": "0" * 64, "STEEM_BLOCKCHAIN_VERSION": "0.19.5"},
+    "database_api.get_witness_schedule": {"median_props": {"maximum_block_size": 65536}},
+    "database_api.get_reward_funds": {"funds": [{"name": "post"}]},
+    "witness_api.get_reserve_ratio": {"current_reserve_ratio": 1},
+}
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.stm = Steem(offline=True)
+        self.stm.offline = False
+        rpc = SteemNodeRPC("https://api.steemit.com", autoconnect=False)
+        rpc.url = "https://api.steemit.com"
+        rpc.current_rpc = rpc.rpc_methods["appbase"]
+        self.stm.rpc = rpc
+        self.payloads = []
+
+    def send(self, payload):
+        self.payloads.append(payload)
+        if isinstance(payload, list):
+            return json.dumps([{"jsonrpc": "2.0", "id": q["id"], "result": results[q["method"]]} for q in payload])
+        return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": results[payload["method"]]})
+
+    def test_refresh_data(self):
+        with mock.patch.object(self.stm.rpc, "_rpcexec_raw", side_effect=self.send):
+            self.stm.refresh_data()
+            self.assertEqual(len(self.payloads), 1)
+            self.assertEqual(len(self.payloads[0]), 7)
+            self.assertEqual(self.stm.get_dynamic_global_properties()["head_block_number"], 1)
+            self.assertEqual(self.stm.get_reward_funds(), {"name": "post"})
+            self.assertEqual(self.stm.get_network()["chain_id"], "0" * 64)
+            self.assertEqual(self.stm.get_current_median_history()["base"], "1.000 SBD")
+            self.assertEqual(len(self.payloads), 1)
+            self.assertNotIn("get_feed_history", self.stm.data)
+
+    def test_refresh_times(self):
+        self.stm.data_refresh_times = {"dynamic_global_properties": 0}
+        with mock.patch.object(self.stm.rpc, "_rpcexec_raw", side_effect=self.send):
+            self.stm.get_config()
+            self.assertEqual(len(self.payloads[0]), 7)
+            self.stm.get_config()
+            self.assertEqual(len(self.payloads), 1)
+            self.stm.get_dynamic_global_properties()
+            self.assertEqual(len(self.payloads), 2)
+            self.assertEqual([q["method"] for q in self.payloads[1]], ["database_api.get_dynamic_global_properties"])
+            self.stm.refresh_data(force_refresh=True, fields=["config", "network"])
+            self.assertEqual([q["method"] for q in self.payloads[2]], ["database_api.get_config"])
+
+    def test_batch_not_supported(self):
+        def send(payload):
+            if isinstance(payload, list):
+                return json.dumps({"jsonrpc": "2.0", "id": 0, "error": {"message": "Batch calls are not supported"}})
+            return self.send(payload)
+        with mock.patch.object(self.stm.rpc, "_rpcexec_raw", side_effect=send):
+            self.stm.refresh_data()
+        self.assertEqual(self.stm.data["reserve_ratio"]["current_reserve_ratio"], 1)
+        self.assertEqual(self.stm.data["config"]["STEEM_BLOCKCHAIN_VERSION"], "0.19.5")
@@ -0,0 +1,99 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from beem.storage import Configuration, Key, DataDir
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config = Configuration()
+        self.config.sqlDataBaseFile = os.path.join(self.directory, "beem.sqlite")
+        self.config.create_table()
+
+    def tearDown(self):
+        DataDir.close_connections()
+        shutil.rmtree(self.directory)
+
+    def test_connection(self):
+        connection = self.config.get_connection()
+        self.assertIs(connection, self.config.get_connection())
+        self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(self.config.get_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(connections[0], connection)
+        DataDir.close_connections()
+        self.assertIsNot(connection, self.config.get_connection())
+
+    def test_close_finished_connections(self):
+        connection = self.config.get_connection()
+        connections = []
+        for i in range(5):
+            thread = threading.Thread(target=lambda: connections.append(self.config.get_connection()))
+            thread.start()
+            thread.join()
+        # the connections of the finished threads are closed
+        paths = [path for path, shared, thread in DataDir._connections]
+        self.assertEqual(paths.count(self.config.sqlDataBaseFile), 2)
+        for closed in connections[:-1]:
+            with self.assertRaises(sqlite3.ProgrammingError):
+                closed.execute("SELECT 1")
+        self.assertEqual(connection.execute("SELECT 1").fetchone()[0], 1)
+
+    def test_config(self):
+        self.assertNotIn("foo", self.config)
+        self.assertIsNone(self.config["foo"])
+        self.assertEqual(self.config["rpcuser"], "")
+        self.config["foo"] = "bar"
+        self.assertIn("foo", self.config)
+        self.assertEqual(self.config["foo"], "bar")
+        self.config["foo"] = "baz"
+        self.assertEqual(self.config["foo"], "baz")
+        self.assertEqual(len(self.config), 1)
+        self.config.delete("foo")
+        self.assertNotIn("foo", self.config)
+        self.assertEqual(self.config.get("foo", "default"), "default")
+
+    def test_cache(self):
+        self.config["foo"] = "bar"
+        self.assertEqual(self.config["foo"], "bar")
+        # Changes of other connections are only seen after clearing the cache
+        connection = self.config.get_connection()
+        connection.execute("UPDATE config SET value=? WHERE key=?", ("changed", "foo"))
+        connection.commit()
+        self.assertEqual(self.config["foo"], "bar")
+        self.config.clear_cache()
+        self.assertEqual(self.config["foo"], "changed")
+
+    def test_get_set_many(self):
+        values = dict(("key%d" % i, "value%d" % i) for i in range(1200))
+        self.config.set_many(values)
+        self.config["key0"] = "new"
+        self.config.clear_cache()
+        result = self.config.get_many(list(values.keys()) + ["rpcuser", "unknown"])
+        self.assertEqual(result["key0"], "new")
+        self.assertEqual(result["key1199"], "value1199")
+        self.assertEqual(result["rpcuser"], "")
+        self.assertIsNone(result["unknown"])
+        self.assertEqual(len(self.config), 1200)
+
+    def test_keys(self):
+        keys = Key()
+        keys.sqlDataBaseFile = self.config.sqlDataBaseFile
+        keys.create_table()
+        keys.add("wif", "pub")
+        self.assertEqual(keys.getPublicKeys(), ["pub"])
+        self.assertEqual(keys.getPrivateKeyForPublicKey("pub"), "wif")
+        keys.delete("pub")
+        self.assertEqual(keys.getPublicKeys(), [])
@@ -0,0 +1,43 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from binascii import hexlify
+from beem import Steem
+from beem.transactionbuilder import TransactionBuilder
+from beembase.operations import Transfer
+from beemapi.fakenode import FakeNode
+from beemgraphenebase.ecdsasig import Signer
+wif = "5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3"
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.node = FakeNode("appbase").start()
+        self.stm = Steem(node=self.node.url, nobroadcast=True, num_retries=1)
+        # the reference block is read with the condenser api
+        self.node.add_response("condenser_api.get_dynamic_global_properties", [],
+                               self.stm.rpc.get_dynamic_global_properties(api="database"))
+
+    def tearDown(self):
+        self.stm.rpc.rpcclose()
+        self.node.stop()
+
+    def test_sign_with_signer(self):
+        stm = self.stm
+        tx = TransactionBuilder(steem_instance=stm)
+        signer = Signer(wif)
+        tx.appendOps(Transfer(**{"from": "beem-test", "to": "test1", "amount": "1.000 STEEM", "memo": ""}))
+        tx.appendWif(signer)
+        tx.appendWif(wif)
+        signed_tx = tx.sign()
+        self.assertEqual(len(tx["signatures"]), 1)
+        key = signed_tx.verify(chain=stm.chain_params, recover_parameter=True)
+        self.assertEqual(key, [hexlify(signer.pubkey).decode("ascii")])
+        # the signer of the wif is kept after clearing the builder
+        cached = tx._get_signer(wif)
+        tx.clear()
+        self.assertIs(tx._get_signer(wif), cached)
@@ -0,0 +1,7 @@
+# This Python file uses the following encoding: utf-8
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 5):
+    # the asyncio tests use async/await
+    collect_ignore.append("test_asyncsteemnoderpc.py")
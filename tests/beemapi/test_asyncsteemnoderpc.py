@@ -0,0 +1,93 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import asyncio
+import json
+import unittest
+import pytest
+web = pytest.importorskip("aiohttp.web")
+from beemapi.asyncsteemnoderpc import AsyncSteemNodeRPC
+from beemapi.exceptions import NumRetriesReached
+from beem.asyncsteem import AsyncSteem
+
+
+async def handle_rpc(request):
+    request.app["calls"] += 1
+    payload = json.loads(await request.text())
+    method = payload["method"]
+    if method == "call":
+        method = "%s.%s" % (payload["params"][0], payload["params"][1])
+    if method == "database_api.get_config":
+        result = {"STEEM_BLOCKCHAIN_VERSION": "0.19.5"}
+    elif method == "block_api.get_block":
+        await asyncio.sleep(0.2)
+        block_num = payload["params"]["block_num"]
+        result = {"block": {"previous": "%08x" % (block_num - 1), "timestamp": "2018-01-01T00:00:00", "transactions": []}}
+    elif method == "database_api.find_accounts":
+        result = {"accounts": [{"name": name} for name in payload["params"]["accounts"]]}
+    else:
+        return web.Response(text=json.dumps({"jsonrpc": "2.0", "id": payload["id"], "error": {"message": "Could not find method %s" % method}}))
+    return web.Response(text=json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": result}))
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.app = web.Application()
+        self.app["calls"] = 0
+        self.app.router.add_post("/", handle_rpc)
+        self.runner = web.AppRunner(self.app)
+        self.loop.run_until_complete(self.runner.setup())
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        self.loop.run_until_complete(site.start())
+        self.url = "http://127.0.0.1:%d" % self.runner.addresses[0][1]
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.runner.cleanup())
+        self.loop.close()
+
+    def test_concurrent_calls(self):
+        async def run():
+            async with AsyncSteemNodeRPC(self.url, num_retries=0) as rpc:
+                self.assertTrue(rpc.get_use_appbase())
+                start = self.loop.time()
+                blocks = await asyncio.gather(*[rpc.get_block({"block_num": i}, api="block") for i in range(1, 51)])
+                return blocks, self.loop.time() - start
+        blocks, duration = self.loop.run_until_complete(run())
+        self.assertEqual(len(blocks), 50)
+        self.assertEqual(blocks[9]["block"]["previous"], "%08x" % 9)
+        # 50 calls with 0.2 s latency each must overlap
+        self.assertLess(duration, 5)
+
+    def test_failover(self):
+        async def run():
+            rpc = AsyncSteemNodeRPC(["http://127.0.0.1:1", self.url], num_retries=5)
+            try:
+                await rpc.rpcconnect()
+                return rpc.url
+            finally:
+                await rpc.rpcclose()
+        self.assertEqual(self.loop.run_until_complete(run()), self.url)
+
+    def test_num_retries(self):
+        async def run():
+            rpc = AsyncSteemNodeRPC(["http://127.0.0.1:1"], num_retries=1)
+            try:
+                await rpc.rpcconnect()
+            finally:
+                await rpc.rpcclose()
+        with self.assertRaises(NumRetriesReached):
+            self.loop.run_until_complete(run())
+
+    def test_async_steem(self):
+        async def run():
+            async with AsyncSteem(node=self.url, num_retries=0) as stm:
+                blocks = await stm.get_blocks(range(1, 11))
+                account = await stm.get_account("beem")
+            return blocks, account
+        blocks, account = self.loop.run_until_complete(run())
+        self.assertEqual([b["id"] for b in blocks], list(range(1, 11)))
+        self.assertEqual(account["name"], "beem")
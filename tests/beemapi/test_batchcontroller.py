@@ -0,0 +1,69 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from beemapi.batchcontroller import BatchController
+
+
+class Testcases(unittest.TestCase):
+
+    def test_slow_start(self):
+        controller = BatchController(batch_size=10, max_batch_size=100, target_latency=1.)
+        self.assertEqual(controller.batch_size("http://a"), 10)
+        controller.record("http://a", 10, 0.1)
+        self.assertEqual(controller.batch_size("http://a"), 20)
+        controller.record("http://a", 20, 0.2)
+        controller.record("http://a", 40, 0.4)
+        controller.record("http://a", 80, 0.8)
+        self.assertEqual(controller.batch_size("http://a"), 100)
+        controller.record("http://a", 100, 0.9)
+        self.assertEqual(controller.batch_size("http://a"), 100)
+        # other nodes are not changed
+        self.assertEqual(controller.batch_size("http://b"), 10)
+        self.assertEqual(controller.batch_size(), 10)
+
+    def test_shrink(self):
+        controller = BatchController(batch_size=100, target_latency=1.)
+        controller.record("http://a", 100, 2.)
+        self.assertEqual(controller.batch_size("http://a"), 75)
+        # after a slow reply, the batch size grows slowly
+        controller.record("http://a", 75, 0.5)
+        self.assertEqual(controller.batch_size("http://a"), 85)
+        controller.record("http://a", 85, 0.5, error=True)
+        self.assertEqual(controller.batch_size("http://a"), 42)
+        controller = BatchController(batch_size=100, max_reply_bytes=1000)
+        controller.record("http://a", 100, 0.1, reply_bytes=2000)
+        self.assertEqual(controller.batch_size("http://a"), 75)
+        controller = BatchController(batch_size=2, min_batch_size=2)
+        controller.record("http://a", 2, 0.1, error=True)
+        self.assertEqual(controller.batch_size("http://a"), 2)
+
+    def test_throughput(self):
+        controller = BatchController(batch_size=100, target_latency=10.)
+        controller.record("http://a", 100, 1.)
+        self.assertEqual(controller.batch_size("http://a"), 200)
+        # twice the items need four times as long
+        controller.record("http://a", 200, 4.)
+        self.assertEqual(controller.batch_size("http://a"), 150)
+        # a smaller batch than the current size does not change it
+        controller.record("http://a", 10, 4.)
+        self.assertEqual(controller.batch_size("http://a"), 150)
+
+    def test_concurrency(self):
+        controller = BatchController(concurrency=1, max_concurrency=3, target_latency=1.)
+        for i in range(2):
+            controller.record("http://a", latency=0.1)
+        self.assertEqual(controller.concurrency("http://a"), 2)
+        for i in range(10):
+            controller.record("http://a", latency=0.1)
+        self.assertEqual(controller.concurrency("http://a"), 3)
+        controller.record("http://a", latency=2.)
+        self.assertEqual(controller.concurrency("http://a"), 2)
+        controller.record("http://a", error=True)
+        self.assertEqual(controller.concurrency("http://a"), 1)
+        stats = controller.get_stats()["http://a"]
+        self.assertEqual(stats["requests"], 14)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["concurrency"], 1)
@@ -0,0 +1,107 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import requests
+from beemapi.graphenerpc import GrapheneRPC
+from beemapi.fakenode import FakeNode, FixtureRecorder, FIXTURE_BLOCKS, get_request_key
+from beemapi.exceptions import RPCError
+
+
+class Testcases(unittest.TestCase):
+
+    def test_get_request_key(self):
+        self.assertEqual(get_request_key({"method": "call", "params": ["database_api", "get_block", [1]], "id": 1}),
+                         "database_api.get_block:[1]")
+        self.assertEqual(get_request_key({"method": "block_api.get_block", "params": {"block_num": 1}, "id": 2}),
+                         'block_api.get_block:{"block_num":1}')
+        self.assertIsNone(get_request_key({"method": "call", "params": [], "id": 1}))
+
+    def test_appbase(self):
+        with FakeNode("appbase") as node:
+            for url in [node.url, node.ws_url]:
+                rpc = GrapheneRPC(url, num_retries=1)
+                self.assertTrue(rpc.get_use_appbase())
+                self.assertEqual(rpc.get_config(api="database")["STEEM_BLOCKCHAIN_VERSION"], "0.20.2")
+                blocks = rpc.rpcexec_batch([{"method": "block_api.get_block", "params": {"block_num": n},
+                                             "jsonrpc": "2.0"} for n in range(FIXTURE_BLOCKS[0], FIXTURE_BLOCKS[0] + 5)])
+                self.assertEqual([int(b["block"]["block_id"][:8], 16) for b in blocks],
+                                 list(range(FIXTURE_BLOCKS[0], FIXTURE_BLOCKS[0] + 5)))
+                with self.assertRaises(RPCError):
+                    rpc.get_block({"block_num": 1}, api="block")
+                rpc.rpcclose()
+
+    def test_pre_appbase(self):
+        with FakeNode("pre_appbase") as node:
+            rpc = GrapheneRPC(node.ws_url, num_retries=1)
+            self.assertFalse(rpc.is_appbase_ready())
+            self.assertEqual(rpc.get_block(FIXTURE_BLOCKS[1])["timestamp"], "2018-08-01T12:02:27")
+            rpc.rpcclose()
+
+    def test_responses(self):
+        node = FakeNode(None)
+        node.add_response("condenser_api.get_dynamic_global_properties", [], {"head_block_number": 1})
+        node.add_response("condenser_api.get_dynamic_global_properties", [], {"head_block_number": 2})
+        node.add_response("condenser_api.get_accounts", [["bad"]], error={"code": -32000, "message": "Bad Cast"})
+        query = {"method": "call", "params": ["condenser_api", "get_dynamic_global_properties", []], "id": 7}
+        self.assertEqual(node.get_reply(query), {"jsonrpc": "2.0", "id": 7, "result": {"head_block_number": 1}})
+        self.assertEqual(node.get_reply(query)["result"]["head_block_number"], 2)
+        # the last reply is repeated
+        self.assertEqual(node.get_reply(query)["result"]["head_block_number"], 2)
+        reply = node.get_reply({"method": "condenser_api.get_accounts", "params": [["bad"]], "id": 8})
+        self.assertEqual(reply["error"]["message"], "Bad Cast")
+        reply = node.get_reply({"method": "condenser_api.get_block", "params": [1], "id": 9})
+        self.assertIn("Could not find method", reply["error"]["message"])
+
+    def test_errors(self):
+        with FakeNode("appbase", error_rate=1., error_type="http") as node:
+            response = requests.post(node.url, data=b'{"method": "call", "params": [], "id": 1}')
+            self.assertEqual(response.status_code, 503)
+        with FakeNode("appbase", error_rate=1., error_type="disconnect") as node:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                requests.post(node.url, data=b'{"method": "call", "params": [], "id": 1}')
+        with FakeNode("appbase", error_rate=0.5, seed=1) as node:
+            replies = [node.handle(b'{"method": "database_api.get_config", "params": {}, "id": 1}')[1]
+                       for i in range(100)]
+            self.assertEqual(sum(1 for r in replies if b"Internal Error" in r), node.errors)
+            self.assertTrue(20 < node.errors < 80)
+            self.assertEqual(node.requests, 100)
+
+    def test_latency(self):
+        with FakeNode("appbase", latency=0.05, jitter=0.05) as node:
+            start = time.time()
+            for i in range(3):
+                node.handle(b'{"method": "database_api.get_config", "params": {}, "id": 1}')
+            duration = time.time() - start
+        self.assertGreaterEqual(duration, 0.15)
+        self.assertLess(duration, 0.5)
+
+    def test_recorder(self):
+        path = tempfile.mkdtemp()
+        try:
+            recorder = FixtureRecorder("test")
+            with FakeNode("appbase") as node:
+                rpc = GrapheneRPC(node.url, num_retries=1, recorder=recorder)
+                rpc.get_dynamic_global_properties(api="database")
+                with rpc.batch() as batch:
+                    batch.get_block({"block_num": FIXTURE_BLOCKS[0]}, api="block")
+                    batch.get_block({"block_num": FIXTURE_BLOCKS[1]}, api="block")
+                with self.assertRaises(RPCError):
+                    rpc.get_block({"block_num": 1}, api="block")
+            # get_config of rpcconnect, the properties, both batch queries and the error
+            self.assertEqual(len(recorder), 5)
+            self.assertIn("error", recorder.responses[-1])
+            recorder.save(os.path.join(path, "test.json"))
+            with FakeNode(os.path.join(path, "test.json")) as node:
+                rpc = GrapheneRPC(node.url, num_retries=1)
+                self.assertEqual(rpc.get_block({"block_num": FIXTURE_BLOCKS[0]}, api="block")["block"]["timestamp"],
+                                 "2018-08-01T12:00:00")
+                self.assertEqual(node.requests, 2)
+        finally:
+            shutil.rmtree(path)
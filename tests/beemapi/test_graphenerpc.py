@@ -0,0 +1,304 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import mock
+import threading
+import time
+import unittest
+from queue import Queue
+from beemapi.graphenerpc import GrapheneRPC, WebsocketReader
+from beemapi.steemnoderpc import SteemNodeRPC
+from beemapi.exceptions import RPCError, ApiNotSupported
+
+
+class FakeWebsocket(object):
+    """Answers the requests in reverse order, after num_requests requests were sent"""
+    def __init__(self, num_requests):
+        self.num_requests = num_requests
+        self.requests = []
+        self.replies = Queue()
+        self.lock = threading.Lock()
+
+    def send(self, payload):
+        with self.lock:
+            self.requests.append(json.loads(payload))
+            if len(self.requests) < self.num_requests:
+                return
+            for request in reversed(self.requests):
+                reply = {"jsonrpc": "2.0", "id": request["id"], "result": request["params"]}
+                self.replies.put(json.dumps(reply))
+            self.requests = []
+
+    def recv(self):
+        reply = self.replies.get()
+        if reply is None:
+            raise IOError("Connection closed")
+        return reply
+
+    def close(self):
+        self.replies.put(None)
+
+
+class Testcases(unittest.TestCase):
+
+    def get_rpc(self, klass=GrapheneRPC):
+        rpc = klass("https://api.steemit.com", autoconnect=False, num_retries_call=2)
+        rpc.url = "https://api.steemit.com"
+        rpc.current_rpc = rpc.rpc_methods["appbase"]
+        return rpc
+
+    def test_batch_out_of_order_and_split(self):
+        rpc = self.get_rpc()
+        payloads = []
+
+        def send(payload):
+            payloads.append(payload)
+            return json.dumps([{"jsonrpc": "2.0", "id": q["id"], "result": q["params"]["block_num"]} for q in reversed(payload)])
+        with mock.patch.object(rpc, "_rpcexec_raw", side_effect=send):
+            with rpc.batch(max_batch_size=4) as batch:
+                for i in range(10):
+                    batch.get_block({"block_num": i}, api="block")
+        self.assertEqual(batch.results, list(range(10)))
+        self.assertEqual([len(p) for p in payloads], [4, 4, 2])
+        self.assertEqual(payloads[0][0]["method"], "block_api.get_block")
+
+    def test_batch_retry_failed(self):
+        rpc = self.get_rpc()
+        payloads = []
+
+        def send(payload):
+            payloads.append(payload)
+            replies = []
+            for q in payload:
+                if q["params"]["block_num"] == 3 and len(payloads) == 1:
+                    replies.append({"jsonrpc": "2.0", "id": q["id"], "error": {"message": "Internal Error"}})
+                elif q["params"]["block_num"] == 5 and len(payloads) == 1:
+                    continue
+                else:
+                    replies.append({"jsonrpc": "2.0", "id": q["id"], "result": q["params"]["block_num"]})
+            return json.dumps(replies)
+        with mock.patch.object(rpc, "_rpcexec_raw", side_effect=send), mock.patch("time.sleep"):
+            batch = rpc.batch()
+            for i in range(8):
+                batch.get_block({"block_num": i}, api="block")
+            self.assertEqual(batch.execute(), list(range(8)))
+        self.assertEqual(len(payloads), 2)
+        self.assertEqual([q["params"]["block_num"] for q in payloads[1]], [3, 5])
+
+    def test_batch_dynamic_global_properties(self):
+        rpc = GrapheneRPC("https://api.steemit.com", autoconnect=False, num_retries_call=2, response_cache=True)
+        rpc.url = "https://api.steemit.com"
+        rpc.current_rpc = rpc.rpc_methods["appbase"]
+
+        def send(payload):
+            return json.dumps([{"jsonrpc": "2.0", "id": q["id"],
+                                "result": {"head_block_number": 20, "last_irreversible_block_num": 5}} for q in payload])
+        with mock.patch.object(rpc, "_rpcexec_raw", side_effect=send):
+            with rpc.batch() as batch:
+                batch.get_dynamic_global_properties(api="database")
+        # the batch result is processed like the result of a single call
+        self.assertEqual(rpc.nodes[0].head_block_num, 20)
+        self.assertEqual(rpc.response_cache.last_irreversible_block_num, 5)
+
+    def test_batch_raise(self):
+        rpc = self.get_rpc()
+
+        def send(payload):
+            return json.dumps([{"jsonrpc": "2.0", "id": q["id"], "error": {"message": "Internal Error"}} for q in payload])
+        with mock.patch.object(rpc, "_rpcexec_raw", side_effect=send) as send_mock, mock.patch("time.sleep"):
+            batch = rpc.batch()
+            batch.get_block({"block_num": 1}, api="block")
+            with self.assertRaises(RPCError):
+                batch.execute()
+        self.assertEqual(send_mock.call_count, 3)
+
+        rpc = self.get_rpc(SteemNodeRPC)
+
+        def send(payload):
+            return json.dumps([{"jsonrpc": "2.0", "id": q["id"], "error": {"message": "Could not find API account_history_api"}} for q in payload])
+        with mock.patch.object(rpc, "_rpcexec_raw", side_effect=send) as send_mock:
+            batch = rpc.batch()
+            batch.get_ops_in_block({"block_num": 1, "only_virtual": False}, api="account_history")
+            with self.assertRaises(ApiNotSupported):
+                batch.execute()
+        self.assertEqual(send_mock.call_count, 1)
+
+    def test_node_scoring(self):
+        rpc = GrapheneRPC(["http://a", "http://b"], autoconnect=False, num_retries=2, node_scoring=True)
+        urls = []
+
+        def send(payload):
+            urls.append(rpc.url)
+            payload = json.loads(payload)
+            if payload["method"] == "call" and payload["params"][1] == "get_config":
+                result = {"STEEM_BLOCKCHAIN_VERSION": "0.19.5"}
+            else:
+                result = {"head_block_number": 10}
+            return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": result})
+        with mock.patch.object(rpc, "request_send", side_effect=send):
+            for i in range(3):
+                rpc.nodes[1].record_success(0.01)
+            rpc.rpcconnect()
+            self.assertEqual(rpc.url, "http://a")
+            self.assertEqual(rpc.nodes[0].samples, 1)
+            for i in range(3):
+                rpc.nodes[0].record_success(2.)
+            rpc.nodes.last_switch_time = 0
+            rpc.get_dynamic_global_properties(api="database")
+        self.assertEqual(rpc.url, "http://b")
+        self.assertEqual(urls[-1], "http://b")
+        self.assertEqual(rpc.nodes[1].head_block_num, 10)
+
+    def test_circuit_breaker_failover(self):
+        rpc = SteemNodeRPC(["http://a", "http://b"], autoconnect=False, num_retries=2, node_scoring=False,
+                           circuit_breaker=True)
+        urls = []
+
+        def send(payload):
+            urls.append(rpc.url)
+            payload = json.loads(payload)
+            if payload["method"] == "call" and payload["params"][1] == "get_config":
+                return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": {"STEEM_BLOCKCHAIN_VERSION": "0.19.5"}})
+            elif rpc.url == "http://a":
+                return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "error": {"message": "Internal Error"}})
+            return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": {"head_block_number": 10}})
+        with mock.patch.object(rpc, "request_send", side_effect=send):
+            rpc.rpcconnect()
+            self.assertEqual(rpc.url, "http://a")
+            with mock.patch("time.sleep") as sleep:
+                props = rpc.get_dynamic_global_properties(api="database")
+            self.assertEqual(props["head_block_number"], 10)
+            # the failed call was repeated on the next node without waiting
+            sleep.assert_not_called()
+        self.assertEqual(rpc.url, "http://b")
+        # the failed call is recorded once, a single failure does not open the node
+        self.assertEqual(rpc.nodes[0].consecutive_failures, 1)
+        self.assertEqual(rpc.nodes[0].state, "closed")
+
+    def test_empty_reply_failover(self):
+        # the circuit breaker is opt-in
+        self.assertFalse(GrapheneRPC(["http://a", "http://b"], autoconnect=False).nodes.circuit_breaker)
+        rpc = GrapheneRPC(["http://a", "http://b"], autoconnect=False, num_retries=2, node_scoring=False,
+                          circuit_breaker=True)
+
+        def send(payload):
+            payload = json.loads(payload)
+            if payload["method"] == "call" and payload["params"][1] == "get_config":
+                return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": {"STEEM_BLOCKCHAIN_VERSION": "0.19.5"}})
+            elif rpc.url == "http://a":
+                return ""
+            return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": {"head_block_number": 10}})
+        with mock.patch.object(rpc, "request_send", side_effect=send):
+            rpc.rpcconnect()
+            with mock.patch("time.sleep") as sleep:
+                props = rpc.get_dynamic_global_properties(api="database")
+            self.assertEqual(props["head_block_number"], 10)
+            sleep.assert_not_called()
+        self.assertEqual(rpc.url, "http://b")
+        self.assertEqual(rpc.nodes[0].consecutive_failures, 1)
+        self.assertAlmostEqual(rpc.nodes[0].success_rate, 1. - rpc.nodes[0].ewma_alpha)
+
+    def test_websocket_reader(self):
+        ws = FakeWebsocket(8)
+        reader = WebsocketReader(ws, timeout=5)
+        results = {}
+
+        def call(i):
+            payload = json.dumps({"jsonrpc": "2.0", "id": i, "method": "get_block", "params": [i]})
+            results[i] = json.loads(reader.send(payload, i))["result"]
+        threads = [threading.Thread(target=call, args=(i, )) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, {i: [i] for i in range(8)})
+        self.assertEqual(len(reader), 0)
+
+        # waiting calls fail, when the connection is closed
+        errors = []
+
+        def failing_call():
+            try:
+                reader.send(json.dumps({"jsonrpc": "2.0", "id": 100, "method": "get_block", "params": []}), 100)
+            except Exception as e:
+                errors.append(e)
+        t = threading.Thread(target=failing_call)
+        t.start()
+        time.sleep(0.05)
+        reader.close()
+        t.join()
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(reader.closed)
+
+    def test_websocket_multiplexing(self):
+        self.assertFalse(GrapheneRPC("ws://a", autoconnect=False).ws_multiplexing)
+        rpc = GrapheneRPC("ws://a", autoconnect=False, ws_multiplexing=True)
+        rpc.url = "ws://a"
+        rpc.current_rpc = rpc.rpc_methods["wsappbase"]
+        rpc.ws = FakeWebsocket(4)
+        rpc._ws_reader = WebsocketReader(rpc.ws)
+        results = {}
+
+        def call(i):
+            results[i] = rpc.get_block({"block_num": i}, api="block")
+        threads = [threading.Thread(target=call, args=(i, )) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        rpc.rpcclose()
+        self.assertEqual(results, {i: {"block_num": i} for i in range(4)})
+
+    def test_hedging(self):
+        rpc = GrapheneRPC(["http://slow", "http://fast"], autoconnect=False, hedge_percentile=90)
+        rpc.url = "http://slow"
+        rpc.current_rpc = rpc.rpc_methods["appbase"]
+        rpc.headers = {}
+        delays = {"http://slow": 0.01, "http://fast": 0.01}
+        sent = []
+
+        class Response(object):
+            status_code = 200
+
+            def __init__(self, text):
+                self.text = text
+                self.content = text.encode("utf8")
+
+        def post(url, data=None, **kwargs):
+            sent.append(url)
+            time.sleep(delays[url])
+            payload = json.loads(data)
+            return Response(json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": url}))
+        rpc.session = mock.Mock()
+        rpc.session.post.side_effect = post
+        for i in range(rpc.hedge_min_samples):
+            rpc.nodes[0].record_success(0.1)
+            rpc.nodes[1].record_success(0.1)
+
+        self.assertEqual(rpc.get_block({"block_num": 1}, api="block"), "http://slow")
+        self.assertEqual(rpc.hedging_stats["hedged"], 0)
+
+        delays["http://slow"] = 1.
+        start = time.time()
+        self.assertEqual(rpc.get_block({"block_num": 1}, api="block"), "http://fast")
+        self.assertLess(time.time() - start, 0.8)
+        self.assertEqual(rpc.hedging_stats, {"calls": 2, "hedged": 1, "backup_won": 1, "abandoned": 1})
+
+        # broadcasts are never hedged
+        with mock.patch.object(rpc, "request_send", return_value=json.dumps({"jsonrpc": "2.0", "id": 1, "result": {}})) as send:
+            rpc.broadcast_transaction({"trx": {}}, api="network_broadcast")
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(rpc.hedging_stats["calls"], 2)
+
+        # the counters are shared by all calling threads
+        delays["http://slow"] = 0.
+        threads = [threading.Thread(target=lambda: [rpc.get_block({"block_num": 1}, api="block") for i in range(5)])
+                   for j in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(rpc.hedging_stats["calls"], 42)
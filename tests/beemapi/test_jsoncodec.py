@@ -0,0 +1,48 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from parameterized import parameterized
+from beemapi import jsoncodec
+from beemapi.jsoncodec import JSONCodec, ORJSON_MODULE, UJSON_MODULE
+
+codec_names = [("json", )]
+if ORJSON_MODULE:
+    codec_names.append(("orjson", ))
+if UJSON_MODULE:
+    codec_names.append(("ujson", ))
+
+
+class Testcases(unittest.TestCase):
+
+    @parameterized.expand(codec_names)
+    def test_roundtrip(self, name):
+        codec = JSONCodec(name)
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "condenser_api.get_block", "params": [1, "äöü", None, True]}
+        data = codec.dumps(payload)
+        self.assertTrue(isinstance(data, bytes))
+        self.assertEqual(codec.loads(data), payload)
+        self.assertEqual(codec.loads(data.decode("utf8")), payload)
+
+    @parameterized.expand(codec_names)
+    def test_fallback(self, name):
+        codec = JSONCodec(name)
+        # larger than 64 bit
+        self.assertEqual(codec.loads(codec.dumps({"supply": 2 ** 70})), {"supply": 2 ** 70})
+        # control characters inside of strings
+        self.assertEqual(codec.loads(b'{"body": "a\tb"}'), {"body": "a\tb"})
+        with self.assertRaises(ValueError):
+            codec.loads("<html>502 Bad Gateway</html>")
+
+    def test_set_json_codec(self):
+        codec = jsoncodec.get_json_codec()
+        try:
+            jsoncodec.set_json_codec("json")
+            self.assertEqual(jsoncodec.get_json_codec().name, "json")
+            self.assertEqual(jsoncodec.loads(jsoncodec.dumps([1, 2])), [1, 2])
+        finally:
+            jsoncodec.set_json_codec(codec)
+        with self.assertRaises(ValueError):
+            JSONCodec("unknown")
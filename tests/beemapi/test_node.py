@@ -4,6 +4,7 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 import pytest
+import time
 import unittest
 from beemapi.node import Nodes
 from beemapi.rpcutils import (
@@ -54,3 +55,121 @@ class Testcases(unittest.TestCase):
         nodes = Nodes(["a", "b", "c"], 5, 5)
         nodes2 = Nodes(nodes, 5, 5)
         self.assertEqual(nodes.url, nodes2.url)
+
+    def test_ewma(self):
+        nodes = Nodes(["a"], -1, 5)
+        node = nodes[0]
+        node.record_success(1.)
+        self.assertEqual(node.latency, 1.)
+        node.record_success(2.)
+        self.assertAlmostEqual(node.latency, 1.3)
+        node.record_failure()
+        self.assertAlmostEqual(node.success_rate, 0.7)
+        self.assertEqual(node.samples, 3)
+        nodes.increase_error_cnt()
+        self.assertAlmostEqual(node.success_rate, 0.49)
+
+    def test_next_by_cost(self):
+        nodes = Nodes(["a", "b", "c"], -1, 5, scoring=True)
+        for node, latency in zip(nodes[:], [4., 0.04, 0.5]):
+            for i in range(3):
+                node.record_success(latency)
+        self.assertEqual(next(nodes), "b")
+        # the current node is left
+        self.assertEqual(next(nodes), "c")
+        self.assertEqual(next(nodes), "b")
+        self.assertEqual([url for url, cost in nodes.get_ranking()], ["b", "c", "a"])
+
+        # failures and a lagging head block increase the costs
+        for i in range(8):
+            nodes[1].record_failure()
+        self.assertEqual(nodes.get_ranking()[0][0], "c")
+        nodes[1].success_rate = 1.
+        nodes[1].record_head_block(1000)
+        nodes[2].record_head_block(1000)
+        nodes[0].record_head_block(1010)
+        self.assertEqual([url for url, cost in nodes.get_ranking()], ["a", "b", "c"])
+
+        # without scoring the nodes are used in turn, scoring is opt-in
+        nodes = Nodes(["a", "b", "c"], -1, 5)
+        nodes[1].record_success(10.)
+        self.assertEqual([next(nodes) for i in range(4)], ["a", "b", "c", "a"])
+
+    def test_better_node_available(self):
+        nodes = Nodes(["a", "b"], -1, 5, scoring=True)
+        next(nodes)
+        self.assertEqual(nodes.url, "a")
+        nodes.last_switch_time = 0
+        for i in range(3):
+            nodes[0].record_success(1.)
+        # unknown nodes do not lead to a switch
+        self.assertFalse(nodes.better_node_available())
+        for i in range(3):
+            nodes[1].record_success(0.1)
+        self.assertTrue(nodes.better_node_available())
+        nodes.last_switch_time = time.time()
+        self.assertFalse(nodes.better_node_available())
+
+    def test_circuit_breaker(self):
+        nodes = Nodes(["a", "b"], -1, 5, scoring=False, circuit_breaker=True)
+        node = nodes[0]
+        self.assertEqual(node.state, "closed")
+        # a single failure does not open the node
+        for i in range(node.breaker_threshold - 1):
+            node.record_failure()
+        self.assertEqual(node.state, "closed")
+        node.record_failure()
+        self.assertEqual(node.state, "open")
+        self.assertFalse(node.is_available())
+        self.assertAlmostEqual(node.open_remaining(), node.breaker_base_time, places=1)
+        # open nodes are skipped
+        self.assertEqual([next(nodes) for i in range(3)], ["b", "b", "b"])
+        node.open_until = time.time() - 1
+        self.assertEqual(node.state, "half-open")
+        self.assertTrue(node.is_available())
+        # a failed trial call opens the node again for twice the time
+        node.record_failure()
+        self.assertEqual(node.state, "open")
+        self.assertAlmostEqual(node.open_remaining(), 2 * node.breaker_base_time, places=1)
+        node.open_until = time.time() - 1
+        node.record_success(0.1)
+        self.assertEqual(node.state, "closed")
+        self.assertEqual(node.open_count, 0)
+
+    def test_other_node_available(self):
+        nodes = Nodes(["a", "b"], -1, 5, circuit_breaker=True)
+        next(nodes)
+        self.assertEqual(nodes.url, "a")
+        self.assertTrue(nodes.other_node_available())
+        for i in range(nodes[1].breaker_threshold):
+            nodes[1].record_failure()
+        self.assertFalse(nodes.other_node_available())
+        for i in range(nodes[0].breaker_threshold):
+            nodes[0].record_failure()
+        # all nodes are open, the node which is available first is used
+        nodes[1].open_until = time.time() + 0.5
+        self.assertEqual(next(nodes), "b")
+        # the circuit breaker is not used by default
+        nodes = Nodes(["a", "b"], -1, 5)
+        next(nodes)
+        self.assertFalse(nodes.other_node_available())
+
+    def test_probing(self):
+        nodes = Nodes(["a", "b"], -1, 5, scoring=True)
+
+        def probe(url):
+            if url == "a":
+                raise Exception("timeout")
+            return 100
+        nodes.start_probing(probe, interval=0.01)
+        try:
+            for i in range(100):
+                if nodes[1].samples >= 3 and nodes[0].samples >= 3:
+                    break
+                time.sleep(0.01)
+        finally:
+            nodes.stop_probing()
+        self.assertLess(nodes[0].success_rate, 0.5)
+        self.assertEqual(nodes[1].success_rate, 1.)
+        self.assertEqual(nodes[1].head_block_num, 100)
+        self.assertEqual(next(nodes), "b")
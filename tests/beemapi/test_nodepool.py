@@ -0,0 +1,111 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import threading
+import time
+import unittest
+from beemapi.nodepool import NodePool
+from beemapi.batchcontroller import BatchController
+from beemapi.graphenerpc import GrapheneRPC
+from beemapi.exceptions import RPCError
+
+
+class FakeRPC(object):
+    lock = threading.Lock()
+    running = {}
+    peak = {}
+
+    def __init__(self, url, **kwargs):
+        self.url = url
+        self.kwargs = kwargs
+
+    def get_block(self, block_num):
+        with self.lock:
+            self.running[self.url] = self.running.get(self.url, 0) + 1
+            self.peak[self.url] = max(self.peak.get(self.url, 0), self.running[self.url])
+        try:
+            time.sleep(0.02)
+            if self.url == "http://down":
+                raise IOError("Connection refused")
+            elif self.url == "http://error":
+                raise RPCError("missing required active authority")
+            return {"block_num": block_num, "url": self.url}
+        finally:
+            with self.lock:
+                self.running[self.url] -= 1
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        FakeRPC.running = {}
+        FakeRPC.peak = {}
+
+    def test_map(self):
+        urls = ["http://a", "http://b", "http://c"]
+        pool = NodePool(urls, rpc_class=FakeRPC, max_concurrency=2)
+        start = time.time()
+        blocks = pool.map(lambda rpc, n: rpc.get_block(n), range(60))
+        duration = time.time() - start
+        pool.close()
+        self.assertEqual([b["block_num"] for b in blocks], list(range(60)))
+        self.assertEqual(set(b["url"] for b in blocks), set(urls))
+        self.assertEqual(max(FakeRPC.peak.values()), 2)
+        # 60 calls of 20 ms on 6 slots
+        self.assertLess(duration, 0.6)
+        stats = pool.get_stats()
+        self.assertEqual(sum(s["calls"] for s in stats.values()), 60)
+        self.assertEqual(sum(s["in_flight"] for s in stats.values()), 0)
+
+    def test_weights(self):
+        pool = NodePool(["http://a", "http://b"], rpc_class=FakeRPC, max_concurrency=8,
+                        weights={"http://a": 3, "http://b": 1})
+        pool.map(lambda rpc, n: rpc.get_block(n), range(80))
+        pool.close()
+        stats = pool.get_stats()
+        self.assertGreater(stats["http://a"]["calls"], 2 * stats["http://b"]["calls"])
+        self.assertGreater(stats["http://b"]["calls"], 0)
+
+    def test_failover(self):
+        pool = NodePool(["http://down", "http://a"], rpc_class=FakeRPC)
+        for i in range(3):
+            self.assertEqual(pool.get_block(i)["url"], "http://a")
+        self.assertLess(pool.nodes[0].success_rate, 1)
+        self.assertEqual(pool.get_stats()["http://down"]["calls"], 1)
+
+        pool = NodePool(["http://down"], rpc_class=FakeRPC, num_retries=2)
+        with self.assertRaises(IOError):
+            pool.get_block(1)
+        self.assertEqual(pool.get_stats()["http://down"]["calls"], 3)
+
+        # errors returned by the node are not repeated
+        pool = NodePool(["http://error", "http://a"], rpc_class=FakeRPC)
+        with self.assertRaises(RPCError):
+            pool.get_block(1)
+
+    def test_controller(self):
+        # every call is slower than the target latency, the concurrency stays at 1
+        controller = BatchController(concurrency=1, max_concurrency=4, target_latency=0.001)
+        pool = NodePool(["http://a"], rpc_class=FakeRPC, max_concurrency=4, controller=controller)
+        pool.map(lambda rpc, n: rpc.get_block(n), range(10))
+        pool.close()
+        self.assertEqual(FakeRPC.peak["http://a"], 1)
+        self.assertEqual(controller.get_stats()["http://a"]["requests"], 10)
+
+        FakeRPC.peak = {}
+        controller = BatchController(concurrency=1, max_concurrency=4, target_latency=10.)
+        pool = NodePool(["http://a"], rpc_class=FakeRPC, max_concurrency=2, controller=controller)
+        pool.map(lambda rpc, n: rpc.get_block(n), range(20))
+        pool.close()
+        self.assertEqual(FakeRPC.peak["http://a"], 2)
+        self.assertEqual(controller.concurrency("http://a"), 4)
+
+    def test_create_pool(self):
+        rpc = GrapheneRPC(["http://a", "http://b"], autoconnect=False, timeout=7)
+        pool = rpc.create_pool(max_concurrency=3)
+        self.assertEqual(pool.rpc_class, GrapheneRPC)
+        self.assertEqual(pool.max_workers, 6)
+        self.assertEqual(pool.rpc_kwargs["timeout"], 7)
+        self.assertFalse(pool.rpc_kwargs["autoconnect"])
@@ -0,0 +1,147 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import mock
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from beemapi.graphenerpc import GrapheneRPC
+from beemapi.responsecache import ResponseCache, CachePolicy
+from beemapi.rpcutils import get_query
+
+chain_id = "0000000000000000000000000000000000000000000000000000000000000000"
+test_chain_id = "79276aea5d4877d9a25892eaa01b0adf019d3e5cb12a97478df3298ccdd01673"
+
+
+class Testcases(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_policy(self):
+        policy = CachePolicy(ttls={"get_accounts": 3, "condenser_api.get_config": 0})
+        self.assertIsNone(policy.get_ttl("database_api", "get_config", {}))
+        self.assertEqual(policy.get_ttl("condenser_api", "get_config", []), 0)
+        self.assertEqual(policy.get_ttl("condenser_api", "get_accounts", [["test"]]), 3)
+        self.assertEqual(policy.get_ttl("condenser_api", "get_dynamic_global_properties", []), 0)
+        # blocks are only immutable, when they are irreversible
+        self.assertEqual(policy.get_ttl("block_api", "get_block", {"block_num": 10}, 9), 0)
+        self.assertIsNone(policy.get_ttl("block_api", "get_block", {"block_num": 10}, 10))
+        self.assertIsNone(policy.get_ttl("condenser_api", "get_ops_in_block", [10, False], 10))
+        policy = CachePolicy(immutable_below_lib=False)
+        self.assertEqual(policy.get_ttl("block_api", "get_block", {"block_num": 10}, 10), 0)
+
+    def test_get_key(self):
+        cache = ResponseCache()
+        cache.set_last_irreversible_block_num(100)
+        # nothing is cached, until the chain is known
+        self.assertEqual(cache.get_key(get_query(True, 1, "block_api", "get_block", ({"block_num": 1}, ))), (None, 0))
+        cache.bind(chain_id)
+        key, ttl = cache.get_key(get_query(True, 1, "block_api", "get_block", ({"block_num": 1}, )))
+        self.assertEqual(key, '0000000000000000:block_api.get_block:{"block_num":1}')
+        self.assertIsNone(ttl)
+        # the request id is not part of the key
+        self.assertEqual(cache.get_key(get_query(True, 2, "block_api", "get_block", ({"block_num": 1}, )))[0], key)
+        key, ttl = cache.get_key(get_query(False, 1, "database_api", "get_block", (1, )))
+        self.assertEqual(key, '0000000000000000:database_api.get_block:[1]')
+        self.assertEqual(cache.get_key(get_query(True, 1, "block_api", "get_block", ({"block_num": 101}, ))), (None, 0))
+        self.assertEqual(cache.get_key([get_query(True, 1, "block_api", "get_block", ({"block_num": 1}, ))]), (None, 0))
+
+    def test_lru_and_expiration(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        self.assertEqual(cache.get("a"), b"1")
+        cache.put("c", b"3")
+        # b is the least recently used result
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1")
+        cache.put("d", b"4", ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("d"))
+        cache = ResponseCache(max_bytes=5)
+        cache.put("a", b"123")
+        cache.put("b", b"456")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()["bytes"], 3)
+
+    def test_disk_tier(self):
+        path = os.path.join(self.directory, "cache.sqlite")
+        cache = ResponseCache(max_entries=1, path=path)
+        self.assertEqual(cache._db.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        # NORMAL
+        self.assertEqual(cache._db.execute("PRAGMA synchronous").fetchone()[0], 1)
+        cache.put("a", b'{"a":1}')
+        cache.put("b", b'{"b":1}', ttl=60)
+        self.assertEqual(cache.get("a"), b'{"a":1}')
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+        cache.close()
+        cache = ResponseCache(path=path)
+        self.assertEqual(cache.get("b"), b'{"b":1}')
+        cache.clear()
+        self.assertIsNone(cache.get("a"))
+        cache.close()
+
+    def test_chains(self):
+        path = os.path.join(self.directory, "cache.sqlite")
+        query = get_query(True, 1, "database_api", "get_config", ({}, ))
+        cache = ResponseCache(path=path, chain_id=chain_id)
+        cache.call(query, lambda q: {"STEEM_CHAIN_ID": chain_id})
+        with self.assertRaises(ValueError):
+            cache.bind(test_chain_id)
+        cache.close()
+        # another chain does not read the results of the shared disk tier
+        cache = ResponseCache(path=path, chain_id=test_chain_id)
+        result = cache.call(query, lambda q: {"STEEM_CHAIN_ID": test_chain_id})
+        self.assertEqual(result["STEEM_CHAIN_ID"], test_chain_id)
+        self.assertEqual(cache.stats()["disk_hits"], 0)
+        cache.close()
+        cache = ResponseCache(path=path)
+        cache.bind(chain_id)
+        self.assertEqual(cache.call(query, lambda q: None)["STEEM_CHAIN_ID"], chain_id)
+        cache.close()
+
+    def test_bind_on_connect(self):
+        rpc = GrapheneRPC("http://a", autoconnect=False, response_cache=True)
+
+        def send(payload):
+            payload = json.loads(payload)
+            return json.dumps({"jsonrpc": "2.0", "id": payload["id"],
+                               "result": {"STEEM_BLOCKCHAIN_VERSION": "0.19.5", "STEEM_CHAIN_ID": test_chain_id}})
+        with mock.patch.object(rpc, "request_send", side_effect=send):
+            rpc.rpcconnect()
+        self.assertEqual(rpc.response_cache.chain_id, test_chain_id)
+
+    def test_rpc(self):
+        rpc = GrapheneRPC("http://a", autoconnect=False, response_cache=ResponseCache(chain_id=chain_id))
+        rpc.url = "http://a"
+        rpc.current_rpc = rpc.rpc_methods["appbase"]
+        methods = []
+
+        def send(payload):
+            payload = json.loads(payload)
+            methods.append(payload["method"])
+            if payload["method"] == "database_api.get_dynamic_global_properties":
+                result = {"head_block_number": 20, "last_irreversible_block_num": 10}
+            else:
+                result = {"block": {"block_id": str(payload["params"]["block_num"])}}
+            return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": result})
+        with mock.patch.object(rpc, "request_send", side_effect=send):
+            rpc.get_block({"block_num": 5}, api="block")
+            rpc.get_dynamic_global_properties(api="database")
+            block = rpc.get_block({"block_num": 5}, api="block")
+            block["block"]["block_id"] = "changed"
+            self.assertEqual(rpc.get_block({"block_num": 5}, api="block"), {"block": {"block_id": "5"}})
+            rpc.get_block({"block_num": 11}, api="block")
+            rpc.get_block({"block_num": 11}, api="block")
+            rpc.get_block({"block_num": 5}, api="block", use_cache=False)
+        self.assertEqual(methods, ["block_api.get_block", "database_api.get_dynamic_global_properties",
+                                   "block_api.get_block", "block_api.get_block", "block_api.get_block",
+                                   "block_api.get_block"])
+        self.assertEqual(rpc.response_cache.stats()["hits"], 1)
@@ -0,0 +1,74 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import json
+import mock
+import unittest
+from beemapi.graphenerpc import GrapheneRPC
+from beemapi.rpcstats import RPCStats, get_method_name
+from beemapi.rpcutils import get_query
+
+
+class Testcases(unittest.TestCase):
+
+    def test_get_method_name(self):
+        self.assertEqual(get_method_name(get_query(True, 1, "block_api", "get_block", ({"block_num": 1}, ))),
+                         "block_api.get_block")
+        self.assertEqual(get_method_name(get_query(False, 1, "database_api", "get_config", ())),
+                         "database_api.get_config")
+        batch = get_query(True, 1, "block_api", "get_block", ([{"block_num": 1}, {"block_num": 2}], ))
+        self.assertEqual(get_method_name(batch), "block_api.get_block")
+
+    def test_record(self):
+        events = []
+        stats = RPCStats(buckets=[0.1, 1.], callback=events.append)
+        query = get_query(True, 1, "block_api", "get_block", ({"block_num": 1}, ))
+        stats.record_request("http://a", query, 0.05, 100, 1000)
+        stats.record_request("http://a", query, 0.5, 100, 0, error=True)
+        stats.record_request("http://a", [query, query], 2., 200, 2000)
+        stats.record_decode("http://a", query, 0.01)
+        stats.record_retry("http://a")
+        stats.record_retry("http://a", failover=True)
+        s = stats.get_stats()["nodes"]["http://a"]
+        self.assertEqual(s["retries"], 1)
+        self.assertEqual(s["failovers"], 1)
+        method = s["methods"]["block_api.get_block"]
+        self.assertEqual(method["requests"], 3)
+        self.assertEqual(method["errors"], 1)
+        self.assertEqual(method["batch_queries"], 4)
+        self.assertEqual(method["request_bytes"], 400)
+        self.assertEqual(method["response_bytes"], 3000)
+        self.assertEqual(method["latency_buckets"], [(0.1, 1), (1., 1), (float("inf"), 1)])
+        self.assertAlmostEqual(method["decode_time"], 0.01)
+        self.assertEqual(len(events), 3)
+        self.assertEqual(events[2]["batch_size"], 2)
+
+        text = stats.to_prometheus()
+        self.assertIn('beem_rpc_request_duration_seconds_bucket{node="http://a",method="block_api.get_block",le="1.0"} 2', text)
+        self.assertIn('beem_rpc_request_duration_seconds_bucket{node="http://a",method="block_api.get_block",le="+Inf"} 3', text)
+        self.assertIn('beem_rpc_failovers_total{node="http://a"} 1', text)
+        stats.reset()
+        self.assertEqual(stats.get_stats(), {"nodes": {}})
+
+    def test_rpc(self):
+        rpc = GrapheneRPC(["http://a", "http://b"], autoconnect=False, rpc_stats=True, num_retries=2,
+                          node_scoring=True)
+        rpc.url = "http://a"
+        rpc.current_rpc = rpc.rpc_methods["appbase"]
+
+        def send(payload):
+            payload = json.loads(payload)
+            if rpc.url == "http://a" and payload["method"] == "database_api.get_dynamic_global_properties":
+                raise IOError("Connection reset")
+            return json.dumps({"jsonrpc": "2.0", "id": payload["id"], "result": {"STEEM_BLOCKCHAIN_VERSION": "0.19.5"}})
+        with mock.patch.object(rpc, "request_send", side_effect=send):
+            rpc.get_config(api="database")
+            rpc.get_dynamic_global_properties(api="database")
+        nodes = rpc.rpc_stats.get_stats()["nodes"]
+        self.assertEqual(nodes["http://a"]["methods"]["database_api.get_config"]["requests"], 1)
+        self.assertEqual(nodes["http://a"]["methods"]["database_api.get_dynamic_global_properties"]["errors"], 1)
+        self.assertEqual(nodes["http://a"]["failovers"], 1)
+        self.assertEqual(nodes["http://b"]["methods"]["database_api.get_dynamic_global_properties"]["requests"], 1)
+        self.assertEqual(nodes["http://b"]["methods"]["database_api.get_dynamic_global_properties"]["decode_count"], 1)
@@ -81,3 +81,15 @@ class Testcases(unittest.TestCase):
         self.assertEqual(query["id"], 1)
         self.assertTrue(isinstance(query["params"], list))
         self.assertEqual(query["params"], ["test_api", "test", ["b"]])
+
+        # changing the arguments afterwards does not change the query
+        params = {"block_num": 1, "ops": [1, 2]}
+        query = get_query(True, 1, "block_api", "get_block", args=(params, ))
+        query_list = get_query(True, 1, "block_api", "get_block", args=((params, params), ))
+        query_call = get_query(False, 1, "block_api", "get_block", args=(params, ))
+        params["block_num"] = 2
+        params["ops"].append(3)
+        self.assertEqual(query["params"], {"block_num": 1, "ops": [1, 2]})
+        self.assertEqual(len(query_list), 2)
+        self.assertEqual(query_list[1]["params"], {"block_num": 1, "ops": [1, 2]})
+        self.assertEqual(query_call["params"][2], [{"block_num": 1, "ops": [1, 2]}])
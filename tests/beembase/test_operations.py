@@ -14,7 +14,8 @@ import os
 import json
 from pprint import pprint
 from beem.amount import Amount
-from beembase.operations import Transfer
+from beembase.operations import Transfer, operation_classes
+from beembase.operationids import ops, getOperationNameForId
 from beembase.objects import Operation
 from beembase.signedtransactions import Signed_Transaction
 
@@ -43,3 +44,18 @@ class Testcases(unittest.TestCase):
         s = Signed_Transaction(tx)
         s.sign(wifkeys=[wif], chain="STEEMAPPBASE")
         self.assertEqual(s.json()["operations"][0][1], transferJson)
+
+    def test_operation_classes(self):
+        for op_id, name in enumerate(ops):
+            self.assertEqual(getOperationNameForId(op_id), name)
+            if name not in operation_classes:
+                with self.assertRaises(NotImplementedError):
+                    Operation([name, {}])
+                continue
+            klass = operation_classes[name]
+            self.assertEqual(klass.__name__.lower(), name)
+            self.assertEqual(Operation(klass.__new__(klass)).opId, op_id)
+        self.assertEqual(getOperationNameForId(len(ops)), "Unknown Operation ID %d" % len(ops))
+        o = Operation([2, {'from': 'test', 'to': 'test1', 'amount': "1.000 STEEM", 'memo': 'foobar'}])
+        self.assertIsInstance(o.op, Transfer)
+        self.assertEqual(o.json()[0], "transfer")
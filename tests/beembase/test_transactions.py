@@ -7,6 +7,7 @@ from builtins import chr
 from builtins import range
 from builtins import super
 import random
+import json
 import unittest
 from pprint import pprint
 from binascii import hexlify
@@ -20,6 +21,8 @@ from beembase import (
 )
 from beembase.objects import Operation
 from beembase.signedtransactions import Signed_Transaction
+from beembase.deserializer import transaction_from_bytes
+from beemgraphenebase.ecdsasig import Signer
 from beemgraphenebase.account import PrivateKey
 from beemgraphenebase import account
 from beembase.operationids import getOperationNameForId
@@ -63,6 +66,10 @@ class Testcases(unittest.TestCase):
             print()
         self.assertEqual(self.cm[:-130], txWire[:-130])
 
+        # The wire format has to round-trip through the deserializer
+        tx2 = transaction_from_bytes(txWire)
+        self.assertEqual(hexlify(py23_bytes(tx2)).decode("ascii"), txWire)
+
         if TEST_AGAINST_CLI_WALLET:
             from grapheneapi.grapheneapi import GrapheneAPI
             rpc = GrapheneAPI("localhost", 8092)
@@ -1029,6 +1036,56 @@ class Testcases(unittest.TestCase):
                    'a866eb')
         self.doit()
 
+    def test_sign_with_signer(self):
+        self.op = operations.Transfer(**{
+            "from": "foo",
+            "to": "baar",
+            "amount": Amount("111.110 STEEM", steem_instance=self.stm),
+            "memo": "Fooo",
+            "prefix": default_prefix
+        })
+        signer = Signer(wif)
+        for i in range(2):
+            tx = Signed_Transaction(ref_block_num=ref_block_num,
+                                    ref_block_prefix=ref_block_prefix,
+                                    expiration=expiration,
+                                    operations=[Operation(self.op)])
+            tx = tx.sign([signer, signer], chain=prefix)
+            self.assertEqual(len(tx.data["signatures"].data), 1)
+            pubkeys = tx.verify([PrivateKey(wif, prefix=u"STM").pubkey], prefix, recover_parameter=True)
+            self.assertEqual(pubkeys, [hexlify(signer.pubkey).decode("ascii")])
+
+    def test_serialization(self):
+        op = operations.Custom_json(**{
+            "json": json.dumps({"data": ["x" * 100] * 100}),
+            "required_auths": [],
+            "required_posting_auths": ["test"],
+            "id": "test"
+        })
+        tx = Signed_Transaction(ref_block_num=ref_block_num,
+                                ref_block_prefix=ref_block_prefix,
+                                expiration=expiration,
+                                operations=[Operation(op)] * 10)
+        tx_id = tx.id
+        tx.sign([wif], chain=prefix)
+        self.assertEqual(tx.id, tx_id)
+        unsigned = tx.message[32:]
+        wire = py23_bytes(tx)
+        self.assertEqual(wire[:len(unsigned)], unsigned)
+        tx2 = transaction_from_bytes(hexlify(wire).decode("ascii"))
+        self.assertEqual(py23_bytes(tx2), wire)
+        self.assertEqual(tx2.id, tx_id)
+        # replacing a field or changing it in place changes the serialized transaction
+        tx.data["operations"] = objects.Array([Operation(op)])
+        self.assertNotEqual(tx.id, tx_id)
+        self.assertLess(len(py23_bytes(tx)), len(wire))
+        tx_id = tx.id
+        digest = tx.digest
+        tx.data["operations"].data.append(Operation(op))
+        self.assertNotEqual(tx.id, tx_id)
+        tx.deriveDigest(prefix)
+        self.assertNotEqual(tx.digest, digest)
+
 
 """
     def test_limit_order_create(self):
@@ -1097,7 +1154,6 @@ class Testcases(unittest.TestCase):
                    "8e641948")
         self.doit()
 
-
     def self.cmConstructedTX(self):
         self.maxDiff = None
         self.op = operations.Bid_collateral(**{
@@ -0,0 +1,63 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from beemgraphenebase import types
+from beemgraphenebase import deserializer
+from beemgraphenebase.account import PublicKey
+from beemgraphenebase.py23 import py23_bytes
+
+
+class Testcases(unittest.TestCase):
+    def read(self, obj, reader, *args):
+        data = bytearray(py23_bytes(obj))
+        value, offset = reader(data, 0, *args)
+        self.assertEqual(offset, len(data))
+        return value
+
+    def test_varint(self):
+        for n in [0, 1, 127, 128, 300, 2 ** 32 - 1, 2 ** 63]:
+            self.assertEqual(self.read(types.Varint32(n), deserializer.read_varint), n)
+
+    def test_integers(self):
+        self.assertEqual(self.read(types.Uint8(255), deserializer.read_uint8), 255)
+        self.assertEqual(self.read(types.Int16(-10000), deserializer.read_int16), -10000)
+        self.assertEqual(self.read(types.Uint16(65535), deserializer.read_uint16), 65535)
+        self.assertEqual(self.read(types.Uint32(4294967295), deserializer.read_uint32), 4294967295)
+        self.assertEqual(self.read(types.Uint64(2 ** 64 - 1), deserializer.read_uint64), 2 ** 64 - 1)
+        self.assertEqual(self.read(types.Int64(-2 ** 63), deserializer.read_int64), -2 ** 63)
+        self.assertTrue(self.read(types.Bool(True), deserializer.read_bool))
+        self.assertFalse(self.read(types.Bool(False), deserializer.read_bool))
+
+    def test_string(self):
+        self.assertEqual(self.read(types.String("Hello ₿ö"), deserializer.read_string), "Hello ₿ö")
+        self.assertEqual(self.read(types.Bytes("00ff10"), deserializer.read_bytes), "00ff10")
+        with self.assertRaises(ValueError):
+            deserializer.read_string(bytearray(b"\x05abc"), 0)
+
+    def test_point_in_time(self):
+        self.assertEqual(self.read(types.PointInTime("2018-07-06T12:01:59"), deserializer.read_point_in_time),
+                         "2018-07-06T12:01:59")
+
+    def test_public_key(self):
+        key = "STM728uLvStTeAkYJsQefks3FX8yfmpFHp8wXw3RY3kwey2JGDooR"
+        self.assertEqual(self.read(PublicKey(key, prefix="STM"), deserializer.read_public_key, "STM"), key)
+
+    def test_containers(self):
+        array = types.Array([types.String("a"), types.String("bc")])
+        self.assertEqual(self.read(array, deserializer.read_array, deserializer.read_string), ["a", "bc"])
+        m = types.Map([[types.String("a"), types.Uint16(1)], [types.String("b"), types.Uint16(2)]])
+        self.assertEqual(self.read(m, deserializer.read_map, deserializer.read_string, deserializer.read_uint16),
+                         [["a", 1], ["b", 2]])
+        self.assertIsNone(self.read(types.Optional(None), deserializer.read_optional, deserializer.read_uint16))
+        self.assertEqual(self.read(types.Optional(types.Uint16(5)), deserializer.read_optional, deserializer.read_uint16), 5)
+        variant = types.Static_variant(types.Uint32(7), 2)
+        self.assertEqual(self.read(variant, deserializer.read_static_variant, {2: deserializer.read_uint32}), [2, 7])
+        with self.assertRaises(ValueError):
+            self.read(variant, deserializer.read_static_variant, {0: deserializer.read_uint32})
+
+
+if __name__ == '__main__':
+    unittest.main()
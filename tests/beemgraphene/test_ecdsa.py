@@ -89,6 +89,61 @@ class Testcases(unittest.TestCase):
         pub_key_sig2 = ecda.verify_message("Foobar2", signature)
         self.assertTrue(hexlify(pub_key_sig2) != pub_key)
 
+    @parameterized.expand([
+        ("cryptography"),
+        ("secp256k1"),
+        ("ecdsa"),
+    ])
+    def test_recover_pubkey_from_digest(self, module):
+        if module == "cryptography":
+            if not ecda.CRYPTOGRAPHY_AVAILABLE:
+                return
+        elif module == "secp256k1":
+            if not ecda.SECP256K1_AVAILABLE:
+                return
+        ecda.SECP256K1_MODULE = module
+        pub_key = py23_bytes(repr(PrivateKey(wif).pubkey), "latin")
+        for message in ["Foobar", "foo", "1234567890"]:
+            signature = ecda.sign_message(message, wif)
+            digest = hashlib.sha256(py23_bytes(message, "utf-8")).digest()
+            self.assertEqual(hexlify(ecda.recover_pubkey_from_digest(digest, signature)), pub_key)
+            self.assertEqual(ecda.recover_pubkey_from_digest(digest, signature),
+                             ecda.verify_message(message, signature))
+            # another digest recovers another key
+            wrong_digest = hashlib.sha256(b"Foobar2").digest()
+            self.assertNotEqual(hexlify(ecda.recover_pubkey_from_digest(wrong_digest, signature)), pub_key)
+        # invalid recovery parameter, length and r
+        self.assertIsNone(ecda.recover_pubkey_from_digest(digest, b"\x00" + signature[1:]))
+        self.assertIsNone(ecda.recover_pubkey_from_digest(digest, signature[:64]))
+        self.assertIsNone(ecda.recover_pubkey_from_digest(digest, signature[:1] + b"\x00" * 64))
+
+    @parameterized.expand([
+        ("cryptography"),
+        ("secp256k1"),
+        ("ecdsa"),
+    ])
+    def test_signer(self, module):
+        if module == "cryptography":
+            if not ecda.CRYPTOGRAPHY_AVAILABLE:
+                return
+        elif module == "secp256k1":
+            if not ecda.SECP256K1_AVAILABLE:
+                return
+        ecda.SECP256K1_MODULE = module
+        signer = ecda.Signer(wif)
+        pub_key = py23_bytes(repr(PrivateKey(wif).pubkey), "latin")
+        self.assertEqual(hexlify(signer.pubkey), pub_key)
+        digests = [hashlib.sha256(py23_bytes("message %d" % i, "utf-8")).digest() for i in range(10)]
+        signatures = signer.sign_digests(digests)
+        self.assertEqual(len(signatures), 10)
+        for digest, signature in zip(digests, signatures):
+            self.assertEqual(len(signature), 65)
+            self.assertTrue(ecda._is_canonical(signature[1:]))
+            self.assertEqual(hexlify(ecda.recover_pubkey_from_digest(digest, signature)), pub_key)
+        signature = signer.sign_message("Foobar")
+        self.assertEqual(hexlify(ecda.verify_message("Foobar", signature)), pub_key)
+        self.assertEqual(hexlify(ecda.Signer(PrivateKey(wif)).pubkey), pub_key)
+
 
 if __name__ == '__main__':
     unittest.main()
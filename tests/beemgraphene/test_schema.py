@@ -0,0 +1,74 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+from collections import OrderedDict
+from beemgraphenebase import types
+from beemgraphenebase.objects import GrapheneObject, SchemaObject
+from beemgraphenebase.schema import Schema, FieldType, get_field_type
+from beemgraphenebase.py23 import py23_bytes
+
+
+class Example(SchemaObject):
+    schema = Schema("example", [
+        ("name", "string"),
+        ("weight", "int16"),
+        ("approve", "bool"),
+        ("auths", ("array", "string")),
+        ("expiration", "point_in_time"),
+        ("extensions", "empty_extensions"),
+    ])
+
+
+def example_wrappers(kwargs):
+    return GrapheneObject(OrderedDict([
+        ("name", types.String(kwargs["name"])),
+        ("weight", types.Int16(kwargs["weight"])),
+        ("approve", types.Bool(kwargs["approve"])),
+        ("auths", types.Array([types.String(a) for a in kwargs["auths"]])),
+        ("expiration", types.PointInTime(kwargs["expiration"])),
+        ("extensions", types.Array([])),
+    ]))
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.kwargs = {"name": "foo\n", "weight": -100, "approve": True, "auths": ["a", "bc"],
+                       "expiration": "2018-01-01T00:00:00", "extensions": ["ignored"]}
+
+    def test_encode(self):
+        obj = Example(**self.kwargs)
+        self.assertEqual(obj._values, ("foo\n", -100, 1, ["a", "bc"], "2018-01-01T00:00:00", []))
+        self.assertEqual(py23_bytes(obj), py23_bytes(example_wrappers(self.kwargs)))
+        self.assertEqual(obj.json(), example_wrappers(self.kwargs).json())
+        self.assertEqual(py23_bytes(Example(obj)), py23_bytes(obj))
+
+    def test_decode(self):
+        obj = Example(self.kwargs)
+        data = bytearray(py23_bytes(obj))
+        result, offset = Example.schema.decode(data, 0)
+        self.assertEqual(offset, len(data))
+        self.assertEqual(list(result.keys()), list(Example.schema.names))
+        self.assertEqual(py23_bytes(Example(result)), py23_bytes(obj))
+
+    def test_data(self):
+        obj = Example(self.kwargs)
+        self.assertIsInstance(obj.data["weight"], types.Int16)
+        # changes of the fields are serialized
+        obj.data["weight"] = types.Int16(5)
+        self.assertEqual(obj.json()["weight"], 5)
+        self.assertEqual(py23_bytes(obj)[5:7], b"\x05\x00")
+
+    def test_field_types(self):
+        with self.assertRaises(ValueError):
+            Schema("unknown", [("a", "float")])
+        with self.assertRaises(KeyError):
+            Example(name="foo")
+        custom = FieldType(write=lambda buf, value: buf.extend(value), read=None)
+        self.assertIs(get_field_type(custom), custom)
+        schema = Schema("custom", [("raw", custom), ("flag", "uint8")])
+        buf = bytearray()
+        schema.encode(buf, schema.normalize({"raw": b"\x01\x02", "flag": "3"}))
+        self.assertEqual(bytes(buf), b"\x01\x02\x03")
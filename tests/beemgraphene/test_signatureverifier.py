@@ -0,0 +1,61 @@
+# This Python file uses the following encoding: utf-8
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+import unittest
+import hashlib
+from binascii import hexlify
+from beemgraphenebase.account import PrivateKey
+import beemgraphenebase.ecdsasig as ecda
+from beemgraphenebase.signatureverifier import SignatureVerifier
+from beemgraphenebase.py23 import py23_bytes
+from beembase.signedtransactions import Signed_Transaction
+from beembase.objects import Operation
+
+wif = "5J4KCbg1G3my9b9hCaQXnHSm6vrwW9xQTJS6ZciW2Kek7cCkCEk"
+wif2 = "5KQwrPbwdL6PhXujxW37FSSQZ1JiwsST4cqQzDeyXtP79zkvFD3"
+
+
+class Testcases(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.items = []
+        for i in range(6):
+            message = py23_bytes("message %d" % i, "utf-8")
+            cls.items.append((hashlib.sha256(message).digest(), ecda.sign_message(message, wif if i % 2 else wif2)))
+        cls.pubkeys = [py23_bytes(repr(PrivateKey(wif2 if i % 2 == 0 else wif).pubkey), "latin") for i in range(6)]
+
+    def test_recover(self):
+        verifier = SignatureVerifier(cache_size=4)
+        pubkeys = verifier.recover(self.items + [self.items[0]])
+        self.assertEqual([hexlify(p) for p in pubkeys], self.pubkeys + self.pubkeys[:1])
+        # the repeated signature is recovered once
+        self.assertEqual(verifier.stats(), {"entries": 4, "hits": 0, "misses": 6})
+        pubkeys = verifier.recover(self.items[-2:] + [(self.items[0][0], b"\x00" * 65)])
+        self.assertEqual([hexlify(p) for p in pubkeys[:2]], self.pubkeys[-2:])
+        self.assertIsNone(pubkeys[2])
+        self.assertEqual(verifier.stats()["hits"], 2)
+        # a signature is only valid for its digest
+        pubkeys = verifier.recover([(self.items[1][0], self.items[0][1])])
+        self.assertNotEqual(hexlify(pubkeys[0]), self.pubkeys[0])
+
+    def test_process_pool(self):
+        with SignatureVerifier(processes=2, chunk_size=2) as verifier:
+            pubkeys = verifier.recover(self.items)
+        self.assertEqual([hexlify(p) for p in pubkeys], self.pubkeys)
+
+    def test_verify_transactions(self):
+        txs = []
+        for i in range(3):
+            op = Operation(["transfer", {"from": "foo", "to": "baar", "amount": "%d.000 STEEM" % (i + 1), "memo": "Fooo"}])
+            tx = Signed_Transaction(ref_block_num=34294, ref_block_prefix=3707022213,
+                                    expiration="2016-04-06T08:29:27", operations=[op])
+            tx.sign([wif, wif2] if i == 1 else [wif], chain="STEEM")
+            txs.append(tx)
+        verifier = SignatureVerifier()
+        pubkeys = verifier.verify_transactions(txs, chain="STEEM")
+        self.assertEqual([len(p) for p in pubkeys], [1, 2, 1])
+        for tx, keys in zip(txs, pubkeys):
+            self.assertEqual(keys, tx.verify(chain="STEEM", recover_parameter=True))
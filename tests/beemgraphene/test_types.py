@@ -23,3 +23,24 @@ class Testcases(unittest.TestCase):
         j = a.json()
         j2 = types.JsonObj(json.dumps(j))
         self.assertEqual(j, j2)
+
+    def test_String(self):
+        s = types.String("a\x00\x08\t\n\x0b\x0c\r\x1fä")
+        self.assertEqual(s.unicodify(), "au0000b\t\nu000bf\ru001fä".encode("utf-8"))
+        self.assertEqual(bytes(s), b"\x17" + s.unicodify())
+        self.assertEqual(bytes(types.String("")), b"\x00")
+
+    def test_write_bytes(self):
+        buf = bytearray(b"\xff")
+        types.write_bytes(buf, types.Uint16(1))
+        types.write_bytes(buf, types.Array([types.String("ab"), types.Uint8(2)]))
+        types.write_bytes(buf, types.Map([[types.String("a"), types.Uint8(1)]]))
+        types.write_bytes(buf, types.Static_variant(types.Uint8(3), 2))
+        self.assertEqual(bytes(buf), b"\xff\x01\x00\x02\x02ab\x02\x01\x01a\x01\x02\x03")
+
+    def test_Optional(self):
+        self.assertEqual(bytes(types.Optional(None)), b"\x00")
+        self.assertEqual(bytes(types.Optional(types.Uint8(5))), b"\x01\x05")
+        # values without wire representation are serialized as empty
+        self.assertEqual(bytes(types.Optional(types.Void())), b"\x00")
+        self.assertTrue(types.Optional(types.Void()).isempty())